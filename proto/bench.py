@@ -0,0 +1,261 @@
+#!/usr/bin/env python
+"""Benchmarks of cheby.
+
+   Usage: python bench.py [--runs N] [BENCH...]
+   Run all the benchmarks if none is specified."""
+
+import sys
+import os
+import time
+import glob
+import argparse
+import statistics
+import subprocess
+import tracemalloc
+import cheby.yamlread as yamlread
+import cheby.parser as parser
+import cheby.tree as tree
+import cheby.layout as layout
+import cheby.sprint as sprint
+import cheby.expand_hdl as expand_hdl
+from cheby.hdl.decoder import build_decoder
+
+protodir = os.path.dirname(os.path.abspath(__file__))
+srcdir = os.path.join(protodir, '..', 'testfiles')
+
+
+class BenchFailure(Exception):
+    pass
+
+
+def report(name, times):
+    """Print the statistics of :param times: (in seconds) and return the
+       median."""
+    med = statistics.median(times)
+    print('{:<40} min: {:8.2f} ms  median: {:8.2f} ms  ({} runs)'.format(
+        name, min(times) * 1e3, med * 1e3, len(times)))
+    return med
+
+
+def time_command(cmd, runs):
+    "Return the wall times of :param runs: executions of :param cmd:"
+    res = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(cmd, cwd=protodir, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        res.append(time.perf_counter() - start)
+    return res
+
+
+def bench_startup(args):
+    """Latency of a cold 'cheby --gen-c' (a new interpreter for each run),
+       compared with the time to import all the back-ends."""
+    gen_c = [sys.executable, '-m', 'cheby.main', '--gen-c=' + os.devnull,
+             '-i', os.path.join(srcdir, 'demo.cheby')]
+    med = report('startup: cheby --gen-c', time_command(gen_c, args.runs))
+    import_all = [sys.executable, '-c',
+                  'import cheby.main as m\n'
+                  'for b in m.BACKENDS.values(): b._load()']
+    report('startup: import all back-ends', time_command(import_all, args.runs))
+    if args.max_startup is not None and med * 1e3 > args.max_startup:
+        raise BenchFailure('cheby --gen-c takes {:.2f} ms (limit: {} ms)'.format(
+            med * 1e3, args.max_startup))
+
+
+def bench_yaml(args):
+    """Time to load all the files of the testfiles corpus, with the python
+       and with the libyaml loaders."""
+    files = sorted(glob.glob(os.path.join(srcdir, '**', '*.cheby'), recursive=True))
+    loaders = [False]
+    if yamlread.MyCSafeLoader is not None:
+        loaders.append(True)
+    else:
+        print('yaml: libyaml is not available')
+    for use_libyaml in loaders:
+        yamlread.use_libyaml = use_libyaml
+        times = []
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            for f in files:
+                with open(f) as fd:
+                    yamlread.load(fd)
+            times.append(time.perf_counter() - start)
+        report('yaml: {} files ({})'.format(
+            len(files), 'libyaml' if use_libyaml else 'python'), times)
+
+
+def synthetic_map(nbr_regs):
+    """Return a laid-out flat memory map of :param nbr_regs: registers (one
+       in eight is a 64-bit register, to be decoded over two words)."""
+    root = tree.Root()
+    root.name = 'synth'
+    root.bus = 'wb-32-be'
+    root.c_filename = 'synth.cheby'
+    for i in range(nbr_regs):
+        reg = tree.Reg(root)
+        reg.name = 'r{}'.format(i)
+        reg.width = 64 if i % 8 == 7 else 32
+        reg.access = 'rw'
+        root.children.append(reg)
+    layout.layout_cheby(root)
+    return root
+
+
+def bench_decoder(args):
+    """Time to build the HDL address decoder of flat maps of increasing size.
+       The time per register should stay (almost) constant."""
+    for nbr_regs in [1000, 10000, 100000]:
+        root = synthetic_map(nbr_regs)
+        times = []
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            build_decoder(root)
+            times.append(time.perf_counter() - start)
+        med = report('decoder: {} registers'.format(nbr_regs), times)
+        print('{:<40} {:8.2f} us/register'.format('', med * 1e6 / nbr_regs))
+
+
+class NodeCounter(tree.Visitor):
+    "Count the nodes of a tree, with a method per kind of node"
+    def __init__(self):
+        self.nbr = 0
+
+
+@NodeCounter.register(tree.NamedNode)
+def count_node(v, n):
+    v.nbr += 1
+
+
+@NodeCounter.register(tree.Reg)
+@NodeCounter.register(tree.Root)
+def count_children(v, n):
+    v.nbr += 1
+    for el in n.children:
+        v.visit(el)
+
+
+class FieldCounter(NodeCounter):
+    "A derived visitor: the methods are found through its base class"
+    pass
+
+
+def bench_visit(args):
+    """Time of full-tree visits of a large laid-out map, with a minimal
+       visitor (so that the dispatch dominates) and with sprint."""
+    root = synthetic_map(50000)
+    for cls in [NodeCounter, FieldCounter]:
+        times = []
+        for _ in range(args.runs):
+            v = cls()
+            start = time.perf_counter()
+            v.visit(root)
+            times.append(time.perf_counter() - start)
+        med = report('visit: {} ({} nodes)'.format(cls.__name__, v.nbr), times)
+        print('{:<40} {:8.2f} ns/node'.format('', med * 1e9 / v.nbr))
+    times = []
+    with open(os.devnull, 'w') as fd:
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            sprint.sprint_cheby(fd, root)
+            times.append(time.perf_counter() - start)
+    report('visit: sprint', times)
+
+
+def count_regs(n):
+    "Return the number of registers of :param n: (including submaps)"
+    if isinstance(n, tree.Reg):
+        return 1
+    res = 0
+    if isinstance(n, tree.Submap) and n.c_submap is not None:
+        res += count_regs(n.c_submap)
+    if isinstance(n, tree.CompositeNode):
+        for el in n.children:
+            res += count_regs(el)
+    return res
+
+
+def traced_size(build):
+    """Return the result of :param build: and the memory (in bytes) it
+       allocates and keeps."""
+    tracemalloc.start()
+    try:
+        start = tracemalloc.get_traced_memory()[0]
+        res = build()
+        return res, tracemalloc.get_traced_memory()[0] - start
+    finally:
+        tracemalloc.stop()
+
+
+def load_corpus(files):
+    "Return the expanded trees of :param files: (ignoring the invalid ones)"
+    res = []
+    with open(os.devnull, 'w') as fd:
+        old_stdout = sys.stdout
+        sys.stdout = fd
+        try:
+            for f in files:
+                try:
+                    t = parser.parse_yaml(f)
+                    layout.layout_cheby(t)
+                    expand_hdl.expand_hdl(t)
+                except Exception:
+                    continue
+                res.append(t)
+        finally:
+            sys.stdout = old_stdout
+    return res
+
+
+def bench_memory(args):
+    """Memory used by the laid-out and expanded trees of the testfiles
+       corpus and of a flat synthetic map of 100k registers."""
+    files = sorted(glob.glob(os.path.join(srcdir, '**', '*.cheby'), recursive=True))
+    trees, size = traced_size(lambda: load_corpus(files))
+    nbr_regs = sum(count_regs(t) for t in trees)
+    print('{:<40} {:8.2f} MB  {:8.0f} bytes/register ({} trees, {} registers)'.format(
+        'memory: testfiles', size / 1e6, size / nbr_regs, len(trees), nbr_regs))
+    nbr_regs = 100000
+
+    def build():
+        root = synthetic_map(nbr_regs)
+        expand_hdl.expand_hdl(root)
+        return root
+
+    _, size = traced_size(build)
+    print('{:<40} {:8.2f} MB  {:8.0f} bytes/register'.format(
+        'memory: {} registers'.format(nbr_regs), size / 1e6, size / nbr_regs))
+
+
+BENCHS = {
+    'decoder': bench_decoder,
+    'memory': bench_memory,
+    'startup': bench_startup,
+    'visit': bench_visit,
+    'yaml': bench_yaml,
+}
+
+
+def main():
+    aparser = argparse.ArgumentParser(description='cheby benchmarks')
+    aparser.add_argument('--runs', type=int, default=10,
+                         help='number of runs of each benchmark')
+    aparser.add_argument('--max-startup', type=float,
+                         help='fail if cheby --gen-c takes more than this time (in ms)')
+    aparser.add_argument('benchs', nargs='*',
+                         help='benchmarks to run ({})'.format(', '.join(sorted(BENCHS))))
+    args = aparser.parse_args()
+    for name in args.benchs:
+        if name not in BENCHS:
+            aparser.error('unknown benchmark {}'.format(name))
+
+    try:
+        for name in args.benchs or sorted(BENCHS):
+            BENCHS[name](args)
+    except BenchFailure as e:
+        sys.stderr.write('error: {}\n'.format(e))
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,173 @@
+"""Reverse lookup: find the element at a bus address.
+
+   An AddressIndex is built for a laid-out tree (or an address space).  It
+   contains the sorted address intervals of the leaves (registers, memories,
+   repeats and submaps without a description); blocks and submaps with a
+   description are flattened.  Memories and repeats are not unrolled: the
+   index of the element is computed, and the address within the element
+   is looked up in a sub-index of their children.
+
+   The addresses are byte addresses, relative to the start of the tree."""
+
+import sys
+import bisect
+import cheby.tree as tree
+
+
+class AddressMatch(object):
+    """Result of a lookup.
+       :var node: the element (a register, or a submap without
+         description).
+       :var path: the path of the element, with the indexes of the
+         memories and repeats (like /top/arr[2]/reg).
+       :var offset: the byte offset of the address within the element.
+       :var fields: the fields of the register in the word at this address
+         (empty if the register has no fields)."""
+    def __init__(self, node, path, offset, fields=()):
+        self.node = node
+        self.path = path
+        self.offset = offset
+        self.fields = fields
+
+    def __str__(self):
+        res = self.path
+        if self.offset != 0:
+            res += '+0x{:x}'.format(self.offset)
+        if self.fields:
+            res += ' [{}]'.format(', '.join(f.name for f in self.fields))
+        return res
+
+
+def word_fields(reg, off, word_size, word_endian):
+    "Return the fields of :param reg: in the word at byte offset :param off:"
+    if not reg.has_fields():
+        return ()
+    off -= off % word_size
+    if reg.c_size > word_size and word_endian == 'big':
+        # The first word has the most significant bits.
+        off = reg.c_size - word_size - off
+    lo = off * tree.BYTE_SIZE
+    hi = lo + word_size * tree.BYTE_SIZE - 1
+    return tuple(f for f in reg.children
+                 if f.lo <= hi and (f.lo if f.hi is None else f.hi) >= lo)
+
+
+class AddressIndex(object):
+    """Sorted intervals of the leaves of :param n: (a root, an address space
+       or the children of a memory or of a repeat)."""
+    def __init__(self, n, path=None):
+        root = n.get_root()
+        self.word_size = root.c_word_size
+        self.word_endian = root.c_word_endian
+        # Intervals: start addresses, end addresses (excluded), nodes and
+        # paths.
+        self.starts = []
+        self.ends = []
+        self.nodes = []
+        self.paths = []
+        # Sub-indexes of memories and repeats (by id).
+        self.subs = {}
+        # Fields of the words of the registers (by id and word number).
+        self.fields = {}
+        leaves = []
+        if path is None:
+            path = n.get_path()
+        self.add_children(leaves, n, 0, path)
+        leaves.sort(key=lambda x: x[0])
+        for start, node, p in leaves:
+            self.starts.append(start)
+            self.ends.append(start + node.c_size)
+            self.nodes.append(node)
+            self.paths.append(p)
+
+    def add_children(self, leaves, n, base, path):
+        for c in n.children:
+            addr = base + c.c_address
+            p = '{}/{}'.format(path, c.name)
+            if isinstance(c, tree.Block):
+                self.add_children(leaves, c, addr, p)
+            elif isinstance(c, tree.Submap) and c.filename is not None:
+                self.add_children(leaves, c.c_submap, addr, p)
+            elif isinstance(c, (tree.Reg, tree.Memory, tree.Repeat, tree.Submap)):
+                leaves.append((addr, c, p))
+            else:
+                raise AssertionError(c)
+
+    def lookup(self, addr):
+        "Return the AddressMatch for :param addr:, or None if there is no element"
+        i = bisect.bisect_right(self.starts, addr) - 1
+        if i < 0 or addr >= self.ends[i]:
+            return None
+        node = self.nodes[i]
+        off = addr - self.starts[i]
+        if isinstance(node, tree.Reg):
+            key = (id(node), off // self.word_size)
+            fields = self.fields.get(key)
+            if fields is None:
+                fields = word_fields(node, off, self.word_size, self.word_endian)
+                self.fields[key] = fields
+            return AddressMatch(node, self.paths[i], off, fields)
+        elif isinstance(node, (tree.Memory, tree.Repeat)):
+            idx = off // node.c_elsize
+            count = node.count if isinstance(node, tree.Repeat) else node.c_depth
+            if idx >= count:
+                # Padding after the last element (the size is aligned).
+                return None
+            sub = self.subs.get(id(node))
+            if sub is None:
+                sub = AddressIndex(node, '')
+                self.subs[id(node)] = sub
+            res = sub.lookup(off - idx * node.c_elsize)
+            if res is None:
+                # Hole in the element.
+                return None
+            res.path = '{}[{}]{}'.format(self.paths[i], idx, res.path)
+            return res
+        else:
+            # Submap without description.
+            return AddressMatch(node, self.paths[i], off)
+
+    def lookup_all(self, addrs):
+        "Return the list of AddressMatch (or None) for the addresses :param addrs:"
+        return [self.lookup(addr) for addr in addrs]
+
+
+def parse_addresses(values):
+    """Return the list of addresses of :param values: (from --decode-address).
+       A value is an address (in C syntax, like 0x1000), or a file (@FILE) of
+       addresses separated by blanks ('@-' for the standard input)."""
+    res = []
+    for v in values:
+        if v.startswith('@'):
+            if v == '@-':
+                words = sys.stdin.read().split()
+            else:
+                with open(v[1:]) as f:
+                    words = f.read().split()
+        else:
+            words = [v]
+        for w in words:
+            try:
+                res.append(int(w, 0))
+            except ValueError:
+                raise ValueError("bad address '{}'".format(w))
+    return res
+
+
+def decode_addresses(fd, n, addrs):
+    "Write to :param fd: the elements at addresses :param addrs: of :param n:"
+    idx = AddressIndex(n)
+    # Traces usually have many times the same addresses.
+    cache = {}
+    lines = []
+    for addr in addrs:
+        line = cache.get(addr)
+        if line is None:
+            m = idx.lookup(addr)
+            line = '0x{:08x}: {}\n'.format(addr, '-' if m is None else m)
+            cache[addr] = line
+        lines.append(line)
+        if len(lines) >= 4096:
+            fd.write(''.join(lines))
+            lines = []
+    fd.write(''.join(lines))
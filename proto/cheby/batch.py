@@ -0,0 +1,239 @@
+"""Generate the outputs of many files from a single process.
+
+   Usage: cheby batch [OPTIONS] INPUTS...
+
+   The options are the same as for cheby, but the names of the output files
+   are templates expanded for each input: '{dir}' is replaced by the
+   directory of the input and '{name}' by its basename without the
+   extension.  An input can be a file, a directory (all the .cheby files
+   under it are used) or a glob pattern.  The files are processed by a pool
+   of --jobs processes, and the files whose outputs are up to date are
+   skipped (unless --force is given)."""
+
+import sys
+import os
+import io
+import glob
+import argparse
+import concurrent.futures
+import cheby.parser
+import cheby.layout as layout
+import cheby.treecache as treecache
+import cheby.compiled as compiled
+import cheby.main as cheby_main
+
+
+class BatchException(Exception):
+    """Exception raised in case of incorrect batch arguments"""
+    pass
+
+
+def build_argparser():
+    aparser = cheby_main.build_argparser()
+    aparser.prog = 'cheby batch'
+    aparser.description = 'generate the outputs of many cheby files'
+    aparser.add_argument('--force', action='store_true',
+                         help='generate the outputs even if they are up to date')
+    aparser.add_argument('inputs', nargs='*',
+                         help='input files, directories or glob patterns')
+    return aparser
+
+
+def find_inputs(args):
+    """Return the list of input files of :param args: (in order, without
+       duplicates)."""
+    patterns = list(args.inputs)
+    if args.input is not None:
+        patterns.insert(0, args.input)
+    res = []
+    for p in patterns:
+        if os.path.isdir(p):
+            files = sorted(glob.glob(os.path.join(p, '**', '*.cheby'), recursive=True))
+        elif os.path.exists(p):
+            files = [p]
+        else:
+            files = sorted(glob.glob(p, recursive=True))
+            if not files:
+                raise BatchException("no input matches '{}'".format(p))
+        for f in files:
+            if f not in res:
+                res.append(f)
+    return res
+
+
+def expand_outputs(args, filename):
+    """Return a copy of :param args: with the output templates expanded
+       for input :param filename:"""
+    name, _ = os.path.splitext(os.path.basename(filename))
+    subst = {'dir': os.path.dirname(filename) or '.', 'name': name}
+    res = argparse.Namespace(**vars(args))
+    for act in cheby_main.OUTPUT_ACTIONS + ['out_prefix', 'depfile']:
+        v = getattr(args, act)
+        if not isinstance(v, str) or v == '+units':
+            continue
+        if v == '-':
+            raise BatchException("cannot write '--{}' to stdout in batch mode".format(
+                act.replace('_', '-')))
+        try:
+            setattr(res, act, v.format(**subst))
+        except (KeyError, IndexError, ValueError) as e:
+            raise BatchException("incorrect template '{}' for '--{}': {}".format(
+                v, act.replace('_', '-'), e))
+    return res
+
+
+def output_files(args):
+    "Return the list of files written by :param args:"
+    res = cheby_main.output_filenames(args)
+    if args.depfile is not None:
+        res.append(args.depfile)
+    return res
+
+
+def gather_files(filename, res):
+    """Add to :param res: :param filename: and (recursively) the files
+       included through its submaps."""
+    filename = os.path.abspath(filename)
+    if filename in res:
+        return
+    res.add(filename)
+    if compiled.is_compiled(filename):
+        # Submaps are part of the compiled file.
+        return
+    try:
+        t = cheby.parser.parse_yaml(filename)
+    except cheby.parser.ParseException:
+        # Will be reported when the file is processed.
+        return
+    submaps = []
+    layout.submap_filenames(t, submaps)
+    for f in submaps:
+        gather_files(f, res)
+
+
+def is_up_to_date(outputs, deps):
+    """Return True if all the files of :param outputs: exist and are
+       more recent than all the files of :param deps:"""
+    if not outputs:
+        return False
+    try:
+        oldest = min(os.stat(f).st_mtime for f in outputs)
+        newest = max(os.stat(f).st_mtime for f in deps)
+    except OSError:
+        return False
+    return oldest >= newest
+
+
+def init_worker(args):
+    """Set the global configuration in a worker process."""
+    layout.word_endianness = args.word_endian
+    cheby_main.open_filename.only_if_changed = args.only_if_changed
+    if args.cache_dir is not None:
+        layout.tree_cache = treecache.TreeCache(args.cache_dir, args.cache_max_size << 20)
+
+
+def process_file(args, outputs, filename):
+    """Generate the outputs for :param filename:.  Return a pair
+       (status, messages) where status is True if the outputs were
+       generated, False if they were up to date and None on error."""
+    stderr = sys.stderr
+    sys.stderr = io.StringIO()
+    try:
+        status = generate_file(args, outputs, filename)
+    except cheby.parser.ParseException as e:
+        sys.stderr.write("{}:{}\n".format(filename, e))
+        status = None
+    except layout.LayoutException as e:
+        sys.stderr.write(str(e) + '\n')
+        status = None
+    except SystemExit:
+        # Errors already reported.
+        status = None
+    except Exception as e:
+        # Any other failure is reported for this file only.
+        sys.stderr.write("{}:error: {}\n".format(filename, str(e) or type(e).__name__))
+        status = None
+    finally:
+        messages = sys.stderr.getvalue()
+        sys.stderr = stderr
+    return (status, messages)
+
+
+def generate_file(args, outputs, filename):
+    """Generate the outputs for :param filename: unless they are up to date.
+       Return True if they were generated."""
+    fargs = expand_outputs(args, filename)
+    foutputs = [expand_outputs(o, filename) for o in outputs]
+    files = output_files(fargs)
+    for o in foutputs:
+        files.extend(output_files(o))
+    if not args.force:
+        deps = set()
+        gather_files(filename, deps)
+        if args.outputs is not None:
+            deps.add(args.outputs)
+        if is_up_to_date(files, deps):
+            return False
+    for f in files:
+        d = os.path.dirname(f)
+        if d:
+            os.makedirs(d, exist_ok=True)
+    # Files are processed in parallel, not their submaps.
+    fargs.jobs = 1
+    cheby_main.handle_file(fargs, filename, foutputs)
+    return True
+
+
+def run(args, outputs, inputs):
+    """Process all the files of :param inputs:.  Messages are written in the
+       order of the inputs.  Return the number of files in error."""
+    nbr_errors = 0
+    if args.jobs > 1:
+        executor = concurrent.futures.ProcessPoolExecutor(
+            args.jobs, initializer=init_worker, initargs=(args,))
+        results = executor.map(process_file, [args] * len(inputs),
+                               [outputs] * len(inputs), inputs)
+    else:
+        executor = None
+        results = (process_file(args, outputs, f) for f in inputs)
+    try:
+        for status, messages in results:
+            sys.stderr.write(messages)
+            if status is None:
+                nbr_errors += 1
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    return nbr_errors
+
+
+def main(argv=None):
+    args = build_argparser().parse_args(argv)
+    cheby_main.set_gconfig(args)
+    init_worker(args)
+    outputs = []
+    if args.outputs is not None:
+        try:
+            outputs = cheby_main.load_outputs(args, args.outputs)
+        except cheby.parser.ParseException as e:
+            sys.stderr.write("{}:{}\n".format(args.outputs, e))
+            sys.exit(2)
+    cheby_main.check_units([args] + outputs)
+    try:
+        inputs = find_inputs(args)
+        if not inputs:
+            raise BatchException('no input file')
+        # Check the templates, and that each output belongs to one input.
+        owners = {}
+        for f in inputs:
+            for a in [args] + outputs:
+                for o in output_files(expand_outputs(a, f)):
+                    owner = owners.setdefault(os.path.abspath(o), f)
+                    if owner != f:
+                        raise BatchException(
+                            "output '{}' is generated by both '{}' and '{}'".format(o, owner, f))
+    except BatchException as e:
+        sys.stderr.write("error: {}\n".format(e))
+        sys.exit(2)
+    if run(args, outputs, inputs) != 0:
+        sys.exit(2)
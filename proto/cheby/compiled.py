@@ -0,0 +1,74 @@
+"""Compiled memory maps.
+
+   A compiled file (.chebyc) contains a laid-out tree, so that it can be
+   used as an input without YAML parsing and layout.  It is only valid for
+   the same version of cheby (and of the schemas), and the same
+   --word-endian option.
+   As the tree is pickled, only load files you trust."""
+
+import os
+import pickle
+import cheby
+import cheby.parser as parser
+import cheby.tree as tree
+import cheby.layout as layout
+from cheby.schemas_version import VERSIONS
+
+MAGIC = b'CHEBYC\n'
+SUFFIX = '.chebyc'
+
+
+def is_compiled(filename):
+    "Return True if :param filename: is a compiled file (from its name)"
+    return filename.endswith(SUFFIX)
+
+
+def dumps(root):
+    "Return the compiled form of the laid-out tree :param root:"
+    header = {'version': cheby.__version__,
+              'schemas': dict(VERSIONS),
+              'tree-format': tree.TREE_FORMAT,
+              'word-endian': layout.word_endianness,
+              'filename': os.path.abspath(root.c_filename)}
+    return MAGIC + pickle.dumps((header, root), pickle.HIGHEST_PROTOCOL)
+
+
+def save(filename, root, only_if_changed=False):
+    """Write the laid-out tree :param root: to :param filename:.
+       If :param only_if_changed: is set, do not rewrite an identical file."""
+    data = dumps(root)
+    if only_if_changed:
+        try:
+            with open(filename, 'rb') as f:
+                if f.read() == data:
+                    return
+        except IOError:
+            pass
+    with open(filename, 'wb') as f:
+        f.write(data)
+
+
+def load(filename):
+    "Return the laid-out tree of compiled file :param filename:"
+    try:
+        with open(filename, 'rb') as f:
+            data = f.read()
+    except IOError as e:
+        raise parser.ParseException(str(e))
+    if not data.startswith(MAGIC):
+        parser.error("not a compiled file")
+    try:
+        header, root = pickle.loads(data[len(MAGIC):])
+    except Exception as e:
+        parser.error("corrupted compiled file ({})".format(e))
+    if header['version'] != cheby.__version__ or header['schemas'] != VERSIONS \
+       or header.get('tree-format') != tree.TREE_FORMAT:
+        parser.error("compiled by cheby {} (this is {}), recompile it".format(
+            header['version'], cheby.__version__))
+    if header['word-endian'] != layout.word_endianness:
+        parser.error("compiled with --word-endian={}, recompile it".format(
+            header['word-endian']))
+    # Submaps filenames are relative to the original file.
+    root.c_filename = header['filename']
+    layout.set_submap_filenames(root)
+    return root
@@ -1,7 +1,7 @@
-import copy
 import cheby.parser as parser
 import cheby.tree as tree
 import cheby.layout as layout
+import cheby.gen_name as gen_name
 
 # Decoce x-hdl extensions.
 
@@ -211,14 +211,56 @@ def expand_pipeline(n, v):
 
 def expand_x_hdl_block(n, dct):
     n.hdl_iogroup = None
+    if isinstance(n, tree.Repeat):
+        n.hdl_repeat_style = 'unroll'
     for k, v in dct.items():
         if k in ('reg-prefix', 'block-prefix'):
             pass
         elif k == 'iogroup':
             n.hdl_iogroup = parser.read_text(n, k, v)
+        elif k == 'repeat-style' and isinstance(n, tree.Repeat):
+            n.hdl_repeat_style = parser.read_text(n, k, v)
+            if n.hdl_repeat_style not in ('unroll', 'array'):
+                parser.error("incorrect value for 'repeat-style' in x-hdl of {}".format(
+                    n.get_path()))
         else:
             parser.error("unhandled '{}' in x-hdl of {}".format(
                 k, n.get_path()))
+    if isinstance(n, tree.Repeat) and n.hdl_repeat_style == 'array':
+        expand_x_hdl_repeat_array_validate(n)
+
+
+def expand_x_hdl_repeat_array_validate(n):
+    """Check that repeat :param n: can be generated as an array: each
+       element must be at an address that is a multiple of a power of 2 so
+       that the index of the element is a slice of the address."""
+    p = n
+    while p is not None:
+        if getattr(p, 'hdl_iogroup', None) is not None:
+            parser.error("'iogroup' not allowed with 'repeat-style: array' for {}".format(
+                n.get_path()))
+        p = p.parent
+    if n.align is not None and not n.align:
+        parser.error("repeat {} must be aligned for 'repeat-style: array'".format(
+            n.get_path()))
+    if n.c_elsize & (n.c_elsize - 1) != 0:
+        parser.error("element size of repeat {} must be a power of 2 for "
+                     "'repeat-style: array' (use 'size')".format(n.get_path()))
+
+    def check_children(p):
+        for c in p.children:
+            if isinstance(c, tree.Reg):
+                continue
+            x_hdl = getattr(c, 'x_hdl', {})
+            if (isinstance(c, (tree.Block, tree.Repeat))
+                    and x_hdl.get('iogroup') is None
+                    and x_hdl.get('repeat-style', 'unroll') == 'unroll'):
+                check_children(c)
+            else:
+                parser.error("{} is not allowed in repeat {} with 'repeat-style: array' "
+                             "(only registers, blocks and unrolled repeats)".format(
+                                 c.get_path(), n.get_path()))
+    check_children(n)
 
 
 def expand_x_hdl_memory(n, dct):
@@ -236,6 +278,11 @@ def expand_x_hdl_memory(n, dct):
 
 def expand_x_hdl_root(n, dct):
     n.hdl_pipeline = None
+    n.hdl_decoder_stages = 1
+    n.hdl_read_mux = 'case'
+    n.hdl_read_mux_fanin = 4
+    n.hdl_read_mux_stages = 0
+    n.hdl_bus_pipelined = False
     n.hdl_bus_attribute = None
     n.hdl_iogroup = None
     n.hdl_wmask = False
@@ -263,6 +310,28 @@ def expand_x_hdl_root(n, dct):
                     n.get_path()))
         elif k == 'pipeline':
             n.hdl_pipeline = expand_pipeline(n, v)
+        elif k == 'decoder-stages':
+            n.hdl_decoder_stages = parser.read_int(n, k, v)
+            if n.hdl_decoder_stages < 1:
+                parser.error("x-hdl:decoder-stages of root {} must be at least 1".format(
+                    n.get_path()))
+        elif k == 'bus-pipelined':
+            n.hdl_bus_pipelined = parser.read_bool(n, k, v)
+        elif k == 'read-mux':
+            n.hdl_read_mux = parser.read_text(n, k, v)
+            if n.hdl_read_mux not in ('case', 'or'):
+                parser.error("bad value for x-hdl:read-mux of root {}".format(
+                    n.get_path()))
+        elif k == 'read-mux-fanin':
+            n.hdl_read_mux_fanin = parser.read_int(n, k, v)
+            if n.hdl_read_mux_fanin < 2:
+                parser.error("x-hdl:read-mux-fanin of root {} must be at least 2".format(
+                    n.get_path()))
+        elif k == 'read-mux-stages':
+            n.hdl_read_mux_stages = parser.read_int(n, k, v)
+            if n.hdl_read_mux_stages < 0:
+                parser.error("x-hdl:read-mux-stages of root {} must not be negative".format(
+                    n.get_path()))
         elif k == 'lock-port':
             n.hdl_lock_port = parser.read_text(n, k, v)
         else:
@@ -274,6 +343,13 @@ def expand_x_hdl_root(n, dct):
         if n.bus == 'avalon-lite-32':
             # No need to pipeline as the avalon interface already inserts a pipeline stage
             pl = []
+        elif n.hdl_bus_pipelined and n.bus.startswith(('axi4-lite-', 'wb-')):
+            # The requests and the replies are already registered by the skid buffers,
+            # and a pipeline would prevent to start an access at every cycle.
+            pl = []
+        elif n.bus == 'axi4-32':
+            # Likewise for the beats of the bursts.
+            pl = []
         else:
             pl = ['wr-in', 'rd-out']
         n.hdl_pipeline = pl
@@ -288,10 +364,33 @@ def expand_x_hdl_root(n, dct):
 def expand_x_hdl_root_validate(r):
     # Validate x-hdl attributes
     if r.hdl_wmask and not any(
-        r.bus.startswith(bus) for bus in ["apb-", "avalon-lite-", "axi4-lite-", "wb-"]
+        r.bus.startswith(bus) for bus in ["apb-", "avalon-lite-", "axi4-", "wb-"]
     ):
         parser.error("Bus '{}' does not support the write mask feature".format(r.bus))
 
+    if r.hdl_bus_pipelined and not r.bus.startswith(('axi4-lite-', 'wb-')):
+        parser.warning(r, "bus-pipelined on '{}' is ignored for {}".format(
+            r.get_path(), r.bus))
+
+    if r.hdl_decoder_stages > 1:
+        expand_x_hdl_decoder_stages_validate(r)
+
+
+def expand_x_hdl_decoder_stages_validate(n):
+    """With several decoder stages, the write requests of a submap are
+       delayed.  Reject the submaps whose bus master also uses the request
+       of the root bus."""
+    for c in n.children:
+        if isinstance(c, tree.Submap):
+            if c.include is True:
+                expand_x_hdl_decoder_stages_validate(c.c_submap)
+            elif c.c_interface in ('apb-32', 'sram'):
+                parser.error("interface '{}' of submap {} is not supported "
+                             "with x-hdl:decoder-stages".format(
+                                 c.c_interface, c.get_path()))
+        elif isinstance(c, tree.CompositeNode):
+            expand_x_hdl_decoder_stages_validate(c)
+
 
 def expand_x_hdl_addressspace(n, dct):
     if dct:
@@ -349,7 +448,8 @@ def expand_x_hdl(n):
     # Visit children
     if isinstance(n, tree.Submap):
         if n.filename is not None:
-            expand_hdl(n.c_submap)
+            # Submaps are unrolled by unroll_hdl.
+            expand_hdl(n.c_submap, False)
         return
     if isinstance(n, tree.CompositeNode):
         for el in n.children:
@@ -363,45 +463,6 @@ def expand_x_hdl(n):
         raise AssertionError(n)
 
 
-def NamedNode_copy(n, new_parent):
-    res = copy.copy(n)
-    res._parent = new_parent
-    return res
-
-
-def Reg_copy(n, new_parent):
-    res = NamedNode_copy(n, new_parent)
-    res.children = [tree_copy(f, res) for f in n.children]
-    layout.build_sorted_fields(res)
-    return res
-
-
-def CompositeNode_copy(n, new_parent):
-    res = NamedNode_copy(n, new_parent)
-    res.children = [tree_copy(f, res) for f in n.children]
-    return res
-
-
-def Submap_copy(n, new_parent):
-    res = CompositeNode_copy(n, new_parent)
-    if n.c_submap is not None:
-        res.c_submap = tree_copy(n.c_submap, res)
-    return res
-
-
-def tree_copy(n, new_parent):
-    if isinstance(n, tree.Reg):
-        return Reg_copy(n, new_parent)
-    elif isinstance(n, tree.Submap):
-        return Submap_copy(n, new_parent)
-    elif isinstance(n, tree.CompositeNode):
-        return CompositeNode_copy(n, new_parent)
-    elif isinstance(n, tree.FieldBase):
-        return NamedNode_copy(n, new_parent)
-    else:
-        raise AssertionError(n)
-
-
 def unroll_repeat(n):
     # Transmute the array to COUNT blocks
     res = tree.RepeatBlock(parent=n.parent, origin=n)
@@ -421,7 +482,7 @@ def unroll_repeat(n):
         blk.c_address = i * n.c_elsize
         blk.c_size = n.c_elsize
         blk.c_align = n.c_align
-        blk.children = [tree_copy(el, blk) for el in n.children]
+        blk.children = [layout.tree_copy(el, blk) for el in n.children]
         blk.origin = n
         blk.hdl_iogroup = None
         layout.build_sorted_children(blk)
@@ -434,6 +495,9 @@ def unroll_repeats(n):
     if isinstance(n, tree.Reg):
         # Nothing to do.
         return n
+    if isinstance(n, tree.Submap) and n.filename is not None:
+        # Unroll the submap before it is copied by an enclosing repeat.
+        unroll_memmap(n.c_submap)
     if isinstance(n, tree.CompositeNode):
         nl = [unroll_repeats(el) for el in n.children]
         n.children = nl
@@ -447,12 +511,81 @@ def unroll_repeats(n):
 
 def expand_memmap_hdl(root):
     expand_x_hdl(root)
+
+
+def unroll_memmap(root):
     unroll_repeats(root)
     # Set again the absolute address, as new nodes may have been added (by unroll)
     layout.set_abs_address(root, 0)
 
 
-def expand_hdl(root):
+def unroll_hdl(root):
+    """Unroll the repeats of :param root: (and of its submaps).
+       As each instance of a repeat is a copy of its children, this is done
+       only for the generators that need the unrolled tree."""
+    if root.c_address_spaces_map:
+        for c in root.children:
+            unroll_memmap(c)
+    else:
+        unroll_memmap(root)
+
+
+def is_repeat_array(n):
+    "Return True if :param n: was unrolled from a repeat generated as an array"
+    return (isinstance(n, tree.RepeatBlock)
+            and getattr(n.origin, 'hdl_repeat_style', None) == 'array')
+
+
+def has_repeat_arrays(n):
+    """Return True if :param n: (or its included submaps) has a repeat
+       generated as an array."""
+    if is_repeat_array(n):
+        return True
+    if isinstance(n, tree.Submap):
+        return n.include is True and has_repeat_arrays(n.c_submap)
+    if isinstance(n, tree.CompositeNode):
+        return any(has_repeat_arrays(c) for c in n.children)
+    return False
+
+
+def roll_repeat_arrays(n):
+    """Replace in :param n: (recursively) the repeats generated as arrays
+       by the original repeats."""
+    if isinstance(n, tree.Submap):
+        if n.include is True:
+            roll_repeat_arrays(n.c_submap)
+        return
+    if not isinstance(n, tree.CompositeNode):
+        return
+    changed = False
+    for i, c in enumerate(n.children):
+        if is_repeat_array(c):
+            rep = layout.tree_copy(c.origin, n)
+            rep.c_abs_addr = c.c_abs_addr
+            n.children[i] = rep
+            changed = True
+        else:
+            roll_repeat_arrays(c)
+    if changed:
+        layout.build_sorted_children(n)
+
+
+def hdl_tree(root):
+    """Return the tree to generate the HDL of :param root: (a root or an
+       address space).  The repeats with 'repeat-style: array' are unrolled
+       like the others for the other generators, so the HDL is generated
+       from a copy of the tree where they are not unrolled."""
+    if not has_repeat_arrays(root):
+        return root
+    res = layout.tree_copy(root, root.parent)
+    roll_repeat_arrays(res)
+    gen_name.gen_name_hierarchy(res)
+    return res
+
+
+def expand_hdl(root, unroll=True):
+    """Decode the x-hdl extensions of :param root:, and unroll the repeats
+       if :param unroll: is true (otherwise use unroll_hdl later)."""
     if root.c_address_spaces_map:
         x_hdl = getattr(root, 'x_hdl', {})
         expand_x_hdl_root(root, x_hdl)
@@ -461,7 +594,13 @@ def expand_hdl(root):
             c.hdl_module_name = root.hdl_module_name
             c.hdl_bus_attribute = root.hdl_bus_attribute
             c.hdl_pipeline = root.hdl_pipeline
+            c.hdl_decoder_stages = root.hdl_decoder_stages
+            c.hdl_read_mux = root.hdl_read_mux
+            c.hdl_read_mux_fanin = root.hdl_read_mux_fanin
+            c.hdl_read_mux_stages = root.hdl_read_mux_stages
             c.hdl_iogroup = None
             c.bus = root.bus
     else:
         expand_memmap_hdl(root)
+    if unroll:
+        unroll_hdl(root)
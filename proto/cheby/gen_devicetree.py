@@ -98,12 +98,11 @@ def gen_children(f, t, indent):
                     for e in dt:
                         for typ, v in e.items():
                             if typ == 'include':
-                                dev = [ch for ch in t.children if ch.name == v]
+                                dev = t.get_child(v)
                                 if dev is None:
                                     error('cannot found include {} in devicetree of {}'.format(
                                         v, c.get_path()))
                                 else:
-                                    dev = dev[0]
                                     f.write('\n{}       0x{:x} 0x{:x}'.format(
                                         nindent * ' ', dev.c_address, dev.c_size - 1))
                     f.write('>;\n')
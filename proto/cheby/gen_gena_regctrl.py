@@ -42,10 +42,7 @@ def find_by_name(root, path, ref):
     for p in path:
         n = None
         if isinstance(base, (tree.Root, tree.Block, tree.Reg)):
-            for e in base.children:
-                if e.name == p:
-                    n = e
-                    break
+            n = base.get_child(p)
         if n is None:
             raise GenHDLException("cannot find '{}' in '{}' for '{}'".format(
                 p, base.name, ref))
@@ -14,6 +14,7 @@
    The _i/_o suffixes are also used for ports, so the ports of the bus can
    also have conflicts with user names.
 """
+import copy
 from cheby.hdltree import (
     HDLModule,
     HDLAssign,
@@ -29,143 +30,27 @@ from cheby.hdltree import (
     HDLConst,
     HDLNumber,
     HDLPort,
+    HDLSync,
+    HDLBinConst,
+    HDLOr,
+    bit_0,
 )
 import cheby.tree as tree
 import cheby.hdlutils as hdlutils
 import cheby.hdlopt as hdlopt
-from cheby.layout import ilog2
+import cheby.expand_hdl as expand_hdl
 from cheby.hdl.wbbus import WBBus
 from cheby.hdl.ibus import Ibus
 from cheby.hdl.genblock import GenBlock
 from cheby.hdl.buses import name_to_busgen
 from cheby.gen_name import concat, concat_if
 from cheby.hdl.axi4litebus import AXI4LiteBus
-from cheby.hdl.globals import libname
-
-def add_block_decoder(root, stmts, addr, children, hi, func, off):
-    # :param hi: is the highest address bit to be decoded.
-    debug = False
-    if debug:
-        print("add_block_decoder: hi={}, off={:08x}".format(hi, off))
-        for i in children:
-            print("{}: {:08x}, sz={:x}, al={:x}".format(
-                i.name, i.c_abs_addr, i.c_size, i.c_align))
-        print("----")
-    if len(children) == 0:
-        # Nothing to do
-        func(stmts, None, 0)
-        return
-    elif len(children) == 1:
-        # If there is only one child, no need to decode anymore.
-        el = children[0]
-        if isinstance(el, tree.Reg):
-            if hi <= root.c_addr_word_bits:
-                foff = off - el.c_abs_addr
-                if el.c_size <= root.c_word_size:
-                    # If the size of the register is smaller than the word,
-                    # always reads at 0.  Word endianness doesn't matter.
-                    assert foff == 0
-                else:
-                    if root.c_word_endian == 'big':
-                        # Big endian
-                        foff = el.c_size - root.c_word_size - foff
-                    else:
-                        # Little endian
-                        foff = foff
-                func(stmts, el, foff * tree.BYTE_SIZE)
-                return
-            else:
-                # Multi-word register - to be split, so decode more.
-                maxsz = 1 << root.c_addr_word_bits
-        else:
-            func(stmts, el, 0)
-            return
-    else:
-        # Will add a decoder for the maximum aligned child.
-        maxsz = max([e.c_align for e in children])
-
-    maxszl2 = ilog2(maxsz)
-    assert maxsz == 1 << maxszl2
-    mask = ~(maxsz - 1)
-    assert maxszl2 < hi
-
-    # Add a decoder.
-    # Note: addr has a word granularity.
-    sw = HDLSwitch(HDLSlice(addr, maxszl2, hi - maxszl2))
-    stmts.append(sw)
-
-    next_base = off
-    while children:
-        # Extract the first child.
-        first = children.pop(0)
-        l = [first]
-        # Skip holes in address to be decoded.
-        base = max(next_base, first.c_abs_addr & mask)
-        next_base = base + maxsz
-        if debug:
-            print("hi={} szl2={} first: {:08x}, base: {:08x}, mask: {:08x}".
-                  format(hi, maxszl2, first.c_abs_addr, base, mask))
-
-        # Create a branch.
-        ch = HDLChoiceExpr(HDLConst(base >> maxszl2, hi - maxszl2))
-        sw.choices.append(ch)
-
-        # Gather other children that are decoded in the same branch (same
-        # base address)
-        last = first
-        while children:
-            el = children[0]
-            if (el.c_abs_addr & mask) != base:
-                break
-            if debug:
-                print(" {} @ {:08x}".format(el.name, el.c_abs_addr))
-            last = el
-            l.append(el)
-            children.pop(0)
-
-        # If the block is larger than its alignment, re-decode it again.
-        if ((last.c_abs_addr + last.c_size - 1) & mask) != base:
-            children.insert(0, last)
-
-        # Sub-decode gathered children.
-        add_block_decoder(root, ch.stmts, addr, l, maxszl2, func, base)
-
-    ch = HDLChoiceDefault()
-    sw.choices.append(ch)
-    func(ch.stmts, None, 0)
-
-
-def gather_leaves(n):
-    # Gather all elements that need to be decoded.
-    if isinstance(n, tree.Reg):
-        return [n]
-    elif isinstance(n, tree.Submap):
-        if n.include is True:
-            return gather_leaves(n.c_submap)
-        else:
-            return [n]
-    elif isinstance(n, tree.Memory):
-        return [n]
-    elif isinstance(n, (tree.Root, tree.Block, tree.AddressSpace)):
-        r = []
-        for e in n.children:
-            r.extend(gather_leaves(e))
-        return r
-    else:
-        raise AssertionError(n)
-
-
-def add_decoder(root, stmts, addr, _n, func):
-    """Call :param func: for each element of :param n:.  :param func: can also
-       be called with None when a decoder is generated and could handle an
-       address that has no corresponding children."""
-    children = gather_leaves(root)
-    children = sorted(children, key=lambda x: x.c_abs_addr)
-
-    add_block_decoder(root, stmts, addr, children, ilog2(root.c_size), func, 0)
+from cheby.hdl.globals import libname, gconfig
+from cheby.hdl.decoder import (build_decoder, render_decoder,
+                               split_decoder, plan_elements)
 
 
-def add_read_mux_process(root, module, ibus):
+def add_read_mux_process(root, module, ibus, plan, name=''):
     # Generate the read decoder.  This is a large combinational process
     # that mux the data and ack.
     # It can be combinational because the read address is stable until the
@@ -175,15 +60,44 @@ def add_read_mux_process(root, module, ibus):
     rdproc = HDLComb()
     module.stmts.append(rdproc)
 
-    # All the read are ack'ed (including the read to unassigned addresses).
-    rdproc.stmts.append(HDLComment("By default ack read requests"))
-    rdproc.stmts.append(HDLAssign(ibus.rd_dat,
-                                  HDLReplicate(bit_x, root.c_word_bits)))
+    if root.hdl_read_mux == 'or':
+        # Each element has its own read data, which is 0 unless the element
+        # is selected, and the read data is the OR of them.
+        els = set()
+        plan_elements(plan, els)
+        nregs = min(root.hdl_read_mux_stages,
+                    or_tree_levels(len(els), root.hdl_read_mux_fanin))
+        mux_bus = copy.copy(ibus)
+        if nregs > 0:
+            # The acks are delayed like the data.
+            mux_bus.rd_ack = module.new_HDLSignal('rd_ack' + name + '_or0')
+            mux_bus.rd_err = module.new_HDLSignal('rd_err' + name + '_or0')
+        el_bus = {}
+        data = []
+    else:
+        # All the read are ack'ed (including the read to unassigned addresses).
+        rdproc.stmts.append(HDLComment("By default ack read requests"))
+        rdproc.stmts.append(HDLAssign(ibus.rd_dat,
+                                      HDLReplicate(bit_x, root.c_word_bits)))
+        mux_bus = ibus
+
+    def get_bus(n):
+        if mux_bus is ibus:
+            return ibus
+        bus = el_bus.get(id(n))
+        if bus is None:
+            bus = copy.copy(mux_bus)
+            bus.rd_dat = module.new_HDLSignal(n.c_name + '_rdat', root.c_word_bits)
+            rdproc.stmts.append(HDLAssign(bus.rd_dat,
+                                          HDLReplicate(bit_0, root.c_word_bits)))
+            el_bus[id(n)] = bus
+            data.append(bus.rd_dat)
+        return bus
 
     def add_read(s, n, off):
         if n is not None:
             s.append(HDLComment("{} {}".format(n.NAME, n.c_name)))
-            n.h_gen.gen_read(s, off, ibus, rdproc)
+            n.h_gen.gen_read(s, off, get_bus(n), rdproc)
         else:
             # By default, acknowledge request to unknown address but return error:
             # Use delayed request signal if available
@@ -192,16 +106,79 @@ def add_read_mux_process(root, module, ibus):
             else:
                 rd_req = ibus.rd_req
 
-            s.append(HDLAssign(ibus.rd_ack, rd_req))
-            s.append(HDLAssign(ibus.rd_err, rd_req))
+            s.append(HDLAssign(mux_bus.rd_ack, rd_req))
+            s.append(HDLAssign(mux_bus.rd_err, rd_req))
 
     stmts = []
-    add_decoder(root, stmts, rd_adr, root, add_read)
+    render_decoder(plan, stmts, rd_adr, add_read)
     rdproc.stmts.extend(stmts)
     hdlutils.compute_sensitivity(rdproc)
 
+    if mux_bus is not ibus:
+        add_read_or_tree(root, module, ibus, mux_bus, data, nregs, name)
+
+
+def or_tree_levels(nbr, fanin):
+    "Number of levels of ORs before the last one to reduce :param nbr: inputs"
+    res = 0
+    while nbr > fanin:
+        nbr = (nbr + fanin - 1) // fanin
+        res += 1
+    return res
+
+
+def add_read_or_tree(root, module, ibus, mux_bus, data, nregs, name):
+    """Reduce the read data of the elements :param data: to the read data of
+       :param ibus: using a balanced tree of ORs.  The outputs of the first
+       :param nregs: levels are registered, and so are the acks of
+       :param mux_bus:."""
+    fanin = root.hdl_read_mux_fanin
+    module.stmts.append(HDLComment('Read data OR tree.'))
+    sync = HDLSync(root.h_bus['clk'], root.h_bus['brst'], rst_sync=gconfig.rst_sync)
+    ack = mux_bus.rd_ack
+    err = mux_bus.rd_err
+    level = 1
+    while len(data) > fanin:
+        nxt = []
+        for i in range(0, len(data), fanin):
+            sig = module.new_HDLSignal('rd_dat{}_or{}_{}'.format(name, level, i // fanin),
+                                       root.c_word_bits)
+            expr = or_reduce(data[i:i + fanin])
+            if level <= nregs:
+                sync.rst_stmts.append(HDLAssign(sig, HDLBinConst(0, root.c_word_bits)))
+                sync.sync_stmts.append(HDLAssign(sig, expr))
+            else:
+                module.stmts.append(HDLAssign(sig, expr))
+            nxt.append(sig)
+        if level <= nregs:
+            for n, sig in [('rd_ack', ack), ('rd_err', err)]:
+                reg = module.new_HDLSignal('{}{}_or{}'.format(n, name, level))
+                sync.rst_stmts.append(HDLAssign(reg, bit_0))
+                sync.sync_stmts.append(HDLAssign(reg, sig))
+                if n == 'rd_ack':
+                    ack = reg
+                else:
+                    err = reg
+        data = nxt
+        level += 1
+    if data:
+        module.stmts.append(HDLAssign(ibus.rd_dat, or_reduce(data)))
+    else:
+        module.stmts.append(HDLAssign(ibus.rd_dat, HDLReplicate(bit_0, root.c_word_bits)))
+    if nregs > 0:
+        module.stmts.append(sync)
+        module.stmts.append(HDLAssign(ibus.rd_ack, ack))
+        module.stmts.append(HDLAssign(ibus.rd_err, err))
 
-def add_write_mux_process(root, module, ibus):
+
+def or_reduce(sigs):
+    res = sigs[0]
+    for s in sigs[1:]:
+        res = HDLOr(res, s)
+    return res
+
+
+def add_write_mux_process(root, module, ibus, plan):
     # Generate the write decoder.  This is a large combinational process
     # that mux the acks and regenerate the requests.
     # It can be combinational because the read address is stable until the
@@ -227,11 +204,141 @@ def add_write_mux_process(root, module, ibus):
             s.append(HDLAssign(ibus.wr_err, wr_req))
 
     stmts = []
-    add_decoder(root, stmts, wr_adr, root, add_write)
+    render_decoder(plan, stmts, wr_adr, add_write)
     wrproc.stmts.extend(stmts)
     hdlutils.compute_sensitivity(wrproc)
 
 
+def stage_choice(plan, val):
+    "Return the choice of the switch of :param plan: for :param val:"
+    if val is None:
+        return HDLChoiceDefault()
+    return HDLChoiceExpr(HDLConst(val, plan.width))
+
+
+def branch_name(name, val):
+    return '{}_{}'.format(name or '_dec', 'others' if val is None else val)
+
+
+def add_read_stages(root, module, ibus, plan, stages, name):
+    """Generate the read decoder of :param plan: using :param stages:
+       stages.  The top switch of the plan is split into one decoder per
+       branch, whose request is decoded from the address and whose outputs
+       are registered and then muxed using the address (which is stable
+       during the access).  So each additional stage delays the read acks
+       by one cycle.
+       :param name: is the prefix of the names of the branch signals."""
+    branches = split_decoder(plan) if stages > 1 else None
+    if branches is None:
+        add_read_mux_process(root, module, ibus, plan, name)
+        return
+    sync = HDLSync(root.h_bus['clk'], root.h_bus['brst'], rst_sync=gconfig.rst_sync)
+    reqproc = HDLComb()
+    sw_req = HDLSwitch(HDLSlice(ibus.rd_adr, plan.lo, plan.width))
+    sw = HDLSwitch(HDLSlice(ibus.rd_adr, plan.lo, plan.width))
+    sigs = [('rd_ack', None), ('rd_err', None), ('rd_dat', root.c_word_bits)]
+    subs = []
+    for val, sub in branches:
+        bname = branch_name(name, val)
+        bus = copy.copy(ibus)
+        ch_req = stage_choice(plan, val)
+        sw_req.choices.append(ch_req)
+        for n in ['rd_req', 'rd_req_del']:
+            if getattr(ibus, n) is None:
+                continue
+            sig = module.new_HDLSignal(n + bname)
+            reqproc.stmts.append(HDLAssign(sig, bit_0))
+            ch_req.stmts.append(HDLAssign(sig, getattr(ibus, n)))
+            setattr(bus, n, sig)
+        ch = stage_choice(plan, val)
+        sw.choices.append(ch)
+        for n, sz in sigs:
+            sig = module.new_HDLSignal(n + bname, sz)
+            reg = module.new_HDLSignal(n + bname + '_d', sz)
+            sync.rst_stmts.append(
+                HDLAssign(reg, bit_0 if sz is None else HDLBinConst(0, sz)))
+            sync.sync_stmts.append(HDLAssign(reg, sig))
+            ch.stmts.append(HDLAssign(getattr(ibus, n), reg))
+            setattr(bus, n, sig)
+        subs.append((bus, sub, bname))
+    if branches[-1][0] is not None:
+        # All the values are decoded, but the switch needs a default choice.
+        sw_req.choices.append(HDLChoiceDefault())
+        ch = HDLChoiceDefault()
+        sw.choices.append(ch)
+        ch.stmts.append(HDLAssign(ibus.rd_ack, bit_0))
+        ch.stmts.append(HDLAssign(ibus.rd_err, bit_0))
+        ch.stmts.append(HDLAssign(ibus.rd_dat, HDLReplicate(bit_x, root.c_word_bits)))
+    module.stmts.append(HDLComment(
+        'Read decoder stage for address bits {}-{}.'.format(
+            plan.lo + plan.width - 1, plan.lo)))
+    reqproc.stmts.append(sw_req)
+    hdlutils.compute_sensitivity(reqproc)
+    module.stmts.append(reqproc)
+    module.stmts.append(sync)
+    proc = HDLComb()
+    proc.stmts.append(sw)
+    hdlutils.compute_sensitivity(proc)
+    module.stmts.append(proc)
+    for bus, sub, bname in subs:
+        add_read_stages(root, module, bus, sub, stages - 1, bname)
+
+
+def add_write_stages(root, module, ibus, plan, stages, name):
+    """Generate the write decoder of :param plan: using :param stages:
+       stages.  The top switch of the plan is split into one decoder per
+       branch, whose request is registered from the address.  The acks are
+       muxed using the address (which is stable during the access).  So each
+       additional stage delays the write requests and acks by one cycle.
+       :param name: is the prefix of the names of the branch signals."""
+    branches = split_decoder(plan) if stages > 1 else None
+    if branches is None:
+        add_write_mux_process(root, module, ibus, plan)
+        return
+    sync = HDLSync(root.h_bus['clk'], root.h_bus['brst'], rst_sync=gconfig.rst_sync)
+    sw_req = HDLSwitch(HDLSlice(ibus.wr_adr, plan.lo, plan.width))
+    sw_ack = HDLSwitch(HDLSlice(ibus.wr_adr, plan.lo, plan.width))
+    subs = []
+    for val, sub in branches:
+        bname = branch_name(name, val)
+        bus = copy.copy(ibus)
+        ch_req = stage_choice(plan, val)
+        sw_req.choices.append(ch_req)
+        for n in ['wr_req', 'wr_req_del']:
+            if getattr(ibus, n) is None:
+                continue
+            reg = module.new_HDLSignal(n + bname)
+            sync.rst_stmts.append(HDLAssign(reg, bit_0))
+            sync.sync_stmts.append(HDLAssign(reg, bit_0))
+            ch_req.stmts.append(HDLAssign(reg, getattr(ibus, n)))
+            setattr(bus, n, reg)
+        ch_ack = stage_choice(plan, val)
+        sw_ack.choices.append(ch_ack)
+        for n in ['wr_ack', 'wr_err']:
+            sig = module.new_HDLSignal(n + bname)
+            ch_ack.stmts.append(HDLAssign(getattr(ibus, n), sig))
+            setattr(bus, n, sig)
+        subs.append((bus, sub, bname))
+    if branches[-1][0] is not None:
+        # All the values are decoded, but the switch needs a default choice.
+        sw_req.choices.append(HDLChoiceDefault())
+        ch = HDLChoiceDefault()
+        sw_ack.choices.append(ch)
+        ch.stmts.append(HDLAssign(ibus.wr_ack, bit_0))
+        ch.stmts.append(HDLAssign(ibus.wr_err, bit_0))
+    sync.sync_stmts.append(sw_req)
+    module.stmts.append(HDLComment(
+        'Write decoder stage for address bits {}-{}.'.format(
+            plan.lo + plan.width - 1, plan.lo)))
+    module.stmts.append(sync)
+    proc = HDLComb()
+    proc.stmts.append(sw_ack)
+    hdlutils.compute_sensitivity(proc)
+    module.stmts.append(proc)
+    for bus, sub, bname in subs:
+        add_write_stages(root, module, bus, sub, stages - 1, bname)
+
+
 def gen_hdl_header(root, ibus=None, wb_lib_name = libname, axil_lib_name = libname):
     # Note: also called from gen_gena_regctrl but without ibus.
     module = HDLModule()
@@ -291,7 +398,12 @@ def gen_hdl_names(n, parent):
                     f.h_pname = f.name
                     f.h_fname = f.name
     elif isinstance(n, tree.Repeat):
-        raise AssertionError(n)
+        # Not unrolled (repeat-style: array): the children are generated once.
+        assert n.hdl_repeat_style == 'array'
+        n.h_fname = concat(parent.h_fname, n.name)
+        n.h_pname = concat_if(parent.h_pname, n.name, parent.hdl_blk_prefix)
+        for c in n.children:
+            gen_hdl_names(c, n)
     elif isinstance(n, tree.RepeatBlock):
         n.h_fname = concat(parent.h_fname, n.name)
         n.h_pname = concat_if(parent.h_pname, n.name, parent.hdl_blk_prefix)
@@ -345,9 +457,12 @@ def gen_hdl_names(n, parent):
 
 
 def generate_hdl(root, wb_lib_name = libname, axil_lib_name = libname):
+    root = expand_hdl.hdl_tree(root)
     ibus = Ibus()
-    # Force the regeneration of wb package (useful only when testing).
+    # Force the regeneration of wb and axi4-lite packages (useful when
+    # several files are generated by the same process).
     WBBus.wb_pkg = None
+    AXI4LiteBus.axi4l_pkg = None
 
     module = gen_hdl_header(root, ibus, wb_lib_name, axil_lib_name)
 
@@ -375,9 +490,13 @@ def generate_hdl(root, wb_lib_name = libname, axil_lib_name = libname):
     root.h_ram = None
     root.h_gen.gen_processes(ibus)
 
-    # Address decoders and muxes.
-    add_write_mux_process(root, module, ibus)
-    add_read_mux_process(root, module, ibus)
+    # Address decoders and muxes.  The same decoder is used for read and
+    # write accesses.
+    root.h_decoder = build_decoder(root)
+    add_write_stages(root, module, ibus, root.h_decoder,
+                     root.hdl_decoder_stages, '')
+    add_read_stages(root, module, ibus, root.h_decoder,
+                    root.hdl_decoder_stages, '')
 
     # Remove unused assignments (cleanup)
     hdlopt.remove_unused(module)
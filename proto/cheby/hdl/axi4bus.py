@@ -0,0 +1,382 @@
+from cheby.hdltree import (
+    HDLPort,
+    HDLAssign,
+    HDLSync,
+    HDLComb,
+    HDLComment,
+    HDLIfElse,
+    HDLIndex,
+    bit_1,
+    bit_0,
+    HDLAnd,
+    HDLOr,
+    HDLNot,
+    HDLEq,
+    HDLParen,
+    HDLAdd,
+    HDLNumber,
+    HDLReplicate,
+    HDLBinConst,
+)
+from cheby.hdl.axi4litebus import AXI4LiteBus, RESP_OKAY, RESP_SLVERR
+import cheby.tree as tree
+import cheby.parser as parser
+from cheby.hdl.globals import gconfig, libname
+from cheby.hdl.ibus import add_bus
+from cheby.hdl.busparams import BusOptions
+from cheby.layout import ilog2
+
+# AXI burst types (AWBURST, ARBURST)
+BURST_FIXED = HDLBinConst(0, 2)
+BURST_INCR = HDLBinConst(1, 2)
+
+
+class AXI4Bus(AXI4LiteBus):
+    """AXI4 (full) bus, with bursts.
+       Each beat of a burst is an access of the internal bus.  The address is
+       incremented for each beat (unless the burst is FIXED).  WRAP bursts and
+       beats smaller than the bus (AxSIZE) are not supported: all their beats
+       are replied with SLVERR, without any access.  There is no ID signal, so
+       the interconnect must handle the IDs."""
+
+    def __init__(self, name):
+        assert name == 'axi4-32'
+
+    def gen_axi4lite_bus(self, module, ports, name, build_port,
+                         addr_bits, lo_addr, data_bits, comment,
+                         is_master=False, is_group=False, libname=libname):
+        # The AXI4-Lite signals and the burst signals (ports are created in order).
+        assert not is_group
+        inp, out = ('IN', 'OUT') if not is_master else ('OUT', 'IN')
+        return [
+            build_port("awvalid", None, dir=inp),
+            build_port("awready", None, dir=out),
+            build_port("awaddr", addr_bits, lo=lo_addr, dir=inp),
+            build_port("awprot", 3, dir=inp),
+            build_port("awlen", 8, dir=inp),
+            build_port("awsize", 3, dir=inp),
+            build_port("awburst", 2, dir=inp),
+
+            build_port("wvalid", None, dir=inp),
+            build_port("wready", None, dir=out),
+            build_port("wdata", data_bits, dir=inp),
+            build_port("wstrb", data_bits // tree.BYTE_SIZE, dir=inp),
+            build_port("wlast", None, dir=inp),
+
+            build_port("bvalid", None, dir=out),
+            build_port("bready", None, dir=inp),
+            build_port("bresp", 2, dir=out),
+
+            build_port("arvalid", None, dir=inp),
+            build_port("arready", None, dir=out),
+            build_port("araddr", addr_bits, lo=lo_addr, dir=inp),
+            build_port("arprot", 3, dir=inp),
+            build_port("arlen", 8, dir=inp),
+            build_port("arsize", 3, dir=inp),
+            build_port("arburst", 2, dir=inp),
+
+            build_port("rvalid", None, dir=out),
+            build_port("rready", None, dir=inp),
+            build_port("rdata", data_bits, dir=out),
+            build_port("rresp", 2, dir=out),
+            build_port("rlast", None, dir=out)]
+
+    def gen_unsupported(self, root, stmts, ch, bad):
+        """Set :param bad: if the burst on channel :param ch: (aw or ar) is not
+           supported: a WRAP (or reserved) burst, or a size other than the
+           size of the bus."""
+        size = HDLBinConst(ilog2(root.c_word_size), 3)
+        proc_if = HDLIfElse(HDLOr(HDLEq(HDLIndex(root.h_bus[ch + 'burst'], 1), bit_1),
+                                  HDLNot(HDLEq(root.h_bus[ch + 'size'], size))))
+        proc_if.then_stmts.append(HDLAssign(bad, bit_1))
+        proc_if.else_stmts.append(HDLAssign(bad, bit_0))
+        stmts.append(proc_if)
+
+    def expand_bus_w_burst(self, root, module, ibus, opts):
+        """Sub-routine of expand_bus: the write part"""
+        ibus.wr_req = module.new_HDLSignal('wr_req')  # Write access
+        ibus.wr_ack = module.new_HDLSignal('wr_ack')  # Ack for write
+        ibus.wr_err = module.new_HDLSignal('wr_err')  # Error for write
+        ibus.wr_adr = module.new_HDLSignal('wr_addr', root.c_addr_bits,
+                                           lo_idx=root.c_addr_word_bits)
+        ibus.wr_dat = module.new_HDLSignal('wr_data', root.c_word_bits)
+        ibus.wr_sel = module.new_HDLSignal('wr_sel', root.c_word_bits)
+        # For the write accesses:
+        # AWREADY is asserted when there is no burst in progress.  AWADDR and AWBURST
+        # are registered.
+        # WREADY is asserted during a burst (until WLAST), when the previous beat is
+        # acknowledged.  Each beat is a write, so a beat can be written at every cycle.
+        # The beats of an unsupported burst (axi_wbad) are accepted but not written.
+        # BVALID is asserted on the ack of the last beat, until BREADY is asserted;
+        # this ends the burst.  BRESP is SLVERR if any of the beats was in error, or if
+        # the burst is not supported.
+        module.stmts.append(HDLComment("AW, W and B channels"))
+        axi_wbusy = module.new_HDLSignal('axi_wbusy')
+        if root.h_bus['awaddr'] is not None:
+            axi_awaddr = module.new_HDLSignal('axi_awaddr', root.c_addr_bits,
+                                              lo_idx=root.c_addr_word_bits)
+        axi_awburst = module.new_HDLSignal('axi_awburst', 2)
+        axi_wbad = module.new_HDLSignal('axi_wbad')
+        axi_wlast = module.new_HDLSignal('axi_wlast')
+        axi_wip = module.new_HDLSignal('axi_wip')
+        axi_wready = module.new_HDLSignal('axi_wready')
+        axi_wdone = module.new_HDLSignal('axi_wdone')
+        axi_werr = module.new_HDLSignal('axi_werr', 2)
+        module.stmts.append(HDLAssign(root.h_bus['awready'], HDLNot(axi_wbusy)))
+        module.stmts.append(HDLAssign(
+            axi_wready,
+            HDLAnd(HDLAnd(axi_wbusy, HDLNot(axi_wlast)),
+                   HDLParen(HDLOr(HDLNot(axi_wip), ibus.wr_ack)))))
+        module.stmts.append(HDLAssign(root.h_bus['wready'], axi_wready))
+        module.stmts.append(HDLAssign(root.h_bus['bvalid'], axi_wdone))
+
+        proc = HDLSync(root.h_bus['clk'], root.h_bus['brst'], rst_sync=gconfig.rst_sync)
+        proc.rst_stmts.append(HDLAssign(ibus.wr_req, bit_0))
+        proc.rst_stmts.append(HDLAssign(axi_wbusy, bit_0))
+        proc.rst_stmts.append(HDLAssign(axi_wlast, bit_0))
+        proc.rst_stmts.append(HDLAssign(axi_wip, bit_0))
+        proc.rst_stmts.append(HDLAssign(axi_wdone, bit_0))
+        proc.rst_stmts.append(HDLAssign(axi_werr, RESP_OKAY))
+        proc.sync_stmts.append(HDLAssign(ibus.wr_req, bit_0))
+
+        # Start a burst.
+        proc_if = HDLIfElse(HDLAnd(HDLEq(root.h_bus['awvalid'], bit_1),
+                                   HDLEq(axi_wbusy, bit_0)))
+        if root.h_bus['awaddr'] is not None:
+            proc_if.then_stmts.append(HDLAssign(opts.resize_addr_lhs(axi_awaddr, ibus),
+                                                opts.resize_addr_in(root.h_bus['awaddr'], ibus)))
+        proc_if.then_stmts.append(HDLAssign(axi_awburst, root.h_bus['awburst']))
+        self.gen_unsupported(root, proc_if.then_stmts, 'aw', axi_wbad)
+        proc_if.then_stmts.append(HDLAssign(axi_wbusy, bit_1))
+        proc_if.else_stmts = None
+        proc.sync_stmts.append(proc_if)
+
+        # Write a beat.
+        proc_if = HDLIfElse(HDLEq(ibus.wr_ack, bit_1))
+        proc_if.then_stmts.append(HDLAssign(axi_wip, bit_0))
+        if opts.bus_error:
+            proc_if_err = HDLIfElse(HDLEq(ibus.wr_err, bit_1))
+            proc_if_err.then_stmts.append(HDLAssign(axi_werr, RESP_SLVERR))
+            proc_if_err.else_stmts = None
+            proc_if.then_stmts.append(proc_if_err)
+        proc_if_last = HDLIfElse(HDLEq(axi_wlast, bit_1))
+        proc_if_last.then_stmts.append(HDLAssign(axi_wdone, bit_1))
+        proc_if_last.else_stmts = None
+        proc_if.then_stmts.append(proc_if_last)
+        proc_if.else_stmts = None
+        proc.sync_stmts.append(proc_if)
+
+        proc_if = HDLIfElse(HDLAnd(HDLEq(axi_wready, bit_1),
+                                   HDLEq(root.h_bus['wvalid'], bit_1)))
+        proc_if.then_stmts.append(HDLAssign(axi_wlast, root.h_bus['wlast']))
+        proc_if_bad = HDLIfElse(HDLEq(axi_wbad, bit_1))
+        proc_if_bad.then_stmts.append(HDLAssign(axi_werr, RESP_SLVERR))
+        proc_if_last = HDLIfElse(HDLEq(root.h_bus['wlast'], bit_1))
+        proc_if_last.then_stmts.append(HDLAssign(axi_wdone, bit_1))
+        proc_if_last.else_stmts = None
+        proc_if_bad.then_stmts.append(proc_if_last)
+        stmts = proc_if_bad.else_stmts
+        stmts.append(HDLAssign(ibus.wr_req, bit_1))
+        stmts.append(HDLAssign(axi_wip, bit_1))
+        if root.h_bus['awaddr'] is not None:
+            stmts.append(HDLAssign(ibus.wr_adr, axi_awaddr))
+            proc_if_inc = HDLIfElse(HDLNot(HDLEq(axi_awburst, BURST_FIXED)))
+            proc_if_inc.then_stmts.append(
+                HDLAssign(axi_awaddr, HDLAdd(axi_awaddr, HDLNumber(1))))
+            proc_if_inc.else_stmts = None
+            stmts.append(proc_if_inc)
+        stmts.append(HDLAssign(ibus.wr_dat, root.h_bus['wdata']))
+        self.gen_wr_sel(root, stmts, ibus.wr_sel, root.h_bus['wstrb'])
+        proc_if.then_stmts.append(proc_if_bad)
+        proc_if.else_stmts = None
+        proc.sync_stmts.append(proc_if)
+
+        # End of the burst.
+        proc_if = HDLIfElse(HDLEq(HDLParen(HDLAnd(axi_wdone, root.h_bus['bready'])), bit_1))
+        proc_if.then_stmts.append(HDLAssign(axi_wdone, bit_0))
+        proc_if.then_stmts.append(HDLAssign(axi_wbusy, bit_0))
+        proc_if.then_stmts.append(HDLAssign(axi_wlast, bit_0))
+        proc_if.then_stmts.append(HDLAssign(axi_werr, RESP_OKAY))
+        proc_if.else_stmts = None
+        proc.sync_stmts.append(proc_if)
+
+        module.stmts.append(proc)
+        module.stmts.append(HDLAssign(root.h_bus['bresp'], axi_werr))
+
+    def expand_bus_r_burst(self, root, module, ibus, opts):
+        """Sub-routine of expand_bus: the read part"""
+        ibus.rd_req = module.new_HDLSignal('rd_req')  # Read access
+        ibus.rd_ack = module.new_HDLSignal('rd_ack')  # Ack for read
+        ibus.rd_err = module.new_HDLSignal('rd_err')  # Error for read
+        ibus.rd_adr = module.new_HDLSignal('rd_addr', root.c_addr_bits,
+                                           lo_idx=root.c_addr_word_bits)
+        ibus.rd_dat = module.new_HDLSignal('rd_data', root.c_word_bits)
+        # For the read accesses:
+        # ARREADY is asserted when there is no burst in progress.  ARADDR, ARBURST and
+        # ARLEN are registered.
+        # Each beat is a read, which is started when the previous read is acknowledged
+        # and when there is room for the reply, so a beat can be read at every cycle.
+        # The beats of an unsupported burst (axi_rbad) are not read, but immediately
+        # acknowledged with an error (axi_rfake).
+        # RVALID is asserted on ack, until RREADY is asserted.  An ack received while
+        # RVALID is asserted is saved in the R skid buffer.  The burst ends when the
+        # last beat (counted by axi_rbeat) is accepted.
+        module.stmts.append(HDLComment("AR and R channels"))
+        axi_rbusy = module.new_HDLSignal('axi_rbusy')
+        if root.h_bus['araddr'] is not None:
+            axi_araddr = module.new_HDLSignal('axi_araddr', root.c_addr_bits,
+                                              lo_idx=root.c_addr_word_bits)
+        axi_arburst = module.new_HDLSignal('axi_arburst', 2)
+        axi_rbad = module.new_HDLSignal('axi_rbad')
+        axi_rfake = module.new_HDLSignal('axi_rfake')
+        axi_rack = module.new_HDLSignal('axi_rack')
+        axi_arlen = module.new_HDLSignal('axi_arlen', 8)
+        axi_rissue = module.new_HDLSignal('axi_rissue', 8)
+        axi_rpend = module.new_HDLSignal('axi_rpend')
+        axi_rbeat = module.new_HDLSignal('axi_rbeat', 8)
+        axi_rip = module.new_HDLSignal('axi_rip')
+        axi_rstart = module.new_HDLSignal('axi_rstart')
+        axi_rdone = module.new_HDLSignal('axi_rdone')
+        axi_rlast = module.new_HDLSignal('axi_rlast')
+        axi_rskid = module.new_HDLSignal('axi_rskid')
+        axi_rskid_data = module.new_HDLSignal('axi_rskid_data', root.c_word_bits)
+        axi_rerr = module.new_HDLSignal('axi_rerr', 2)
+        axi_rskid_err = module.new_HDLSignal('axi_rskid_err', 2)
+        module.stmts.append(HDLAssign(root.h_bus['arready'], HDLNot(axi_rbusy)))
+        module.stmts.append(HDLAssign(root.h_bus['rvalid'], axi_rdone))
+        module.stmts.append(HDLAssign(axi_rack, HDLOr(ibus.rd_ack, axi_rfake)))
+        module.stmts.append(HDLAssign(
+            axi_rstart,
+            HDLAnd(HDLAnd(
+                axi_rpend,
+                HDLParen(HDLOr(HDLNot(axi_rip), axi_rack))),
+                HDLParen(HDLAnd(HDLNot(axi_rskid),
+                                HDLParen(HDLOr(HDLNot(HDLParen(HDLAnd(axi_rdone, axi_rack))),
+                                               root.h_bus['rready'])))))))
+
+        proc = HDLComb()
+        proc.sensitivity.extend([axi_rbeat, axi_arlen])
+        proc_if = HDLIfElse(HDLEq(axi_rbeat, axi_arlen))
+        proc_if.then_stmts.append(HDLAssign(axi_rlast, bit_1))
+        proc_if.else_stmts.append(HDLAssign(axi_rlast, bit_0))
+        proc.stmts.append(proc_if)
+        module.stmts.append(proc)
+        module.stmts.append(HDLAssign(root.h_bus['rlast'], axi_rlast))
+
+        proc = HDLSync(root.h_bus['clk'], root.h_bus['brst'], rst_sync=gconfig.rst_sync)
+        proc.rst_stmts.append(HDLAssign(ibus.rd_req, bit_0))
+        proc.rst_stmts.append(HDLAssign(axi_rfake, bit_0))
+        proc.rst_stmts.append(HDLAssign(axi_rbusy, bit_0))
+        proc.rst_stmts.append(HDLAssign(axi_rpend, bit_0))
+        proc.rst_stmts.append(HDLAssign(axi_rip, bit_0))
+        proc.rst_stmts.append(
+            HDLAssign(root.h_bus['rdata'], HDLReplicate(bit_0, root.c_word_bits)))
+        proc.sync_stmts.append(HDLAssign(ibus.rd_req, bit_0))
+        proc.sync_stmts.append(HDLAssign(axi_rfake, bit_0))
+
+        if opts.bus_error:
+            err = HDLParen(HDLOr(ibus.rd_err, axi_rbad))
+        else:
+            err = axi_rbad
+        self.gen_reply(root, proc, axi_rack, err,
+                       (root.h_bus['rdata'], ibus.rd_dat),
+                       root.h_bus['rready'], axi_rdone, axi_rerr, axi_rskid, axi_rskid_err,
+                       axi_rskid_data)
+        proc_if = HDLIfElse(HDLEq(axi_rack, bit_1))
+        proc_if.then_stmts.append(HDLAssign(axi_rip, bit_0))
+        proc_if.else_stmts = None
+        proc.sync_stmts.append(proc_if)
+
+        # Start a burst.
+        proc_if = HDLIfElse(HDLAnd(HDLEq(root.h_bus['arvalid'], bit_1),
+                                   HDLEq(axi_rbusy, bit_0)))
+        if root.h_bus['araddr'] is not None:
+            proc_if.then_stmts.append(HDLAssign(opts.resize_addr_lhs(axi_araddr, ibus),
+                                                opts.resize_addr_in(root.h_bus['araddr'], ibus)))
+        proc_if.then_stmts.append(HDLAssign(axi_arburst, root.h_bus['arburst']))
+        self.gen_unsupported(root, proc_if.then_stmts, 'ar', axi_rbad)
+        proc_if.then_stmts.append(HDLAssign(axi_arlen, root.h_bus['arlen']))
+        proc_if.then_stmts.append(HDLAssign(axi_rissue, HDLReplicate(bit_0, 8)))
+        proc_if.then_stmts.append(HDLAssign(axi_rbeat, HDLReplicate(bit_0, 8)))
+        proc_if.then_stmts.append(HDLAssign(axi_rbusy, bit_1))
+        proc_if.then_stmts.append(HDLAssign(axi_rpend, bit_1))
+        proc_if.else_stmts = None
+        proc.sync_stmts.append(proc_if)
+
+        # Read a beat.
+        proc_if = HDLIfElse(HDLEq(axi_rstart, bit_1))
+        proc_if.then_stmts.append(HDLAssign(axi_rip, bit_1))
+        proc_if_bad = HDLIfElse(HDLEq(axi_rbad, bit_1))
+        proc_if_bad.then_stmts.append(HDLAssign(axi_rfake, bit_1))
+        proc_if_bad.else_stmts.append(HDLAssign(ibus.rd_req, bit_1))
+        if root.h_bus['araddr'] is not None:
+            proc_if_bad.else_stmts.append(HDLAssign(ibus.rd_adr, axi_araddr))
+            proc_if_inc = HDLIfElse(HDLNot(HDLEq(axi_arburst, BURST_FIXED)))
+            proc_if_inc.then_stmts.append(
+                HDLAssign(axi_araddr, HDLAdd(axi_araddr, HDLNumber(1))))
+            proc_if_inc.else_stmts = None
+            proc_if_bad.else_stmts.append(proc_if_inc)
+        proc_if.then_stmts.append(proc_if_bad)
+        proc_if_last = HDLIfElse(HDLEq(axi_rissue, axi_arlen))
+        proc_if_last.then_stmts.append(HDLAssign(axi_rpend, bit_0))
+        proc_if_last.else_stmts = None
+        proc_if.then_stmts.append(proc_if_last)
+        proc_if.then_stmts.append(HDLAssign(axi_rissue, HDLAdd(axi_rissue, HDLNumber(1))))
+        proc_if.else_stmts = None
+        proc.sync_stmts.append(proc_if)
+
+        # End of a beat, and of the burst.
+        proc_if = HDLIfElse(HDLEq(HDLParen(HDLAnd(axi_rdone, root.h_bus['rready'])), bit_1))
+        proc_if.then_stmts.append(HDLAssign(axi_rbeat, HDLAdd(axi_rbeat, HDLNumber(1))))
+        proc_if_last = HDLIfElse(HDLEq(axi_rlast, bit_1))
+        proc_if_last.then_stmts.append(HDLAssign(axi_rbusy, bit_0))
+        proc_if_last.else_stmts = None
+        proc_if.then_stmts.append(proc_if_last)
+        proc_if.else_stmts = None
+        proc.sync_stmts.append(proc_if)
+
+        module.stmts.append(proc)
+        module.stmts.append(HDLAssign(root.h_bus['rresp'], axi_rerr))
+
+    def expand_bus(self, root, module, ibus, lib_name):
+        """Create AXI4 interface for the design."""
+        opts = BusOptions(root, root)
+        if opts.busgroup:
+            parser.error("busgroup is not supported by bus '{}' of '{}'".format(
+                root.bus, root.get_path()))
+        bus = [('clk', HDLPort("aclk")),
+               ('brst', HDLPort("areset_n"))]
+        bus.extend(self.gen_axi4lite_bus(module, module, 'axi4',
+            lambda n, sz, lo=0, dir='IN':
+                (n, None if sz == 0 else HDLPort(n, size=sz, lo_idx=lo, dir=dir)),
+                opts.addr_wd, opts.addr_low, root.c_word_bits, None, False, False))
+        if root.hdl_bus_attribute == 'Xilinx':
+            self.add_xilinx_attributes(bus, 'slave')
+        add_bus(root, module, bus)
+        root.h_bussplit = True
+        ibus.addr_size = root.c_addr_bits
+        ibus.addr_low = root.c_addr_word_bits
+        ibus.data_size = root.c_word_bits
+        ibus.rst = root.h_bus['brst']
+        ibus.clk = root.h_bus['clk']
+
+        self.expand_bus_w_burst(root, module, ibus, opts)
+        self.expand_bus_r_burst(root, module, ibus, opts)
+
+    def gen_bus_slave(self, root, module, prefix, n, opts):
+        if opts.busgroup:
+            parser.error("busgroup is not supported by interface '{}' of '{}'".format(
+                n.c_interface, n.get_path()))
+        super().gen_bus_slave(root, module, prefix, n, opts)
+        n.h_bus['awvalid'].comment = "\n" + (n.comment or "AXI-4 bus {}".format(n.name))
+
+    def wire_bus_slave(self, root, module, n, ibus):
+        # Single beat accesses.
+        super().wire_bus_slave(root, module, n, ibus)
+        size = HDLBinConst(ilog2(root.c_word_size), 3)
+        stmts = module.stmts
+        for ch in ('aw', 'ar'):
+            stmts.append(HDLAssign(n.h_bus[ch + 'len'], HDLBinConst(0, 8)))
+            stmts.append(HDLAssign(n.h_bus[ch + 'size'], size))
+            stmts.append(HDLAssign(n.h_bus[ch + 'burst'], BURST_INCR))
+        stmts.append(HDLAssign(n.h_bus['wlast'], bit_1))
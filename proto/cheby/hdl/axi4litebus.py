@@ -99,6 +99,21 @@ class AXI4LiteBus(BusGen):
             data_bits, 0, data_bits, comment, True, False)
         return
 
+    def gen_wr_sel(self, root, stmts, sel, wstrb):
+        """Translate Byte-wise write mask :param wstrb: of AXI4Lite bus to
+           bit-wise write mask :param sel: of internal bus"""
+        for idx in range(root.c_word_bits // tree.BYTE_SIZE):
+            stmts.append(
+                HDLAssign(
+                    HDLSlice(sel, idx * tree.BYTE_SIZE, tree.BYTE_SIZE),
+                    HDLReplicate(
+                        HDLSlice(wstrb, idx, None),
+                        tree.BYTE_SIZE,
+                        True,
+                    ),
+                )
+            )
+
     def expand_bus_w(self, root, module, ibus, opts):
         """Sub-routine of expand_bus: the write part"""
         ibus.wr_req = module.new_HDLSignal('wr_req')  # Write access
@@ -163,20 +178,7 @@ class AXI4LiteBus(BusGen):
         proc_if = HDLIfElse(HDLAnd(HDLEq(root.h_bus['wvalid'], bit_1),
                                    HDLEq(axi_wset, bit_0)))
         proc_if.then_stmts.append(HDLAssign(ibus.wr_dat, root.h_bus['wdata']))
-
-        #   Translate Byte-wise write mask of AXI4Lite bus to bit-wise write mask of
-        #   internal bus
-        for idx in range(root.c_word_bits // tree.BYTE_SIZE):
-            proc_if.then_stmts.append(
-                HDLAssign(
-                    HDLSlice(ibus.wr_sel, idx * tree.BYTE_SIZE, tree.BYTE_SIZE),
-                    HDLReplicate(
-                        HDLSlice(root.h_bus['wstrb'], idx, None),
-                        tree.BYTE_SIZE,
-                        True,
-                    ),
-                )
-            )
+        self.gen_wr_sel(root, proc_if.then_stmts, ibus.wr_sel, root.h_bus['wstrb'])
 
         proc_if.then_stmts.append(HDLAssign(axi_wset, bit_1))
         proc_if.then_stmts.append(
@@ -312,6 +314,251 @@ class AXI4LiteBus(BusGen):
             rresp = RESP_OKAY
         module.stmts.append(HDLAssign(root.h_bus['rresp'], rresp))
 
+    def gen_reply(self, root, proc, ack, err, data, ready, done, resp, skid, skid_resp,
+                  skid_data):
+        """Sub-routine of the pipelined expand_bus: the reply channel (B or R).
+           The reply of the internal bus (:param ack:, :param err: and :param data:)
+           is loaded in the channel registers (:param done: for VALID, :param resp:
+           and :param data:) if they are free, otherwise in the skid buffer.
+           There is no error reply if :param resp: is None."""
+        proc.rst_stmts.append(HDLAssign(done, bit_0))
+        if resp is not None:
+            proc.rst_stmts.append(HDLAssign(resp, RESP_OKAY))
+        proc.rst_stmts.append(HDLAssign(skid, bit_0))
+
+        # Move the skid buffer to the channel registers when the reply is accepted.
+        proc_if = HDLIfElse(HDLEq(HDLParen(HDLAnd(done, ready)), bit_1))
+        proc_if.then_stmts.append(HDLAssign(done, skid))
+        if resp is not None:
+            proc_if.then_stmts.append(HDLAssign(resp, skid_resp))
+        if data is not None:
+            proc_if.then_stmts.append(HDLAssign(data[0], skid_data))
+        proc_if.then_stmts.append(HDLAssign(skid, bit_0))
+        proc_if.else_stmts = None
+        proc.sync_stmts.append(proc_if)
+
+        # Load the reply of the internal bus.
+        proc_if = HDLIfElse(HDLEq(ack, bit_1))
+        proc_load = HDLIfElse(HDLOr(HDLEq(done, bit_0),
+                                    HDLEq(HDLParen(HDLAnd(ready, HDLNot(skid))), bit_1)))
+        proc_load.then_stmts.append(HDLAssign(done, bit_1))
+        proc_load.else_stmts.append(HDLAssign(skid, bit_1))
+        for stmts, r, d in [(proc_load.then_stmts, resp, None if data is None else data[0]),
+                            (proc_load.else_stmts, skid_resp, skid_data)]:
+            if resp is not None:
+                proc_if_err = HDLIfElse(HDLEq(err, bit_0))
+                proc_if_err.then_stmts.append(HDLAssign(r, RESP_OKAY))
+                proc_if_err.else_stmts.append(HDLAssign(r, RESP_SLVERR))
+                stmts.append(proc_if_err)
+            if data is not None:
+                stmts.append(HDLAssign(d, data[1]))
+        proc_if.then_stmts.append(proc_load)
+        proc_if.else_stmts = None
+        proc.sync_stmts.append(proc_if)
+
+    def expand_bus_w_pipelined(self, root, module, ibus, opts):
+        """Sub-routine of expand_bus: the write part, when a new access can be
+           started at every cycle"""
+        ibus.wr_req = module.new_HDLSignal('wr_req')  # Write access
+        ibus.wr_ack = module.new_HDLSignal('wr_ack')  # Ack for write
+        ibus.wr_err = module.new_HDLSignal('wr_err')  # Error for write
+        ibus.wr_adr = module.new_HDLSignal('wr_addr', root.c_addr_bits,
+                                           lo_idx=root.c_addr_word_bits)
+        ibus.wr_dat = module.new_HDLSignal('wr_data', root.c_word_bits)
+        ibus.wr_sel = module.new_HDLSignal('wr_sel', root.c_word_bits)
+        # For the write accesses:
+        # AWREADY and WREADY are deasserted when the skid buffer of their channel is full.
+        # A write is started when the address and the data are available (either in the
+        # skid buffers or on the bus), when the previous write is acknowledged and when
+        # there is room for the reply.  Otherwise AWADDR and WDATA are saved in the skid
+        # buffers.  So a write can be started at every cycle.
+        # BVALID is asserted on ack, until BREADY is asserted.  An ack received while
+        # BVALID is asserted is saved in the B skid buffer.
+        module.stmts.append(HDLComment("AW, W and B channels (pipelined)"))
+        axi_awskid = module.new_HDLSignal('axi_awskid')
+        if root.h_bus['awaddr'] is not None:
+            axi_awaddr = module.new_HDLSignal('axi_awaddr', root.c_addr_bits,
+                                              lo_idx=root.c_addr_word_bits)
+        axi_wskid = module.new_HDLSignal('axi_wskid')
+        axi_wdata = module.new_HDLSignal('axi_wdata', root.c_word_bits)
+        axi_wstrb = module.new_HDLSignal('axi_wstrb', root.c_word_bits // tree.BYTE_SIZE)
+        axi_wip = module.new_HDLSignal('axi_wip')
+        axi_wstart = module.new_HDLSignal('axi_wstart')
+        axi_wdone = module.new_HDLSignal('axi_wdone')
+        axi_bskid = module.new_HDLSignal('axi_bskid')
+        if opts.bus_error:
+            axi_werr = module.new_HDLSignal('axi_werr', 2)
+            axi_bskid_err = module.new_HDLSignal('axi_bskid_err', 2)
+        else:
+            axi_werr = None
+            axi_bskid_err = None
+        module.stmts.append(HDLAssign(root.h_bus['awready'], HDLNot(axi_awskid)))
+        module.stmts.append(HDLAssign(root.h_bus['wready'], HDLNot(axi_wskid)))
+        module.stmts.append(HDLAssign(root.h_bus['bvalid'], axi_wdone))
+        module.stmts.append(HDLAssign(
+            axi_wstart,
+            HDLAnd(HDLAnd(HDLAnd(
+                HDLParen(HDLOr(HDLNot(axi_wip), ibus.wr_ack)),
+                HDLParen(HDLOr(axi_awskid, root.h_bus['awvalid']))),
+                HDLParen(HDLOr(axi_wskid, root.h_bus['wvalid']))),
+                HDLParen(HDLAnd(HDLNot(axi_bskid),
+                                HDLParen(HDLOr(HDLNot(HDLParen(HDLAnd(axi_wdone, ibus.wr_ack))),
+                                               root.h_bus['bready'])))))))
+
+        proc = HDLSync(root.h_bus['clk'], root.h_bus['brst'], rst_sync=gconfig.rst_sync)
+        proc.rst_stmts.append(HDLAssign(ibus.wr_req, bit_0))
+        proc.rst_stmts.append(HDLAssign(axi_awskid, bit_0))
+        proc.rst_stmts.append(HDLAssign(axi_wskid, bit_0))
+        proc.rst_stmts.append(HDLAssign(axi_wip, bit_0))
+        proc.sync_stmts.append(HDLAssign(ibus.wr_req, bit_0))
+
+        self.gen_reply(root, proc, ibus.wr_ack, ibus.wr_err, None,
+                       root.h_bus['bready'], axi_wdone, axi_werr, axi_bskid, axi_bskid_err, None)
+        proc_if = HDLIfElse(HDLEq(ibus.wr_ack, bit_1))
+        proc_if.then_stmts.append(HDLAssign(axi_wip, bit_0))
+        proc_if.else_stmts = None
+        proc.sync_stmts.append(proc_if)
+
+        # Start a write, or save AW and W in the skid buffers.
+        proc_start = HDLIfElse(HDLEq(axi_wstart, bit_1))
+        proc_start.then_stmts.append(HDLAssign(ibus.wr_req, bit_1))
+        proc_start.then_stmts.append(HDLAssign(axi_wip, bit_1))
+        proc_if = HDLIfElse(HDLEq(axi_awskid, bit_1))
+        if root.h_bus['awaddr'] is not None:
+            proc_if.then_stmts.append(HDLAssign(ibus.wr_adr, axi_awaddr))
+            proc_if.else_stmts.append(HDLAssign(opts.resize_addr_lhs(ibus.wr_adr, ibus),
+                                                opts.resize_addr_in(root.h_bus['awaddr'], ibus)))
+        proc_if.then_stmts.append(HDLAssign(axi_awskid, bit_0))
+        if not proc_if.else_stmts:
+            proc_if.else_stmts = None
+        proc_start.then_stmts.append(proc_if)
+        proc_if = HDLIfElse(HDLEq(axi_wskid, bit_1))
+        proc_if.then_stmts.append(HDLAssign(ibus.wr_dat, axi_wdata))
+        self.gen_wr_sel(root, proc_if.then_stmts, ibus.wr_sel, axi_wstrb)
+        proc_if.then_stmts.append(HDLAssign(axi_wskid, bit_0))
+        proc_if.else_stmts.append(HDLAssign(ibus.wr_dat, root.h_bus['wdata']))
+        self.gen_wr_sel(root, proc_if.else_stmts, ibus.wr_sel, root.h_bus['wstrb'])
+        proc_start.then_stmts.append(proc_if)
+
+        proc_if = HDLIfElse(HDLAnd(HDLEq(root.h_bus['awvalid'], bit_1),
+                                   HDLEq(axi_awskid, bit_0)))
+        if root.h_bus['awaddr'] is not None:
+            proc_if.then_stmts.append(HDLAssign(opts.resize_addr_lhs(axi_awaddr, ibus),
+                                                opts.resize_addr_in(root.h_bus['awaddr'], ibus)))
+        proc_if.then_stmts.append(HDLAssign(axi_awskid, bit_1))
+        proc_if.else_stmts = None
+        proc_start.else_stmts.append(proc_if)
+        proc_if = HDLIfElse(HDLAnd(HDLEq(root.h_bus['wvalid'], bit_1),
+                                   HDLEq(axi_wskid, bit_0)))
+        proc_if.then_stmts.append(HDLAssign(axi_wdata, root.h_bus['wdata']))
+        proc_if.then_stmts.append(HDLAssign(axi_wstrb, root.h_bus['wstrb']))
+        proc_if.then_stmts.append(HDLAssign(axi_wskid, bit_1))
+        proc_if.else_stmts = None
+        proc_start.else_stmts.append(proc_if)
+        proc.sync_stmts.append(proc_start)
+
+        module.stmts.append(proc)
+
+        if opts.bus_error:
+            bresp = axi_werr
+        else:
+            bresp = RESP_OKAY
+        module.stmts.append(HDLAssign(root.h_bus['bresp'], bresp))
+
+    def expand_bus_r_pipelined(self, root, module, ibus, opts):
+        """Sub-routine of expand_bus: the read part, when a new access can be
+           started at every cycle"""
+        ibus.rd_req = module.new_HDLSignal('rd_req')  # Read access
+        ibus.rd_ack = module.new_HDLSignal('rd_ack')  # Ack for read
+        ibus.rd_err = module.new_HDLSignal('rd_err')  # Error for read
+        ibus.rd_adr = module.new_HDLSignal('rd_addr', root.c_addr_bits,
+                                           lo_idx=root.c_addr_word_bits)
+        ibus.rd_dat = module.new_HDLSignal('rd_data', root.c_word_bits)
+        # For the read accesses:
+        # ARREADY is deasserted when the AR skid buffer is full.
+        # A read is started when the address is available (either in the skid buffer or
+        # on the bus), when the previous read is acknowledged and when there is room for
+        # the reply.  Otherwise ARADDR is saved in the skid buffer.  So a read can be
+        # started at every cycle.
+        # RVALID is asserted on ack, until RREADY is asserted.  As RDATA must be stable
+        # until RREADY is asserted, it is registered.  An ack received while RVALID is
+        # asserted is saved in the R skid buffer.
+        module.stmts.append(HDLComment("AR and R channels (pipelined)"))
+        axi_arskid = module.new_HDLSignal('axi_arskid')
+        if root.h_bus['araddr'] is not None:
+            axi_araddr = module.new_HDLSignal('axi_araddr', root.c_addr_bits,
+                                              lo_idx=root.c_addr_word_bits)
+        axi_rip = module.new_HDLSignal('axi_rip')
+        axi_rstart = module.new_HDLSignal('axi_rstart')
+        axi_rdone = module.new_HDLSignal('axi_rdone')
+        axi_rskid = module.new_HDLSignal('axi_rskid')
+        axi_rskid_data = module.new_HDLSignal('axi_rskid_data', root.c_word_bits)
+        if opts.bus_error:
+            axi_rerr = module.new_HDLSignal('axi_rerr', 2)
+            axi_rskid_err = module.new_HDLSignal('axi_rskid_err', 2)
+        else:
+            axi_rerr = None
+            axi_rskid_err = None
+        module.stmts.append(HDLAssign(root.h_bus['arready'], HDLNot(axi_arskid)))
+        module.stmts.append(HDLAssign(root.h_bus['rvalid'], axi_rdone))
+        module.stmts.append(HDLAssign(
+            axi_rstart,
+            HDLAnd(HDLAnd(
+                HDLParen(HDLOr(HDLNot(axi_rip), ibus.rd_ack)),
+                HDLParen(HDLOr(axi_arskid, root.h_bus['arvalid']))),
+                HDLParen(HDLAnd(HDLNot(axi_rskid),
+                                HDLParen(HDLOr(HDLNot(HDLParen(HDLAnd(axi_rdone, ibus.rd_ack))),
+                                               root.h_bus['rready'])))))))
+
+        proc = HDLSync(root.h_bus['clk'], root.h_bus['brst'], rst_sync=gconfig.rst_sync)
+        proc.rst_stmts.append(HDLAssign(ibus.rd_req, bit_0))
+        proc.rst_stmts.append(HDLAssign(axi_arskid, bit_0))
+        proc.rst_stmts.append(HDLAssign(axi_rip, bit_0))
+        proc.rst_stmts.append(
+            HDLAssign(root.h_bus['rdata'], HDLReplicate(bit_0, root.c_word_bits)))
+        proc.sync_stmts.append(HDLAssign(ibus.rd_req, bit_0))
+
+        self.gen_reply(root, proc, ibus.rd_ack, ibus.rd_err,
+                       (root.h_bus['rdata'], ibus.rd_dat),
+                       root.h_bus['rready'], axi_rdone, axi_rerr, axi_rskid, axi_rskid_err,
+                       axi_rskid_data)
+        proc_if = HDLIfElse(HDLEq(ibus.rd_ack, bit_1))
+        proc_if.then_stmts.append(HDLAssign(axi_rip, bit_0))
+        proc_if.else_stmts = None
+        proc.sync_stmts.append(proc_if)
+
+        # Start a read, or save AR in the skid buffer.
+        proc_start = HDLIfElse(HDLEq(axi_rstart, bit_1))
+        proc_start.then_stmts.append(HDLAssign(ibus.rd_req, bit_1))
+        proc_start.then_stmts.append(HDLAssign(axi_rip, bit_1))
+        proc_if = HDLIfElse(HDLEq(axi_arskid, bit_1))
+        if root.h_bus['araddr'] is not None:
+            proc_if.then_stmts.append(HDLAssign(ibus.rd_adr, axi_araddr))
+            proc_if.else_stmts.append(HDLAssign(opts.resize_addr_lhs(ibus.rd_adr, ibus),
+                                                opts.resize_addr_in(root.h_bus['araddr'], ibus)))
+        proc_if.then_stmts.append(HDLAssign(axi_arskid, bit_0))
+        if not proc_if.else_stmts:
+            proc_if.else_stmts = None
+        proc_start.then_stmts.append(proc_if)
+
+        proc_if = HDLIfElse(HDLAnd(HDLEq(root.h_bus['arvalid'], bit_1),
+                                   HDLEq(axi_arskid, bit_0)))
+        if root.h_bus['araddr'] is not None:
+            proc_if.then_stmts.append(HDLAssign(opts.resize_addr_lhs(axi_araddr, ibus),
+                                                opts.resize_addr_in(root.h_bus['araddr'], ibus)))
+        proc_if.then_stmts.append(HDLAssign(axi_arskid, bit_1))
+        proc_if.else_stmts = None
+        proc_start.else_stmts.append(proc_if)
+        proc.sync_stmts.append(proc_start)
+
+        module.stmts.append(proc)
+
+        if opts.bus_error:
+            rresp = axi_rerr
+        else:
+            rresp = RESP_OKAY
+        module.stmts.append(HDLAssign(root.h_bus['rresp'], rresp))
+
     def add_xilinx_attributes(self, bus, portname):
         for name, port in bus:
             if name in ('clk', 'brst'):
@@ -350,8 +597,12 @@ class AXI4LiteBus(BusGen):
         # immediately, and they must be 'sent' after the request has be
         # acknowledged.  This concerns RVALID, RDATA, BVALID.
         # Internal signals and bus protocol
-        self.expand_bus_w(root, module, ibus, opts)
-        self.expand_bus_r(root, module, ibus, opts)
+        if opts.pipelined:
+            self.expand_bus_w_pipelined(root, module, ibus, opts)
+            self.expand_bus_r_pipelined(root, module, ibus, opts)
+        else:
+            self.expand_bus_w(root, module, ibus, opts)
+            self.expand_bus_r(root, module, ibus, opts)
 
     def gen_bus_slave(self, root, module, prefix, n, opts):
         comment = "\n" + (n.comment or "AXI-4 lite bus {}".format(n.name))
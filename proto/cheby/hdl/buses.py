@@ -4,6 +4,7 @@ from cheby.hdl.srambus import SRAMBus
 from cheby.hdl.simplebus import SimpleBus
 from cheby.hdl.apbbus import APBBus
 from cheby.hdl.axi4litebus import AXI4LiteBus
+from cheby.hdl.axi4bus import AXI4Bus
 from cheby.hdl.avalonbus import AvalonBus
 
 
@@ -14,6 +15,8 @@ def name_to_busgen(name):
         return APBBus(name)
     elif name == 'axi4-lite-32':
         return AXI4LiteBus(name)
+    elif name == 'axi4-32':
+        return AXI4Bus(name)
     elif name == 'avalon-lite-32':
         return AvalonBus(name)
     elif name.startswith('cern-be-vme-'):
@@ -11,6 +11,7 @@ class BusOptions:
         # Extract x-hdl options for :param bus:
         self.busgroup = bus.get_extension('x_hdl', 'busgroup')
         self.bus_error = bus.get_extension('x_hdl', 'bus-error')
+        self.pipelined = bus.get_extension('x_hdl', 'bus-pipelined', False)
 
         # External size.  There might be some extra unused bits for address.
         # The default rule is to restrict the address bus to only the used bits.
@@ -0,0 +1,198 @@
+"""Address decoder plan.
+
+   The plan describes how to decode the address of an access to find the
+   element (register, memory, submap) to be accessed.  It is computed once
+   per address space and then rendered into HDL for the read and for the
+   write accesses.
+"""
+from cheby.hdltree import (HDLSwitch, HDLChoiceExpr, HDLChoiceDefault,
+                           HDLSlice, HDLConst)
+import cheby.tree as tree
+from cheby.layout import ilog2
+
+
+class DecoderLeaf:
+    """End of the decoding: access to :param el: (None if there is no
+       element at this address) with the bit offset :param off: (for
+       registers larger than a word)."""
+    def __init__(self, el, off):
+        self.el = el
+        self.off = off
+
+
+class DecoderSwitch:
+    """Decode address bits [lo, lo + width - 1].
+       Each choice is a pair (value, plan); the default choice is for
+       values without element."""
+    def __init__(self, lo, width):
+        self.lo = lo
+        self.width = width
+        self.choices = []
+
+
+def gather_leaves(n):
+    # Gather all elements that need to be decoded.
+    if isinstance(n, tree.Reg):
+        return [n]
+    elif isinstance(n, tree.Submap):
+        if n.include is True:
+            return gather_leaves(n.c_submap)
+        else:
+            return [n]
+    elif isinstance(n, (tree.Memory, tree.Repeat)):
+        # A repeat which is not unrolled is decoded by its generator.
+        return [n]
+    elif isinstance(n, (tree.Root, tree.Block, tree.AddressSpace)):
+        r = []
+        for e in n.children:
+            r.extend(gather_leaves(e))
+        return r
+    else:
+        raise AssertionError(n)
+
+
+def build_block_decoder(root, children, lo, hi_idx, hi, off):
+    """Return the plan to decode :param children:[lo:hi_idx] (sorted by
+       address) at address :param off:.
+       :param hi: is the highest address bit to be decoded.
+       The children are not copied, so that the time is proportional to the
+       number of children times the depth of the decoder."""
+    debug = False
+    if debug:
+        print("build_block_decoder: hi={}, off={:08x}".format(hi, off))
+        for i in children[lo:hi_idx]:
+            print("{}: {:08x}, sz={:x}, al={:x}".format(
+                i.name, i.c_abs_addr, i.c_size, i.c_align))
+        print("----")
+    nbr = hi_idx - lo
+    if nbr == 0:
+        # Nothing to do
+        return DecoderLeaf(None, 0)
+    elif nbr == 1:
+        # If there is only one child, no need to decode anymore.
+        el = children[lo]
+        if isinstance(el, tree.Reg):
+            if hi <= root.c_addr_word_bits:
+                foff = off - el.c_abs_addr
+                if el.c_size <= root.c_word_size:
+                    # If the size of the register is smaller than the word,
+                    # always reads at 0.  Word endianness doesn't matter.
+                    assert foff == 0
+                else:
+                    if root.c_word_endian == 'big':
+                        # Big endian
+                        foff = el.c_size - root.c_word_size - foff
+                    else:
+                        # Little endian
+                        foff = foff
+                return DecoderLeaf(el, foff * tree.BYTE_SIZE)
+            else:
+                # Multi-word register - to be split, so decode more.
+                maxsz = 1 << root.c_addr_word_bits
+        else:
+            return DecoderLeaf(el, 0)
+    else:
+        # Will add a decoder for the maximum aligned child.
+        maxsz = max([children[i].c_align for i in range(lo, hi_idx)])
+
+    maxszl2 = ilog2(maxsz)
+    assert maxsz == 1 << maxszl2
+    mask = ~(maxsz - 1)
+    assert maxszl2 < hi
+
+    # Add a decoder.
+    # Note: addr has a word granularity.
+    sw = DecoderSwitch(maxszl2, hi - maxszl2)
+
+    i = lo
+    next_base = off
+    while i < hi_idx:
+        # Extract the first child.
+        first = children[i]
+        # Skip holes in address to be decoded.
+        base = max(next_base, first.c_abs_addr & mask)
+        next_base = base + maxsz
+        if debug:
+            print("hi={} szl2={} first: {:08x}, base: {:08x}, mask: {:08x}".
+                  format(hi, maxszl2, first.c_abs_addr, base, mask))
+
+        # Gather other children that are decoded in the same branch (same
+        # base address)
+        j = i + 1
+        while j < hi_idx and (children[j].c_abs_addr & mask) == base:
+            if debug:
+                print(" {} @ {:08x}".format(children[j].name, children[j].c_abs_addr))
+            j += 1
+
+        # Sub-decode gathered children.
+        sw.choices.append(
+            (base >> maxszl2,
+             build_block_decoder(root, children, i, j, maxszl2, base)))
+
+        # If the block is larger than its alignment, re-decode it again.
+        last = children[j - 1]
+        if ((last.c_abs_addr + last.c_size - 1) & mask) != base:
+            i = j - 1
+        else:
+            i = j
+
+    return sw
+
+
+def build_decoder(root):
+    """Return the decoder plan for :param root: (a root or an address
+       space)."""
+    children = gather_leaves(root)
+    children.sort(key=lambda x: x.c_abs_addr)
+    return build_block_decoder(root, children, 0, len(children),
+                               ilog2(root.c_size), 0)
+
+
+def plan_elements(plan, res):
+    "Add to :param res: the ids of the elements decoded by :param plan:"
+    if isinstance(plan, DecoderLeaf):
+        if plan.el is not None:
+            res.add(id(plan.el))
+    else:
+        for _, sub in plan.choices:
+            plan_elements(sub, res)
+
+
+def split_decoder(plan):
+    """Return the list of branches (value, plan) of the switch :param plan:,
+       with a last branch (None, leaf) for the values without element.
+       Return None if :param plan: is not a switch or if an element (like a
+       register larger than a word) is decoded by several branches, as the
+       switch cannot be split in independent decoders."""
+    if not isinstance(plan, DecoderSwitch):
+        return None
+    seen = set()
+    for _, sub in plan.choices:
+        els = set()
+        plan_elements(sub, els)
+        if not seen.isdisjoint(els):
+            return None
+        seen.update(els)
+    res = list(plan.choices)
+    if len(res) < (1 << plan.width):
+        res.append((None, DecoderLeaf(None, 0)))
+    return res
+
+
+def render_decoder(plan, stmts, addr, func):
+    """Render :param plan: to HDL statements appended to :param stmts:,
+       using :param addr: as the (word granularity) address.
+       :param func: is called with (stmts, el, off) for each leaf; el is None
+       when the address has no corresponding element."""
+    if isinstance(plan, DecoderLeaf):
+        func(stmts, plan.el, plan.off)
+        return
+    sw = HDLSwitch(HDLSlice(addr, plan.lo, plan.width))
+    stmts.append(sw)
+    for val, sub in plan.choices:
+        ch = HDLChoiceExpr(HDLConst(val, plan.width))
+        sw.choices.append(ch)
+        render_decoder(sub, ch.stmts, addr, func)
+    ch = HDLChoiceDefault()
+    sw.choices.append(ch)
+    func(ch.stmts, None, 0)
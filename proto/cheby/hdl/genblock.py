@@ -5,7 +5,14 @@ from cheby.hdl.genreg import GenReg
 from cheby.hdl.geninterface import GenInterface
 from cheby.hdl.genmemory import GenMemory
 from cheby.hdl.gensubmap import GenSubmap
-from cheby.hdltree import HDLInterface, HDLInterfaceArray, HDLInterfaceIndex
+from cheby.hdl.decoder import gather_leaves, build_block_decoder, render_decoder
+from cheby.hdltree import (HDLInterface, HDLInterfaceArray, HDLInterfaceIndex,
+                           HDLObject, HDLSignal, HDLPort, HDLSlice, HDLIndex,
+                           HDLPartSelect, HDLToInteger, HDLNumber,
+                           HDLBinary, HDLUnary, HDLParen, HDLReplicate,
+                           HDLAssign, HDLIfElse, HDLSync, HDLComb, HDLSwitch,
+                           HDLChoiceExpr, HDLChoiceDefault, HDLComment,
+                           HDLGenFor, HDLLe, bit_0)
 import cheby.tree as tree
 from cheby.layout import ilog2
 
@@ -15,6 +22,9 @@ class GenBlock(ElGen):
         for n in self.n.children:
             if isinstance(n, tree.RepeatBlock):
                 n.h_gen = GenRepeatBlock(self.root, self.module, n)
+            elif isinstance(n, tree.Repeat):
+                # Not unrolled (repeat-style: array)
+                n.h_gen = GenRepeatArray(self.root, self.module, n)
             elif isinstance(n, tree.Block):
                 n.h_gen = GenBlock(self.root, self.module, n)
             elif isinstance(n, tree.Submap):
@@ -115,3 +125,225 @@ class GenRepeatBlock(GenBlock):
         else:
             for n in self.n.children:
                 n.h_gen.gen_ports()
+
+
+class GenRepeatArray(GenBlock):
+    """Generate code for a Repeat which is not unrolled (x-hdl repeat-style
+       is 'array').  The code of the children is generated once, within a
+       for generate statement.  The ports (and the signals driven by the
+       write decoder) are vectors of 'count' elements, and the element to
+       be accessed is decoded from the address."""
+    def __init__(self, root, module, n):
+        super(GenRepeatArray, self).__init__(root, module, n)
+        # Replicated objects (vectors) and the width of their element (None
+        # for a bit).
+        self.h_width = {}
+        # Signals declared within the generate statement.
+        self.h_locals = []
+        # Vectors to read local signals from the decoders.
+        self.h_views = {}
+        self.h_genfor = None
+        self.h_plan = None
+
+    def gather_leaves(self):
+        "Return the registers of an element, sorted by address"
+        res = []
+        for c in self.n.children:
+            res.extend(gather_leaves(c))
+        res.sort(key=lambda x: x.c_abs_addr)
+        return res
+
+    def widen(self, obj):
+        """Transform :param obj: (a port or a signal of the children) into a
+           vector of elements."""
+        self.h_width[obj] = obj.size
+        obj.size = self.n.count * (obj.size or 1)
+
+    def gen_ports(self):
+        nports = len(self.module.ports)
+        ndecls = len(self.module.decls)
+        super(GenRepeatArray, self).gen_ports()
+        for p in self.module.ports[nports:]:
+            self.widen(p)
+        decls = self.module.decls[ndecls:]
+        del self.module.decls[ndecls:]
+        # The write requests are driven by the write decoder, so they
+        # are declared outside of the generate statement.
+        wreqs = [r.h_wreq for r in self.gather_leaves() if r.h_wreq is not None]
+        for d in decls:
+            if d in wreqs:
+                self.widen(d)
+                self.module.decls.append(d)
+            else:
+                self.h_locals.append(d)
+
+    def element(self, obj, idx, off, size):
+        w = self.h_width[obj]
+        return HDLPartSelect(obj, idx, w or 1, off, size)
+
+    def get_view(self, sig):
+        "Return a vector whose elements are local signal :param sig:"
+        res = self.h_views.get(sig)
+        if res is None:
+            res = self.module.new_HDLSignal(sig.name + '_arr', sig.size)
+            self.widen(res)
+            self.h_views[sig] = res
+            self.h_genfor.stmts.append(
+                HDLAssign(self.element(res, self.h_genfor.var, 0, sig.size), sig))
+        return res
+
+    def get_vector(self, obj, in_loop):
+        """Return the vector for :param obj:, or None if :param obj: is not
+           replicated (or is a local signal within the loop)"""
+        if obj in self.h_width:
+            return obj
+        elif obj in self.h_locals and not in_loop:
+            return self.get_view(obj)
+        else:
+            return None
+
+    def rewrite(self, e, idx, in_loop):
+        """Return expression :param e: of the children for the element
+           :param idx:.  :param in_loop: is true for an expression within
+           the generate statement (where local signals are visible)."""
+        if isinstance(e, (HDLSlice, HDLIndex)) and isinstance(e.prefix, HDLObject):
+            vec = self.get_vector(e.prefix, in_loop)
+            if vec is None:
+                return e
+            size = e.size if isinstance(e, HDLSlice) else None
+            return self.element(vec, idx, e.index, size)
+        elif isinstance(e, (HDLSignal, HDLPort)):
+            vec = self.get_vector(e, in_loop)
+            if vec is None:
+                return e
+            return self.element(vec, idx, 0, self.h_width[vec])
+        elif isinstance(e, HDLBinary):
+            return type(e)(self.rewrite(e.left, idx, in_loop),
+                           self.rewrite(e.right, idx, in_loop))
+        elif isinstance(e, (HDLUnary, HDLParen)):
+            return type(e)(self.rewrite(e.expr, idx, in_loop))
+        elif isinstance(e, HDLReplicate):
+            return HDLReplicate(self.rewrite(e.expr, idx, in_loop), e.num, e.with_others)
+        else:
+            # Constants
+            return e
+
+    def rewrite_stmts(self, stmts, idx, in_loop):
+        if stmts is None:
+            return None
+        return [self.rewrite_stmt(s, idx, in_loop) for s in stmts]
+
+    def rewrite_stmt(self, s, idx, in_loop):
+        if isinstance(s, HDLAssign):
+            return HDLAssign(self.rewrite(s.target, idx, in_loop),
+                             self.rewrite(s.expr, idx, in_loop))
+        elif isinstance(s, HDLIfElse):
+            res = HDLIfElse(self.rewrite(s.cond, idx, in_loop))
+            res.then_stmts = self.rewrite_stmts(s.then_stmts, idx, in_loop)
+            res.else_stmts = self.rewrite_stmts(s.else_stmts, idx, in_loop)
+            return res
+        elif isinstance(s, HDLSync):
+            res = HDLSync(s.clk, s.rst, s.rst_val, s.rst_sync)
+            res.name = s.name
+            res.rst_stmts = self.rewrite_stmts(s.rst_stmts, idx, in_loop)
+            res.sync_stmts = self.rewrite_stmts(s.sync_stmts, idx, in_loop)
+            return res
+        elif isinstance(s, HDLComb):
+            res = HDLComb()
+            res.name = s.name
+            res.stmts = self.rewrite_stmts(s.stmts, idx, in_loop)
+            res.sensitivity = [self.rewrite(e, idx, in_loop) for e in s.sensitivity]
+            return res
+        elif isinstance(s, HDLSwitch):
+            res = HDLSwitch(self.rewrite(s.expr, idx, in_loop))
+            for c in s.choices:
+                if isinstance(c, HDLChoiceExpr):
+                    ch = HDLChoiceExpr(c.expr)
+                else:
+                    ch = HDLChoiceDefault()
+                ch.stmts = self.rewrite_stmts(c.stmts, idx, in_loop)
+                res.choices.append(ch)
+            return res
+        elif isinstance(s, HDLComment):
+            return s
+        else:
+            raise AssertionError(s)
+
+    def gen_processes(self, ibus):
+        n = self.n
+        nstmts = len(self.module.stmts)
+        super(GenRepeatArray, self).gen_processes(ibus)
+        stmts = self.module.stmts[nstmts:]
+        del self.module.stmts[nstmts:]
+        if not all(isinstance(s, HDLComment) for s in stmts):
+            # Like the generate statement, the comment is not emitted
+            # when there are no processes.
+            self.module.stmts.append(HDLComment("Repeat {}".format(n.c_name)))
+        self.h_genfor = HDLGenFor('g_' + n.c_name, 'i_' + n.c_name, n.count)
+        self.h_genfor.decls = self.h_locals
+        self.h_genfor.stmts = self.rewrite_stmts(stmts, self.h_genfor.var, True)
+        self.module.stmts.append(self.h_genfor)
+
+    def gen_access(self, s, adr, proc, gen, gen_error):
+        """Generate the decoder within an element, for an access at address
+           :param adr:.  :param gen: generates the access to a child, and
+           :param gen_error: the access to an address without a child."""
+        n = self.n
+        lo = ilog2(n.c_elsize)
+        width = ilog2(n.c_size) - lo
+        if width == 0:
+            idx = HDLNumber(0)
+        else:
+            idx = HDLToInteger(HDLSlice(adr, lo, width))
+        if self.h_plan is None:
+            leaves = self.gather_leaves()
+            self.h_plan = build_block_decoder(self.root, leaves, 0, len(leaves), lo, 0)
+
+        # Default values of the children are set for the whole vectors.
+        defaults = HDLComb()
+
+        def add_access(stmts, el, off):
+            if el is None:
+                gen_error(stmts)
+            else:
+                stmts.append(HDLComment("{} {}".format(el.NAME, el.c_name)))
+                el_stmts = []
+                gen(el, el_stmts, off, defaults)
+                stmts.extend(self.rewrite_stmts(el_stmts, idx, False))
+
+        stmts = []
+        render_decoder(self.h_plan, stmts, adr, add_access)
+        for d in defaults.stmts:
+            assert d.target in self.h_width
+            proc.stmts.append(HDLAssign(d.target, HDLReplicate(bit_0, d.target.size)))
+
+        if n.count < (1 << width):
+            # Check the index is valid.
+            check = HDLIfElse(HDLLe(idx, HDLNumber(n.count - 1)))
+            check.then_stmts = stmts
+            gen_error(check.else_stmts)
+            s.append(check)
+        else:
+            s.extend(stmts)
+
+    def gen_read(self, s, off, ibus, rdproc):
+        def gen(el, stmts, el_off, proc):
+            el.h_gen.gen_read(stmts, el_off, ibus, proc)
+
+        def gen_error(stmts):
+            rd_req = ibus.rd_req_del or ibus.rd_req
+            stmts.append(HDLAssign(ibus.rd_ack, rd_req))
+            stmts.append(HDLAssign(ibus.rd_err, rd_req))
+
+        self.gen_access(s, ibus.rd_adr, rdproc, gen, gen_error)
+
+    def gen_write(self, s, off, ibus, wrproc):
+        def gen(el, stmts, el_off, proc):
+            el.h_gen.gen_write(stmts, el_off, ibus, proc)
+
+        def gen_error(stmts):
+            wr_req = ibus.wr_req_del or ibus.wr_req
+            stmts.append(HDLAssign(ibus.wr_ack, wr_req))
+            stmts.append(HDLAssign(ibus.wr_err, wr_req))
+
+        self.gen_access(s, ibus.wr_adr, wrproc, gen, gen_error)
@@ -68,6 +68,9 @@ class GenMemory(ElGen):
             reg.h_rreq = build_sig('_rreq')
             reg.h_rack = build_sig('_rack')
             reg.h_sig_wr = build_sig('_int_wr')
+            if self.root.h_bussplit:
+                # Read blocked by a write (and done at the next cycle).
+                reg.h_rp = build_sig('_rp')
 
     def gen_processes(self, ibus):
         mem = self.n
@@ -236,6 +239,10 @@ class GenMemory(ElGen):
             else:
                 rack = reg.h_rreq[i]
             proc.sync_stmts.append(HDLAssign(reg.h_rack[i], rack))
+            if self.root.h_bussplit and reg.access in ['rw', 'wo']:
+                proc.rst_stmts.append(HDLAssign(reg.h_rp[i], bit_0))
+                proc.sync_stmts.append(
+                    HDLAssign(reg.h_rp[i], HDLAnd(reg.h_rreq[i], mem.h_wreq)))
         self.module.stmts.append(proc)
 
     def foreach_word(self, s, reg, ibus, func):
@@ -262,10 +269,10 @@ class GenMemory(ElGen):
             if self.root.c_word_bits > reg.c_rwidth:
                 val = HDLConcat(HDLBinConst(0, self.root.c_word_bits - reg.c_rwidth), val)
             stmt.append(HDLAssign(ibus.rd_dat, val))
-            # Set rd signal to ram: read when there is not WR request,
-            # and either a read request or a pending read request.
+            # Set rd signal to ram: either a read request or a pending read
+            # request.  The read is acked only when there is no WR request.
             if self.root.h_bussplit and reg.access in ['wo', 'rw']:
-                rd_sig = HDLAnd(ibus.rd_req, HDLNot(n.h_wreq))
+                rd_sig = HDLOr(ibus.rd_req, reg.h_rp[i])
             else:
                 rd_sig = ibus.rd_req
             stmt.append(HDLAssign(reg.h_rreq[i], rd_sig))
@@ -273,6 +280,8 @@ class GenMemory(ElGen):
             rdproc.stmts.append(HDLAssign(reg.h_rreq[i], bit_0))
             # Use delayed ack as ack.
             stmt.append(HDLAssign(ibus.rd_ack, reg.h_rack[i]))
+            # Return no error
+            stmt.append(HDLAssign(ibus.rd_err, bit_0))
 
         # TODO: handle list of registers!
         n = self.n
@@ -292,3 +301,5 @@ class GenMemory(ElGen):
             self.foreach_word(s, reg, ibus, gen_write_word)
         # Always ack the request, even if ignored.
         s.append(HDLAssign(ibus.wr_ack, ibus.wr_req))
+        # Return no error
+        s.append(HDLAssign(ibus.wr_err, bit_0))
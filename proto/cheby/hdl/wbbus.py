@@ -48,6 +48,21 @@ class WBBus(BusGen):
         module.stmts.append(proc)
         return HDLAnd(stb, HDLNot(wb_xip))
 
+    def gen_wr_sel(self, root, stmts, sel, wb_sel):
+        """Translate Byte-wise write mask :param wb_sel: of Wishbone bus to
+           bit-wise write mask :param sel: of internal bus"""
+        for idx in range(root.c_word_bits // tree.BYTE_SIZE):
+            stmts.append(
+                HDLAssign(
+                    HDLSlice(sel, idx * tree.BYTE_SIZE, tree.BYTE_SIZE),
+                    HDLReplicate(
+                        HDLSlice(wb_sel, idx, None),
+                        tree.BYTE_SIZE,
+                        True,
+                    ),
+                )
+            )
+
     def add_decode_wb(self, root, module, ibus, opts):
         "Generate internal signals used by decoder/processes from WB bus."
         ibus.addr_size = root.c_addr_bits
@@ -62,17 +77,7 @@ class WBBus(BusGen):
         ibus.wr_sel = module.new_HDLSignal('wr_sel', root.c_word_bits)
         proc = HDLComb()
         proc.sensitivity.extend([root.h_bus['sel']])
-        for idx in range(root.c_word_bits // tree.BYTE_SIZE):
-            proc.stmts.append(
-                HDLAssign(
-                    HDLSlice(ibus.wr_sel, idx * tree.BYTE_SIZE, tree.BYTE_SIZE),
-                    HDLReplicate(
-                        HDLSlice(root.h_bus['sel'], idx, None),
-                        tree.BYTE_SIZE,
-                        True,
-                    ),
-                )
-            )
+        self.gen_wr_sel(root, proc.stmts, ibus.wr_sel, root.h_bus['sel'])
         module.stmts.append(proc)
 
         if ibus.addr_size > 0:
@@ -146,6 +151,138 @@ class WBBus(BusGen):
             module.stmts.append(HDLAssign(root.h_bus['err'], bit_0))
 
 
+    def add_decode_wb_pipelined(self, root, module, ibus, opts):
+        """Generate internal signals used by decoder/processes from WB bus,
+           when a new access can be started at every cycle (Wishbone B4
+           pipelined mode)."""
+        ibus.addr_size = root.c_addr_bits
+        ibus.addr_low = root.c_addr_word_bits
+        ibus.data_size = root.c_word_bits
+        ibus.clk = root.h_bus['clk']
+        ibus.rst = root.h_bus['brst']
+        ibus.rd_dat = module.new_HDLSignal('rd_dat_int', root.c_word_bits)
+        ibus.wr_dat = module.new_HDLSignal('wr_dat_int', root.c_word_bits)
+        ibus.wr_sel = module.new_HDLSignal('wr_sel', root.c_word_bits)
+        if ibus.addr_size > 0:
+            addr = module.new_HDLSignal('adr_int', ibus.addr_size, lo_idx=ibus.addr_low)
+            ibus.rd_adr = addr
+            ibus.wr_adr = addr
+        ibus.rd_req = module.new_HDLSignal('rd_req_int')    # Read access
+        ibus.wr_req = module.new_HDLSignal('wr_req_int')    # Write access
+        ibus.rd_ack = module.new_HDLSignal('rd_ack_int')    # Ack for read
+        ibus.rd_err = module.new_HDLSignal('rd_err_int')    # Error for read
+        ibus.wr_ack = module.new_HDLSignal('wr_ack_int')    # Ack for write
+        ibus.wr_err = module.new_HDLSignal('wr_err_int')    # Error for write
+        # A request is accepted when STB is asserted and STALL is not.
+        # An access is started when the request is available (either in the skid
+        # buffer or on the bus) and when the previous access is acknowledged (or
+        # when there is no access in progress).  Otherwise the request is saved in
+        # the skid buffer, and STALL is asserted until the skid buffer is empty.
+        # So an access can be started at every cycle.
+        # The replies are registered: ACK is asserted for one cycle per request,
+        # in the order of the requests.
+        # Note: the accepted requests are always completed, even if CYC is
+        # deasserted.
+        wb_en = module.new_HDLSignal('wb_en')
+        ack_int = module.new_HDLSignal('ack_int')  # Ack
+        if opts.bus_error:
+            err_int = module.new_HDLSignal('err_int')  # Err
+        wb_skid = module.new_HDLSignal('wb_skid')
+        if ibus.addr_size > 0:
+            wb_skid_adr = module.new_HDLSignal('wb_skid_adr', ibus.addr_size,
+                                               lo_idx=ibus.addr_low)
+        wb_skid_we = module.new_HDLSignal('wb_skid_we')
+        wb_skid_dat = module.new_HDLSignal('wb_skid_dat', root.c_word_bits)
+        wb_skid_sel = module.new_HDLSignal('wb_skid_sel', root.c_word_bits // tree.BYTE_SIZE)
+        wb_ip = module.new_HDLSignal('wb_ip')
+        wb_start = module.new_HDLSignal('wb_start')
+        module.stmts.append(
+            HDLAssign(wb_en, HDLAnd(root.h_bus['cyc'], root.h_bus['stb'])))
+        module.stmts.append(HDLAssign(ack_int, HDLOr(ibus.rd_ack, ibus.wr_ack)))
+        if opts.bus_error:
+            module.stmts.append(HDLAssign(err_int, HDLOr(ibus.rd_err, ibus.wr_err)))
+        module.stmts.append(
+            HDLAssign(wb_start,
+                      HDLAnd(HDLParen(HDLOr(HDLNot(wb_ip), ack_int)),
+                             HDLParen(HDLOr(wb_skid, wb_en)))))
+        module.stmts.append(HDLComment(None))
+
+        proc = HDLSync(root.h_bus['clk'], root.h_bus['brst'],
+                       rst_sync=gconfig.rst_sync)
+        proc.rst_stmts.append(HDLAssign(ibus.rd_req, bit_0))
+        proc.rst_stmts.append(HDLAssign(ibus.wr_req, bit_0))
+        proc.rst_stmts.append(HDLAssign(wb_skid, bit_0))
+        proc.rst_stmts.append(HDLAssign(wb_ip, bit_0))
+        proc.rst_stmts.append(HDLAssign(root.h_bus['ack'], bit_0))
+        if opts.bus_error:
+            proc.rst_stmts.append(HDLAssign(root.h_bus['err'], bit_0))
+        proc.rst_stmts.append(
+            HDLAssign(root.h_bus['dato'], HDLReplicate(bit_0, root.c_word_bits)))
+        proc.sync_stmts.append(HDLAssign(ibus.rd_req, bit_0))
+        proc.sync_stmts.append(HDLAssign(ibus.wr_req, bit_0))
+
+        # Reply
+        if opts.bus_error:
+            proc.sync_stmts.append(
+                HDLAssign(root.h_bus['ack'], HDLAnd(ack_int, HDLNot(err_int))))
+            proc.sync_stmts.append(
+                HDLAssign(root.h_bus['err'], HDLAnd(ack_int, err_int)))
+        else:
+            proc.sync_stmts.append(HDLAssign(root.h_bus['ack'], ack_int))
+        proc_if = HDLIfElse(HDLEq(ibus.rd_ack, bit_1))
+        proc_if.then_stmts.append(HDLAssign(root.h_bus['dato'], ibus.rd_dat))
+        proc_if.else_stmts = None
+        proc.sync_stmts.append(proc_if)
+        proc_if = HDLIfElse(HDLEq(ack_int, bit_1))
+        proc_if.then_stmts.append(HDLAssign(wb_ip, bit_0))
+        proc_if.else_stmts = None
+        proc.sync_stmts.append(proc_if)
+
+        # Start an access, or save the request in the skid buffer.
+        proc_start = HDLIfElse(HDLEq(wb_start, bit_1))
+        proc_start.then_stmts.append(HDLAssign(wb_ip, bit_1))
+        proc_if = HDLIfElse(HDLEq(wb_skid, bit_1))
+        if ibus.addr_size > 0:
+            adrs = [wb_skid_adr, opts.resize_addr_in(root.h_bus['adr'], ibus)]
+        else:
+            adrs = [None, None]
+        for stmts, adr, we, dat, sel in [
+                (proc_if.then_stmts, adrs[0], wb_skid_we, wb_skid_dat, wb_skid_sel),
+                (proc_if.else_stmts, adrs[1], root.h_bus['we'], root.h_bus['dati'],
+                 root.h_bus['sel'])]:
+            stmts.append(HDLAssign(ibus.rd_req, HDLNot(we)))
+            stmts.append(HDLAssign(ibus.wr_req, we))
+            if adr is not None:
+                stmts.append(HDLAssign(addr, adr))
+            stmts.append(HDLAssign(ibus.wr_dat, dat))
+            self.gen_wr_sel(root, stmts, ibus.wr_sel, sel)
+        proc_if.then_stmts.append(HDLAssign(wb_skid, bit_0))
+        proc_start.then_stmts.append(proc_if)
+
+        proc_if = HDLIfElse(HDLAnd(HDLEq(wb_en, bit_1), HDLEq(wb_skid, bit_0)))
+        if ibus.addr_size > 0:
+            proc_if.then_stmts.append(
+                HDLAssign(wb_skid_adr, opts.resize_addr_in(root.h_bus['adr'], ibus)))
+        proc_if.then_stmts.append(HDLAssign(wb_skid_we, root.h_bus['we']))
+        proc_if.then_stmts.append(HDLAssign(wb_skid_dat, root.h_bus['dati']))
+        proc_if.then_stmts.append(HDLAssign(wb_skid_sel, root.h_bus['sel']))
+        proc_if.then_stmts.append(HDLAssign(wb_skid, bit_1))
+        proc_if.else_stmts = None
+        proc_start.else_stmts.append(proc_if)
+        proc.sync_stmts.append(proc_start)
+        module.stmts.append(proc)
+        module.stmts.append(HDLComment(None))
+
+        # Stall while the skid buffer is full.
+        module.stmts.append(HDLAssign(root.h_bus['stall'], wb_skid))
+
+        # No retry
+        module.stmts.append(HDLAssign(root.h_bus['rty'], bit_0))
+
+        if not opts.bus_error:
+            # No error
+            module.stmts.append(HDLAssign(root.h_bus['err'], bit_0))
+
     def gen_wishbone_bus(self, build_port, addr_bits, lo_addr,
                          data_bits, is_master) -> Dict[str, HDLNode]:
         # FIXME: 'dat' is used both as an input and as an output.
@@ -230,7 +367,10 @@ class WBBus(BusGen):
 
         # Bus access
         module.stmts.append(HDLComment('WB decode signals'))
-        self.add_decode_wb(root, module, ibus, opts)
+        if opts.pipelined:
+            self.add_decode_wb_pipelined(root, module, ibus, opts)
+        else:
+            self.add_decode_wb(root, module, ibus, opts)
 
     def gen_bus_slave(self, root, module, prefix, n, opts):
         # Create the bus for a submap or a memory
@@ -1,11 +1,10 @@
 """Optimization pass
-   Remove unused signals
+   Remove unused signals (always done by gen_hdl).
+   With --hdl-opt, also fold constant expressions and remove empty control
+   statements (ifelse, case, Sync, Comb).
 """
 import cheby.hdltree as hdltree
 
-# TODO: currently we always keep control statements (ifelse, case, Sync, Comb)
-# Remove them if they are empty ?
-
 class Unused:
     def __init__(self):
         # Signals that are known to be used.  The initial set is input ports.
@@ -58,7 +57,7 @@ class Unused:
         if isinstance(t, (hdltree.HDLSignal, hdltree.HDLInterfaceInstance, hdltree.HDLPort)):
             return t
         elif isinstance(t, (hdltree.HDLInterfaceSelect, hdltree.HDLInterfaceIndex,
-                            hdltree.HDLSlice, hdltree.HDLIndex)):
+                            hdltree.HDLSlice, hdltree.HDLIndex, hdltree.HDLPartSelect)):
             # For index: check the index is const.
             return self.extract_target(t.prefix)
         else:
@@ -69,7 +68,7 @@ class Unused:
             return
         if isinstance(e, (hdltree.HDLSignal, hdltree.HDLPort, hdltree.HDLInterfaceInstance)):
             s.add(e)
-        elif isinstance(e, (hdltree.HDLSlice, hdltree.HDLIndex)):
+        elif isinstance(e, (hdltree.HDLSlice, hdltree.HDLIndex, hdltree.HDLPartSelect)):
             self.build_expr(s, e.prefix)
             self.build_expr(s, e.index)
         elif isinstance(e, (hdltree.HDLInterfaceSelect, hdltree.HDLInterfaceIndex)):
@@ -77,9 +76,11 @@ class Unused:
         elif isinstance(e, hdltree.HDLBinary):
             self.build_expr(s, e.left)
             self.build_expr(s, e.right)
-        elif isinstance(e, (hdltree.HDLUnary, hdltree.HDLParen, hdltree.HDLReplicate)):
+        elif isinstance(e, (hdltree.HDLUnary, hdltree.HDLParen, hdltree.HDLReplicate,
+                            hdltree.HDLToInteger)):
             self.build_expr(s, e.expr)
-        elif isinstance(e, (int, hdltree.HDLBit, hdltree.HDLUndef, hdltree.HDLConstBase)):
+        elif isinstance(e, (int, hdltree.HDLBit, hdltree.HDLUndef, hdltree.HDLConstBase,
+                            hdltree.HDLNumber, hdltree.HDLGenVar)):
             pass
         else:
             assert False, "build_expr {}".format(e)
@@ -121,6 +122,9 @@ class Unused:
         elif isinstance(t, hdltree.HDLInstance):
             for _, expr in t.conns:
                 self.build_expr(self.discovered, expr)
+        elif isinstance(t, hdltree.HDLGenFor):
+            self.build_list(t.decls)
+            self.build_list(t.stmts)
         elif isinstance(t, (hdltree.HDLComment, )):
             pass
         else:
@@ -147,7 +151,8 @@ class Unused:
             return self.is_unused(t.target)
         elif isinstance(t, (hdltree.HDLInterfaceSelect,
                             hdltree.HDLInterfaceIndex,
-                            hdltree.HDLIndex, hdltree.HDLSlice)):
+                            hdltree.HDLIndex, hdltree.HDLSlice,
+                            hdltree.HDLPartSelect)):
             return self.is_unused(t.prefix)
         elif isinstance(t, (hdltree.HDLInterfaceInstance, hdltree.HDLPort)):
             assert t not in self.unused
@@ -156,6 +161,9 @@ class Unused:
             return not (t.then_stmts or t.else_stmts)
         elif isinstance(t, hdltree.HDLSync):
             return not (t.rst_stmts or t.sync_stmts)
+        elif isinstance(t, hdltree.HDLGenFor):
+            # Also remove the statement if there are only comments.
+            return all(isinstance(s, hdltree.HDLComment) for s in t.stmts)
         elif isinstance(t, (hdltree.HDLComment,
                             hdltree.HDLComb, hdltree.HDLInstance,
                             hdltree.HDLSwitch, hdltree.HDLChoice)):
@@ -188,6 +196,8 @@ class Unused:
             self.remove_unused_list(t.sync_stmts)
         elif isinstance(t, hdltree.HDLComb):
             self.remove_unused_list(t.stmts)
+            # Also from the sensitivity list.
+            t.sensitivity = [s for s in t.sensitivity if s not in self.unused]
         elif isinstance(t, hdltree.HDLIfElse):
             self.remove_unused_list(t.then_stmts)
             self.remove_unused_list(t.else_stmts)
@@ -195,6 +205,9 @@ class Unused:
             self.remove_unused_list(t.choices)
         elif isinstance(t, hdltree.HDLChoice):
             self.remove_unused_list(t.stmts)
+        elif isinstance(t, hdltree.HDLGenFor):
+            self.remove_unused_list(t.decls)
+            self.remove_unused_list(t.stmts)
         elif isinstance(t, (hdltree.HDLSignal, hdltree.HDLComment,
                             hdltree.HDLInstance, hdltree.HDLAssign)):
             # No recursion
@@ -219,3 +232,269 @@ def remove_unused(t):
     #    print("unused: {}".format(s.name))
     # Remove unused signals (declaration and use)
     u.remove_unused(t)
+
+
+def is_bit(e, val=None):
+    "Return True if :param e: is a constant bit (of value :param val: if not None)"
+    if isinstance(e, hdltree.HDLBit) \
+       or (isinstance(e, hdltree.HDLConstBase) and e.size is None):
+        return val is None or e.val == val
+    return False
+
+
+def is_vector_const(e):
+    return isinstance(e, hdltree.HDLConstBase) and e.size is not None
+
+
+class Simplify:
+    """Fold constant expressions and remove empty control statements."""
+    def __init__(self):
+        # Number of folded expressions
+        self.folded = 0
+        # Number of nodes created (by the inversion of conditions)
+        self.created = 0
+
+    def fold_not(self, e, x):
+        """Fold :param e: (an HDLNot) whose operand has been folded to
+           :param x:."""
+        if is_bit(x):
+            self.folded += 1
+            return hdltree.bit_0 if x.val else hdltree.bit_1
+        elif is_vector_const(x):
+            self.folded += 1
+            return type(x)(~x.val & ((1 << x.size) - 1), x.size)
+        elif isinstance(x, hdltree.HDLNot):
+            self.folded += 1
+            return x.expr
+        e.expr = x
+        return e
+
+    def fold_and_or(self, e, left, right):
+        """Fold :param e: (an HDLAnd or an HDLOr) whose operands have been
+           folded to :param left: and :param right:."""
+        # Neutral and absorbing bits.
+        absorb, neutral = (0, 1) if isinstance(e, hdltree.HDLAnd) else (1, 0)
+        for a, b in [(left, right), (right, left)]:
+            if is_bit(a, absorb):
+                self.folded += 1
+                return a
+            if is_bit(a, neutral):
+                self.folded += 1
+                return b
+        if is_vector_const(left) and is_vector_const(right) \
+           and left.size == right.size:
+            self.folded += 1
+            if isinstance(e, hdltree.HDLAnd):
+                val = left.val & right.val
+            else:
+                val = left.val | right.val
+            return type(left)(val, left.size)
+        e.left = left
+        e.right = right
+        return e
+
+    def fold_expr(self, e):
+        """Return :param e: with its constant sub-expressions folded.
+           Only operators on bits and on vector constants of the same size
+           are folded, so that the type of the expression is not changed."""
+        if isinstance(e, hdltree.HDLParen):
+            x = self.fold_expr(e.expr)
+            if isinstance(x, (hdltree.HDLCst, hdltree.HDLObject)):
+                self.folded += 1
+                return x
+            e.expr = x
+            return e
+        elif isinstance(e, hdltree.HDLNot):
+            return self.fold_not(e, self.fold_expr(e.expr))
+        elif isinstance(e, (hdltree.HDLAnd, hdltree.HDLOr)):
+            return self.fold_and_or(e, self.fold_expr(e.left), self.fold_expr(e.right))
+        elif isinstance(e, hdltree.HDLBinary):
+            e.left = self.fold_expr(e.left)
+            e.right = self.fold_expr(e.right)
+            return e
+        elif isinstance(e, (hdltree.HDLUnary, hdltree.HDLReplicate, hdltree.HDLExtBase)):
+            e.expr = self.fold_expr(e.expr)
+            return e
+        else:
+            return e
+
+    def fold_cond(self, e):
+        """Fold the condition :param e:.  Return an HDLBool if the condition
+           is constant."""
+        if isinstance(e, hdltree.HDLParen):
+            x = self.fold_cond(e.expr)
+            if isinstance(x, hdltree.HDLBool):
+                return x
+            e.expr = x
+            return e
+        elif isinstance(e, hdltree.HDLEq):
+            left = self.fold_expr(e.left)
+            right = self.fold_expr(e.right)
+            if (is_bit(left) and is_bit(right)) \
+               or (is_vector_const(left) and is_vector_const(right)
+                   and left.size == right.size):
+                self.folded += 1
+                return hdltree.HDLBool(left.val == right.val)
+            e.left = left
+            e.right = right
+            return e
+        elif isinstance(e, hdltree.HDLNot):
+            x = self.fold_cond(e.expr)
+            if isinstance(x, hdltree.HDLBool):
+                self.folded += 1
+                return hdltree.HDLBool(not x.val)
+            return self.fold_not(e, x)
+        elif isinstance(e, (hdltree.HDLAnd, hdltree.HDLOr)):
+            left = self.fold_cond(e.left)
+            right = self.fold_cond(e.right)
+            absorb = isinstance(e, hdltree.HDLOr)
+            for a, b in [(left, right), (right, left)]:
+                if isinstance(a, hdltree.HDLBool):
+                    self.folded += 1
+                    return a if a.val == absorb else b
+            return self.fold_and_or(e, left, right)
+        else:
+            x = self.fold_expr(e)
+            if is_bit(x):
+                # A condition on a std_logic (verilog style).
+                self.folded += 1
+                return hdltree.HDLBool(x.val == 1)
+            return x
+
+    def simplify_list(self, stmts):
+        """Return the simplified list of statements :param stmts:"""
+        if stmts is None:
+            return None
+        res = []
+        for s in stmts:
+            res.extend(self.simplify(s))
+        return res
+
+    def simplify(self, s):
+        """Return the list of statements that replaces :param s:"""
+        if isinstance(s, hdltree.HDLAssign):
+            s.expr = self.fold_expr(s.expr)
+            return [s]
+        elif isinstance(s, hdltree.HDLIfElse):
+            s.cond = self.fold_cond(s.cond)
+            s.then_stmts = self.simplify_list(s.then_stmts)
+            s.else_stmts = self.simplify_list(s.else_stmts)
+            if isinstance(s.cond, hdltree.HDLBool):
+                return s.then_stmts if s.cond.val else (s.else_stmts or [])
+            if not s.else_stmts:
+                s.else_stmts = None
+                if not s.then_stmts:
+                    return []
+            elif not s.then_stmts:
+                if isinstance(s.cond, hdltree.HDLNot):
+                    s.cond = s.cond.expr
+                else:
+                    s.cond = hdltree.HDLNot(s.cond)
+                    self.created += 1
+                s.then_stmts = s.else_stmts
+                s.else_stmts = None
+            return [s]
+        elif isinstance(s, hdltree.HDLSwitch):
+            s.expr = self.fold_expr(s.expr)
+            for c in s.choices:
+                c.stmts = self.simplify_list(c.stmts)
+            # Empty choices can be removed if the default choice is empty.
+            if any(isinstance(c, hdltree.HDLChoiceDefault) and not c.stmts
+                   for c in s.choices):
+                s.choices = [c for c in s.choices
+                             if c.stmts or isinstance(c, hdltree.HDLChoiceDefault)]
+            if len(s.choices) == 1 and isinstance(s.choices[0], hdltree.HDLChoiceDefault):
+                return s.choices[0].stmts
+            return [s]
+        elif isinstance(s, hdltree.HDLComb):
+            s.stmts = self.simplify_list(s.stmts)
+            return [s] if s.stmts else []
+        elif isinstance(s, hdltree.HDLSync):
+            s.rst_stmts = self.simplify_list(s.rst_stmts)
+            s.sync_stmts = self.simplify_list(s.sync_stmts)
+            return [s] if s.rst_stmts or s.sync_stmts else []
+        elif isinstance(s, hdltree.HDLGenFor):
+            s.stmts = self.simplify_list(s.stmts)
+            if all(isinstance(x, hdltree.HDLComment) for x in s.stmts):
+                return []
+            return [s]
+        elif isinstance(s, hdltree.HDLInstance):
+            s.conns = [(name, self.fold_expr(e)) for name, e in s.conns]
+            return [s]
+        else:
+            return [s]
+
+
+def count_nodes(t):
+    "Return the number of nodes (statements, declarations and expressions) of :param t:"
+    if t is None:
+        return 0
+    elif isinstance(t, list):
+        return sum(count_nodes(e) for e in t)
+    elif isinstance(t, hdltree.HDLModule):
+        return 1 + count_nodes(t.decls) + count_nodes(t.stmts)
+    elif isinstance(t, hdltree.HDLAssign):
+        return 1 + count_nodes(t.target) + count_nodes(t.expr)
+    elif isinstance(t, hdltree.HDLIfElse):
+        return 1 + count_nodes(t.cond) + count_nodes(t.then_stmts) + count_nodes(t.else_stmts)
+    elif isinstance(t, hdltree.HDLSwitch):
+        return 1 + count_nodes(t.expr) + count_nodes(t.choices)
+    elif isinstance(t, hdltree.HDLChoiceExpr):
+        return 1 + count_nodes(t.expr) + count_nodes(t.stmts)
+    elif isinstance(t, hdltree.HDLChoiceDefault):
+        return 1 + count_nodes(t.stmts)
+    elif isinstance(t, hdltree.HDLComb):
+        return 1 + count_nodes(t.stmts)
+    elif isinstance(t, hdltree.HDLSync):
+        return 1 + count_nodes(t.rst_stmts) + count_nodes(t.sync_stmts)
+    elif isinstance(t, hdltree.HDLGenFor):
+        return 1 + count_nodes(t.decls) + count_nodes(t.stmts)
+    elif isinstance(t, hdltree.HDLInstance):
+        return 1 + sum(count_nodes(e) for _, e in t.conns)
+    elif isinstance(t, hdltree.HDLBinary):
+        return 1 + count_nodes(t.left) + count_nodes(t.right)
+    elif isinstance(t, (hdltree.HDLUnary, hdltree.HDLParen, hdltree.HDLReplicate,
+                        hdltree.HDLExtBase, hdltree.HDLToInteger)):
+        return 1 + count_nodes(t.expr)
+    elif isinstance(t, (hdltree.HDLSlice, hdltree.HDLIndex, hdltree.HDLPartSelect)):
+        return 1 + count_nodes(t.prefix)
+    else:
+        return 1
+
+
+def count_signals(module):
+    return sum(1 for d in module.decls if isinstance(d, hdltree.HDLSignal))
+
+
+class OptStats:
+    """Statistics of optimize"""
+    def __init__(self):
+        self.nodes = 0      # Number of nodes removed
+        self.signals = 0    # Number of signals removed
+        self.folded = 0     # Number of folded expressions
+
+    def __str__(self):
+        return "removed {} nodes ({} signals), folded {} expressions".format(
+            self.nodes, self.signals, self.folded)
+
+
+def optimize(module):
+    """Optimize :param module: (fold constants, remove empty statements and
+       unused signals) until nothing can be removed.  Return the statistics."""
+    stats = OptStats()
+    simplify = Simplify()
+    nbr_nodes = count_nodes(module)
+    nbr_signals = count_signals(module)
+    while True:
+        module.stmts = simplify.simplify_list(module.stmts)
+        # Folding may have removed the last use of a signal.
+        remove_unused(module)
+        # The nodes created by the inversion of conditions are not counted,
+        # so that only the removed nodes are.
+        n = count_nodes(module) - simplify.created
+        if n == nbr_nodes - stats.nodes:
+            break
+        stats.nodes = nbr_nodes - n
+    stats.signals = nbr_signals - count_signals(module)
+    stats.folded = simplify.folded
+    return stats
@@ -189,6 +189,18 @@ class HDLGenIf(HDLStmt):
         self.stmts = []
 
 
+class HDLGenFor(HDLStmt):
+    """Replicate :field stmts: (and the signals of :field decls:, local to
+       each instance) :param count: times.  The index is :field var:."""
+    def __init__(self, name, var, count):
+        super(HDLGenFor, self).__init__()
+        self.name = name
+        self.var = HDLGenVar(var)
+        self.count = count
+        self.decls = []
+        self.stmts = []
+
+
 class HDLAssign(HDLStmt):
     def __init__(self, target, expr):
         super(HDLAssign, self).__init__()
@@ -324,6 +336,21 @@ class HDLExternalName(HDLExpr):
         self.name = name
 
 
+class HDLGenVar(HDLExpr):
+    "The index of a for generate statement"
+    def __init__(self, name):
+        super(HDLGenVar, self).__init__()
+        self.name = name
+
+
+class HDLToInteger(HDLExpr):
+    "Unsigned value of vector :param expr:, to be used as an index"
+    def __init__(self, expr):
+        super(HDLToInteger, self).__init__()
+        assert expr is not None
+        self.expr = expr
+
+
 class HDLIndex(HDLExpr):
     def __init__(self, prefix, index):
         super(HDLIndex, self).__init__()
@@ -343,6 +370,22 @@ class HDLSlice(HDLExpr):
         self.size = size
 
 
+class HDLPartSelect(HDLExpr):
+    """Select :param size: bits (a single bit if None) of :param prefix: from
+       bit :param index: * :param width: + :param offset:.
+       :param index: is an expression (a generate index or a decoded address),
+       so this is the element :param index: of an array flattened in a vector."""
+    def __init__(self, prefix, index, width, offset=0, size=None):
+        super(HDLPartSelect, self).__init__()
+        assert prefix is not None
+        assert index is not None
+        self.prefix = prefix
+        self.index = index
+        self.width = width
+        self.offset = offset
+        self.size = size
+
+
 def Slice_or_Index(prefix, index, size):
     if size == 1:
         return HDLIndex(prefix, index)
@@ -436,3 +479,8 @@ class HDLMul(HDLBinary):
 
 class HDLSub(HDLBinary):
     pass
+
+
+class HDLAdd(HDLBinary):
+    "Unsigned addition of a vector and a number"
+    pass
@@ -2,7 +2,8 @@ from cheby.hdltree import (HDLCst, HDLComb,
                            HDLSignal, HDLPort, HDLInterfaceSelect,
                            HDLBinary, HDLUnary,
                            HDLCst, HDLReplicate, HDLSlice, HDLIndex,
-                           HDLAssign, HDLSwitch, HDLComment)
+                           HDLPartSelect, HDLToInteger, HDLGenVar,
+                           HDLAssign, HDLSwitch, HDLIfElse, HDLComment)
 
 def compute_sensitivity(comb):
     res = []
@@ -30,6 +31,16 @@ def compute_sensitivity(comb):
         elif isinstance(expr, (HDLSlice, HDLIndex)):
             if not is_target:
                 extract_expr(expr.prefix)
+        elif isinstance(expr, HDLPartSelect):
+            if not is_target:
+                extract_expr(expr.prefix)
+            # The index is read even for a target.
+            extract_expr(expr.index)
+        elif isinstance(expr, HDLToInteger):
+            assert not is_target
+            extract_expr(expr.expr)
+        elif isinstance(expr, HDLGenVar):
+            pass
         else:
             assert False, "cannot handle expression {}".format(expr)
 
@@ -43,6 +54,10 @@ def compute_sensitivity(comb):
                 for ch in s.choices:
                     # Choice is static.
                     extract_stmt_list(ch.stmts)
+            elif isinstance(s, HDLIfElse):
+                extract_expr(s.cond)
+                extract_stmt_list(s.then_stmts)
+                extract_stmt_list(s.else_stmts or [])
             elif isinstance(s, HDLComment):
                 pass
             else:
@@ -8,6 +8,7 @@
 """
 
 import sys
+import io
 import os.path
 import cheby.tree as tree
 import cheby.parser
@@ -17,6 +18,19 @@ import cheby.parser
 # Apply to the whole design.
 word_endianness = 'default'
 
+# Persistent cache of laid-out trees (a cheby.treecache.TreeCache), or None.
+tree_cache = None
+
+# In-process memo of laid-out submaps.
+# Key is (filename, mtime, word_endianness), value is the laid-out tree
+# which is never modified: users get a copy of it.
+submap_memo = {}
+
+# Submaps loaded in advance by preload_submaps.  Same key as submap_memo,
+# value is (tree, laid, messages): tree is laid-out if laid is True, and
+# messages are the diagnostics written while loading it.
+submap_preload = {}
+
 def ilog2(val):
     "Return n such as 2**n >= val and 2**(n-1) < val"
     assert val > 0
@@ -355,10 +369,202 @@ def compute_submap_absolute_filename(sm):
     return filename
 
 
+
+def submap_dependencies(n, res):
+    """Append to :param res: the filenames of the submaps loaded by
+       :param n: (recursively)."""
+    if isinstance(n, tree.Submap):
+        if n.filename is not None:
+            res.append(compute_submap_absolute_filename(n))
+            submap_dependencies(n.c_submap, res)
+    elif isinstance(n, tree.CompositeNode):
+        for c in n.children:
+            submap_dependencies(c, res)
+
+
+def set_submap_filenames(n):
+    """Set the filename of the trees loaded by the submaps of :param n:,
+       as they are relative to the filename of the root."""
+    if isinstance(n, tree.Submap):
+        if n.filename is not None:
+            n.c_submap.c_filename = compute_submap_absolute_filename(n)
+            set_submap_filenames(n.c_submap)
+    elif isinstance(n, tree.CompositeNode):
+        for c in n.children:
+            set_submap_filenames(c)
+
+
+def NamedNode_copy(n, new_parent):
+    # Shallow copy.  Much faster than copy.copy (which goes through
+    # __reduce_ex__), as repeats may be unrolled to many nodes.
+    res = n.__class__.__new__(n.__class__)
+    tree.copy_slots(n, res)
+    # Do not allocate an empty instance dictionary.
+    d = n.__dict__
+    if d:
+        res.__dict__.update(d)
+    res._parent = new_parent
+    return res
+
+
+def Reg_copy(n, new_parent):
+    res = NamedNode_copy(n, new_parent)
+    res.children = [tree_copy(f, res) for f in n.children]
+    build_sorted_fields(res)
+    return res
+
+
+def CompositeNode_copy(n, new_parent):
+    res = NamedNode_copy(n, new_parent)
+    res.children = [tree_copy(f, res) for f in n.children]
+    if hasattr(n, 'c_sorted_children'):
+        build_sorted_children(res)
+    return res
+
+
+def Submap_copy(n, new_parent):
+    res = CompositeNode_copy(n, new_parent)
+    if n.c_submap is not None:
+        res.c_submap = tree_copy(n.c_submap, res)
+    return res
+
+
+def tree_copy(n, new_parent):
+    if isinstance(n, tree.Reg):
+        return Reg_copy(n, new_parent)
+    elif isinstance(n, tree.Submap):
+        return Submap_copy(n, new_parent)
+    elif isinstance(n, tree.CompositeNode):
+        return CompositeNode_copy(n, new_parent)
+    elif isinstance(n, tree.FieldBase):
+        return NamedNode_copy(n, new_parent)
+    else:
+        raise AssertionError(n)
+
+
+def parse_and_layout(filename, layout_func, jobs=1):
+    """Parse :param filename: and lay it out with :param layout_func:.
+       Use the tree cache if enabled.  If :param jobs: is greater than 1,
+       the submaps are loaded in parallel by that many processes."""
+    kind = layout_func.__name__
+    if tree_cache is not None:
+        res = tree_cache.load(filename, kind)
+        if res is not None:
+            return res
+    res = cheby.parser.parse_yaml(filename)
+    if jobs > 1:
+        preload_submaps(res, jobs)
+    try:
+        layout_func(res)
+    finally:
+        submap_preload.clear()
+    if tree_cache is not None:
+        tree_cache.store(filename, kind, res)
+    return res
+
+
+def submap_key(filename):
+    "Key of :param filename: for submap_memo"
+    try:
+        mtime = os.stat(filename).st_mtime_ns
+    except OSError:
+        mtime = None
+    return (os.path.abspath(filename), mtime, word_endianness)
+
+
 def load_submap(blk):
-    sys.stderr.write('Loading {}...\n'.format(blk.filename))
+    """Load and layout the submap of :param blk:.  A file is loaded only
+       once, and each instance gets a copy of it."""
     filename = compute_submap_absolute_filename(blk)
-    return cheby.parser.parse_yaml(filename)
+    key = submap_key(filename)
+    res = submap_memo.get(key)
+    if res is None:
+        sys.stderr.write('Loading {}...\n'.format(blk.filename))
+        pre = submap_preload.pop(key, None)
+        if pre is None:
+            res = parse_and_layout(filename, layout_cheby_memmap)
+        else:
+            res, laid, messages = pre
+            sys.stderr.write(messages)
+            if not laid:
+                layout_cheby_memmap(res)
+                if tree_cache is not None:
+                    tree_cache.store(filename, 'layout_cheby_memmap', res)
+        submap_memo[key] = res
+    return tree_copy(res, None)
+
+
+def submap_filenames(n, res):
+    "Append to :param res: the absolute filename of the submaps of :param n:"
+    if isinstance(n, tree.Submap):
+        if n.filename is not None:
+            res.append(compute_submap_absolute_filename(n))
+    elif isinstance(n, tree.CompositeNode):
+        for c in n.children:
+            submap_filenames(c, res)
+
+
+def preload_file(filename, endianness):
+    """Worker of preload_submaps: parse :param filename:, and lay it out if it
+       has no submaps.  Return (tree, laid, messages, submaps), or None in case
+       of error (the error is reported when the file is loaded again by the
+       normal path)."""
+    global word_endianness
+    word_endianness = endianness
+    stderr = sys.stderr
+    sys.stderr = io.StringIO()
+    try:
+        res = cheby.parser.parse_yaml(filename)
+        submaps = []
+        submap_filenames(res, submaps)
+        laid = not submaps
+        if laid:
+            layout_cheby_memmap(res)
+        return (res, laid, sys.stderr.getvalue(), submaps)
+    except Exception:
+        return None
+    finally:
+        sys.stderr = stderr
+
+
+def preload_submaps(root, jobs):
+    """Load in parallel (using :param jobs: processes) all the files included
+       (directly or not) by :param root:.  The results are put in
+       submap_preload and are used by load_submap during the layout."""
+    # Not imported at the top, as it is slow to import and rarely used.
+    import concurrent.futures
+    with concurrent.futures.ProcessPoolExecutor(jobs) as executor:
+        pending = {}
+        seen = set()
+
+        def submit(filename):
+            key = submap_key(filename)
+            if key in seen or key in submap_memo:
+                return
+            seen.add(key)
+            if tree_cache is not None:
+                res = tree_cache.load(filename, 'layout_cheby_memmap')
+                if res is not None:
+                    submap_preload[key] = (res, True, '')
+                    return
+            pending[executor.submit(preload_file, filename, word_endianness)] = key
+
+        submaps = []
+        submap_filenames(root, submaps)
+        for f in submaps:
+            submit(f)
+        while pending:
+            done, _ = concurrent.futures.wait(
+                pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            for fut in done:
+                key = pending.pop(fut)
+                res = fut.result()
+                if res is None:
+                    continue
+                t, laid, messages, submaps = res
+                submap_preload[key] = (t, laid, messages)
+                for f in submaps:
+                    submit(f)
 
 
 def align_block(n):
@@ -395,7 +601,6 @@ def layout_submap(lo, n):
             raise LayoutException(
                 n, "size given for submap '{}'".format(n.get_path()))
         submap = load_submap(n)
-        layout_cheby_memmap(submap)
         n.c_submap = submap
         n.c_size = n.c_submap.c_size
         n.c_align = n.c_submap.c_align
@@ -537,13 +742,13 @@ def build_sorted_fields(n):
 def layout_composite_children(lo, n):
     layout_check_name(n)
 
-    # Check each child has a unique name.
-    names = set()
-    for c in n.children:
-        if c.name in names:
-            raise LayoutException(
-                c, "child {} reuse name '{}'".format(c.get_path(), c.name))
-        names.add(c.name)
+    # Check each child has a unique name.  The index keeps the first child
+    # of a name.
+    if len(tree.children_index(n)) != len(n.children):
+        for c in n.children:
+            if n.get_child(c.name) is not c:
+                raise LayoutException(
+                    c, "child {} reuse name '{}'".format(c.get_path(), c.name))
 
     # Compute size and alignment of children.
     lo1 = lo.duplicate()
@@ -687,7 +892,7 @@ def layout_bus(root, name):
         else:
             raise LayoutException(
                 root, "unknown bus size '{}'".format(root.bus))
-    elif name == 'axi4-lite-32':
+    elif name == 'axi4-lite-32' or name == 'axi4-32':
         root.c_word_size = 4
         root.c_word_endian = 'little'
     elif name == 'apb-32' or name == 'simple-32' or name == 'avalon-lite-32':
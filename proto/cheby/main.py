@@ -3,37 +3,111 @@ import sys
 import os.path
 import time
 import argparse
+import io
+from contextlib import contextmanager
+import importlib
 import cheby.parser
-import cheby.print_pretty as pprint
-import cheby.sprint as sprint
-import cheby.gen_c as gen_c
-import cheby.gen_laychk as gen_laychk
 import cheby.layout as layout
-import cheby.gen_hdl as gen_hdl
-import cheby.print_vhdl as print_vhdl
-import cheby.print_verilog as print_verilog
-import cheby.gen_edge as gen_edge
-import cheby.gen_edge3 as gen_edge3
-import cheby.gen_silecs as gen_silecs
-import cheby.gen_custom as gen_custom
 import cheby.expand_hdl as expand_hdl
 import cheby.gen_name as gen_name
-import cheby.gen_gena_memmap as gen_gena_memmap
-import cheby.gen_gena_regctrl as gen_gena_regctrl
-import cheby.gen_gena_dsp as gen_gena_dsp
-import cheby.gen_wbgen_hdl as gen_wbgen_hdl
-import cheby.print_html as print_html
-import cheby.print_markdown as print_markdown
-import cheby.print_rest as print_rest
-import cheby.print_latex as print_latex
-import cheby.print_consts as print_consts
-import cheby.gen_devicetree as gen_devicetree
-import cheby.gen_device_script as gen_device_script
-import cheby.gen_header as gen_header
 import cheby.hdl.globals
+import cheby.yamlread
+from cheby.hdl.globals import gconfig_scope
 
 
-def decode_args():
+class LazyModule(object):
+    """A module imported on its first use."""
+
+    def __init__(self, name):
+        object.__setattr__(self, '_name', name)
+        object.__setattr__(self, '_module', None)
+
+    def _load(self):
+        if self._module is None:
+            object.__setattr__(self, '_module', importlib.import_module(self._name))
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr, val):
+        setattr(self._load(), attr, val)
+
+
+# Registry of the back-ends.  Most of them are not needed by a run, so
+# they are imported only when used to reduce the start-up time.
+BACKENDS = {}
+
+
+def backend(name):
+    "Return the (lazily imported) back-end module :param name:"
+    res = BACKENDS.get(name)
+    if res is None:
+        res = LazyModule(name)
+        BACKENDS[name] = res
+    return res
+
+
+pprint = backend('cheby.print_pretty')
+sprint = backend('cheby.sprint')
+gen_c = backend('cheby.gen_c')
+gen_laychk = backend('cheby.gen_laychk')
+gen_hdl = backend('cheby.gen_hdl')
+hdlopt = backend('cheby.hdlopt')
+print_vhdl = backend('cheby.print_vhdl')
+print_verilog = backend('cheby.print_verilog')
+gen_edge = backend('cheby.gen_edge')
+gen_edge3 = backend('cheby.gen_edge3')
+gen_silecs = backend('cheby.gen_silecs')
+gen_custom = backend('cheby.gen_custom')
+gen_gena_memmap = backend('cheby.gen_gena_memmap')
+gen_gena_regctrl = backend('cheby.gen_gena_regctrl')
+gen_gena_dsp = backend('cheby.gen_gena_dsp')
+gen_wbgen_hdl = backend('cheby.gen_wbgen_hdl')
+print_html = backend('cheby.print_html')
+print_markdown = backend('cheby.print_markdown')
+print_rest = backend('cheby.print_rest')
+print_latex = backend('cheby.print_latex')
+print_consts = backend('cheby.print_consts')
+gen_devicetree = backend('cheby.gen_devicetree')
+gen_device_script = backend('cheby.gen_device_script')
+gen_header = backend('cheby.gen_header')
+treecache = backend('cheby.treecache')
+compiled = backend('cheby.compiled')
+addrindex = backend('cheby.addrindex')
+
+# Destinations of the options that generate an output file.
+OUTPUT_ACTIONS = [
+    'print_pretty', 'print_simple', 'print_simple_expanded',
+    'print_pretty_expanded', 'print_memmap', 'print_memmap_verbose',
+    'gen_c', 'gen_c_check_layout', 'gen_hdl', 'gen_consts',
+    'gen_edge', 'gen_edge3', 'gen_silecs', 'gen_devicetree',
+    'gen_install_script', 'gen_custom',
+    'gen_gena_memmap', 'gen_gena_regctrl',
+    'gen_gena_dsp_map', 'gen_gena_dsp_h', 'gen_gena_dsp_c',
+    'gen_wbgen_hdl', 'gen_doc', 'doc_copy_template', 'save_compiled']
+
+# Outputs that need the expanded (unrolled) tree.
+EXPANDED_ACTIONS = [
+    'print_simple_expanded', 'print_pretty_expanded', 'gen_hdl',
+    'gen_consts', 'gen_silecs', 'gen_gena_regctrl',
+    'gen_gena_dsp_map', 'gen_gena_dsp_h', 'gen_gena_dsp_c', 'gen_gena_dsp',
+    'gen_wbgen_hdl', 'gen_doc', 'doc_copy_template']
+
+# Options that apply to the whole input and thus cannot be set per output.
+GLOBAL_OPTIONS = ['input', 'outputs', 'word-endian', 'cache-dir', 'cache-max-size', 'jobs',
+                  'depfile', 'only-if-changed', 'example', 'version']
+
+
+def compiled_filename(name):
+    "Check the filename of --save-compiled"
+    if name == '-':
+        # The compiled file is binary.
+        raise argparse.ArgumentTypeError('cannot write a compiled file to stdout')
+    return name
+
+
+def build_argparser():
     aparser = argparse.ArgumentParser(description='cheby utility',
                                       prog='cheby')
     aparser.add_argument('--version', action='version',
@@ -67,6 +141,9 @@ def decode_args():
                          help='select language for hdl generation')
     aparser.add_argument('--gen-hdl', nargs='?', const='-',
                          help='generate hdl file')
+    aparser.add_argument('--hdl-opt', action='store_true',
+                         help='optimize the generated hdl (fold constants, remove empty '
+                              'statements) and report the number of removed nodes')
     aparser.add_argument('--hdl-preload', action='store_true',
                          help='preload registers with their preset value if it exists '
                               '(if this flag is not supplied, the preset value is only written to the registers '
@@ -152,12 +229,29 @@ def decode_args():
                          help='Ordered set of characters to be used for ReST heading levels')
     aparser.add_argument('--input', '-i',
                          help='input file')
+    aparser.add_argument('--cache-dir',
+                         help='directory of the persistent cache of laid-out files')
+    aparser.add_argument('--cache-max-size', type=int, default=256,
+                         help='maximum size of the cache in MiB (default: 256)')
+    aparser.add_argument('--jobs', '-j', type=int, default=1,
+                         help='number of processes used to load the submaps (default: 1)')
+    aparser.add_argument('--save-compiled', type=compiled_filename,
+                         help='save the laid-out memory map (to be used as an input)')
+    aparser.add_argument('--depfile',
+                         help='write the dependencies of the outputs (in make format)')
+    aparser.add_argument('--only-if-changed', action='store_true',
+                         help='do not rewrite outputs whose content is unchanged')
+    aparser.add_argument('--outputs',
+                         help='YAML manifest of outputs to generate from a single run')
     aparser.add_argument('--ff-reset', choices=['sync', 'async'], default='sync',
                          help='select synchronous or asynchronous reset for flip-flops')
     aparser.add_argument('--word-endian', choices=['default', 'big', 'little'], default='default',
                          help='override the word-endianness in memmory maps')
     aparser.add_argument('--address-space',
-                         help='specify address space for --gen-hdl')
+                         help='specify address space for --gen-hdl and --decode-address')
+    aparser.add_argument('--decode-address', action='append', metavar='ADDR',
+                         help='print the element at address ADDR, or at each address '
+                              'of file @FILE (@- for stdin).  Can be repeated')
     aparser.add_argument('--out-prefix', default='',
                          help='specify path prefix for automatic output files')
 
@@ -167,14 +261,65 @@ def decode_args():
     aparser.add_argument('--axil-lib-name',
                          default = cheby.hdl.globals.libname,
                         help = 'Specify name of VHDL library where AXI_pkg is compiled')
-    args = aparser.parse_args()
+    return aparser
+
+
+def set_gconfig(args):
+    """Set the global HDL configuration from :param args:"""
     cheby.hdl.globals.gconfig.hdl_lang = args.hdl
     cheby.hdl.globals.gconfig.rst_sync = (args.ff_reset != 'async')
     cheby.hdl.globals.gconfig.preload_reg_preset = args.hdl_preload
+
+
+def decode_args(argv=None):
+    aparser = build_argparser()
+    args = aparser.parse_args(argv)
+    set_gconfig(args)
     layout.word_endianness = args.word_endian
 
     return args
 
+
+def load_outputs(args, filename):
+    """Read the outputs manifest :param filename:.  Return a list of
+       arguments (one per output entry).  Each entry is decoded like the
+       command line, and inherits the options (but not the actions) of
+       :param args:"""
+    try:
+        el = cheby.yamlread.load(open(filename))
+    except IOError as e:
+        raise cheby.parser.ParseException(str(e))
+    except cheby.yamlread.ScanException as e:
+        raise cheby.parser.ParseException(str(e))
+    if not isinstance(el, dict) or 'outputs' not in el:
+        cheby.parser.error("missing 'outputs' root node")
+    if not isinstance(el['outputs'], list):
+        cheby.parser.error("'outputs' must be a list")
+    aparser = build_argparser()
+    res = []
+    for i, entry in enumerate(el['outputs']):
+        if not isinstance(entry, dict):
+            cheby.parser.error("outputs entry {} must be a dictionary".format(i))
+        argv = []
+        for k, v in entry.items():
+            if k in GLOBAL_OPTIONS:
+                cheby.parser.error(
+                    "option '{}' not allowed in outputs entry {}".format(k, i))
+            if v is False:
+                continue
+            elif v is None or v is True:
+                argv.append('--' + k)
+            else:
+                argv.append('--{}={}'.format(k, v))
+        # Start from the command line options, without the actions.
+        ns = argparse.Namespace(**vars(args))
+        for act in OUTPUT_ACTIONS:
+            setattr(ns, act, None)
+        ns.gen_gena_dsp = False
+        ns.decode_address = None
+        res.append(aparser.parse_args(argv, namespace=ns))
+    return res
+
 def print_hdl(out, lang, h):
     if lang == 'vhdl':
         print_vhdl.print_vhdl(out, h)
@@ -186,7 +331,11 @@ def print_hdl(out, lang, h):
 
 class open_filename(object):
     """Handle '-' as stdout, but wrap the file in a class so that it is not
-     closed at the exit of the 'with' statement."""
+     closed at the exit of the 'with' statement.
+     If only_if_changed is set, the file is not written if its content
+     is unchanged (so that its modification time is preserved)."""
+
+    only_if_changed = False
 
     def __init__(self, name):
         self.name = name
@@ -195,22 +344,111 @@ class open_filename(object):
     def __enter__(self):
         if self.name == '-':
             self.fh = sys.stdout
+        elif self.only_if_changed:
+            self.fh = io.StringIO()
         else:
             self.fh = open(self.name, 'w')
         return self.fh
 
     def __exit__(self, etype, value, traceback):
-        if self.name != '-':
+        if self.name == '-':
+            return
+        if self.only_if_changed:
+            if etype is not None:
+                return
+            content = self.fh.getvalue()
+            try:
+                with open(self.name) as f:
+                    if f.read() == content:
+                        return
+            except (IOError, UnicodeDecodeError):
+                pass
+            with open(self.name, 'w') as f:
+                f.write(content)
+        else:
             self.fh.close()
 
     def __getattr__(self, val):
         return getattr(self.fh, val)  # pass on
 
-def handle_file(args, filename):
-    t = cheby.parser.parse_yaml(filename)
 
-    layout.layout_cheby(t)
+def output_filenames(args):
+    "Return the list of files written by the output options of :param args:"
+    res = []
+    for act in OUTPUT_ACTIONS:
+        v = getattr(args, act)
+        if isinstance(v, str) and v not in ('-', '+units'):
+            res.append(v)
+    return res
+
+
+def check_units(all_args):
+    """Exit with an error if the per-unit HDL output is used with --depfile
+       or --only-if-changed, as the names of the units are not known before
+       the generation."""
+    args = all_args[0]
+    if args.depfile is None and not args.only_if_changed:
+        return
+    if any(a.gen_hdl == '+units' for a in all_args):
+        sys.stderr.write('error: --gen-hdl=+units cannot be used with '
+                         '--depfile or --only-if-changed\n')
+        sys.exit(2)
+
+
+def depfile_escape(filename):
+    "Escape :param filename: for a make rule"
+    return filename.replace(' ', '\\ ').replace('#', '\\#').replace('$', '$$')
+
 
+def write_depfile(f, targets, deps):
+    "Write a make rule for :param targets: with prerequisites :param deps:"
+    f.write('{}:'.format(' '.join(depfile_escape(t) for t in targets)))
+    for d in deps:
+        f.write(' \\\n  {}'.format(depfile_escape(d)))
+    f.write('\n')
+
+
+@contextmanager
+def output_scope(args):
+    """Set the global configuration for the generation of the outputs of
+     :param args:, and restore it on exit."""
+    with gconfig_scope():
+        set_gconfig(args)
+        yield args
+
+
+def select_address_space(args, t):
+    "Return the address space of :param t: selected by --address-space"
+    if not t.c_address_spaces_map:
+        if not (args.address_space is None):
+            sys.stderr.write('error: --address-space not allowed (no address space)\n')
+            sys.exit(2)
+        return t
+    if args.address_space is None:
+        sys.stderr.write('error: --address-space required\n')
+        sys.exit(2)
+    top = t.c_address_spaces_map.get(args.address_space)
+    if top is None:
+        sys.stderr.write('error: no address space "{}"\n'.format(args.address_space))
+        sys.exit(2)
+    return top
+
+
+def decode_addresses(args, t):
+    "Print the elements at the addresses of --decode-address"
+    top = select_address_space(args, t)
+    try:
+        addrs = addrindex.parse_addresses(args.decode_address)
+    except (IOError, ValueError) as e:
+        sys.stderr.write('error: --decode-address: {}\n'.format(e))
+        sys.exit(2)
+    addrindex.decode_addresses(sys.stdout, top, addrs)
+
+
+def gen_layout_outputs(args, t):
+    """Generate outputs that only need the layout."""
+    if args.decode_address is not None:
+        decode_addresses(args, t)
     if args.print_pretty is not None:
         with open_filename(args.print_pretty) as f:
             pprint.pprint_cheby(f, t)
@@ -241,9 +479,9 @@ def handle_file(args, filename):
         with open_filename(args.gen_edge3) as f:
             gen_edge3.generate_edge3(f, t)
 
-    # Generate names for C code (but do not expand)
-    gen_name.gen_name_memmap(t)
 
+def gen_named_outputs(args, t):
+    """Generate outputs that need the names (but not the expanded tree)."""
     if args.print_memmap_verbose is not None:
         with open_filename(args.print_memmap_verbose) as f:
             sprint.sprint_cheby(f, t, False, True)
@@ -254,12 +492,14 @@ def handle_file(args, filename):
         with open_filename(args.gen_c_check_layout) as f:
             gen_laychk.gen_chklayout_cheby(f, t)
 
-    # Decode x-hdl, unroll
-    expand_hdl.expand_hdl(t)
-    # Regenerate names and sorted children after unrolling.
-    gen_name.gen_name_memmap(t)
-    layout.sort_tree(t)
 
+def needs_expanded_tree(args):
+    "Return True if an output of :param args: needs the expanded tree"
+    return any(getattr(args, act) not in (None, False) for act in EXPANDED_ACTIONS)
+
+
+def gen_expanded_outputs(args, t, filename, hdl_cache):
+    """Generate outputs that need the expanded tree."""
     if args.gen_silecs is not None:
         with open_filename(args.gen_silecs) as f:
             gen_silecs.generate_silecs(f, t)
@@ -354,23 +594,25 @@ def handle_file(args, filename):
                 f.write(header.format(name=t.description, basename=basename,
                                       date=time.strftime("%a %b %d %X %Y"),
                                       c=c, l=l, ext=ext))
+            style = print_vhdl.style
             print_vhdl.style = 'wbgen'
-            print_hdl(f, args.hdl, h)
+            try:
+                print_hdl(f, args.hdl, h)
+            finally:
+                print_vhdl.style = style
     if args.gen_hdl is not None:
-        if not t.c_address_spaces_map:
-            if not (args.address_space is None):
-                sys.stderr.write('error: --address-space not allowed (no address space)\n')
-                sys.exit(2)
-            top = t
-        else:
-            if args.address_space is None:
-                sys.stderr.write('error: --address-space required\n')
-                sys.exit(2)
-            top = t.c_address_spaces_map.get(args.address_space)
-            if top is None:
-                sys.stderr.write('error: no address space "{}"\n'.format(args.address_space))
-                sys.exit(2)
-        h = gen_hdl.generate_hdl(top, args.wb_lib_name, args.axil_lib_name)
+        top = select_address_space(args, t)
+        # The HDL tree only depends on these options, so it can be shared
+        # by several outputs (like VHDL and SV).
+        key = (args.address_space, args.wb_lib_name, args.axil_lib_name, args.ff_reset,
+               args.hdl_opt)
+        h = hdl_cache.get(key)
+        if h is None:
+            h = gen_hdl.generate_hdl(top, args.wb_lib_name, args.axil_lib_name)
+            if args.hdl_opt:
+                stats = hdlopt.optimize(h)
+                sys.stderr.write('{}: hdl-opt: {}\n'.format(filename, stats))
+            hdl_cache[key] = h
         if args.gen_hdl == '+units':
             if args.hdl == 'verilog' or args.hdl == 'sv':
                 print_verilog.print_verilog_per_units(h, args.out_prefix)
@@ -382,6 +624,64 @@ def handle_file(args, filename):
                 print_hdl(f, args.hdl, h)
 
 
+def handle_file(args, filename, outputs=()):
+    """Generate the outputs of :param args: and of each element of
+       :param outputs: (a list of arguments).  The input is parsed, laid out
+       and expanded only once for all the outputs."""
+    all_args = [args]
+    all_args.extend(outputs)
+
+    deps = [filename]
+    if compiled.is_compiled(filename):
+        # Submaps are part of the compiled file.
+        t = compiled.load(filename)
+    else:
+        t = layout.parse_and_layout(filename, layout.layout_cheby, args.jobs)
+        layout.submap_dependencies(t, deps)
+    if args.outputs is not None:
+        deps.append(args.outputs)
+
+    # Save before the tree is modified by the generators.
+    for a in all_args:
+        if a.save_compiled is not None:
+            compiled.save(a.save_compiled, t, open_filename.only_if_changed)
+
+    for a in all_args:
+        with output_scope(a):
+            gen_layout_outputs(a, t)
+
+    # Generate names for C code (but do not expand)
+    gen_name.gen_name_memmap(t)
+
+    for a in all_args:
+        with output_scope(a):
+            gen_named_outputs(a, t)
+
+    # Decode x-hdl
+    expand_hdl.expand_hdl(t, False)
+
+    if any(needs_expanded_tree(a) for a in all_args):
+        # Unroll (only when needed, as the repeats are copied)
+        expand_hdl.unroll_hdl(t)
+        # Regenerate names and sorted children after unrolling.
+        gen_name.gen_name_memmap(t)
+        layout.sort_tree(t)
+
+        hdl_cache = {}
+        for a in all_args:
+            with output_scope(a):
+                gen_expanded_outputs(a, t, filename, hdl_cache)
+
+    if args.depfile is not None:
+        targets = []
+        for a in all_args:
+            targets.extend(output_filenames(a))
+        if not targets:
+            targets.append(args.depfile)
+        with open_filename(args.depfile) as f:
+            write_depfile(f, targets, list(dict.fromkeys(deps)))
+
+
 def print_example():
     sys.stdout.write("""memory-map:
   bus: wb-32-be
@@ -400,7 +700,19 @@ def print_example():
               range: 1
 """)
 
+# Sub-commands: module and function.
+SUBCOMMANDS = {
+    'batch': ('cheby.batch', 'main'),
+    'serve': ('cheby.server', 'serve_main'),
+    'client': ('cheby.server', 'client_main'),
+}
+
+
 def main():
+    if len(sys.argv) > 1 and sys.argv[1] in SUBCOMMANDS:
+        module, func = SUBCOMMANDS[sys.argv[1]]
+        getattr(backend(module), func)(sys.argv[2:])
+        return
     args = decode_args()
     if args.example:
         print_example()
@@ -410,8 +722,19 @@ def main():
     if f is None:
         sys.stderr.write('error: argument --input/-i is required\n')
         sys.exit(2)
+    open_filename.only_if_changed = args.only_if_changed
+    if args.cache_dir is not None:
+        layout.tree_cache = treecache.TreeCache(args.cache_dir, args.cache_max_size << 20)
+    outputs = []
+    if args.outputs is not None:
+        try:
+            outputs = load_outputs(args, args.outputs)
+        except cheby.parser.ParseException as e:
+            sys.stderr.write("{}:{}\n".format(args.outputs, e))
+            sys.exit(2)
+    check_units([args] + outputs)
     try:
-        handle_file(args, f)
+        handle_file(args, f, outputs)
     except cheby.parser.ParseException as e:
         sys.stderr.write("{}:{}\n".format(f, e))
         sys.exit(2)
@@ -415,7 +415,7 @@ def parse_c_header(root, el):
 def parse_yaml(filename):
     try:
         el = yamlread.load(open(filename))
-    except IOError as e:
+    except (IOError, UnicodeDecodeError) as e:
         raise ParseException(str(e))
     except yamlread.ScanException as e:
         raise ParseException(str(e))
@@ -179,6 +179,7 @@ operator = {hdltree.HDLAnd: (' & ', 4),
             hdltree.HDLOr:  (' | ', 3),
             hdltree.HDLNot: ('~', 5),
             hdltree.HDLSub: ('-', 1),
+            hdltree.HDLAdd: (' + ', 1),
             hdltree.HDLMul: ('*', 2),
             hdltree.HDLEq:  (' == ', 5),
             hdltree.HDLGe:  (' >= ', 5),
@@ -262,6 +263,20 @@ def generate_expr(e, prio=-1):
                 generate_expr(e.prefix), e.index + e.size - 1, e.index)
     elif isinstance(e, hdltree.HDLIndex):
         return "{}[{}]".format(generate_expr(e.prefix), e.index)
+    elif isinstance(e, hdltree.HDLPartSelect):
+        lo = generate_expr(e.index, operator[hdltree.HDLMul][1])
+        if e.width != 1:
+            lo = "{}*{}".format(lo, e.width)
+        if e.offset != 0:
+            lo = "{}+{}".format(lo, e.offset)
+        if e.size is None:
+            return "{}[{}]".format(generate_expr(e.prefix), lo)
+        else:
+            return "{}[{} +: {}]".format(generate_expr(e.prefix), lo, e.size)
+    elif isinstance(e, hdltree.HDLToInteger):
+        return generate_expr(e.expr)
+    elif isinstance(e, hdltree.HDLGenVar):
+        return e.name
     elif isinstance(e, hdltree.HDLInterfaceSelect):
         return "{}.{}".format(generate_expr(e.prefix), e.subport.name)
     elif isinstance(e, hdltree.HDLInterfaceIndex):
@@ -275,7 +290,7 @@ def generate_expr(e, prio=-1):
 def get_base_name(s):
     if isinstance(s, hdltree.HDLObject):
         return s
-    elif isinstance(s, hdltree.HDLSlice) or isinstance(s, hdltree.HDLIndex):
+    elif isinstance(s, (hdltree.HDLSlice, hdltree.HDLIndex, hdltree.HDLPartSelect)):
         return get_base_name(s.prefix)
     elif isinstance(s, hdltree.HDLInterfaceSelect):
         return get_base_name(s.subport)
@@ -485,6 +500,18 @@ def generate_stmts(fd, stmts, indent):
             wln(fd, sindent + "end generate genblock_{};".format(gen_num))
             gen_num += 1
 
+        elif isinstance(s, hdltree.HDLGenFor):
+            v = s.var.name
+            wln(fd, sindent + "genvar {};".format(v))
+            wln(fd, sindent + "generate")
+            wln(fd, sindent + "for ({v} = 0; {v} < {n}; {v} = {v} + 1) begin : {name}".format(
+                v=v, n=s.count, name=s.name))
+            for d in s.decls:
+                generate_decl(fd, d, indent + 1)
+            generate_stmts(fd, s.stmts, indent + 1)
+            wln(fd, sindent + "end")
+            wln(fd, sindent + "endgenerate")
+
         else:
             assert False, "unhandled hdl stmt {}".format(s)
 
@@ -556,8 +583,7 @@ def extract_reg_init(decls):
 
 def extract_reg_assign(stmt, is_reg):
     targ = stmt.target
-    while isinstance(targ, hdltree.HDLSlice) \
-           or isinstance(targ, hdltree.HDLIndex):
+    while isinstance(targ, (hdltree.HDLSlice, hdltree.HDLIndex, hdltree.HDLPartSelect)):
         targ = targ.prefix
     if isinstance(targ, hdltree.HDLInterfaceSelect):
         return
@@ -588,11 +614,8 @@ def extract_reg_seq(stmts):
             raise AssertionError(s)
 
 
-def extract_reg_module(module):
-    "Detect whether ports/signals are wire or reg."
-    extract_reg_init(module.ports)
-    extract_reg_init(module.decls)
-    for s in module.stmts:
+def extract_reg_stmts(stmts):
+    for s in stmts:
         if isinstance(s, hdltree.HDLAssign):
             extract_reg_assign(s, False)
         elif isinstance(s, hdltree.HDLSync):
@@ -600,6 +623,16 @@ def extract_reg_module(module):
             extract_reg_seq(s.sync_stmts)
         elif isinstance(s, hdltree.HDLComb):
             extract_reg_seq(s.stmts)
+        elif isinstance(s, hdltree.HDLGenFor):
+            extract_reg_init(s.decls)
+            extract_reg_stmts(s.stmts)
+
+
+def extract_reg_module(module):
+    "Detect whether ports/signals are wire or reg."
+    extract_reg_init(module.ports)
+    extract_reg_init(module.decls)
+    extract_reg_stmts(module.stmts)
 
 
 def print_module_declaration(fd, module):
@@ -236,6 +236,9 @@ operator = {hdltree.HDLAnd: (' and ', 4),
 def generate_expr(e, prio=-1):
     if isinstance(e, hdltree.HDLObject):
         return e.name
+    elif isinstance(e, hdltree.HDLAdd):
+        return "std_logic_vector(unsigned({}) + {})".format(
+            generate_expr(e.left), generate_expr(e.right))
     elif isinstance(e, hdltree.HDLBinary):
         opname, opprio = operator[type(e)]
         res = ''.join([generate_expr(e.left, opprio),
@@ -303,6 +306,20 @@ def generate_expr(e, prio=-1):
                 generate_expr(e.prefix), e.index + e.size - 1, e.index)
     elif isinstance(e, hdltree.HDLIndex):
         return "{}({})".format(generate_expr(e.prefix), e.index)
+    elif isinstance(e, hdltree.HDLPartSelect):
+        idx = generate_expr(e.index, operator[hdltree.HDLMul][1])
+        if e.width != 1:
+            idx = "{}*{}".format(idx, e.width)
+        lo = idx if e.offset == 0 else "{}+{}".format(idx, e.offset)
+        if e.size is None:
+            return "{}({})".format(generate_expr(e.prefix), lo)
+        else:
+            return "{}({}+{} downto {})".format(
+                generate_expr(e.prefix), idx, e.offset + e.size - 1, lo)
+    elif isinstance(e, hdltree.HDLToInteger):
+        return "to_integer(unsigned({}))".format(generate_expr(e.expr))
+    elif isinstance(e, hdltree.HDLGenVar):
+        return e.name
     elif isinstance(e, hdltree.HDLInterfaceSelect):
         # is_master means the direction is not reversed.
         if e.subport.dir == 'EXT':
@@ -318,7 +335,7 @@ def generate_expr(e, prio=-1):
 def get_base_name(s):
     if isinstance(s, hdltree.HDLObject):
         return s
-    elif isinstance(s, hdltree.HDLSlice) or isinstance(s, hdltree.HDLIndex):
+    elif isinstance(s, (hdltree.HDLSlice, hdltree.HDLIndex, hdltree.HDLPartSelect)):
         return get_base_name(s.prefix)
     elif isinstance(s, hdltree.HDLInterfaceSelect):
         return get_base_name(s.subport)
@@ -487,8 +504,8 @@ def generate_stmts(fd, stmts, indent):
             wln(fd, "begin")
             # wln(fd, "  begin")
             for s1 in s.stmts:
-                generate_seq(fd, s1, 2)
-            w(fd, "  end process")
+                generate_seq(fd, s1, indent + 1)
+            w(fd, sindent + "end process")
             if s.name is not None:
                 w(fd, ' {}'.format(s.name))
             wln(fd, ";")
@@ -522,6 +539,14 @@ def generate_stmts(fd, stmts, indent):
             generate_stmts(fd, s.stmts, indent + 1)
             wln(fd, sindent + "end generate genblock_{};".format(gen_num))
             gen_num += 1
+        elif isinstance(s, hdltree.HDLGenFor):
+            wln(fd, sindent + "{}: for {} in 0 to {} generate".format(
+                s.name, s.var.name, s.count - 1))
+            for d in s.decls:
+                generate_decl(fd, d, indent + 1)
+            wln(fd, sindent + "begin")
+            generate_stmts(fd, s.stmts, indent + 1)
+            wln(fd, sindent + "end generate {};".format(s.name))
         else:
             assert False, "unhandled hdl stmt {}".format(s)
 
@@ -0,0 +1,170 @@
+"""Server mode: keep the laid-out trees in memory between runs.
+
+   'cheby serve --socket PATH' listens on a local UNIX socket.  Each request
+   is a command line which is run like the cheby command, in the current
+   directory of the client.  The outputs are written by the server, and its
+   standard output, standard error and exit status are sent back to the
+   client.  The laid-out trees are kept in memory and reused until the
+   file or one of the files it includes is modified.
+
+   'cheby client --socket PATH [--] ARGS...' sends a request to the server and
+   'cheby client --socket PATH --shutdown' stops it.
+
+   The messages are JSON objects.  A request is either
+   {"cwd": DIR, "argv": [ARGS...]} or {"shutdown": true}, and the answer is
+   {"status": CODE, "stdout": TEXT, "stderr": TEXT}."""
+
+import sys
+import os
+import io
+import json
+import socket
+import argparse
+import traceback
+import cheby.layout as layout
+import cheby.treecache as treecache
+import cheby.main as cheby_main
+
+# Sub-commands that cannot be run by the server.
+FORBIDDEN = ['serve', 'client']
+
+
+def recv_message(conn):
+    "Receive a message from :param conn: until the end of the stream"
+    chunks = []
+    while True:
+        data = conn.recv(1 << 16)
+        if not data:
+            break
+        chunks.append(data)
+    return json.loads(b''.join(chunks).decode('utf-8'))
+
+
+def send_message(conn, msg):
+    conn.sendall(json.dumps(msg).encode('utf-8'))
+    conn.shutdown(socket.SHUT_WR)
+
+
+def run_request(cache, argv, cwd):
+    """Run cheby with arguments :param argv: in directory :param cwd:,
+       using the trees of :param cache:.  Return the answer."""
+    old_cwd = os.getcwd()
+    old_argv = sys.argv
+    old_stdout = sys.stdout
+    old_stderr = sys.stderr
+    out = io.StringIO()
+    err = io.StringIO()
+    status = 0
+    try:
+        sys.stdout = out
+        sys.stderr = err
+        os.chdir(cwd)
+        sys.argv = ['cheby'] + argv
+        layout.tree_cache = cache
+        # The entries of the submap memo include the nested submaps, which
+        # may have been modified since the previous request.  The trees are
+        # still kept by the cache, which checks all the included files.
+        layout.submap_memo.clear()
+        if argv[:1] and argv[0] in FORBIDDEN:
+            err.write("error: '{}' cannot be run by the server\n".format(argv[0]))
+            status = 2
+        else:
+            cheby_main.main()
+    except SystemExit as e:
+        if e.code is None:
+            status = 0
+        elif isinstance(e.code, int):
+            status = e.code
+        else:
+            err.write('{}\n'.format(e.code))
+            status = 1
+    except Exception:
+        # Do not stop the server on an internal error.
+        err.write(traceback.format_exc())
+        status = 1
+    finally:
+        sys.stdout = old_stdout
+        sys.stderr = old_stderr
+        sys.argv = old_argv
+        os.chdir(old_cwd)
+        layout.tree_cache = cache
+    return {'status': status, 'stdout': out.getvalue(), 'stderr': err.getvalue()}
+
+
+def serve(sock, cache=None):
+    """Handle the requests received on the listening socket :param sock:
+       until a shutdown request."""
+    if cache is None:
+        cache = treecache.MemoryTreeCache()
+    while True:
+        conn, _ = sock.accept()
+        with conn:
+            try:
+                req = recv_message(conn)
+            except (ValueError, UnicodeDecodeError) as e:
+                send_message(conn, {'status': 2, 'stdout': '',
+                                    'stderr': 'error: bad request: {}\n'.format(e)})
+                continue
+            if req.get('shutdown'):
+                send_message(conn, {'status': 0, 'stdout': '', 'stderr': ''})
+                return
+            answer = run_request(cache, req.get('argv', []), req.get('cwd', os.getcwd()))
+            send_message(conn, answer)
+
+
+def request(path, msg):
+    "Send :param msg: to the server listening on :param path: and return the answer"
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+        conn.connect(path)
+        send_message(conn, msg)
+        return recv_message(conn)
+
+
+def serve_main(argv=None):
+    aparser = argparse.ArgumentParser(prog='cheby serve',
+                                      description='cheby server')
+    aparser.add_argument('--socket', required=True,
+                         help='path of the UNIX socket to listen on')
+    args = aparser.parse_args(argv)
+    if os.path.exists(args.socket):
+        # Remove a stale socket, but do not steal it from a running server.
+        try:
+            request(args.socket, {'argv': ['--version']})
+            sys.stderr.write('error: a server is already running on {}\n'.format(args.socket))
+            sys.exit(2)
+        except OSError:
+            os.remove(args.socket)
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.bind(args.socket)
+        sock.listen()
+        try:
+            serve(sock)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            os.remove(args.socket)
+
+
+def client_main(argv=None):
+    aparser = argparse.ArgumentParser(prog='cheby client',
+                                      description='send a command to a cheby server')
+    aparser.add_argument('--socket', required=True,
+                         help='path of the UNIX socket of the server')
+    aparser.add_argument('--shutdown', action='store_true',
+                         help='stop the server')
+    # The other arguments are for the cheby command.
+    args, cmd = aparser.parse_known_args(argv)
+    if cmd[:1] == ['--']:
+        cmd = cmd[1:]
+    if args.shutdown:
+        msg = {'shutdown': True}
+    else:
+        msg = {'cwd': os.getcwd(), 'argv': cmd}
+    try:
+        answer = request(args.socket, msg)
+    except OSError as e:
+        sys.stderr.write('error: cannot connect to {}: {}\n'.format(args.socket, e))
+        sys.exit(2)
+    sys.stdout.write(answer['stdout'])
+    sys.stderr.write(answer['stderr'])
+    sys.exit(answer['status'])
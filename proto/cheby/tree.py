@@ -7,15 +7,25 @@
    - Extensions are stored as python data in a 'x_XXX' field, where 'XXX' is
      the name of the extension.
    - Computed values have the 'c_' prefix (layout module).
-   - HDL fields have the 'h_' prefix (gen_hdl module). """
+   - HDL fields have the 'h_' prefix (gen_hdl module).
+   There can be many nodes (after unrolling repeats), so the attributes that
+   are always or very often set (user data, computed values and the main HDL
+   fields) are slots.  The other attributes (like the extensions) are stored
+   in the instance dictionary, which is only allocated when needed.  A slot
+   must be declared only once in a class hierarchy. """
 
 BYTE_SIZE = 8
 
+# Version of the layout of the nodes.  Change it when the slots are changed,
+# as it invalidates the pickled trees (cache, compiled files).
+TREE_FORMAT = 3
+
 
 class Node(object):
     """Base class for any Cheby node.
        :var parent: the parent of that node, None for the root.
        """
+    __slots__ = ('_parent', '__dict__')
     _dispatcher = {}    # Class variable for visitor.
 
     def __init__(self, parent):
@@ -26,16 +36,34 @@ class Node(object):
         return self._parent
 
     def visit(self, name, *args, **kwargs):
-        for c in name.__mro__:
-            f = self._dispatcher.get(c, None)
-            if f is not None:
-                return f(*args, **kwargs)
-        assert False, "method not found"
+        try:
+            f = _dispatch_cache[(name, self.__class__)]
+        except KeyError:
+            f = _resolve_visit(name, self.__class__)
+        return f(*args, **kwargs)
+
+
+# Resolved methods of the visitors, indexed by (visitor class, node class).
+# Cleared when a method is registered.
+_dispatch_cache = {}
+
+
+def _resolve_visit(name, typ):
+    "Find the method of visitor :param name: for nodes of class :param typ:"
+    for c in name.__mro__:
+        f = typ._dispatcher.get(c, None)
+        if f is not None:
+            _dispatch_cache[(name, typ)] = f
+            return f
+    assert False, "method not found"
 
 
 class NamedNode(Node):
     """Many Cheby nodes have a name/description/comment.  Create a
        common class for them."""
+    __slots__ = ('name', 'description', 'comment', 'note',
+                 'c_address', 'c_size', 'c_align', 'c_abs_addr', 'c_name',
+                 'h_fname', 'h_pname', 'h_gen')
     _dispatcher = {}
 
     def __init__(self, parent):
@@ -48,6 +76,13 @@ class NamedNode(Node):
         self.c_address = None
         self.c_size = None
         self.c_align = None
+        self.c_abs_addr = None
+        self.c_name = None
+        # HDL values (set by expand_hdl and gen_hdl).  They are initialized
+        # so that the nodes are quickly copied when repeats are unrolled.
+        self.h_fname = None
+        self.h_pname = None
+        self.h_gen = None
 
     def get_path(self):
         """Return the full path (from the root) of this node."""
@@ -91,6 +126,9 @@ class NamedNode(Node):
 class CompositeNode(NamedNode):
     """Base class for Cheby nodes with children; they are also named.
        :var children: is the list of children."""
+    __slots__ = ('address', 'align', 'size_str', 'size_val', 'children',
+                 'c_sorted_children', 'c_children_index',
+                 'hdl_iogroup', 'hdl_blk_prefix', 'hdl_reg_prefix')
     _dispatcher = {}
 
     def __init__(self, parent):
@@ -102,9 +140,22 @@ class CompositeNode(NamedNode):
         self.children = []
         # Computed variables
         self.c_size = None       # Compute by layout (aligned)
+        self.c_children_index = None    # See children_index
+        self.hdl_iogroup = None
+        self.hdl_blk_prefix = None
+        self.hdl_reg_prefix = None
+
+    def get_child(self, name):
+        "Return the child named :param name:, or None"
+        return lookup_child(self, name)
 
 
 class Root(CompositeNode):
+    __slots__ = ('bus', 'word_endian', 'version', 'ident', 'memmap_version',
+                 'schema_version',
+                 'c_word_size', 'c_addr_word_bits', 'c_filename', 'c_word_endian',
+                 'c_version', 'c_memmap_version', 'c_enums_dict',
+                 'c_prefix_c_struct', 'c_address_spaces_map', 'c_path_index')
     _dispatcher = {}
     NAME = "MemoryMap"
 
@@ -127,9 +178,31 @@ class Root(CompositeNode):
         self.c_enums_dict = {}      # Dictionnary from enum name to enum node.
         self.c_prefix_c_struct = False  # Set if c struct are prefixed with root name
         self.c_address_spaces_map = {}
+        self.c_path_index = None        # See get_by_path
+
+    def get_by_path(self, path):
+        """Return the node whose absolute path (as returned by get_path)
+           is :param path:, or None.
+           The index of the paths is built on the first call.  When a path
+           is not in the index, or when the node found is not at this path
+           anymore, the path is looked up from the root (by name) and the
+           entry is updated."""
+        if self.c_path_index is None:
+            self.c_path_index = {}
+            build_path_index(self, self.get_path(), self.c_path_index)
+        n = self.c_path_index.get(path)
+        if n is not None and n.get_path() == path and is_attached(n, self):
+            return n
+        n = lookup_path(self, path)
+        if n is None:
+            self.c_path_index.pop(path, None)
+        else:
+            self.c_path_index[path] = n
+        return n
 
 
 class Block(CompositeNode):
+    __slots__ = ('origin',)
     _dispatcher = {}
     NAME = "Block"
 
@@ -140,6 +213,7 @@ class Block(CompositeNode):
 
 class RepeatBlock(Block):
     """Like a block, but expanded from Repeat"""
+    __slots__ = ('count',)
     _dispatcher = {}
     NAME = "RepeatBlock"
 
@@ -149,6 +223,8 @@ class RepeatBlock(Block):
 
 
 class Submap(CompositeNode):
+    __slots__ = ('filename', 'interface', 'include', 'address_space',
+                 'c_submap')
     _dispatcher = {}
     NAME = "Submap"
 
@@ -163,6 +239,7 @@ class Submap(CompositeNode):
 
 
 class Repeat(CompositeNode):
+    __slots__ = ('count',)
     _dispatcher = {}
     NAME = "Repeat"
 
@@ -172,6 +249,8 @@ class Repeat(CompositeNode):
 
 
 class Memory(CompositeNode):
+    __slots__ = ('memsize_val', 'memsize_str', 'memdepth_val', 'memdepth_str',
+                 'interface', 'c_depth', 'c_depth_interface')
     _dispatcher = {}
     NAME = "Memory"
 
@@ -187,6 +266,16 @@ class Memory(CompositeNode):
 
 
 class Reg(NamedNode):
+    __slots__ = ('width', 'type', 'access', 'address', 'children', 'preset',
+                 'constant',
+                 'c_rwidth', 'c_iowidth', 'c_mwidth', 'c_nwords', 'c_type',
+                 'c_sorted_fields', 'c_children_index',
+                 'hdl_write_strobe', 'hdl_read_strobe', 'hdl_write_ack',
+                 'hdl_read_ack', 'hdl_port', 'hdl_type', 'hdl_field_types',
+                 'hdl_port_name',
+                 'h_has_regs', 'h_wreq_port', 'h_wreq_wire_port', 'h_rreq_port',
+                 'h_wack_port', 'h_rack_port', 'h_wack', 'h_wreq', 'h_wstrb',
+                 'h_wstrb_wire')
     _dispatcher = {}
     NAME = "Reg"
 
@@ -209,6 +298,29 @@ class Reg(NamedNode):
         self.c_nwords = None    # Number of words for multi-words registers
         self.c_align = None     # Alignment
         self.c_type = None      # Type. None if register with fields.
+        self.hdl_write_strobe = None
+        self.hdl_read_strobe = None
+        self.hdl_write_ack = None
+        self.hdl_read_ack = None
+        self.hdl_port = None
+        self.hdl_type = None
+        self.hdl_field_types = None
+        self.hdl_port_name = None
+        self.h_has_regs = None
+        self.h_wreq_port = None
+        self.h_wreq_wire_port = None
+        self.h_rreq_port = None
+        self.h_wack_port = None
+        self.h_rack_port = None
+        self.h_wack = None
+        self.h_wreq = None
+        self.h_wstrb = None
+        self.h_wstrb_wire = None
+        self.c_children_index = None    # See children_index
+
+    def get_child(self, name):
+        "Return the field named :param name:, or None"
+        return lookup_child(self, name)
 
     def has_fields(self):
         """True if the register has one or more fields defined by the user.
@@ -219,6 +331,10 @@ class Reg(NamedNode):
 
 class FieldBase(NamedNode):
     "Base for Field and FieldReg"
+    __slots__ = ('hi', 'lo', 'preset', 'type',
+                 'c_type', 'c_rwidth', 'c_iowidth', 'c_preset',
+                 'hdl_port_name', 'hdl_type', 'hdl_lock', 'hdl_lock_value',
+                 'h_iport', 'h_oport', 'h_wmask_port', 'h_reg')
     NAME = "Field"
 
     def __init__(self, parent):
@@ -228,23 +344,37 @@ class FieldBase(NamedNode):
         self.preset = None
         self.type = None
         self.c_type = None
+        self.hdl_port_name = None
+        self.hdl_type = None
+        self.hdl_lock = None
+        self.hdl_lock_value = None
+        self.h_iport = None
+        self.h_oport = None
+        self.h_wmask_port = None
+        self.h_reg = None
 
 
 class Field(FieldBase):
     "A field within a register."
+    __slots__ = ()
 
 
 class FieldReg(FieldBase):
     "A pseudo field for a register without fields."
+    __slots__ = ()
 
 
 class EnumVal(NamedNode):
+    __slots__ = ('value',)
+
     def __init__(self, parent):
         super(EnumVal, self).__init__(parent)
         self.value = None
 
 
 class EnumDecl(CompositeNode):
+    __slots__ = ('width', 'c_width')
+
     def __init__(self, parent):
         super(EnumDecl, self).__init__(parent)
         self.width = None       # Width or None
@@ -254,20 +384,131 @@ class EnumDecl(CompositeNode):
 
 class AddressSpace(CompositeNode):
     # Children are nodes
-    pass
+    __slots__ = ()
 
 class AddressSpaces(CompositeNode):
     # children are AddressSpace
-    pass
+    __slots__ = ()
+
+
+def children_index(n, rebuild=False):
+    """Return the dictionary from names to positions of the children of
+       :param n: (a composite node or a register).  If several children have
+       the same name (which is an error detected by layout), the first one
+       is kept.
+       The index is built on the first call, and rebuilt when the list of
+       children is replaced, when its length has changed or when
+       :param rebuild: is set.  Children replaced or renamed in place are
+       detected by lookup_child."""
+    idx = n.c_children_index
+    if rebuild or idx is None or idx[0] is not n.children or idx[1] != len(n.children):
+        d = {}
+        for i, c in enumerate(n.children):
+            d.setdefault(c.name, i)
+        idx = (n.children, len(n.children), d)
+        n.c_children_index = idx
+    return idx[2]
+
+
+def lookup_child(n, name):
+    """Return the child of :param n: named :param name:, or None.
+       The index is rebuilt if the child found has been renamed or
+       replaced, or if there is no such child (one may have been renamed)."""
+    i = children_index(n).get(name)
+    if i is None or n.children[i].name != name:
+        i = children_index(n, rebuild=True).get(name)
+        if i is None:
+            return None
+    return n.children[i]
+
+
+def lookup_path(root, path):
+    "Return the node of :param root: at :param path: by following the names, or None"
+    prefix = root.get_path() + '/'
+    if path == prefix[:-1]:
+        return root
+    if not path.startswith(prefix):
+        return None
+    n = root
+    for name in path[len(prefix):].split('/'):
+        if not hasattr(n, 'get_child'):
+            return None
+        n = n.get_child(name)
+        if n is None:
+            return None
+    return n
+
+
+def is_attached(n, root):
+    "Return True if :param n: is still a descendant of :param root:"
+    while n is not root:
+        parent = n.parent
+        if parent is None or parent.get_child(n.name) is not n:
+            return False
+        n = parent
+    return True
+
+
+def build_path_index(n, path, res):
+    "Add to :param res: the path of the descendants of :param n: (whose path is :param path:)"
+    res.setdefault(path, n)
+    for c in getattr(n, 'children', ()):
+        build_path_index(c, '{}/{}'.format(path, '??' if c.name is None else c.name), res)
+
+
+def slot_names(cls):
+    "Return the names of the slots of nodes of class :param cls: (without __dict__)"
+    return tuple(name for c in cls.__mro__
+                 for name in c.__dict__.get('__slots__', ())
+                 if name != '__dict__')
+
+
+def make_slots_copier(cls):
+    """Return a function (src, dst) that copies the slots of a node of class
+       :param cls: to another one.  The function is generated so that each
+       slot is directly accessed (which is much faster than getattr and
+       setattr).  It raises AttributeError if a slot of src is not set."""
+    src = 'def copy(src, dst):\n'
+    for name in slot_names(cls):
+        src += '    dst.{0} = src.{0}\n'.format(name)
+    env = {}
+    exec(src, env)
+    return env['copy']
+
+
+_slots_copiers = {}
+_unset = object()
+
+
+def copy_slots(src, dst):
+    "Copy the slots of node :param src: that are set to node :param dst:"
+    cls = src.__class__
+    f = _slots_copiers.get(cls)
+    if f is None:
+        f = make_slots_copier(cls)
+        _slots_copiers[cls] = f
+    try:
+        f(src, dst)
+    except AttributeError:
+        # At least one slot is not set.
+        for name in slot_names(cls):
+            v = getattr(src, name, _unset)
+            if v is not _unset:
+                setattr(dst, name, v)
 
 
 class Visitor(object):
     def visit(self, n, *args, **kwargs):
-        return n.visit(self.__class__, self, n, *args, **kwargs)
+        try:
+            f = _dispatch_cache[(self.__class__, n.__class__)]
+        except KeyError:
+            f = _resolve_visit(self.__class__, n.__class__)
+        return f(self, n, *args, **kwargs)
 
     @classmethod
     def register(cls, typ):
         def fun(f):
             typ._dispatcher[cls] = f
+            _dispatch_cache.clear()
             return f
         return fun
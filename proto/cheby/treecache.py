@@ -0,0 +1,178 @@
+"""Caches of laid-out trees.
+
+   TreeCache is a persistent cache.  Each entry is the pickled laid-out tree
+   of a file.  The entry is keyed by the absolute filename and the content
+   of the file, the cheby version and the global options that change the
+   layout.  The entry also records the content hash of every file included
+   through a submap, so that it is invalidated when any of them changes.
+   The total size of the cache is bounded: the least recently used entries
+   are removed first.
+
+   MemoryTreeCache is an in-memory cache used by 'cheby serve'."""
+
+import hashlib
+import os
+import pickle
+import sys
+import tempfile
+import cheby
+import cheby.tree as tree
+import cheby.layout as layout
+from cheby.schemas_version import VERSIONS
+
+SUFFIX = '.pickle'
+
+
+def file_hash(filename):
+    "Return the hash of the content of :param filename:, or None if it cannot be read."
+    try:
+        with open(filename, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except IOError:
+        return None
+
+
+def gather_deps(n, res):
+    "Append to :param res: the (filename, hash) of files included by submaps of :param n:"
+    files = []
+    layout.submap_dependencies(n, files)
+    for f in files:
+        res.append((os.path.abspath(f), file_hash(f)))
+
+
+class TreeCache(object):
+    def __init__(self, dirname, max_size):
+        self.dirname = dirname
+        self.max_size = max_size
+        os.makedirs(dirname, exist_ok=True)
+
+    def entry_name(self, filename, kind, content_hash):
+        h = hashlib.sha256()
+        for v in [cheby.__version__, repr(sorted(VERSIONS.items())),
+                  str(tree.TREE_FORMAT), kind, layout.word_endianness,
+                  os.path.abspath(filename), content_hash]:
+            h.update(v.encode('utf-8'))
+            h.update(b'\0')
+        return os.path.join(self.dirname, h.hexdigest() + SUFFIX)
+
+    def load(self, filename, kind):
+        """Return the tree for :param filename: laid-out by :param kind:,
+           or None if not in the cache."""
+        content_hash = file_hash(filename)
+        if content_hash is None:
+            return None
+        entry = self.entry_name(filename, kind, content_hash)
+        try:
+            with open(entry, 'rb') as f:
+                deps, root = pickle.load(f)
+        except IOError:
+            return None
+        except Exception:
+            # Corrupted or incompatible entry.
+            self.remove(entry)
+            return None
+        for dep, dep_hash in deps:
+            if file_hash(dep) != dep_hash:
+                # An included file has changed.
+                self.remove(entry)
+                return None
+        # Mark as recently used.
+        os.utime(entry)
+        root.c_filename = filename
+        layout.set_submap_filenames(root)
+        return root
+
+    def store(self, filename, kind, root):
+        """Add to the cache the tree :param root: for :param filename:"""
+        content_hash = file_hash(filename)
+        if content_hash is None:
+            return
+        deps = []
+        gather_deps(root, deps)
+        entry = self.entry_name(filename, kind, content_hash)
+        # Write atomically, as the cache may be shared by several processes.
+        fd, tmpname = tempfile.mkstemp(dir=self.dirname)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump((deps, root), f, pickle.HIGHEST_PROTOCOL)
+            os.replace(tmpname, entry)
+        except (IOError, pickle.PicklingError, RecursionError) as e:
+            sys.stderr.write("warning: cannot cache {}: {}\n".format(filename, e))
+            self.remove(tmpname)
+            return
+        self.trim()
+
+    def remove(self, entry):
+        try:
+            os.remove(entry)
+        except OSError:
+            pass
+
+    def trim(self):
+        "Remove the least recently used entries until the size is below the limit"
+        entries = []
+        total = 0
+        for name in os.listdir(self.dirname):
+            if not name.endswith(SUFFIX):
+                continue
+            path = os.path.join(self.dirname, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+            total += st.st_size
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_size:
+                break
+            self.remove(path)
+            total -= size
+
+
+def file_mtime(filename):
+    "Return the modification time of :param filename:, or None if it does not exist."
+    try:
+        return os.stat(filename).st_mtime_ns
+    except OSError:
+        return None
+
+
+class MemoryTreeCache(object):
+    """In-memory cache of laid-out trees, for long-running processes.
+       An entry is invalidated when the modification time of the file or
+       of a file it includes changes.  The trees are kept pickled, so that
+       each user gets its own copy."""
+
+    def __init__(self):
+        self.entries = {}
+
+    def key(self, filename, kind):
+        return (os.path.abspath(filename), kind, layout.word_endianness)
+
+    def load(self, filename, kind):
+        """Return the tree for :param filename: laid-out by :param kind:,
+           or None if not in the cache."""
+        key = self.key(filename, kind)
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        deps, data = entry
+        if any(file_mtime(f) != mtime for f, mtime in deps):
+            del self.entries[key]
+            return None
+        root = pickle.loads(data)
+        root.c_filename = filename
+        layout.set_submap_filenames(root)
+        return root
+
+    def store(self, filename, kind, root):
+        """Add to the cache the tree :param root: for :param filename:"""
+        files = [filename]
+        layout.submap_dependencies(root, files)
+        deps = [(os.path.abspath(f), file_mtime(f)) for f in files]
+        try:
+            data = pickle.dumps(root, pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, RecursionError):
+            return
+        self.entries[self.key(filename, kind)] = (deps, data)
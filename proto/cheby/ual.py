@@ -1,85 +1,246 @@
+"""Access to the registers of a device through a memory map.
+
+   create_ual_access returns a UALValue for the root of a memory map; the
+   children are accessed as attributes (and the elements of repeats and
+   memories as items):
+     v = create_ual_access(ual, 'map.cheby')
+     v.blk.reg.field = 1
+     v.blk.reg2 = 0x1234
+     val = int(v.blk.arr[2].reg)
+   The ual object provides the word accesses: readw, readl, writew and
+   writel (with a byte address).  MmapUAL is a ual for a memory-mapped
+   file or device (like /dev/uio0).
+
+   read_words reads the words of a whole block, memory, repeat or element,
+   and read_array reads them into a NumPy array (NumPy is only needed for
+   this function)."""
+
+import os
+import mmap
 import cheby.parser
 import cheby.layout
 import cheby.tree as tree
 
+try:
+    import numpy
+except ImportError:
+    # NumPy is not available (read_array cannot be used).
+    numpy = None
+
+
+class MmapUAL(object):
+    """Word accesses to the file or device :param filename: mapped in memory
+       from :param offset: (a multiple of the page size; for a UIO device,
+       the mapping N is at offset N * page size) for :param size: bytes
+       (by default, the size of the file).
+       The words are accessed through memoryviews (without copy), with the
+       byte order of the host.  The addresses must be aligned."""
+    def __init__(self, filename, size=None, offset=0, readonly=False):
+        fd = os.open(filename, os.O_RDONLY if readonly else os.O_RDWR)
+        try:
+            if size is None:
+                size = os.fstat(fd).st_size - offset
+            prot = mmap.PROT_READ if readonly else mmap.PROT_READ | mmap.PROT_WRITE
+            self._mmap = mmap.mmap(fd, size, mmap.MAP_SHARED, prot, offset=offset)
+        finally:
+            os.close(fd)
+        self.size = size
+        self._mem = memoryview(self._mmap)
+        self._mem16 = self._mem[:size & ~1].cast('H')
+        self._mem32 = self._mem[:size & ~3].cast('I')
+
+    def readw(self, addr):
+        return self._mem16[addr >> 1]
+
+    def readl(self, addr):
+        return self._mem32[addr >> 2]
+
+    def writew(self, addr, val):
+        self._mem16[addr >> 1] = val
+
+    def writel(self, addr, val):
+        self._mem32[addr >> 2] = val
+
+    def view(self, addr, size):
+        "Return a memoryview of :param size: bytes at :param addr: (without copy)"
+        return self._mem[addr:addr + size]
+
+    def close(self):
+        # The views must be released before the mapping can be closed.
+        self._mem32.release()
+        self._mem16.release()
+        self._mem.release()
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, etype, value, traceback):
+        self.close()
+
 
 class UALValue(object):
-    def __init__(self, ual, root, node, offset):
+    def __init__(self, ual, root, node, offset, index=None):
         self._ual = ual
         self._root = root
         self._node = node
         self._offset = offset
+        # Index of the element for an element of a repeat or of a memory
+        # (whose node is the repeat or the memory), otherwise None.
+        self._index = index
+        # Values of the children and of the elements, created once.
+        self._values = {}
 
-    def _get_child(self, name, children):
-        els = [el for el in children if el.name == name]
-        if len(els) != 1:
-            raise AttributeError("no {} in {}".format(name, self._node.name))
-        return els[0]
+    def _get_child(self, name, node=None):
+        if node is None:
+            node = self._node
+        el = node.get_child(name)
+        if el is None:
+            raise AttributeError("no {} in {}".format(name, node.name))
+        return el
+
+    def _word_offsets(self):
+        """Return the list of (address, shift) of the words of the register,
+           the first word has the least significant bits."""
+        word_size = self._root.c_word_size
+        res = [(self._offset + i * word_size, i * word_size * tree.BYTE_SIZE)
+               for i in range(self._node.c_size // word_size)]
+        if self._root.c_word_endian == 'big':
+            # The first word has the most significant bits.
+            res = [(addr, shift) for (addr, _), (_, shift) in zip(res, reversed(res))]
+        return res
 
     def _read_val(self):
         res = 0
-        word_size = self._root.c_word_size * tree.BYTE_SIZE
-        # FIXME: assume LE
-        for i in range(self._node.width // word_size):
-            addr = self._offset + i * word_size
-            if word_size == 16:
+        word_size = self._root.c_word_size
+        for addr, shift in self._word_offsets():
+            if word_size == 2:
                 v = self._ual.readw(addr)
-            elif word_size == 32:
+            elif word_size == 4:
                 v = self._ual.readl(addr)
             else:
                 raise AssertionError
-            res |= v << (i * word_size)
+            res |= v << shift
         return res
 
     def _write_val(self, val):
-        word_size = self._root.c_word_size * tree.BYTE_SIZE
-        # FIXME: assume LE
-        for i in range(self._node.width // word_size):
-            addr = self._offset + i * word_size
-            v = (val >> (i * word_size)) & ((1 << word_size) - 1)
-            if word_size == 16:
+        word_size = self._root.c_word_size
+        mask = (1 << (word_size * tree.BYTE_SIZE)) - 1
+        for addr, shift in self._word_offsets():
+            v = (val >> shift) & mask
+            if word_size == 2:
                 self._ual.writew(addr, v)
-            elif word_size == 32:
+            elif word_size == 4:
                 self._ual.writel(addr, v)
             else:
                 raise AssertionError
 
+    def __int__(self):
+        if not isinstance(self._node, tree.Reg):
+            raise TypeError("{} is not a register".format(self._node.name))
+        return self._read_val()
+
     def __getattr__(self, name):
-        if isinstance(self._node, (tree.Root, tree.Block, tree.Array)):
-            el = self._get_child(name, self._node.children)
-            return UALValue(self._ual, self._root, el,
-                            self._offset + el.c_address)
-        elif isinstance(self._node, tree.Reg) and self._node.type is None:
-            raise AttributeError
-#            el = self._get_child(name)
-#            val = self.read_reg()
+        if name[0] == '_':
+            raise AttributeError(name)
+        res = self._values.get(name)
+        if res is not None:
+            return res
+        node = self._node
+        if isinstance(node, tree.Submap) and node.filename is not None:
+            node = node.c_submap
+        if isinstance(node, (tree.Root, tree.Block, tree.Repeat, tree.Memory)):
+            el = self._get_child(name, node)
+            res = UALValue(self._ual, el.get_root(), el,
+                           self._offset + el.c_address)
+            self._values[name] = res
+            return res
+        elif isinstance(node, tree.Reg) and node.has_fields():
+            el = self._get_child(name)
+            return (self._read_val() >> el.lo) & ((1 << field_width(el)) - 1)
         else:
-            raise AttributeError
+            raise AttributeError("no '{}' in {}".format(name, node.name))
 
     def __setattr__(self, name, value):
         if name[0] == '_':
             object.__setattr__(self, name, value)
-        elif isinstance(self._node, tree.Reg) and self._node.type is None:
-            el = self._get_child(name, self._node.children)
+        elif isinstance(self._node, tree.Reg) and self._node.has_fields():
+            el = self._get_child(name)
             val = self._read_val()
-            mask = ((1 << el.c_width) - 1) << el.lo
+            mask = ((1 << field_width(el)) - 1) << el.lo
             val &= ~mask
             val |= (value << el.lo) & mask
             self._write_val(val)
+        elif isinstance(getattr(self, name)._node, tree.Reg):
+            getattr(self, name)._write_val(value)
         else:
-            print(self._node)
             raise AttributeError("no '{}' in {}".format(name, self._node.name))
 
+    def _count(self):
+        "Number of elements of a repeat or of a memory"
+        if self._index is not None:
+            raise TypeError("{}[{}] is an element".format(self._node.name, self._index))
+        elif isinstance(self._node, tree.Repeat):
+            return self._node.count
+        elif isinstance(self._node, tree.Memory):
+            return self._node.c_depth
+        else:
+            raise TypeError("{} is not a repeat or a memory".format(self._node.name))
+
     def __getitem__(self, key):
+        if self._index is not None:
+            raise TypeError("{}[{}] is an element".format(self._node.name, self._index))
         if not isinstance(key, int):
             raise KeyError
-        if isinstance(self._node, tree.Array):
-            if key >= self._node.repeat:
-                raise IndexError
-            return UALValue(self._ual, self._root, self._node,
-                            self._offset + key * self._node.c_elsize)
-        else:
-            raise TypeError
+        if key < 0 or key >= self._count():
+            raise IndexError
+        res = self._values.get(key)
+        if res is None:
+            res = UALValue(self._ual, self._root, self._node,
+                           self._offset + key * self._node.c_elsize, key)
+            self._values[key] = res
+        return res
+
+
+def field_width(f):
+    return 1 if f.hi is None else f.hi - f.lo + 1
+
+
+def array_shape(v):
+    """Return the shape and the size in bytes of the array of :param v:
+       (see read_array)"""
+    node = v._node
+    word_size = v._root.c_word_size
+    if v._index is not None:
+        return (node.c_elsize // word_size,), node.c_elsize
+    elif isinstance(node, (tree.Memory, tree.Repeat)):
+        return (v._count(), node.c_elsize // word_size), v._count() * node.c_elsize
+    else:
+        return (node.c_size // word_size,), node.c_size
+
+
+def read_words(v):
+    """Read the words of the block, memory, repeat or element of :param v:
+       (a UALValue), in address order.  With a MmapUAL, return a memoryview
+       of the mapping (without copy), otherwise a list."""
+    word_size = v._root.c_word_size
+    _, size = array_shape(v)
+    if isinstance(v._ual, MmapUAL):
+        return v._ual.view(v._offset, size).cast('H' if word_size == 2 else 'I')
+    read = v._ual.readw if word_size == 2 else v._ual.readl
+    return [read(v._offset + i) for i in range(0, size, word_size)]
+
+
+def read_array(v):
+    """Read the block, memory or repeat of :param v: (a UALValue) into a
+       NumPy array of words.  The array of a memory or of a repeat has a
+       row per element, the array of an element is a single row.  With a
+       MmapUAL, the words are copied at once."""
+    if numpy is None:
+        raise ImportError("NumPy is required by read_array")
+    dtype = {2: numpy.uint16, 4: numpy.uint32}[v._root.c_word_size]
+    shape, _ = array_shape(v)
+    return numpy.array(read_words(v), dtype=dtype).reshape(shape)
 
 
 def create_ual_access(ual, filename):
@@ -87,3 +248,12 @@ def create_ual_access(ual, filename):
     cheby.layout.layout_cheby(root)
 
     return UALValue(ual, root, root, 0)
+
+
+def create_mmap_access(device, filename, offset=0, readonly=False):
+    """Return the UALValue for the memory map :param filename: of the file
+       or device :param device: mapped from :param offset:"""
+    root = cheby.parser.parse_yaml(filename)
+    cheby.layout.layout_cheby(root)
+    ual = MmapUAL(device, root.c_size, offset, readonly)
+    return UALValue(ual, root, root, 0)
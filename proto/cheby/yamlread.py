@@ -7,6 +7,12 @@ from yaml.resolver import Resolver
 
 from yaml.constructor import SafeConstructor
 
+try:
+    from yaml.cyaml import CParser
+except ImportError:
+    # libyaml is not available.
+    CParser = None
+
 class ScanException(Exception):
     """Exception raised in case of yaml error"""
     def __init__(self, msg):
@@ -47,7 +53,34 @@ class MySafeLoader(Reader, Scanner, Parser, Composer, MySafeConstructor, Resolve
         Resolver.__init__(self)
 
 
+if CParser is not None:
+    class MyCSafeLoader(CParser, MySafeConstructor, Resolver):
+        """Same as MySafeLoader, but uses the (faster) libyaml parser."""
+
+        def __init__(self, stream):
+            CParser.__init__(self, stream)
+            MySafeConstructor.__init__(self)
+            Resolver.__init__(self)
+else:
+    MyCSafeLoader = None
+
+# Use libyaml if available (can be disabled for testing).
+use_libyaml = MyCSafeLoader is not None
+
+
 def load(raw):
+    if use_libyaml:
+        if hasattr(raw, 'read') and not (hasattr(raw, 'seekable') and raw.seekable()):
+            # The input may be read twice (after an error), but a pipe
+            # cannot be rewound.
+            raw = raw.read()
+        try:
+            return yaml.load(raw, Loader=MyCSafeLoader)
+        except yaml.YAMLError:
+            # Let the python loader report the error, so that the messages
+            # do not depend on libyaml.
+            if hasattr(raw, 'seek'):
+                raw.seek(0)
     try:
         return yaml.load(raw, Loader=MySafeLoader)
     except yaml.scanner.ScannerError as e:
@@ -2,9 +2,18 @@
 """Simple test program"""
 import sys
 import os
+import io
+import contextlib
 import subprocess
 import argparse
+import tempfile
+import glob
+import pickle
+import socket
+import threading
 import cheby.parser as parser
+import cheby.tree as tree
+import cheby.yamlread as yamlread
 import cheby.layout as layout
 import cheby.print_pretty as pprint
 import cheby.sprint as sprint
@@ -29,6 +38,15 @@ import cheby.print_rest as print_rest
 import cheby.gen_custom as gen_custom
 import cheby.gen_edge3 as gen_edge3
 import cheby.gen_silecs as gen_silecs
+import cheby.main as cheby_main
+import cheby.batch as cheby_batch
+import cheby.server as cheby_server
+import cheby.compiled as compiled
+import cheby.treecache as treecache
+import cheby.hdltree as hdltree
+import cheby.hdlopt as hdlopt
+import cheby.addrindex as addrindex
+import cheby.ual as ual
 from cheby.hdl.globals import gconfig, gconfig_scope
 
 srcdir = os.path.join(os.path.dirname(os.path.realpath(__file__)),
@@ -398,7 +416,9 @@ def test_hdl_err():
               'access/const_err_wo', 'access/const_err_nopreset',
               'access/autoclear_err_ro',
               'access/orclr_err_ro', 'access/orclr_err_wo',
-              'issue109/test']:
+              'issue109/test',
+              'features/repeat-array-err1', 'features/repeat-array-err2',
+              'features/decoder-stages-err1']:
         if args.verbose:
             print('test hdl error: {}'.format(f))
         t = parse_ok(srcdir + f + '.cheby')
@@ -469,7 +489,10 @@ def test_hdl_ref():
               'issue79/CSR', 'bug-memory/mem64ro', 'issue87/qsm_regs', 'issue89/map',
               'issue92/blockInMap', 'issue90/bugDPSSRAMbwSel',
               'bug-repmem/bran', 'bug-empty/noout', 'bug-empty/noinp',
-              'bug-cernbe/repro', 'bug-cernbe/sub_repro']:
+              'bug-cernbe/repro', 'bug-cernbe/sub_repro',
+              'features/repeat-array', 'features/decoder-stages',
+              'features/read-mux-or', 'features/axi4_pipelined',
+              'features/wb_pipelined', 'features/axi4_burst']:
         if args.verbose:
             print('test hdl with ref: {}'.format(f))
         cheby_file = srcdir + f + '.cheby'
@@ -1173,6 +1196,814 @@ def test_silecs():
             error('SILECS generation error for {}'.format(f))
         nbr_tests += 1
 
+def test_outputs_manifest():
+    # Outputs generated from a manifest must be identical to the outputs of
+    # separate runs.
+    global nbr_tests
+    outputs = [('a.vhdl', ['--gen-hdl']),
+               ('a.sv', ['--hdl=sv', '--gen-hdl']),
+               ('a_consts.h', ['--consts-style=h', '--gen-consts']),
+               ('a_consts.py', ['--consts-style=python', '--gen-consts']),
+               ('a.md', ['--doc=md', '--gen-doc']),
+               ('a.h', ['--gen-c'])]
+    for f in ['demo_all', 'features/axi4_byte', 'issue60/busgroup-axi4']:
+        if args.verbose:
+            print('test outputs manifest: {}'.format(f))
+        cheby_file = srcdir + f + '.cheby'
+        with tempfile.TemporaryDirectory() as tmp:
+            manifest = os.path.join(tmp, 'outputs.yaml')
+            with open(manifest, 'w') as fd:
+                fd.write('outputs:\n')
+                for name, opts in outputs:
+                    fd.write('  - {}: {}\n'.format(opts[-1][2:], os.path.join(tmp, 'm_' + name)))
+                    for o in opts[:-1]:
+                        fd.write('    {}: {}\n'.format(*o[2:].split('=')))
+            with gconfig_scope():
+                margs = cheby_main.decode_args(['--no-header', '-i', cheby_file, '--outputs', manifest])
+                cheby_main.handle_file(margs, cheby_file, cheby_main.load_outputs(margs, manifest))
+            for name, opts in outputs:
+                with gconfig_scope():
+                    sargs = cheby_main.decode_args(['--no-header', '-i', cheby_file] + opts[:-1]
+                                             + [opts[-1] + '=' + os.path.join(tmp, 's_' + name)])
+                    cheby_main.handle_file(sargs, cheby_file)
+                if open(os.path.join(tmp, 'm_' + name)).read() != open(os.path.join(tmp, 's_' + name)).read():
+                    error('outputs manifest mismatch for {} ({})'.format(f, name))
+        nbr_tests += 1
+    for m in ['err_option', 'err_entry']:
+        try:
+            cheby_main.load_outputs(cheby_main.decode_args([]), srcdir + 'outputs/' + m + '.yaml')
+            error('outputs manifest error expected for {}'.format(m))
+        except parser.ParseException:
+            pass
+        nbr_tests += 1
+
+
+def test_tree_cache():
+    global nbr_tests
+    with tempfile.TemporaryDirectory() as tmp:
+        for f in ['demo_all.cheby', 'demo_all_sub.cheby']:
+            with open(os.path.join(tmp, f), 'w') as fd:
+                fd.write(open(srcdir + f).read())
+        top = os.path.join(tmp, 'demo_all.cheby')
+        sub = os.path.join(tmp, 'demo_all_sub.cheby')
+        cache = treecache.TreeCache(os.path.join(tmp, 'cache'), 1 << 20)
+        layout.tree_cache = cache
+        try:
+            # The cached tree must be identical to the original one.
+            ref = write_buffer()
+            t = parse_ok(top)
+            layout_ok(t)
+            pprint.pprint_cheby(ref, t)
+            for _ in range(2):
+                t = layout.parse_and_layout(top, layout.layout_cheby)
+                buf = write_buffer()
+                pprint.pprint_cheby(buf, t)
+                if buf.get() != ref.get():
+                    error('tree cache: cached tree differs')
+            if cache.load(top, 'layout_cheby') is None:
+                error('tree cache: entry expected')
+            nbr_tests += 1
+
+            # Modification of an included file invalidates the entry.
+            with open(sub, 'a') as fd:
+                fd.write('\n')
+            if cache.load(top, 'layout_cheby') is not None:
+                error('tree cache: entry not invalidated')
+            nbr_tests += 1
+
+            # Size limit.
+            cache.max_size = 0
+            cache.trim()
+            if os.listdir(cache.dirname):
+                error('tree cache: entries not removed')
+            nbr_tests += 1
+        finally:
+            layout.tree_cache = None
+
+
+def test_submap_memo():
+    # A file included several times is loaded once, but each instance
+    # has its own nodes.
+    global nbr_tests
+    layout.submap_memo.clear()
+    t = parse_ok(srcdir + 'submap-memo/top.cheby')
+    layout_ok(t)
+    if len(layout.submap_memo) != 2:
+        error('submap memo: {} files loaded'.format(len(layout.submap_memo)))
+    m0, m1, l2 = t.children
+    leaves = [m0.c_submap.children[0].c_submap, m0.c_submap.children[1].c_submap,
+              m1.c_submap.children[0].c_submap, m1.c_submap.children[1].c_submap,
+              l2.c_submap]
+    regs = [l.children[0] for l in leaves]
+    if len(set(id(r) for r in regs)) != len(regs):
+        error('submap memo: instances share nodes')
+    if len(set(r.c_abs_addr for r in regs)) != len(regs):
+        error('submap memo: incorrect absolute addresses')
+    if any(l in layout.submap_memo.values() for l in leaves):
+        error('submap memo: memo tree is used')
+    nbr_tests += 1
+
+
+def test_parallel_submaps():
+    # Loading the submaps in parallel gives the same trees and the same
+    # messages and errors as the serial load.
+    global nbr_tests
+    for f in ['submap-memo/top.cheby', 'demo_all.cheby', 'submap-memo/top_err.cheby']:
+        res = []
+        for jobs in [1, 3]:
+            layout.submap_memo.clear()
+            buf = write_buffer()
+            old_stderr = sys.stderr
+            sys.stderr = buf
+            try:
+                t = layout.parse_and_layout(srcdir + f, layout.layout_cheby, jobs)
+                pprint.pprint_cheby(buf, t)
+            except (parser.ParseException, layout.LayoutException) as e:
+                buf.write('error: {}\n'.format(e))
+            finally:
+                sys.stderr = old_stderr
+            res.append(buf.get())
+        if res[0] != res[1]:
+            error('parallel submaps: difference for {}'.format(f))
+        nbr_tests += 1
+
+
+def test_batch():
+    global nbr_tests
+    with tempfile.TemporaryDirectory() as tmp:
+        for f in ['leaf.cheby', 'mid.cheby', 'top.cheby']:
+            with open(os.path.join(tmp, f), 'w') as fd:
+                fd.write(open(srcdir + 'submap-memo/' + f).read())
+        out = os.path.join(tmp, 'out')
+        argv = ['--gen-c={}/{{name}}.h'.format(out), '--jobs=2', tmp]
+        cheby_batch.main(argv)
+        names = sorted(os.listdir(out))
+        if names != ['leaf.h', 'mid.h', 'top.h']:
+            error('batch: unexpected outputs {}'.format(names))
+        # The outputs are the same as with cheby.
+        args = cheby_main.decode_args(['--gen-c=' + os.path.join(tmp, 'ref.h')])
+        cheby_main.handle_file(args, os.path.join(tmp, 'top.cheby'))
+        if open(os.path.join(out, 'top.h')).read() != open(os.path.join(tmp, 'ref.h')).read():
+            error('batch: output differs')
+        nbr_tests += 1
+
+        # Up to date outputs are not regenerated, unless the input or
+        # an included file is more recent.
+        base = os.path.getmtime(os.path.join(out, 'top.h')) - 100
+        for f in names:
+            os.utime(os.path.join(out, f), (base, base))
+        for f in ['leaf.cheby', 'mid.cheby', 'top.cheby']:
+            os.utime(os.path.join(tmp, f), (base - 10, base - 10))
+        os.utime(os.path.join(tmp, 'mid.cheby'), (base + 10, base + 10))
+        cheby_batch.main(argv)
+        rebuilt = [f for f in names if os.path.getmtime(os.path.join(out, f)) != base]
+        if rebuilt != ['mid.h', 'top.h']:
+            error('batch: incorrect rebuild {}'.format(rebuilt))
+        nbr_tests += 1
+
+        # Errors.
+        for argv in [['--gen-c=-', tmp], ['--gen-c={x}.h', tmp],
+                     ['--gen-c=a.h', tmp], [os.path.join(tmp, 'none*.cheby')]]:
+            try:
+                cheby_batch.main(argv)
+                error('batch: error expected for {}'.format(argv))
+            except SystemExit:
+                pass
+        nbr_tests += 1
+
+        # A compiled file is its only dependency, and unreadable inputs
+        # are reported.
+        chebyc = os.path.join(tmp, 'top.chebyc')
+        args = cheby_main.decode_args(['--save-compiled=' + chebyc])
+        cheby_main.handle_file(args, os.path.join(tmp, 'top.cheby'))
+        deps = set()
+        cheby_batch.gather_files(chebyc, deps)
+        if deps != {chebyc}:
+            error('batch: incorrect dependencies {}'.format(deps))
+        bad = os.path.join(tmp, 'bad.cheby')
+        with open(bad, 'wb') as fd:
+            fd.write(b'\xff\xfe\x00')
+        try:
+            cheby_batch.main(['--gen-c={}/{{name}}.h'.format(out), chebyc, bad])
+            error('batch: error expected for {}'.format(bad))
+        except SystemExit:
+            pass
+        if open(os.path.join(out, 'top.h')).read() != open(os.path.join(tmp, 'ref.h')).read():
+            error('batch: output differs for {}'.format(chebyc))
+        nbr_tests += 1
+
+        # Other failures are reported for their file only.
+        out2 = os.path.join(tmp, 'out2')
+        os.makedirs(out2)
+        with open(os.path.join(out2, 'leaf'), 'w') as fd:
+            fd.write('not a directory\n')
+        err = io.StringIO()
+        try:
+            with contextlib.redirect_stderr(err):
+                cheby_batch.main(['--gen-c={}/{{name}}/regs.h'.format(out2), tmp])
+            error('batch: error expected for leaf.cheby')
+        except SystemExit:
+            pass
+        if os.path.join(tmp, 'leaf.cheby') + ':error: ' not in err.getvalue():
+            error('batch: incorrect message {}'.format(err.getvalue()))
+        if not all(os.path.exists(os.path.join(out2, n, 'regs.h')) for n in ['mid', 'top']):
+            error('batch: missing outputs')
+        nbr_tests += 1
+
+        # +units is not allowed with --depfile or --only-if-changed.
+        err = io.StringIO()
+        try:
+            with contextlib.redirect_stderr(err):
+                cheby_batch.main(['--gen-hdl=+units', '--only-if-changed', tmp])
+            error('batch: error expected for +units')
+        except SystemExit:
+            pass
+        if 'cannot be used' not in err.getvalue():
+            error('batch: incorrect message {}'.format(err.getvalue()))
+        nbr_tests += 1
+
+        try:
+            cheby_main.decode_args(['--save-compiled=-'])
+            error('save-compiled: error expected for stdout')
+        except SystemExit:
+            pass
+        nbr_tests += 1
+
+
+def test_depfile():
+    global nbr_tests
+    with tempfile.TemporaryDirectory() as tmp:
+        top = srcdir + 'submap-memo/top.cheby'
+        out_h = os.path.join(tmp, 'top.h')
+        out_d = os.path.join(tmp, 'top d.d')
+        argv = ['--gen-c=' + out_h, '--header=commit', '--depfile=' + out_d]
+        cheby_main.handle_file(cheby_main.decode_args(argv), top)
+        ref = '{}: \\\n  {} \\\n  {} \\\n  {}\n'.format(
+            out_h, top, srcdir + 'submap-memo/mid.cheby', srcdir + 'submap-memo/leaf.cheby')
+        if open(out_d).read() != ref:
+            error('depfile: incorrect content')
+        nbr_tests += 1
+
+        # Unchanged outputs are not rewritten.
+        old = os.path.getmtime(out_h) - 100
+        os.utime(out_h, (old, old))
+        cheby_main.open_filename.only_if_changed = True
+        try:
+            cheby_main.handle_file(cheby_main.decode_args(argv), top)
+            if os.path.getmtime(out_h) != old:
+                error('only-if-changed: unchanged output rewritten')
+            with open(out_h, 'a') as f:
+                f.write('\n')
+            os.utime(out_h, (old, old))
+            cheby_main.handle_file(cheby_main.decode_args(argv), top)
+            if os.path.getmtime(out_h) == old:
+                error('only-if-changed: changed output not rewritten')
+        finally:
+            cheby_main.open_filename.only_if_changed = False
+        nbr_tests += 1
+
+    # The per-unit outputs cannot be listed.
+    for argv in [['--gen-hdl=+units', '--hdl=sv', '--depfile=x.d'],
+                 ['--gen-hdl=+units', '--hdl=sv', '--only-if-changed']]:
+        try:
+            with contextlib.redirect_stderr(io.StringIO()):
+                cheby_main.check_units([cheby_main.decode_args(argv)])
+            error('depfile: error expected for {}'.format(argv))
+        except SystemExit:
+            pass
+    cheby_main.check_units([cheby_main.decode_args(['--gen-hdl=+units', '--hdl=sv'])])
+    nbr_tests += 1
+
+
+def test_lazy_backends():
+    # Only the needed back-ends are imported.
+    global nbr_tests
+    script = ('import sys\n'
+              'import cheby.main\n'
+              'sys.argv = ["cheby", "--gen-c=" + sys.argv[1], "-i", sys.argv[2]]\n'
+              'cheby.main.main()\n'
+              'print(" ".join(sorted(m for m in sys.modules if m.startswith("cheby."))))\n')
+    with tempfile.TemporaryDirectory() as tmp:
+        out = subprocess.check_output(
+            [sys.executable, '-c', script, os.path.join(tmp, 'demo.h'), srcdir + 'demo.cheby'],
+            stderr=subprocess.DEVNULL, universal_newlines=True)
+    modules = out.split()
+    if 'cheby.gen_c' not in modules:
+        error('lazy backends: gen_c not loaded')
+    for m in ['cheby.gen_hdl', 'cheby.print_vhdl', 'cheby.gen_wbgen_hdl',
+              'cheby.gen_gena_regctrl', 'cheby.print_latex', 'cheby.treecache']:
+        if m in modules:
+            error('lazy backends: {} loaded'.format(m))
+    nbr_tests += 1
+
+
+def test_server():
+    global nbr_tests
+    with tempfile.TemporaryDirectory() as tmp:
+        for f in ['demo_all.cheby', 'demo_all_sub.cheby']:
+            with open(os.path.join(tmp, f), 'w') as fd:
+                fd.write(open(srcdir + f).read())
+        path = os.path.join(tmp, 'sock')
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.bind(path)
+        sock.listen()
+        thread = threading.Thread(target=cheby_server.serve, args=(sock,))
+        thread.start()
+        try:
+            argv = ['--gen-c=-', '--header=none', '-i', 'demo_all.cheby']
+            ref = subprocess.check_output([sys.executable, '-m', 'cheby.main'] + argv,
+                                          cwd=tmp, stderr=subprocess.DEVNULL,
+                                          env=dict(os.environ, PYTHONPATH=os.getcwd()))
+            msg = {'cwd': tmp, 'argv': argv}
+            for loading in [True, False]:
+                ans = cheby_server.request(path, msg)
+                if ans['status'] != 0 or ans['stdout'] != ref.decode():
+                    error('server: incorrect output')
+                if ('Loading' in ans['stderr']) != loading:
+                    error('server: incorrect reuse of trees')
+            nbr_tests += 1
+
+            # A modified submap is reloaded.
+            os.utime(os.path.join(tmp, 'demo_all_sub.cheby'), (0, 0))
+            ans = cheby_server.request(path, msg)
+            if 'Loading' not in ans['stderr']:
+                error('server: tree not invalidated')
+            ans = cheby_server.request(path, {'cwd': tmp, 'argv': ['-i', 'none.cheby']})
+            if ans['status'] != 2 or 'none.cheby' not in ans['stderr']:
+                error('server: error not reported')
+            nbr_tests += 1
+
+            # A modified submap of a submap is reloaded.
+            files = {
+                'top.cheby': ('memory-map:\n  name: top\n  bus: wb-32-be\n'
+                              '  children:\n  - submap:\n      name: mid\n'
+                              '      filename: mid.cheby\n      include: True\n'),
+                'mid.cheby': ('memory-map:\n  name: mid\n  bus: wb-32-be\n'
+                              '  children:\n  - submap:\n      name: leaf\n'
+                              '      filename: leaf.cheby\n      include: True\n'),
+                'leaf.cheby': ('memory-map:\n  name: leaf\n  bus: wb-32-be\n'
+                               '  children:\n  - reg:\n      name: REG\n'
+                               '      width: 32\n      access: rw\n')}
+            for f, content in files.items():
+                with open(os.path.join(tmp, f), 'w') as fd:
+                    fd.write(content)
+            msg = {'cwd': tmp, 'argv': ['--print-simple=-', '-i', 'top.cheby']}
+            leaf = os.path.join(tmp, 'leaf.cheby')
+            for i, name in enumerate(['reg1', 'reg2']):
+                with open(leaf, 'w') as fd:
+                    fd.write(files['leaf.cheby'].replace('REG', name))
+                # Be sure the modification time changes.
+                os.utime(leaf, ns=(0, i))
+                ans = cheby_server.request(path, msg)
+                if ans['status'] != 0 or name not in ans['stdout']:
+                    error('server: nested submap not reloaded')
+            nbr_tests += 1
+        finally:
+            cheby_server.request(path, {'shutdown': True})
+            thread.join()
+            sock.close()
+            layout.tree_cache = None
+
+
+def test_yaml_loaders():
+    # The libyaml loader gives the same results and errors as the python one.
+    global nbr_tests
+    if yamlread.MyCSafeLoader is None:
+        return
+    errors = ["a: b: c\n", "a:\n\t- b\n", "[a, b\n", "a: 'x\n", "- a\nb: c\n", "a: *x\n"]
+    with tempfile.TemporaryDirectory() as tmp:
+        files = sorted(glob.glob(srcdir + '**/*.cheby', recursive=True))
+        for i, e in enumerate(errors):
+            files.append(os.path.join(tmp, 'err{}.cheby'.format(i)))
+            with open(files[-1], 'w') as f:
+                f.write(e)
+        for f in files:
+            res = []
+            for use_libyaml in [False, True]:
+                yamlread.use_libyaml = use_libyaml
+                try:
+                    res.append(yamlread.load(open(f)))
+                except Exception as e:
+                    res.append('{}: {}'.format(type(e).__name__, e))
+            if res[0] != res[1]:
+                error('yaml loaders: difference for {}'.format(f))
+    # The error of an input which cannot be rewound (like stdin).
+    rd, wr = os.pipe()
+    with os.fdopen(wr, 'w') as f:
+        f.write(errors[0])
+    with os.fdopen(rd) as f:
+        try:
+            yamlread.load(f)
+            error('yaml loaders: error expected for a pipe')
+        except yamlread.ScanException:
+            pass
+    nbr_tests += 1
+
+
+def test_compiled():
+    global nbr_tests
+    with tempfile.TemporaryDirectory() as tmp:
+        chebyc = os.path.join(tmp, 'demo_all.chebyc')
+        for f in ['demo_all.cheby', 'issue60/busgroup-axi4.cheby', 'bug-gen-c-02/mbox_regs.cheby']:
+            res = []
+            for inp, extra in [(srcdir + f, ['--save-compiled=' + chebyc]), (chebyc, [])]:
+                out = os.path.join(tmp, 'out.vhd')
+                args = cheby_main.decode_args(['--header=none', '--gen-hdl=' + out] + extra)
+                cheby_main.handle_file(args, inp)
+                res.append(open(out).read())
+            if res[0] != res[1]:
+                error('compiled: output differs for {}'.format(f))
+            nbr_tests += 1
+
+        # Errors
+        header, root = pickle.loads(open(chebyc, 'rb').read()[len(compiled.MAGIC):])
+        header['version'] = '0.0'
+        bad_version = os.path.join(tmp, 'bad_version.chebyc')
+        with open(bad_version, 'wb') as fd:
+            fd.write(compiled.MAGIC + pickle.dumps((header, root)))
+        not_compiled = os.path.join(tmp, 'not_compiled.chebyc')
+        with open(not_compiled, 'w') as fd:
+            fd.write(open(srcdir + 'demo.cheby').read())
+        for f, endian in [(bad_version, 'default'), (not_compiled, 'default'), (chebyc, 'big')]:
+            layout.word_endianness = endian
+            try:
+                compiled.load(f)
+                error('compiled: error expected for {}'.format(f))
+            except parser.ParseException:
+                pass
+            finally:
+                layout.word_endianness = 'default'
+        nbr_tests += 1
+
+
+def test_decoder_plan():
+    # The decoder plan reaches every element, and is shared by the read
+    # and the write processes.
+    global nbr_tests
+    import cheby.hdl.decoder as decoder
+
+    def plan_leaves(plan, res):
+        if isinstance(plan, decoder.DecoderLeaf):
+            if plan.el is not None:
+                res.add(id(plan.el))
+        else:
+            for _, sub in plan.choices:
+                plan_leaves(sub, res)
+
+    for f in ['demo_all.cheby', 'features/mapinfo1.cheby', 'features/reg128.cheby']:
+        t = parse_ok(srcdir + f)
+        layout_ok(t)
+        expand_hdl.expand_hdl(t)
+        gen_name.gen_name_memmap(t)
+        gen_hdl.generate_hdl(t)
+        res = set()
+        plan_leaves(t.h_decoder, res)
+        if res != set(id(el) for el in decoder.gather_leaves(t)):
+            error('decoder: elements not decoded for {}'.format(f))
+        nbr_tests += 1
+
+
+def test_unroll_on_demand():
+    # Repeats are unrolled only by unroll_hdl.
+    global nbr_tests
+
+    def count_repeats(n, res):
+        if isinstance(n, tree.RepeatBlock):
+            res['RepeatBlock'] += 1
+        elif isinstance(n, tree.Repeat):
+            res['Repeat'] += 1
+        if isinstance(n, tree.Submap):
+            if n.filename is not None:
+                count_repeats(n.c_submap, res)
+        elif isinstance(n, tree.CompositeNode):
+            for el in n.children:
+                count_repeats(el, res)
+
+    for f in ['demo_all.cheby', 'issue143/map.cheby']:
+        t = parse_ok(srcdir + f)
+        layout_ok(t)
+        expand_hdl.expand_hdl(t, False)
+        res = {'Repeat': 0, 'RepeatBlock': 0}
+        count_repeats(t, res)
+        if res['Repeat'] == 0 or res['RepeatBlock'] != 0:
+            error('unroll: repeats unrolled too early in {}'.format(f))
+        expand_hdl.unroll_hdl(t)
+        res = {'Repeat': 0, 'RepeatBlock': 0}
+        count_repeats(t, res)
+        if res['Repeat'] != 0 or res['RepeatBlock'] == 0:
+            error('unroll: repeats not unrolled in {}'.format(f))
+        nbr_tests += 1
+
+    # With 'repeat-style: array', the repeats are unrolled for all the
+    # generators but the HDL.
+    f = 'features/repeat-array.cheby'
+    consts = []
+    for style in ['array', 'unroll']:
+        t = parse_ok(srcdir + f)
+        for c in t.children:
+            if isinstance(c, tree.Repeat):
+                c.x_hdl['repeat-style'] = style
+        layout_ok(t)
+        expand_hdl.expand_hdl(t)
+        gen_name.gen_name_memmap(t)
+        buf = write_buffer()
+        print_consts.pconsts_cheby(buf, t, 'h')
+        consts.append(buf.get())
+        h = gen_hdl.generate_hdl(t)
+        res = {'Repeat': 0, 'RepeatBlock': 0}
+        count_repeats(t, res)
+        if res['Repeat'] != 0:
+            error('unroll: repeat-style modified the tree in {}'.format(f))
+        if (len([s for s in h.stmts if isinstance(s, hdltree.HDLGenFor)]) == 0) \
+           != (style == 'unroll'):
+            error('unroll: bad hdl for repeat-style {} in {}'.format(style, f))
+    if consts[0] != consts[1]:
+        error('unroll: repeat-style modified the constants of {}'.format(f))
+    nbr_tests += 1
+
+
+def test_hdl_opt():
+    # Constant folding and removal of empty statements (--hdl-opt).
+    global nbr_tests
+    m = hdltree.HDLModule('opt')
+    a = m.add_port('a_i', dir='IN')
+    o = m.add_port('o_o', dir='OUT')
+    s = m.new_HDLSignal('s')
+    comb = hdltree.HDLComb()
+    comb.sensitivity.append(a)
+    cond = hdltree.HDLIfElse(hdltree.HDLEq(hdltree.bit_1, hdltree.bit_1))
+    cond.then_stmts.append(hdltree.HDLAssign(o, hdltree.HDLAnd(a, hdltree.bit_1)))
+    comb.stmts.append(cond)
+    m.stmts.append(comb)
+    m.stmts.append(hdltree.HDLComb())
+    m.stmts.append(hdltree.HDLAssign(s, a))
+    stats = hdlopt.optimize(m)
+    if len(m.stmts) != 1 or len(comb.stmts) != 1 \
+       or not isinstance(comb.stmts[0], hdltree.HDLAssign) \
+       or comb.stmts[0].expr is not a:
+        error('hdl-opt: statements not simplified')
+    if stats.signals != 1 or stats.folded != 2 or stats.nodes == 0:
+        error('hdl-opt: bad statistics: {}'.format(stats))
+    nbr_tests += 1
+
+    # An if with only an else branch is inverted, which is not a removal.
+    for negated, nodes in [(False, 0), (True, 1)]:
+        m = hdltree.HDLModule('opt')
+        a = m.add_port('a_i', dir='IN')
+        o = m.add_port('o_o', dir='OUT')
+        c = hdltree.HDLEq(a, hdltree.bit_1)
+        cond = hdltree.HDLIfElse(hdltree.HDLNot(c) if negated else c)
+        cond.else_stmts.append(hdltree.HDLAssign(o, a))
+        comb = hdltree.HDLComb()
+        comb.stmts.append(cond)
+        m.stmts.append(comb)
+        stats = hdlopt.optimize(m)
+        if not cond.then_stmts or cond.else_stmts is not None:
+            error('hdl-opt: if not inverted')
+        if stats.nodes != nodes or stats.folded != 0:
+            error('hdl-opt: bad statistics for an inverted if: {}'.format(stats))
+        nbr_tests += 1
+
+    # Each fold is counted once, including a constant bit as a condition.
+    simplify = hdlopt.Simplify()
+    c = simplify.fold_cond(hdltree.HDLOr(
+        hdltree.HDLNot(hdltree.HDLNot(hdltree.HDLEq(a, hdltree.bit_1))),
+        hdltree.HDLParen(hdltree.HDLNot(hdltree.bit_1))))
+    if not isinstance(c, hdltree.HDLEq) or simplify.folded != 4:
+        error('hdl-opt: bad folding of a condition ({} folds)'.format(simplify.folded))
+    nbr_tests += 1
+
+    # The optimized modules can still be printed.
+    fd = write_null()
+    for f in ['demo_all.cheby', 'features/axi4_burst.cheby', 'features/wb_pipelined.cheby']:
+        t = parse_ok(srcdir + f)
+        layout_ok(t)
+        expand_hdl.expand_hdl(t)
+        gen_name.gen_name_memmap(t)
+        h = gen_hdl.generate_hdl(t)
+        hdlopt.optimize(h)
+        print_vhdl.print_vhdl(fd, h)
+        print_verilog.print_verilog(fd, h)
+        nbr_tests += 1
+
+
+def test_visitor_cache():
+    # The cached methods of the visitors are invalidated by register.
+    global nbr_tests
+
+    class V(tree.Visitor):
+        pass
+
+    class W(V):
+        pass
+
+    @V.register(tree.Root)
+    def v_root(v, n):
+        return 'V'
+
+    root = tree.Root()
+    if W().visit(root) != 'V':
+        error('visitor: base method not found')
+
+    @W.register(tree.Root)
+    def w_root(v, n):
+        return 'W'
+
+    if W().visit(root) != 'W' or V().visit(root) != 'V':
+        error('visitor: cache not invalidated by register')
+    nbr_tests += 1
+
+
+def test_tree_slots():
+    # Copies of nodes keep the slots (set or not) and the extensions.
+    global nbr_tests
+    root = tree.Root()
+    reg = tree.Reg(root)
+    reg.name = 'r'
+    reg.x_hdl = {'type': 'wire'}
+    del reg.c_name
+    res = layout.NamedNode_copy(reg, root)
+    if res.name != 'r' or res.x_hdl is not reg.x_hdl or res.parent is not root:
+        error('tree: bad copy of a node')
+    if hasattr(res, 'c_name') or hasattr(res, 'c_sorted_fields'):
+        error('tree: unset slot set by the copy')
+    nbr_tests += 1
+
+
+def test_name_index():
+    # Lookup of children by name and of nodes by path.
+    global nbr_tests
+    t = parse_ok(srcdir + 'demo_all.cheby')
+    layout_ok(t)
+    for n in [t] + [c for c in t.children if isinstance(c, tree.Block)]:
+        for c in n.children:
+            if n.get_child(c.name) is not c:
+                error('index: child {} not found'.format(c.get_path()))
+            if t.get_by_path(c.get_path()) is not c:
+                error('index: path {} not found'.format(c.get_path()))
+    if t.get_child('no-such-child') is not None \
+       or t.get_by_path(t.get_path() + '/no/such/node') is not None:
+        error('index: unexpected child found')
+    nbr_tests += 1
+
+    # The indexes follow the changes of the children.
+    reg = tree.Reg(t)
+    reg.name = 'new_reg'
+    t.children.append(reg)
+    if t.get_child('new_reg') is not reg \
+       or t.get_by_path(reg.get_path()) is not reg:
+        error('index: new child not found')
+    old = t.children[0]
+    path = old.get_path()
+    t.children = t.children[1:]
+    if t.get_child(old.name) is not None or t.get_by_path(path) is not None:
+        error('index: removed child found')
+    nbr_tests += 1
+
+    # Children replaced or renamed in place.
+    old = t.children[0]
+    path = old.get_path()
+    new = tree.Reg(t)
+    new.name = 'new_reg0'
+    t.children[0] = new
+    if t.get_child(old.name) is not None or t.get_child('new_reg0') is not new \
+       or t.get_by_path(path) is not None or t.get_by_path(new.get_path()) is not new:
+        error('index: replaced child found')
+    new.name = 'renamed_reg0'
+    if t.get_child('new_reg0') is not None or t.get_child('renamed_reg0') is not new \
+       or t.get_by_path(t.get_path() + '/new_reg0') is not None \
+       or t.get_by_path(new.get_path()) is not new:
+        error('index: renamed child not found')
+    blk = [c for c in t.children if isinstance(c, tree.Block) and c.children][0]
+    c = blk.children[0]
+    path = c.get_path()
+    blk.name = 'renamed_blk'
+    if t.get_by_path(path) is not None or t.get_by_path(c.get_path()) is not c:
+        error('index: child of a renamed block not found')
+    nbr_tests += 1
+
+    # A missing path does not rebuild the index.
+    idx = t.c_path_index
+    if t.get_by_path(t.get_path() + '/no/such/node') is not None \
+       or t.c_path_index is not idx:
+        error('index: path index rebuilt on a miss')
+    nbr_tests += 1
+
+
+def test_address_index():
+    # Reverse lookup of addresses.
+    global nbr_tests
+    t = parse_ok(srcdir + 'demo_all.cheby')
+    layout_ok(t)
+    idx = addrindex.AddressIndex(t)
+    for addr, ref in [(0x0, '/demo_all/reg0 [field00, field01, field02]'),
+                      (0xc, '/demo_all/reg2+0x4 [field10, field11]'),
+                      (0x14, '/demo_all/block1/b1reg1 [f0, f1]'),
+                      (0x2a, '/demo_all/sub1/reg2+0x2 [field1]'),
+                      (0x1c, None), (0x40, None), (0x1004, '/demo_all/sub3+0x4')]:
+        m = idx.lookup(addr)
+        if (None if m is None else str(m)) != ref:
+            error('addrindex: bad lookup at 0x{:x}: {}'.format(addr, m))
+    nbr_tests += 1
+
+    # Repeats are not unrolled.
+    t = parse_ok(srcdir + 'bug-gen-c-02/fip_urv_regs.cheby')
+    layout_ok(t)
+    idx = addrindex.AddressIndex(t)
+    m = idx.lookup(0x4c)
+    if m is None or m.path != '/fip_urv_regs/boards[3]/pins':
+        error('addrindex: bad lookup in a repeat: {}'.format(m))
+    nbr_tests += 1
+
+    # Bulk decoding from a file.
+    with tempfile.TemporaryDirectory() as tmp:
+        fname = os.path.join(tmp, 'addrs.txt')
+        with open(fname, 'w') as f:
+            f.write('0x4c 0x4c\n0x7fffffff\n')
+        addrs = addrindex.parse_addresses(['@' + fname, '76'])
+        if addrs != [0x4c, 0x4c, 0x7fffffff, 76]:
+            error('addrindex: bad addresses {}'.format(addrs))
+    buf = io.StringIO()
+    addrindex.decode_addresses(buf, t, addrs)
+    if buf.getvalue() != ('0x0000004c: /fip_urv_regs/boards[3]/pins\n' * 2
+                          + '0x7fffffff: -\n'
+                          + '0x0000004c: /fip_urv_regs/boards[3]/pins\n'):
+        error('addrindex: bad decoding:\n{}'.format(buf.getvalue()))
+    nbr_tests += 1
+
+    # Holes in the elements and padding after the last element.
+    t = parse_ok(srcdir + 'features/repeat-array.cheby')
+    layout_ok(t)
+    idx = addrindex.AddressIndex(t)
+    for addr, ref in [(0x54, '/repeat_array/ch[1]/status'), (0x56, None),
+                      (0x88, '/repeat_array/ev[2]/time'), (0x8c, None)]:
+        m = idx.lookup(addr)
+        if (None if m is None else str(m)) != ref:
+            error('addrindex: bad lookup at 0x{:x}: {}'.format(addr, m))
+    nbr_tests += 1
+
+
+def test_ual_mmap():
+    # Register accesses through a memory-mapped file.
+    global nbr_tests
+    with tempfile.TemporaryDirectory() as tmp:
+        dev = os.path.join(tmp, 'dev')
+        with open(dev, 'wb') as f:
+            f.write(bytes(range(256)) * 33)
+        v = ual.create_mmap_access(dev, srcdir + 'demo_all.cheby')
+        word = lambda addr: int.from_bytes(bytes(range(addr, addr + 4)), sys.byteorder)
+        # The first word of a register has the most significant bits (big endian).
+        if int(v.reg1) != word(4) or int(v.reg2) != (word(8) << 32) | word(12):
+            error('ual: bad register read')
+        if int(v.arr1[1].areg1) != word(0x04) or int(v.ram_ro1[3].value) != word(0x8c) \
+           or int(v.sub1.reg1) != word(0x24):
+            error('ual: bad read in repeat, memory or submap')
+        if v.arr1[1] is not v.arr1[1] or v.block1.b1reg0 is not v.block1.b1reg0:
+            error('ual: values not reused')
+        # An element cannot be indexed again.
+        for el in [v.arr1[1], v.ram_ro1[3]]:
+            try:
+                el[1]
+                error('ual: element indexed')
+            except TypeError:
+                pass
+        v.reg2.field10 = 0xabcd
+        v.block1.b1reg0 = 0x12345678
+        if v.reg2.field10 != 0xabcd or v.reg2.field11 != (word(8) << 16 | word(12) >> 16) & 0xffffffffff:
+            error('ual: bad field write')
+        if int(v.block1.b1reg0) != 0x12345678:
+            error('ual: bad register write')
+        # The words of a memory, of an element and of a block, through the
+        # mapping and through the word accesses.
+        class WordUAL(object):
+            def __init__(self, m):
+                self.readw = m.readw
+                self.readl = m.readl
+        w = ual.create_ual_access(WordUAL(v._ual), srcdir + 'demo_all.cheby')
+        for x in [v, w]:
+            for el, ref in [(x.ram_ro1, [int(v.ram_ro1[i].value) for i in range(32)]),
+                            (x.arr1[1], [int(v.arr1[1].areg1)]),
+                            (x.block1, [0x12345678, word(0x14), word(0x18), word(0x1c)])]:
+                if list(ual.read_words(el)) != ref:
+                    error('ual: bad read_words of {}'.format(el._node.name))
+        if ual.array_shape(v.ram_ro1) != ((32, 1), 128) or ual.array_shape(w.arr1[1]) != ((1,), 4):
+            error('ual: bad array_shape')
+        if ual.numpy is not None:
+            arr = ual.read_array(v.ram_ro1)
+            if arr.shape != (32, 1) or arr[3][0] != int(v.ram_ro1[3].value):
+                error('ual: bad read_array')
+            # The array of an element is a single row.
+            arr = ual.read_array(v.arr1[1])
+            if arr.shape != (v.arr1._node.c_elsize // 4,) \
+               or arr[0] != int(v.arr1[1].areg1):
+                error('ual: bad read_array of an element')
+        v._ual.close()
+        with open(dev, 'rb') as f:
+            if f.read()[0x10:0x14] != (0x12345678).to_bytes(4, sys.byteorder):
+                error('ual: write not in the file')
+    nbr_tests += 1
+
+
 def main():
     global args
 
@@ -1214,6 +2045,24 @@ def main():
         test_custom()
         test_edge3()
         test_silecs()
+        test_outputs_manifest()
+        test_tree_cache()
+        test_submap_memo()
+        test_parallel_submaps()
+        test_batch()
+        test_depfile()
+        test_lazy_backends()
+        test_server()
+        test_yaml_loaders()
+        test_compiled()
+        test_decoder_plan()
+        test_unroll_on_demand()
+        test_hdl_opt()
+        test_visitor_cache()
+        test_tree_slots()
+        test_name_index()
+        test_address_index()
+        test_ual_mmap()
         print("Done ({} tests)!".format(nbr_tests))
     except TestError as e:
         werr(e.msg)
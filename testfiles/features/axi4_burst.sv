@@ -0,0 +1,518 @@
+
+module axi4_burst
+  (
+    input   wire aclk,
+    input   wire areset_n,
+    input   wire awvalid,
+    output  wire awready,
+    input   wire [9:2] awaddr,
+    input   wire [2:0] awprot,
+    input   wire [7:0] awlen,
+    input   wire [2:0] awsize,
+    input   wire [1:0] awburst,
+    input   wire wvalid,
+    output  wire wready,
+    input   wire [31:0] wdata,
+    input   wire [3:0] wstrb,
+    input   wire wlast,
+    output  wire bvalid,
+    input   wire bready,
+    output  wire [1:0] bresp,
+    input   wire arvalid,
+    output  wire arready,
+    input   wire [9:2] araddr,
+    input   wire [2:0] arprot,
+    input   wire [7:0] arlen,
+    input   wire [2:0] arsize,
+    input   wire [1:0] arburst,
+    output  wire rvalid,
+    input   wire rready,
+    output  reg [31:0] rdata,
+    output  wire [1:0] rresp,
+    output  wire rlast,
+
+    // REG ctrl
+    output  wire [31:0] ctrl_o,
+
+    // REG status
+    input   wire [31:0] status_i,
+
+    // RAM port for buf
+    input   wire [5:0] buf_adr_i,
+    input   wire buf_data_rd_i,
+    output  wire [31:0] buf_data_dat_o,
+
+    // AXI-4 bus sub
+    output  wire sub_awvalid_o,
+    input   wire sub_awready_i,
+    output  wire [7:2] sub_awaddr_o,
+    output  wire [2:0] sub_awprot_o,
+    output  wire [7:0] sub_awlen_o,
+    output  wire [2:0] sub_awsize_o,
+    output  wire [1:0] sub_awburst_o,
+    output  wire sub_wvalid_o,
+    input   wire sub_wready_i,
+    output  wire [31:0] sub_wdata_o,
+    output  reg [3:0] sub_wstrb_o,
+    output  wire sub_wlast_o,
+    input   wire sub_bvalid_i,
+    output  wire sub_bready_o,
+    input   wire [1:0] sub_bresp_i,
+    output  wire sub_arvalid_o,
+    input   wire sub_arready_i,
+    output  wire [7:2] sub_araddr_o,
+    output  wire [2:0] sub_arprot_o,
+    output  wire [7:0] sub_arlen_o,
+    output  wire [2:0] sub_arsize_o,
+    output  wire [1:0] sub_arburst_o,
+    input   wire sub_rvalid_i,
+    output  wire sub_rready_o,
+    input   wire [31:0] sub_rdata_i,
+    input   wire [1:0] sub_rresp_i,
+    input   wire sub_rlast_i
+  );
+  reg wr_req;
+  reg wr_ack;
+  reg wr_err;
+  reg [9:2] wr_addr;
+  reg [31:0] wr_data;
+  reg [31:0] wr_sel;
+  reg axi_wbusy;
+  reg [9:2] axi_awaddr;
+  reg [1:0] axi_awburst;
+  reg axi_wbad;
+  reg axi_wlast;
+  reg axi_wip;
+  wire axi_wready;
+  reg axi_wdone;
+  reg [1:0] axi_werr;
+  reg rd_req;
+  reg rd_ack;
+  reg rd_err;
+  reg [9:2] rd_addr;
+  reg [31:0] rd_data;
+  reg axi_rbusy;
+  reg [9:2] axi_araddr;
+  reg [1:0] axi_arburst;
+  reg axi_rbad;
+  reg axi_rfake;
+  wire axi_rack;
+  reg [7:0] axi_arlen;
+  reg [7:0] axi_rissue;
+  reg axi_rpend;
+  reg [7:0] axi_rbeat;
+  reg axi_rip;
+  wire axi_rstart;
+  reg axi_rdone;
+  reg axi_rlast;
+  reg axi_rskid;
+  reg [31:0] axi_rskid_data;
+  reg [1:0] axi_rerr;
+  reg [1:0] axi_rskid_err;
+  reg [31:0] ctrl_reg;
+  reg ctrl_wreq;
+  wire ctrl_wack;
+  wire [31:0] buf_data_int_dato;
+  wire [31:0] buf_data_ext_dat;
+  reg buf_data_rreq;
+  reg buf_data_rack;
+  reg buf_data_int_wr;
+  reg buf_data_rp;
+  reg sub_aw_val;
+  reg sub_w_val;
+  reg sub_ar_val;
+  reg sub_rd;
+  reg sub_wr;
+  wire buf_wr;
+  wire buf_wreq;
+  reg [5:0] buf_adr_int;
+  reg [3:0] buf_sel_int;
+
+  // AW, W and B channels
+  assign awready = ~axi_wbusy;
+  assign axi_wready = (axi_wbusy & ~axi_wlast) & (~axi_wip | wr_ack);
+  assign wready = axi_wready;
+  assign bvalid = axi_wdone;
+  always_ff @(posedge(aclk))
+  begin
+    if (!areset_n)
+      begin
+        wr_req <= 1'b0;
+        axi_wbusy <= 1'b0;
+        axi_wlast <= 1'b0;
+        axi_wip <= 1'b0;
+        axi_wdone <= 1'b0;
+        axi_werr <= 2'b00;
+      end
+    else
+      begin
+        wr_req <= 1'b0;
+        if (awvalid == 1'b1 & axi_wbusy == 1'b0)
+          begin
+            axi_awaddr <= awaddr;
+            axi_awburst <= awburst;
+            if (awburst[1] == 1'b1 | ~(awsize == 3'b010))
+              axi_wbad <= 1'b1;
+            else
+              axi_wbad <= 1'b0;
+            axi_wbusy <= 1'b1;
+          end
+        if (wr_ack == 1'b1)
+          begin
+            axi_wip <= 1'b0;
+            if (wr_err == 1'b1)
+              axi_werr <= 2'b10;
+            if (axi_wlast == 1'b1)
+              axi_wdone <= 1'b1;
+          end
+        if (axi_wready == 1'b1 & wvalid == 1'b1)
+          begin
+            axi_wlast <= wlast;
+            if (axi_wbad == 1'b1)
+              begin
+                axi_werr <= 2'b10;
+                if (wlast == 1'b1)
+                  axi_wdone <= 1'b1;
+              end
+            else
+              begin
+                wr_req <= 1'b1;
+                axi_wip <= 1'b1;
+                wr_addr <= axi_awaddr;
+                if (~(axi_awburst == 2'b00))
+                  axi_awaddr <= axi_awaddr + 1;
+                wr_data <= wdata;
+                wr_sel[7:0] <= {8{wstrb[0]}};
+                wr_sel[15:8] <= {8{wstrb[1]}};
+                wr_sel[23:16] <= {8{wstrb[2]}};
+                wr_sel[31:24] <= {8{wstrb[3]}};
+              end
+          end
+        if ((axi_wdone & bready) == 1'b1)
+          begin
+            axi_wdone <= 1'b0;
+            axi_wbusy <= 1'b0;
+            axi_wlast <= 1'b0;
+            axi_werr <= 2'b00;
+          end
+      end
+  end
+  assign bresp = axi_werr;
+
+  // AR and R channels
+  assign arready = ~axi_rbusy;
+  assign rvalid = axi_rdone;
+  assign axi_rack = rd_ack | axi_rfake;
+  assign axi_rstart = (axi_rpend & (~axi_rip | axi_rack)) & (~axi_rskid & (~(axi_rdone & axi_rack) | rready));
+  always_comb
+  if (axi_rbeat == axi_arlen)
+    axi_rlast = 1'b1;
+  else
+    axi_rlast = 1'b0;
+  assign rlast = axi_rlast;
+  always_ff @(posedge(aclk))
+  begin
+    if (!areset_n)
+      begin
+        rd_req <= 1'b0;
+        axi_rfake <= 1'b0;
+        axi_rbusy <= 1'b0;
+        axi_rpend <= 1'b0;
+        axi_rip <= 1'b0;
+        rdata <= 32'b0;
+        axi_rdone <= 1'b0;
+        axi_rerr <= 2'b00;
+        axi_rskid <= 1'b0;
+      end
+    else
+      begin
+        rd_req <= 1'b0;
+        axi_rfake <= 1'b0;
+        if ((axi_rdone & rready) == 1'b1)
+          begin
+            axi_rdone <= axi_rskid;
+            axi_rerr <= axi_rskid_err;
+            rdata <= axi_rskid_data;
+            axi_rskid <= 1'b0;
+          end
+        if (axi_rack == 1'b1)
+          if (axi_rdone == 1'b0 | (rready & ~axi_rskid) == 1'b1)
+            begin
+              axi_rdone <= 1'b1;
+              if ((rd_err | axi_rbad) == 1'b0)
+                axi_rerr <= 2'b00;
+              else
+                axi_rerr <= 2'b10;
+              rdata <= rd_data;
+            end
+          else
+            begin
+              axi_rskid <= 1'b1;
+              if ((rd_err | axi_rbad) == 1'b0)
+                axi_rskid_err <= 2'b00;
+              else
+                axi_rskid_err <= 2'b10;
+              axi_rskid_data <= rd_data;
+            end
+        if (axi_rack == 1'b1)
+          axi_rip <= 1'b0;
+        if (arvalid == 1'b1 & axi_rbusy == 1'b0)
+          begin
+            axi_araddr <= araddr;
+            axi_arburst <= arburst;
+            if (arburst[1] == 1'b1 | ~(arsize == 3'b010))
+              axi_rbad <= 1'b1;
+            else
+              axi_rbad <= 1'b0;
+            axi_arlen <= arlen;
+            axi_rissue <= 8'b0;
+            axi_rbeat <= 8'b0;
+            axi_rbusy <= 1'b1;
+            axi_rpend <= 1'b1;
+          end
+        if (axi_rstart == 1'b1)
+          begin
+            axi_rip <= 1'b1;
+            if (axi_rbad == 1'b1)
+              axi_rfake <= 1'b1;
+            else
+              begin
+                rd_req <= 1'b1;
+                rd_addr <= axi_araddr;
+                if (~(axi_arburst == 2'b00))
+                  axi_araddr <= axi_araddr + 1;
+              end
+            if (axi_rissue == axi_arlen)
+              axi_rpend <= 1'b0;
+            axi_rissue <= axi_rissue + 1;
+          end
+        if ((axi_rdone & rready) == 1'b1)
+          begin
+            axi_rbeat <= axi_rbeat + 1;
+            if (axi_rlast == 1'b1)
+              axi_rbusy <= 1'b0;
+          end
+      end
+  end
+  assign rresp = axi_rerr;
+
+  // Register ctrl
+  assign ctrl_o = ctrl_reg;
+  assign ctrl_wack = ctrl_wreq;
+  always_ff @(posedge(aclk))
+  begin
+    if (!areset_n)
+      ctrl_reg <= 32'b00000000000000000000000000000000;
+    else
+      if (ctrl_wreq == 1'b1)
+        ctrl_reg <= wr_data;
+  end
+
+  // Register status
+
+  // Memory buf
+  always_comb
+  if (buf_wr == 1'b1)
+    buf_adr_int = wr_addr[7:2];
+  else
+    buf_adr_int = rd_addr[7:2];
+  assign buf_wreq = buf_data_int_wr;
+  assign buf_wr = buf_wreq;
+  cheby_dpssram #(
+      .g_data_width(32),
+      .g_size(64),
+      .g_addr_width(6),
+      .g_dual_clock(1'b0),
+      .g_use_bwsel(1'b1)
+    )
+  buf_data_raminst (
+      .clk_a_i(aclk),
+      .clk_b_i(aclk),
+      .addr_a_i(buf_adr_int),
+      .bwsel_a_i(buf_sel_int),
+      .data_a_i(wr_data),
+      .data_a_o(buf_data_int_dato),
+      .rd_a_i(buf_data_rreq),
+      .wr_a_i(buf_data_int_wr),
+      .addr_b_i(buf_adr_i),
+      .bwsel_b_i({4{1'b1}}),
+      .data_b_i(buf_data_ext_dat),
+      .data_b_o(buf_data_dat_o),
+      .rd_b_i(buf_data_rd_i),
+      .wr_b_i(1'b0)
+    );
+  
+  always_comb
+  begin
+    buf_sel_int = 4'b0;
+    if (~(wr_sel[7:0] == 8'b0))
+      buf_sel_int[0] = 1'b1;
+    if (~(wr_sel[15:8] == 8'b0))
+      buf_sel_int[1] = 1'b1;
+    if (~(wr_sel[23:16] == 8'b0))
+      buf_sel_int[2] = 1'b1;
+    if (~(wr_sel[31:24] == 8'b0))
+      buf_sel_int[3] = 1'b1;
+  end
+  always_ff @(posedge(aclk))
+  begin
+    if (!areset_n)
+      begin
+        buf_data_rack <= 1'b0;
+        buf_data_rp <= 1'b0;
+      end
+    else
+      begin
+        buf_data_rack <= (buf_data_rreq & ~buf_wreq) & ~buf_data_rack;
+        buf_data_rp <= buf_data_rreq & buf_wreq;
+      end
+  end
+
+  // Interface sub
+  assign sub_awvalid_o = sub_aw_val;
+  assign sub_awaddr_o = wr_addr[7:2];
+  assign sub_awprot_o = 3'b000;
+  assign sub_wvalid_o = sub_w_val;
+  assign sub_wdata_o = wr_data;
+  always_comb
+  begin
+    sub_wstrb_o = 4'b0;
+    if (~(wr_sel[7:0] == 8'b0))
+      sub_wstrb_o[0] = 1'b1;
+    if (~(wr_sel[15:8] == 8'b0))
+      sub_wstrb_o[1] = 1'b1;
+    if (~(wr_sel[23:16] == 8'b0))
+      sub_wstrb_o[2] = 1'b1;
+    if (~(wr_sel[31:24] == 8'b0))
+      sub_wstrb_o[3] = 1'b1;
+  end
+  assign sub_bready_o = 1'b1;
+  assign sub_arvalid_o = sub_ar_val;
+  assign sub_araddr_o = rd_addr[7:2];
+  assign sub_arprot_o = 3'b000;
+  assign sub_rready_o = 1'b1;
+  always_ff @(posedge(aclk))
+  begin
+    if (!areset_n)
+      begin
+        sub_aw_val <= 1'b0;
+        sub_w_val <= 1'b0;
+        sub_ar_val <= 1'b0;
+      end
+    else
+      begin
+        sub_aw_val <= sub_wr | (sub_aw_val & ~sub_awready_i);
+        sub_w_val <= sub_wr | (sub_w_val & ~sub_wready_i);
+        sub_ar_val <= sub_rd | (sub_ar_val & ~sub_arready_i);
+      end
+  end
+  assign sub_awlen_o = 8'b00000000;
+  assign sub_awsize_o = 3'b010;
+  assign sub_awburst_o = 2'b01;
+  assign sub_arlen_o = 8'b00000000;
+  assign sub_arsize_o = 3'b010;
+  assign sub_arburst_o = 2'b01;
+  assign sub_wlast_o = 1'b1;
+
+  // Process for write requests.
+  always_comb
+  begin
+    ctrl_wreq = 1'b0;
+    buf_data_int_wr = 1'b0;
+    sub_wr = 1'b0;
+    case (wr_addr[9:8])
+    2'b00:
+      case (wr_addr[7:2])
+      6'b000000:
+        begin
+          // Reg ctrl
+          ctrl_wreq = wr_req;
+          wr_ack = ctrl_wack;
+          wr_err = 1'b0;
+        end
+      6'b000001:
+        begin
+          // Reg status
+          wr_ack = wr_req;
+          wr_err = wr_req;
+        end
+      default:
+        begin
+          wr_ack = wr_req;
+          wr_err = wr_req;
+        end
+      endcase
+    2'b01:
+      begin
+        // Memory buf
+        buf_data_int_wr = wr_req;
+        wr_ack = wr_req;
+        wr_err = 1'b0;
+      end
+    2'b10:
+      begin
+        // Submap sub
+        sub_wr = wr_req;
+        wr_ack = sub_bvalid_i;
+      end
+    default:
+      begin
+        wr_ack = wr_req;
+        wr_err = wr_req;
+      end
+    endcase
+  end
+
+  // Process for read requests.
+  always_comb
+  begin
+    // By default ack read requests
+    rd_data = {32{1'bx}};
+    buf_data_rreq = 1'b0;
+    sub_rd = 1'b0;
+    case (rd_addr[9:8])
+    2'b00:
+      case (rd_addr[7:2])
+      6'b000000:
+        begin
+          // Reg ctrl
+          rd_ack = rd_req;
+          rd_err = 1'b0;
+          rd_data = ctrl_reg;
+        end
+      6'b000001:
+        begin
+          // Reg status
+          rd_ack = rd_req;
+          rd_err = 1'b0;
+          rd_data = status_i;
+        end
+      default:
+        begin
+          rd_ack = rd_req;
+          rd_err = rd_req;
+        end
+      endcase
+    2'b01:
+      begin
+        // Memory buf
+        rd_data = buf_data_int_dato;
+        buf_data_rreq = rd_req | buf_data_rp;
+        rd_ack = buf_data_rack;
+        rd_err = 1'b0;
+      end
+    2'b10:
+      begin
+        // Submap sub
+        sub_rd = rd_req;
+        rd_data = sub_rdata_i;
+        rd_ack = sub_rvalid_i;
+      end
+    default:
+      begin
+        rd_ack = rd_req;
+        rd_err = rd_req;
+      end
+    endcase
+  end
+endmodule
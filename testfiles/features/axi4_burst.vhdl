@@ -0,0 +1,505 @@
+library ieee;
+use ieee.std_logic_1164.all;
+use ieee.numeric_std.all;
+use work.cheby_pkg.all;
+
+entity axi4_burst is
+  port (
+    aclk                 : in    std_logic;
+    areset_n             : in    std_logic;
+    awvalid              : in    std_logic;
+    awready              : out   std_logic;
+    awaddr               : in    std_logic_vector(9 downto 2);
+    awprot               : in    std_logic_vector(2 downto 0);
+    awlen                : in    std_logic_vector(7 downto 0);
+    awsize               : in    std_logic_vector(2 downto 0);
+    awburst              : in    std_logic_vector(1 downto 0);
+    wvalid               : in    std_logic;
+    wready               : out   std_logic;
+    wdata                : in    std_logic_vector(31 downto 0);
+    wstrb                : in    std_logic_vector(3 downto 0);
+    wlast                : in    std_logic;
+    bvalid               : out   std_logic;
+    bready               : in    std_logic;
+    bresp                : out   std_logic_vector(1 downto 0);
+    arvalid              : in    std_logic;
+    arready              : out   std_logic;
+    araddr               : in    std_logic_vector(9 downto 2);
+    arprot               : in    std_logic_vector(2 downto 0);
+    arlen                : in    std_logic_vector(7 downto 0);
+    arsize               : in    std_logic_vector(2 downto 0);
+    arburst              : in    std_logic_vector(1 downto 0);
+    rvalid               : out   std_logic;
+    rready               : in    std_logic;
+    rdata                : out   std_logic_vector(31 downto 0);
+    rresp                : out   std_logic_vector(1 downto 0);
+    rlast                : out   std_logic;
+
+    -- REG ctrl
+    ctrl_o               : out   std_logic_vector(31 downto 0);
+
+    -- REG status
+    status_i             : in    std_logic_vector(31 downto 0);
+
+    -- RAM port for buf
+    buf_adr_i            : in    std_logic_vector(5 downto 0);
+    buf_data_rd_i        : in    std_logic;
+    buf_data_dat_o       : out   std_logic_vector(31 downto 0);
+
+    -- AXI-4 bus sub
+    sub_awvalid_o        : out   std_logic;
+    sub_awready_i        : in    std_logic;
+    sub_awaddr_o         : out   std_logic_vector(7 downto 2);
+    sub_awprot_o         : out   std_logic_vector(2 downto 0);
+    sub_awlen_o          : out   std_logic_vector(7 downto 0);
+    sub_awsize_o         : out   std_logic_vector(2 downto 0);
+    sub_awburst_o        : out   std_logic_vector(1 downto 0);
+    sub_wvalid_o         : out   std_logic;
+    sub_wready_i         : in    std_logic;
+    sub_wdata_o          : out   std_logic_vector(31 downto 0);
+    sub_wstrb_o          : out   std_logic_vector(3 downto 0);
+    sub_wlast_o          : out   std_logic;
+    sub_bvalid_i         : in    std_logic;
+    sub_bready_o         : out   std_logic;
+    sub_bresp_i          : in    std_logic_vector(1 downto 0);
+    sub_arvalid_o        : out   std_logic;
+    sub_arready_i        : in    std_logic;
+    sub_araddr_o         : out   std_logic_vector(7 downto 2);
+    sub_arprot_o         : out   std_logic_vector(2 downto 0);
+    sub_arlen_o          : out   std_logic_vector(7 downto 0);
+    sub_arsize_o         : out   std_logic_vector(2 downto 0);
+    sub_arburst_o        : out   std_logic_vector(1 downto 0);
+    sub_rvalid_i         : in    std_logic;
+    sub_rready_o         : out   std_logic;
+    sub_rdata_i          : in    std_logic_vector(31 downto 0);
+    sub_rresp_i          : in    std_logic_vector(1 downto 0);
+    sub_rlast_i          : in    std_logic
+  );
+end axi4_burst;
+
+architecture syn of axi4_burst is
+  signal wr_req                         : std_logic;
+  signal wr_ack                         : std_logic;
+  signal wr_err                         : std_logic;
+  signal wr_addr                        : std_logic_vector(9 downto 2);
+  signal wr_data                        : std_logic_vector(31 downto 0);
+  signal wr_sel                         : std_logic_vector(31 downto 0);
+  signal axi_wbusy                      : std_logic;
+  signal axi_awaddr                     : std_logic_vector(9 downto 2);
+  signal axi_awburst                    : std_logic_vector(1 downto 0);
+  signal axi_wbad                       : std_logic;
+  signal axi_wlast                      : std_logic;
+  signal axi_wip                        : std_logic;
+  signal axi_wready                     : std_logic;
+  signal axi_wdone                      : std_logic;
+  signal axi_werr                       : std_logic_vector(1 downto 0);
+  signal rd_req                         : std_logic;
+  signal rd_ack                         : std_logic;
+  signal rd_err                         : std_logic;
+  signal rd_addr                        : std_logic_vector(9 downto 2);
+  signal rd_data                        : std_logic_vector(31 downto 0);
+  signal axi_rbusy                      : std_logic;
+  signal axi_araddr                     : std_logic_vector(9 downto 2);
+  signal axi_arburst                    : std_logic_vector(1 downto 0);
+  signal axi_rbad                       : std_logic;
+  signal axi_rfake                      : std_logic;
+  signal axi_rack                       : std_logic;
+  signal axi_arlen                      : std_logic_vector(7 downto 0);
+  signal axi_rissue                     : std_logic_vector(7 downto 0);
+  signal axi_rpend                      : std_logic;
+  signal axi_rbeat                      : std_logic_vector(7 downto 0);
+  signal axi_rip                        : std_logic;
+  signal axi_rstart                     : std_logic;
+  signal axi_rdone                      : std_logic;
+  signal axi_rlast                      : std_logic;
+  signal axi_rskid                      : std_logic;
+  signal axi_rskid_data                 : std_logic_vector(31 downto 0);
+  signal axi_rerr                       : std_logic_vector(1 downto 0);
+  signal axi_rskid_err                  : std_logic_vector(1 downto 0);
+  signal ctrl_reg                       : std_logic_vector(31 downto 0);
+  signal ctrl_wreq                      : std_logic;
+  signal ctrl_wack                      : std_logic;
+  signal buf_data_int_dato              : std_logic_vector(31 downto 0);
+  signal buf_data_ext_dat               : std_logic_vector(31 downto 0);
+  signal buf_data_rreq                  : std_logic;
+  signal buf_data_rack                  : std_logic;
+  signal buf_data_int_wr                : std_logic;
+  signal buf_data_rp                    : std_logic;
+  signal sub_aw_val                     : std_logic;
+  signal sub_w_val                      : std_logic;
+  signal sub_ar_val                     : std_logic;
+  signal sub_rd                         : std_logic;
+  signal sub_wr                         : std_logic;
+  signal buf_wr                         : std_logic;
+  signal buf_wreq                       : std_logic;
+  signal buf_adr_int                    : std_logic_vector(5 downto 0);
+  signal buf_sel_int                    : std_logic_vector(3 downto 0);
+begin
+
+  -- AW, W and B channels
+  awready <= not axi_wbusy;
+  axi_wready <= (axi_wbusy and not axi_wlast) and (not axi_wip or wr_ack);
+  wready <= axi_wready;
+  bvalid <= axi_wdone;
+  process (aclk) begin
+    if rising_edge(aclk) then
+      if areset_n = '0' then
+        wr_req <= '0';
+        axi_wbusy <= '0';
+        axi_wlast <= '0';
+        axi_wip <= '0';
+        axi_wdone <= '0';
+        axi_werr <= "00";
+      else
+        wr_req <= '0';
+        if awvalid = '1' and axi_wbusy = '0' then
+          axi_awaddr <= awaddr;
+          axi_awburst <= awburst;
+          if awburst(1) = '1' or not (awsize = "010") then
+            axi_wbad <= '1';
+          else
+            axi_wbad <= '0';
+          end if;
+          axi_wbusy <= '1';
+        end if;
+        if wr_ack = '1' then
+          axi_wip <= '0';
+          if wr_err = '1' then
+            axi_werr <= "10";
+          end if;
+          if axi_wlast = '1' then
+            axi_wdone <= '1';
+          end if;
+        end if;
+        if axi_wready = '1' and wvalid = '1' then
+          axi_wlast <= wlast;
+          if axi_wbad = '1' then
+            axi_werr <= "10";
+            if wlast = '1' then
+              axi_wdone <= '1';
+            end if;
+          else
+            wr_req <= '1';
+            axi_wip <= '1';
+            wr_addr <= axi_awaddr;
+            if not (axi_awburst = "00") then
+              axi_awaddr <= std_logic_vector(unsigned(axi_awaddr) + 1);
+            end if;
+            wr_data <= wdata;
+            wr_sel(7 downto 0) <= (others => wstrb(0));
+            wr_sel(15 downto 8) <= (others => wstrb(1));
+            wr_sel(23 downto 16) <= (others => wstrb(2));
+            wr_sel(31 downto 24) <= (others => wstrb(3));
+          end if;
+        end if;
+        if (axi_wdone and bready) = '1' then
+          axi_wdone <= '0';
+          axi_wbusy <= '0';
+          axi_wlast <= '0';
+          axi_werr <= "00";
+        end if;
+      end if;
+    end if;
+  end process;
+  bresp <= axi_werr;
+
+  -- AR and R channels
+  arready <= not axi_rbusy;
+  rvalid <= axi_rdone;
+  axi_rack <= rd_ack or axi_rfake;
+  axi_rstart <= (axi_rpend and (not axi_rip or axi_rack)) and (not axi_rskid and (not (axi_rdone and axi_rack) or rready));
+  process (axi_rbeat, axi_arlen) begin
+    if axi_rbeat = axi_arlen then
+      axi_rlast <= '1';
+    else
+      axi_rlast <= '0';
+    end if;
+  end process;
+  rlast <= axi_rlast;
+  process (aclk) begin
+    if rising_edge(aclk) then
+      if areset_n = '0' then
+        rd_req <= '0';
+        axi_rfake <= '0';
+        axi_rbusy <= '0';
+        axi_rpend <= '0';
+        axi_rip <= '0';
+        rdata <= (others => '0');
+        axi_rdone <= '0';
+        axi_rerr <= "00";
+        axi_rskid <= '0';
+      else
+        rd_req <= '0';
+        axi_rfake <= '0';
+        if (axi_rdone and rready) = '1' then
+          axi_rdone <= axi_rskid;
+          axi_rerr <= axi_rskid_err;
+          rdata <= axi_rskid_data;
+          axi_rskid <= '0';
+        end if;
+        if axi_rack = '1' then
+          if axi_rdone = '0' or (rready and not axi_rskid) = '1' then
+            axi_rdone <= '1';
+            if (rd_err or axi_rbad) = '0' then
+              axi_rerr <= "00";
+            else
+              axi_rerr <= "10";
+            end if;
+            rdata <= rd_data;
+          else
+            axi_rskid <= '1';
+            if (rd_err or axi_rbad) = '0' then
+              axi_rskid_err <= "00";
+            else
+              axi_rskid_err <= "10";
+            end if;
+            axi_rskid_data <= rd_data;
+          end if;
+        end if;
+        if axi_rack = '1' then
+          axi_rip <= '0';
+        end if;
+        if arvalid = '1' and axi_rbusy = '0' then
+          axi_araddr <= araddr;
+          axi_arburst <= arburst;
+          if arburst(1) = '1' or not (arsize = "010") then
+            axi_rbad <= '1';
+          else
+            axi_rbad <= '0';
+          end if;
+          axi_arlen <= arlen;
+          axi_rissue <= (others => '0');
+          axi_rbeat <= (others => '0');
+          axi_rbusy <= '1';
+          axi_rpend <= '1';
+        end if;
+        if axi_rstart = '1' then
+          axi_rip <= '1';
+          if axi_rbad = '1' then
+            axi_rfake <= '1';
+          else
+            rd_req <= '1';
+            rd_addr <= axi_araddr;
+            if not (axi_arburst = "00") then
+              axi_araddr <= std_logic_vector(unsigned(axi_araddr) + 1);
+            end if;
+          end if;
+          if axi_rissue = axi_arlen then
+            axi_rpend <= '0';
+          end if;
+          axi_rissue <= std_logic_vector(unsigned(axi_rissue) + 1);
+        end if;
+        if (axi_rdone and rready) = '1' then
+          axi_rbeat <= std_logic_vector(unsigned(axi_rbeat) + 1);
+          if axi_rlast = '1' then
+            axi_rbusy <= '0';
+          end if;
+        end if;
+      end if;
+    end if;
+  end process;
+  rresp <= axi_rerr;
+
+  -- Register ctrl
+  ctrl_o <= ctrl_reg;
+  ctrl_wack <= ctrl_wreq;
+  process (aclk) begin
+    if rising_edge(aclk) then
+      if areset_n = '0' then
+        ctrl_reg <= "00000000000000000000000000000000";
+      else
+        if ctrl_wreq = '1' then
+          ctrl_reg <= wr_data;
+        end if;
+      end if;
+    end if;
+  end process;
+
+  -- Register status
+
+  -- Memory buf
+  process (rd_addr, wr_addr, buf_wr) begin
+    if buf_wr = '1' then
+      buf_adr_int <= wr_addr(7 downto 2);
+    else
+      buf_adr_int <= rd_addr(7 downto 2);
+    end if;
+  end process;
+  buf_wreq <= buf_data_int_wr;
+  buf_wr <= buf_wreq;
+  buf_data_raminst: cheby_dpssram
+    generic map (
+      g_data_width         => 32,
+      g_size               => 64,
+      g_addr_width         => 6,
+      g_dual_clock         => '0',
+      g_use_bwsel          => '1'
+    )
+    port map (
+      clk_a_i              => aclk,
+      clk_b_i              => aclk,
+      addr_a_i             => buf_adr_int,
+      bwsel_a_i            => buf_sel_int,
+      data_a_i             => wr_data,
+      data_a_o             => buf_data_int_dato,
+      rd_a_i               => buf_data_rreq,
+      wr_a_i               => buf_data_int_wr,
+      addr_b_i             => buf_adr_i,
+      bwsel_b_i            => (others => '1'),
+      data_b_i             => buf_data_ext_dat,
+      data_b_o             => buf_data_dat_o,
+      rd_b_i               => buf_data_rd_i,
+      wr_b_i               => '0'
+    );
+  
+  process (wr_sel) begin
+    buf_sel_int <= (others => '0');
+    if not (wr_sel(7 downto 0) = (7 downto 0 => '0')) then
+      buf_sel_int(0) <= '1';
+    end if;
+    if not (wr_sel(15 downto 8) = (7 downto 0 => '0')) then
+      buf_sel_int(1) <= '1';
+    end if;
+    if not (wr_sel(23 downto 16) = (7 downto 0 => '0')) then
+      buf_sel_int(2) <= '1';
+    end if;
+    if not (wr_sel(31 downto 24) = (7 downto 0 => '0')) then
+      buf_sel_int(3) <= '1';
+    end if;
+  end process;
+  process (aclk) begin
+    if rising_edge(aclk) then
+      if areset_n = '0' then
+        buf_data_rack <= '0';
+        buf_data_rp <= '0';
+      else
+        buf_data_rack <= (buf_data_rreq and not buf_wreq) and not buf_data_rack;
+        buf_data_rp <= buf_data_rreq and buf_wreq;
+      end if;
+    end if;
+  end process;
+
+  -- Interface sub
+  sub_awvalid_o <= sub_aw_val;
+  sub_awaddr_o <= wr_addr(7 downto 2);
+  sub_awprot_o <= "000";
+  sub_wvalid_o <= sub_w_val;
+  sub_wdata_o <= wr_data;
+  process (wr_sel) begin
+    sub_wstrb_o <= (others => '0');
+    if not (wr_sel(7 downto 0) = (7 downto 0 => '0')) then
+      sub_wstrb_o(0) <= '1';
+    end if;
+    if not (wr_sel(15 downto 8) = (7 downto 0 => '0')) then
+      sub_wstrb_o(1) <= '1';
+    end if;
+    if not (wr_sel(23 downto 16) = (7 downto 0 => '0')) then
+      sub_wstrb_o(2) <= '1';
+    end if;
+    if not (wr_sel(31 downto 24) = (7 downto 0 => '0')) then
+      sub_wstrb_o(3) <= '1';
+    end if;
+  end process;
+  sub_bready_o <= '1';
+  sub_arvalid_o <= sub_ar_val;
+  sub_araddr_o <= rd_addr(7 downto 2);
+  sub_arprot_o <= "000";
+  sub_rready_o <= '1';
+  process (aclk) begin
+    if rising_edge(aclk) then
+      if areset_n = '0' then
+        sub_aw_val <= '0';
+        sub_w_val <= '0';
+        sub_ar_val <= '0';
+      else
+        sub_aw_val <= sub_wr or (sub_aw_val and not sub_awready_i);
+        sub_w_val <= sub_wr or (sub_w_val and not sub_wready_i);
+        sub_ar_val <= sub_rd or (sub_ar_val and not sub_arready_i);
+      end if;
+    end if;
+  end process;
+  sub_awlen_o <= "00000000";
+  sub_awsize_o <= "010";
+  sub_awburst_o <= "01";
+  sub_arlen_o <= "00000000";
+  sub_arsize_o <= "010";
+  sub_arburst_o <= "01";
+  sub_wlast_o <= '1';
+
+  -- Process for write requests.
+  process (wr_addr, wr_req, ctrl_wack, sub_bvalid_i) begin
+    ctrl_wreq <= '0';
+    buf_data_int_wr <= '0';
+    sub_wr <= '0';
+    case wr_addr(9 downto 8) is
+    when "00" =>
+      case wr_addr(7 downto 2) is
+      when "000000" =>
+        -- Reg ctrl
+        ctrl_wreq <= wr_req;
+        wr_ack <= ctrl_wack;
+        wr_err <= '0';
+      when "000001" =>
+        -- Reg status
+        wr_ack <= wr_req;
+        wr_err <= wr_req;
+      when others =>
+        wr_ack <= wr_req;
+        wr_err <= wr_req;
+      end case;
+    when "01" =>
+      -- Memory buf
+      buf_data_int_wr <= wr_req;
+      wr_ack <= wr_req;
+      wr_err <= '0';
+    when "10" =>
+      -- Submap sub
+      sub_wr <= wr_req;
+      wr_ack <= sub_bvalid_i;
+    when others =>
+      wr_ack <= wr_req;
+      wr_err <= wr_req;
+    end case;
+  end process;
+
+  -- Process for read requests.
+  process (rd_addr, rd_req, ctrl_reg, status_i, buf_data_int_dato, buf_data_rp,
+           buf_data_rack, sub_rdata_i, sub_rvalid_i) begin
+    -- By default ack read requests
+    rd_data <= (others => 'X');
+    buf_data_rreq <= '0';
+    sub_rd <= '0';
+    case rd_addr(9 downto 8) is
+    when "00" =>
+      case rd_addr(7 downto 2) is
+      when "000000" =>
+        -- Reg ctrl
+        rd_ack <= rd_req;
+        rd_err <= '0';
+        rd_data <= ctrl_reg;
+      when "000001" =>
+        -- Reg status
+        rd_ack <= rd_req;
+        rd_err <= '0';
+        rd_data <= status_i;
+      when others =>
+        rd_ack <= rd_req;
+        rd_err <= rd_req;
+      end case;
+    when "01" =>
+      -- Memory buf
+      rd_data <= buf_data_int_dato;
+      buf_data_rreq <= rd_req or buf_data_rp;
+      rd_ack <= buf_data_rack;
+      rd_err <= '0';
+    when "10" =>
+      -- Submap sub
+      sub_rd <= rd_req;
+      rd_data <= sub_rdata_i;
+      rd_ack <= sub_rvalid_i;
+    when others =>
+      rd_ack <= rd_req;
+      rd_err <= rd_req;
+    end case;
+  end process;
+end syn;
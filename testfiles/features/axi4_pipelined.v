@@ -0,0 +1,483 @@
+
+module axi4_pipelined
+  (
+    input   wire aclk,
+    input   wire areset_n,
+    input   wire awvalid,
+    output  wire awready,
+    input   wire [8:2] awaddr,
+    input   wire [2:0] awprot,
+    input   wire wvalid,
+    output  wire wready,
+    input   wire [31:0] wdata,
+    input   wire [3:0] wstrb,
+    output  wire bvalid,
+    input   wire bready,
+    output  wire [1:0] bresp,
+    input   wire arvalid,
+    output  wire arready,
+    input   wire [8:2] araddr,
+    input   wire [2:0] arprot,
+    output  wire rvalid,
+    input   wire rready,
+    output  reg [31:0] rdata,
+    output  wire [1:0] rresp,
+
+    // REG ctrl
+    output  wire [31:0] ctrl_o,
+
+    // REG status
+    input   wire [31:0] status_i,
+
+    // REG cnt
+    output  wire [63:0] cnt_o,
+
+    // RAM port for buf
+    input   wire [5:0] buf_adr_i,
+    input   wire buf_data_rd_i,
+    output  wire [31:0] buf_data_dat_o
+  );
+  reg wr_req;
+  reg wr_ack;
+  reg wr_err;
+  reg [8:2] wr_addr;
+  reg [31:0] wr_data;
+  reg [31:0] wr_sel;
+  reg axi_awskid;
+  reg [8:2] axi_awaddr;
+  reg axi_wskid;
+  reg [31:0] axi_wdata;
+  reg [3:0] axi_wstrb;
+  reg axi_wip;
+  wire axi_wstart;
+  reg axi_wdone;
+  reg axi_bskid;
+  reg [1:0] axi_werr;
+  reg [1:0] axi_bskid_err;
+  reg rd_req;
+  reg rd_ack;
+  reg rd_err;
+  reg [8:2] rd_addr;
+  reg [31:0] rd_data;
+  reg axi_arskid;
+  reg [8:2] axi_araddr;
+  reg axi_rip;
+  wire axi_rstart;
+  reg axi_rdone;
+  reg axi_rskid;
+  reg [31:0] axi_rskid_data;
+  reg [1:0] axi_rerr;
+  reg [1:0] axi_rskid_err;
+  reg [31:0] ctrl_reg;
+  reg ctrl_wreq;
+  wire ctrl_wack;
+  reg [63:0] cnt_reg;
+  reg [1:0] cnt_wreq;
+  wire [1:0] cnt_wack;
+  wire [31:0] buf_data_int_dato;
+  wire [31:0] buf_data_ext_dat;
+  reg buf_data_rreq;
+  reg buf_data_rack;
+  reg buf_data_int_wr;
+  reg buf_data_rp;
+  wire buf_wr;
+  wire buf_wreq;
+  reg [5:0] buf_adr_int;
+  reg [3:0] buf_sel_int;
+
+  // AW, W and B channels (pipelined)
+  assign awready = ~axi_awskid;
+  assign wready = ~axi_wskid;
+  assign bvalid = axi_wdone;
+  assign axi_wstart = (((~axi_wip | wr_ack) & (axi_awskid | awvalid)) & (axi_wskid | wvalid)) & (~axi_bskid & (~(axi_wdone & wr_ack) | bready));
+  always @(posedge(aclk))
+  begin
+    if (!areset_n)
+      begin
+        wr_req <= 1'b0;
+        axi_awskid <= 1'b0;
+        axi_wskid <= 1'b0;
+        axi_wip <= 1'b0;
+        axi_wdone <= 1'b0;
+        axi_werr <= 2'b00;
+        axi_bskid <= 1'b0;
+      end
+    else
+      begin
+        wr_req <= 1'b0;
+        if ((axi_wdone & bready) == 1'b1)
+          begin
+            axi_wdone <= axi_bskid;
+            axi_werr <= axi_bskid_err;
+            axi_bskid <= 1'b0;
+          end
+        if (wr_ack == 1'b1)
+          if (axi_wdone == 1'b0 | (bready & ~axi_bskid) == 1'b1)
+            begin
+              axi_wdone <= 1'b1;
+              if (wr_err == 1'b0)
+                axi_werr <= 2'b00;
+              else
+                axi_werr <= 2'b10;
+            end
+          else
+            begin
+              axi_bskid <= 1'b1;
+              if (wr_err == 1'b0)
+                axi_bskid_err <= 2'b00;
+              else
+                axi_bskid_err <= 2'b10;
+            end
+        if (wr_ack == 1'b1)
+          axi_wip <= 1'b0;
+        if (axi_wstart == 1'b1)
+          begin
+            wr_req <= 1'b1;
+            axi_wip <= 1'b1;
+            if (axi_awskid == 1'b1)
+              begin
+                wr_addr <= axi_awaddr;
+                axi_awskid <= 1'b0;
+              end
+            else
+              wr_addr <= awaddr;
+            if (axi_wskid == 1'b1)
+              begin
+                wr_data <= axi_wdata;
+                wr_sel[7:0] <= {8{axi_wstrb[0]}};
+                wr_sel[15:8] <= {8{axi_wstrb[1]}};
+                wr_sel[23:16] <= {8{axi_wstrb[2]}};
+                wr_sel[31:24] <= {8{axi_wstrb[3]}};
+                axi_wskid <= 1'b0;
+              end
+            else
+              begin
+                wr_data <= wdata;
+                wr_sel[7:0] <= {8{wstrb[0]}};
+                wr_sel[15:8] <= {8{wstrb[1]}};
+                wr_sel[23:16] <= {8{wstrb[2]}};
+                wr_sel[31:24] <= {8{wstrb[3]}};
+              end
+          end
+        else
+          begin
+            if (awvalid == 1'b1 & axi_awskid == 1'b0)
+              begin
+                axi_awaddr <= awaddr;
+                axi_awskid <= 1'b1;
+              end
+            if (wvalid == 1'b1 & axi_wskid == 1'b0)
+              begin
+                axi_wdata <= wdata;
+                axi_wstrb <= wstrb;
+                axi_wskid <= 1'b1;
+              end
+          end
+      end
+  end
+  assign bresp = axi_werr;
+
+  // AR and R channels (pipelined)
+  assign arready = ~axi_arskid;
+  assign rvalid = axi_rdone;
+  assign axi_rstart = ((~axi_rip | rd_ack) & (axi_arskid | arvalid)) & (~axi_rskid & (~(axi_rdone & rd_ack) | rready));
+  always @(posedge(aclk))
+  begin
+    if (!areset_n)
+      begin
+        rd_req <= 1'b0;
+        axi_arskid <= 1'b0;
+        axi_rip <= 1'b0;
+        rdata <= 32'b0;
+        axi_rdone <= 1'b0;
+        axi_rerr <= 2'b00;
+        axi_rskid <= 1'b0;
+      end
+    else
+      begin
+        rd_req <= 1'b0;
+        if ((axi_rdone & rready) == 1'b1)
+          begin
+            axi_rdone <= axi_rskid;
+            axi_rerr <= axi_rskid_err;
+            rdata <= axi_rskid_data;
+            axi_rskid <= 1'b0;
+          end
+        if (rd_ack == 1'b1)
+          if (axi_rdone == 1'b0 | (rready & ~axi_rskid) == 1'b1)
+            begin
+              axi_rdone <= 1'b1;
+              if (rd_err == 1'b0)
+                axi_rerr <= 2'b00;
+              else
+                axi_rerr <= 2'b10;
+              rdata <= rd_data;
+            end
+          else
+            begin
+              axi_rskid <= 1'b1;
+              if (rd_err == 1'b0)
+                axi_rskid_err <= 2'b00;
+              else
+                axi_rskid_err <= 2'b10;
+              axi_rskid_data <= rd_data;
+            end
+        if (rd_ack == 1'b1)
+          axi_rip <= 1'b0;
+        if (axi_rstart == 1'b1)
+          begin
+            rd_req <= 1'b1;
+            axi_rip <= 1'b1;
+            if (axi_arskid == 1'b1)
+              begin
+                rd_addr <= axi_araddr;
+                axi_arskid <= 1'b0;
+              end
+            else
+              rd_addr <= araddr;
+          end
+        else if (arvalid == 1'b1 & axi_arskid == 1'b0)
+          begin
+            axi_araddr <= araddr;
+            axi_arskid <= 1'b1;
+          end
+      end
+  end
+  assign rresp = axi_rerr;
+
+  // Register ctrl
+  assign ctrl_o = ctrl_reg;
+  assign ctrl_wack = ctrl_wreq;
+  always @(posedge(aclk))
+  begin
+    if (!areset_n)
+      ctrl_reg <= 32'b00000000000000000000000000000000;
+    else
+      if (ctrl_wreq == 1'b1)
+        ctrl_reg <= wr_data;
+  end
+
+  // Register status
+
+  // Register cnt
+  assign cnt_o = cnt_reg;
+  assign cnt_wack = cnt_wreq;
+  always @(posedge(aclk))
+  begin
+    if (!areset_n)
+      cnt_reg <= 64'b0000000000000000000000000000000000000000000000000000000000000000;
+    else
+      begin
+        if (cnt_wreq[0] == 1'b1)
+          cnt_reg[31:0] <= wr_data;
+        if (cnt_wreq[1] == 1'b1)
+          cnt_reg[63:32] <= wr_data;
+      end
+  end
+
+  // Memory buf
+  always @(rd_addr, wr_addr, buf_wr)
+  if (buf_wr == 1'b1)
+    buf_adr_int = wr_addr[7:2];
+  else
+    buf_adr_int = rd_addr[7:2];
+  assign buf_wreq = buf_data_int_wr;
+  assign buf_wr = buf_wreq;
+  cheby_dpssram #(
+      .g_data_width(32),
+      .g_size(64),
+      .g_addr_width(6),
+      .g_dual_clock(1'b0),
+      .g_use_bwsel(1'b1)
+    )
+  buf_data_raminst (
+      .clk_a_i(aclk),
+      .clk_b_i(aclk),
+      .addr_a_i(buf_adr_int),
+      .bwsel_a_i(buf_sel_int),
+      .data_a_i(wr_data),
+      .data_a_o(buf_data_int_dato),
+      .rd_a_i(buf_data_rreq),
+      .wr_a_i(buf_data_int_wr),
+      .addr_b_i(buf_adr_i),
+      .bwsel_b_i({4{1'b1}}),
+      .data_b_i(buf_data_ext_dat),
+      .data_b_o(buf_data_dat_o),
+      .rd_b_i(buf_data_rd_i),
+      .wr_b_i(1'b0)
+    );
+  
+  always @(wr_sel)
+  begin
+    buf_sel_int = 4'b0;
+    if (~(wr_sel[7:0] == 8'b0))
+      buf_sel_int[0] = 1'b1;
+    if (~(wr_sel[15:8] == 8'b0))
+      buf_sel_int[1] = 1'b1;
+    if (~(wr_sel[23:16] == 8'b0))
+      buf_sel_int[2] = 1'b1;
+    if (~(wr_sel[31:24] == 8'b0))
+      buf_sel_int[3] = 1'b1;
+  end
+  always @(posedge(aclk))
+  begin
+    if (!areset_n)
+      begin
+        buf_data_rack <= 1'b0;
+        buf_data_rp <= 1'b0;
+      end
+    else
+      begin
+        buf_data_rack <= (buf_data_rreq & ~buf_wreq) & ~buf_data_rack;
+        buf_data_rp <= buf_data_rreq & buf_wreq;
+      end
+  end
+
+  // Process for write requests.
+  always @(wr_addr, wr_req, ctrl_wack, cnt_wack)
+  begin
+    ctrl_wreq = 1'b0;
+    cnt_wreq = 2'b0;
+    buf_data_int_wr = 1'b0;
+    case (wr_addr[8:8])
+    1'b0:
+      case (wr_addr[7:3])
+      5'b00000:
+        case (wr_addr[2:2])
+        1'b0:
+          begin
+            // Reg ctrl
+            ctrl_wreq = wr_req;
+            wr_ack = ctrl_wack;
+            wr_err = 1'b0;
+          end
+        1'b1:
+          begin
+            // Reg status
+            wr_ack = wr_req;
+            wr_err = wr_req;
+          end
+        default:
+          begin
+            wr_ack = wr_req;
+            wr_err = wr_req;
+          end
+        endcase
+      5'b00001:
+        case (wr_addr[2:2])
+        1'b0:
+          begin
+            // Reg cnt
+            cnt_wreq[0] = wr_req;
+            wr_ack = cnt_wack[0];
+            wr_err = 1'b0;
+          end
+        1'b1:
+          begin
+            // Reg cnt
+            cnt_wreq[1] = wr_req;
+            wr_ack = cnt_wack[1];
+            wr_err = 1'b0;
+          end
+        default:
+          begin
+            wr_ack = wr_req;
+            wr_err = wr_req;
+          end
+        endcase
+      default:
+        begin
+          wr_ack = wr_req;
+          wr_err = wr_req;
+        end
+      endcase
+    1'b1:
+      begin
+        // Memory buf
+        buf_data_int_wr = wr_req;
+        wr_ack = wr_req;
+        wr_err = 1'b0;
+      end
+    default:
+      begin
+        wr_ack = wr_req;
+        wr_err = wr_req;
+      end
+    endcase
+  end
+
+  // Process for read requests.
+  always @(rd_addr, rd_req, ctrl_reg, status_i, cnt_reg, buf_data_int_dato, buf_data_rp, buf_data_rack)
+  begin
+    // By default ack read requests
+    rd_data = {32{1'bx}};
+    buf_data_rreq = 1'b0;
+    case (rd_addr[8:8])
+    1'b0:
+      case (rd_addr[7:3])
+      5'b00000:
+        case (rd_addr[2:2])
+        1'b0:
+          begin
+            // Reg ctrl
+            rd_ack = rd_req;
+            rd_err = 1'b0;
+            rd_data = ctrl_reg;
+          end
+        1'b1:
+          begin
+            // Reg status
+            rd_ack = rd_req;
+            rd_err = 1'b0;
+            rd_data = status_i;
+          end
+        default:
+          begin
+            rd_ack = rd_req;
+            rd_err = rd_req;
+          end
+        endcase
+      5'b00001:
+        case (rd_addr[2:2])
+        1'b0:
+          begin
+            // Reg cnt
+            rd_ack = rd_req;
+            rd_err = 1'b0;
+            rd_data = cnt_reg[31:0];
+          end
+        1'b1:
+          begin
+            // Reg cnt
+            rd_ack = rd_req;
+            rd_err = 1'b0;
+            rd_data = cnt_reg[63:32];
+          end
+        default:
+          begin
+            rd_ack = rd_req;
+            rd_err = rd_req;
+          end
+        endcase
+      default:
+        begin
+          rd_ack = rd_req;
+          rd_err = rd_req;
+        end
+      endcase
+    1'b1:
+      begin
+        // Memory buf
+        rd_data = buf_data_int_dato;
+        buf_data_rreq = rd_req | buf_data_rp;
+        rd_ack = buf_data_rack;
+        rd_err = 1'b0;
+      end
+    default:
+      begin
+        rd_ack = rd_req;
+        rd_err = rd_req;
+      end
+    endcase
+  end
+endmodule
@@ -0,0 +1,446 @@
+library ieee;
+use ieee.std_logic_1164.all;
+use ieee.numeric_std.all;
+use work.cheby_pkg.all;
+
+entity axi4_pipelined is
+  port (
+    aclk                 : in    std_logic;
+    areset_n             : in    std_logic;
+    awvalid              : in    std_logic;
+    awready              : out   std_logic;
+    awaddr               : in    std_logic_vector(8 downto 2);
+    awprot               : in    std_logic_vector(2 downto 0);
+    wvalid               : in    std_logic;
+    wready               : out   std_logic;
+    wdata                : in    std_logic_vector(31 downto 0);
+    wstrb                : in    std_logic_vector(3 downto 0);
+    bvalid               : out   std_logic;
+    bready               : in    std_logic;
+    bresp                : out   std_logic_vector(1 downto 0);
+    arvalid              : in    std_logic;
+    arready              : out   std_logic;
+    araddr               : in    std_logic_vector(8 downto 2);
+    arprot               : in    std_logic_vector(2 downto 0);
+    rvalid               : out   std_logic;
+    rready               : in    std_logic;
+    rdata                : out   std_logic_vector(31 downto 0);
+    rresp                : out   std_logic_vector(1 downto 0);
+
+    -- REG ctrl
+    ctrl_o               : out   std_logic_vector(31 downto 0);
+
+    -- REG status
+    status_i             : in    std_logic_vector(31 downto 0);
+
+    -- REG cnt
+    cnt_o                : out   std_logic_vector(63 downto 0);
+
+    -- RAM port for buf
+    buf_adr_i            : in    std_logic_vector(5 downto 0);
+    buf_data_rd_i        : in    std_logic;
+    buf_data_dat_o       : out   std_logic_vector(31 downto 0)
+  );
+end axi4_pipelined;
+
+architecture syn of axi4_pipelined is
+  signal wr_req                         : std_logic;
+  signal wr_ack                         : std_logic;
+  signal wr_err                         : std_logic;
+  signal wr_addr                        : std_logic_vector(8 downto 2);
+  signal wr_data                        : std_logic_vector(31 downto 0);
+  signal wr_sel                         : std_logic_vector(31 downto 0);
+  signal axi_awskid                     : std_logic;
+  signal axi_awaddr                     : std_logic_vector(8 downto 2);
+  signal axi_wskid                      : std_logic;
+  signal axi_wdata                      : std_logic_vector(31 downto 0);
+  signal axi_wstrb                      : std_logic_vector(3 downto 0);
+  signal axi_wip                        : std_logic;
+  signal axi_wstart                     : std_logic;
+  signal axi_wdone                      : std_logic;
+  signal axi_bskid                      : std_logic;
+  signal axi_werr                       : std_logic_vector(1 downto 0);
+  signal axi_bskid_err                  : std_logic_vector(1 downto 0);
+  signal rd_req                         : std_logic;
+  signal rd_ack                         : std_logic;
+  signal rd_err                         : std_logic;
+  signal rd_addr                        : std_logic_vector(8 downto 2);
+  signal rd_data                        : std_logic_vector(31 downto 0);
+  signal axi_arskid                     : std_logic;
+  signal axi_araddr                     : std_logic_vector(8 downto 2);
+  signal axi_rip                        : std_logic;
+  signal axi_rstart                     : std_logic;
+  signal axi_rdone                      : std_logic;
+  signal axi_rskid                      : std_logic;
+  signal axi_rskid_data                 : std_logic_vector(31 downto 0);
+  signal axi_rerr                       : std_logic_vector(1 downto 0);
+  signal axi_rskid_err                  : std_logic_vector(1 downto 0);
+  signal ctrl_reg                       : std_logic_vector(31 downto 0);
+  signal ctrl_wreq                      : std_logic;
+  signal ctrl_wack                      : std_logic;
+  signal cnt_reg                        : std_logic_vector(63 downto 0);
+  signal cnt_wreq                       : std_logic_vector(1 downto 0);
+  signal cnt_wack                       : std_logic_vector(1 downto 0);
+  signal buf_data_int_dato              : std_logic_vector(31 downto 0);
+  signal buf_data_ext_dat               : std_logic_vector(31 downto 0);
+  signal buf_data_rreq                  : std_logic;
+  signal buf_data_rack                  : std_logic;
+  signal buf_data_int_wr                : std_logic;
+  signal buf_data_rp                    : std_logic;
+  signal buf_wr                         : std_logic;
+  signal buf_wreq                       : std_logic;
+  signal buf_adr_int                    : std_logic_vector(5 downto 0);
+  signal buf_sel_int                    : std_logic_vector(3 downto 0);
+begin
+
+  -- AW, W and B channels (pipelined)
+  awready <= not axi_awskid;
+  wready <= not axi_wskid;
+  bvalid <= axi_wdone;
+  axi_wstart <= (((not axi_wip or wr_ack) and (axi_awskid or awvalid)) and (axi_wskid or wvalid)) and (not axi_bskid and (not (axi_wdone and wr_ack) or bready));
+  process (aclk) begin
+    if rising_edge(aclk) then
+      if areset_n = '0' then
+        wr_req <= '0';
+        axi_awskid <= '0';
+        axi_wskid <= '0';
+        axi_wip <= '0';
+        axi_wdone <= '0';
+        axi_werr <= "00";
+        axi_bskid <= '0';
+      else
+        wr_req <= '0';
+        if (axi_wdone and bready) = '1' then
+          axi_wdone <= axi_bskid;
+          axi_werr <= axi_bskid_err;
+          axi_bskid <= '0';
+        end if;
+        if wr_ack = '1' then
+          if axi_wdone = '0' or (bready and not axi_bskid) = '1' then
+            axi_wdone <= '1';
+            if wr_err = '0' then
+              axi_werr <= "00";
+            else
+              axi_werr <= "10";
+            end if;
+          else
+            axi_bskid <= '1';
+            if wr_err = '0' then
+              axi_bskid_err <= "00";
+            else
+              axi_bskid_err <= "10";
+            end if;
+          end if;
+        end if;
+        if wr_ack = '1' then
+          axi_wip <= '0';
+        end if;
+        if axi_wstart = '1' then
+          wr_req <= '1';
+          axi_wip <= '1';
+          if axi_awskid = '1' then
+            wr_addr <= axi_awaddr;
+            axi_awskid <= '0';
+          else
+            wr_addr <= awaddr;
+          end if;
+          if axi_wskid = '1' then
+            wr_data <= axi_wdata;
+            wr_sel(7 downto 0) <= (others => axi_wstrb(0));
+            wr_sel(15 downto 8) <= (others => axi_wstrb(1));
+            wr_sel(23 downto 16) <= (others => axi_wstrb(2));
+            wr_sel(31 downto 24) <= (others => axi_wstrb(3));
+            axi_wskid <= '0';
+          else
+            wr_data <= wdata;
+            wr_sel(7 downto 0) <= (others => wstrb(0));
+            wr_sel(15 downto 8) <= (others => wstrb(1));
+            wr_sel(23 downto 16) <= (others => wstrb(2));
+            wr_sel(31 downto 24) <= (others => wstrb(3));
+          end if;
+        else
+          if awvalid = '1' and axi_awskid = '0' then
+            axi_awaddr <= awaddr;
+            axi_awskid <= '1';
+          end if;
+          if wvalid = '1' and axi_wskid = '0' then
+            axi_wdata <= wdata;
+            axi_wstrb <= wstrb;
+            axi_wskid <= '1';
+          end if;
+        end if;
+      end if;
+    end if;
+  end process;
+  bresp <= axi_werr;
+
+  -- AR and R channels (pipelined)
+  arready <= not axi_arskid;
+  rvalid <= axi_rdone;
+  axi_rstart <= ((not axi_rip or rd_ack) and (axi_arskid or arvalid)) and (not axi_rskid and (not (axi_rdone and rd_ack) or rready));
+  process (aclk) begin
+    if rising_edge(aclk) then
+      if areset_n = '0' then
+        rd_req <= '0';
+        axi_arskid <= '0';
+        axi_rip <= '0';
+        rdata <= (others => '0');
+        axi_rdone <= '0';
+        axi_rerr <= "00";
+        axi_rskid <= '0';
+      else
+        rd_req <= '0';
+        if (axi_rdone and rready) = '1' then
+          axi_rdone <= axi_rskid;
+          axi_rerr <= axi_rskid_err;
+          rdata <= axi_rskid_data;
+          axi_rskid <= '0';
+        end if;
+        if rd_ack = '1' then
+          if axi_rdone = '0' or (rready and not axi_rskid) = '1' then
+            axi_rdone <= '1';
+            if rd_err = '0' then
+              axi_rerr <= "00";
+            else
+              axi_rerr <= "10";
+            end if;
+            rdata <= rd_data;
+          else
+            axi_rskid <= '1';
+            if rd_err = '0' then
+              axi_rskid_err <= "00";
+            else
+              axi_rskid_err <= "10";
+            end if;
+            axi_rskid_data <= rd_data;
+          end if;
+        end if;
+        if rd_ack = '1' then
+          axi_rip <= '0';
+        end if;
+        if axi_rstart = '1' then
+          rd_req <= '1';
+          axi_rip <= '1';
+          if axi_arskid = '1' then
+            rd_addr <= axi_araddr;
+            axi_arskid <= '0';
+          else
+            rd_addr <= araddr;
+          end if;
+        elsif arvalid = '1' and axi_arskid = '0' then
+          axi_araddr <= araddr;
+          axi_arskid <= '1';
+        end if;
+      end if;
+    end if;
+  end process;
+  rresp <= axi_rerr;
+
+  -- Register ctrl
+  ctrl_o <= ctrl_reg;
+  ctrl_wack <= ctrl_wreq;
+  process (aclk) begin
+    if rising_edge(aclk) then
+      if areset_n = '0' then
+        ctrl_reg <= "00000000000000000000000000000000";
+      else
+        if ctrl_wreq = '1' then
+          ctrl_reg <= wr_data;
+        end if;
+      end if;
+    end if;
+  end process;
+
+  -- Register status
+
+  -- Register cnt
+  cnt_o <= cnt_reg;
+  cnt_wack <= cnt_wreq;
+  process (aclk) begin
+    if rising_edge(aclk) then
+      if areset_n = '0' then
+        cnt_reg <= "0000000000000000000000000000000000000000000000000000000000000000";
+      else
+        if cnt_wreq(0) = '1' then
+          cnt_reg(31 downto 0) <= wr_data;
+        end if;
+        if cnt_wreq(1) = '1' then
+          cnt_reg(63 downto 32) <= wr_data;
+        end if;
+      end if;
+    end if;
+  end process;
+
+  -- Memory buf
+  process (rd_addr, wr_addr, buf_wr) begin
+    if buf_wr = '1' then
+      buf_adr_int <= wr_addr(7 downto 2);
+    else
+      buf_adr_int <= rd_addr(7 downto 2);
+    end if;
+  end process;
+  buf_wreq <= buf_data_int_wr;
+  buf_wr <= buf_wreq;
+  buf_data_raminst: cheby_dpssram
+    generic map (
+      g_data_width         => 32,
+      g_size               => 64,
+      g_addr_width         => 6,
+      g_dual_clock         => '0',
+      g_use_bwsel          => '1'
+    )
+    port map (
+      clk_a_i              => aclk,
+      clk_b_i              => aclk,
+      addr_a_i             => buf_adr_int,
+      bwsel_a_i            => buf_sel_int,
+      data_a_i             => wr_data,
+      data_a_o             => buf_data_int_dato,
+      rd_a_i               => buf_data_rreq,
+      wr_a_i               => buf_data_int_wr,
+      addr_b_i             => buf_adr_i,
+      bwsel_b_i            => (others => '1'),
+      data_b_i             => buf_data_ext_dat,
+      data_b_o             => buf_data_dat_o,
+      rd_b_i               => buf_data_rd_i,
+      wr_b_i               => '0'
+    );
+  
+  process (wr_sel) begin
+    buf_sel_int <= (others => '0');
+    if not (wr_sel(7 downto 0) = (7 downto 0 => '0')) then
+      buf_sel_int(0) <= '1';
+    end if;
+    if not (wr_sel(15 downto 8) = (7 downto 0 => '0')) then
+      buf_sel_int(1) <= '1';
+    end if;
+    if not (wr_sel(23 downto 16) = (7 downto 0 => '0')) then
+      buf_sel_int(2) <= '1';
+    end if;
+    if not (wr_sel(31 downto 24) = (7 downto 0 => '0')) then
+      buf_sel_int(3) <= '1';
+    end if;
+  end process;
+  process (aclk) begin
+    if rising_edge(aclk) then
+      if areset_n = '0' then
+        buf_data_rack <= '0';
+        buf_data_rp <= '0';
+      else
+        buf_data_rack <= (buf_data_rreq and not buf_wreq) and not buf_data_rack;
+        buf_data_rp <= buf_data_rreq and buf_wreq;
+      end if;
+    end if;
+  end process;
+
+  -- Process for write requests.
+  process (wr_addr, wr_req, ctrl_wack, cnt_wack) begin
+    ctrl_wreq <= '0';
+    cnt_wreq <= (others => '0');
+    buf_data_int_wr <= '0';
+    case wr_addr(8 downto 8) is
+    when "0" =>
+      case wr_addr(7 downto 3) is
+      when "00000" =>
+        case wr_addr(2 downto 2) is
+        when "0" =>
+          -- Reg ctrl
+          ctrl_wreq <= wr_req;
+          wr_ack <= ctrl_wack;
+          wr_err <= '0';
+        when "1" =>
+          -- Reg status
+          wr_ack <= wr_req;
+          wr_err <= wr_req;
+        when others =>
+          wr_ack <= wr_req;
+          wr_err <= wr_req;
+        end case;
+      when "00001" =>
+        case wr_addr(2 downto 2) is
+        when "0" =>
+          -- Reg cnt
+          cnt_wreq(0) <= wr_req;
+          wr_ack <= cnt_wack(0);
+          wr_err <= '0';
+        when "1" =>
+          -- Reg cnt
+          cnt_wreq(1) <= wr_req;
+          wr_ack <= cnt_wack(1);
+          wr_err <= '0';
+        when others =>
+          wr_ack <= wr_req;
+          wr_err <= wr_req;
+        end case;
+      when others =>
+        wr_ack <= wr_req;
+        wr_err <= wr_req;
+      end case;
+    when "1" =>
+      -- Memory buf
+      buf_data_int_wr <= wr_req;
+      wr_ack <= wr_req;
+      wr_err <= '0';
+    when others =>
+      wr_ack <= wr_req;
+      wr_err <= wr_req;
+    end case;
+  end process;
+
+  -- Process for read requests.
+  process (rd_addr, rd_req, ctrl_reg, status_i, cnt_reg, buf_data_int_dato,
+           buf_data_rp, buf_data_rack) begin
+    -- By default ack read requests
+    rd_data <= (others => 'X');
+    buf_data_rreq <= '0';
+    case rd_addr(8 downto 8) is
+    when "0" =>
+      case rd_addr(7 downto 3) is
+      when "00000" =>
+        case rd_addr(2 downto 2) is
+        when "0" =>
+          -- Reg ctrl
+          rd_ack <= rd_req;
+          rd_err <= '0';
+          rd_data <= ctrl_reg;
+        when "1" =>
+          -- Reg status
+          rd_ack <= rd_req;
+          rd_err <= '0';
+          rd_data <= status_i;
+        when others =>
+          rd_ack <= rd_req;
+          rd_err <= rd_req;
+        end case;
+      when "00001" =>
+        case rd_addr(2 downto 2) is
+        when "0" =>
+          -- Reg cnt
+          rd_ack <= rd_req;
+          rd_err <= '0';
+          rd_data <= cnt_reg(31 downto 0);
+        when "1" =>
+          -- Reg cnt
+          rd_ack <= rd_req;
+          rd_err <= '0';
+          rd_data <= cnt_reg(63 downto 32);
+        when others =>
+          rd_ack <= rd_req;
+          rd_err <= rd_req;
+        end case;
+      when others =>
+        rd_ack <= rd_req;
+        rd_err <= rd_req;
+      end case;
+    when "1" =>
+      -- Memory buf
+      rd_data <= buf_data_int_dato;
+      buf_data_rreq <= rd_req or buf_data_rp;
+      rd_ack <= buf_data_rack;
+      rd_err <= '0';
+    when others =>
+      rd_ack <= rd_req;
+      rd_err <= rd_req;
+    end case;
+  end process;
+end syn;
@@ -0,0 +1,775 @@
+
+module decoder_stages
+  (
+    input   wire rst_n_i,
+    input   wire clk_i,
+    input   wire wb_cyc_i,
+    input   wire wb_stb_i,
+    input   wire [9:2] wb_adr_i,
+    input   wire [3:0] wb_sel_i,
+    input   wire wb_we_i,
+    input   wire [31:0] wb_dat_i,
+    output  wire wb_ack_o,
+    output  wire wb_err_o,
+    output  wire wb_rty_o,
+    output  wire wb_stall_o,
+    output  reg [31:0] wb_dat_o,
+
+    // REG ctrl
+    output  wire [31:0] ctrl_o,
+
+    // REG status
+    input   wire [31:0] status_i,
+    output  reg status_rd_o,
+
+    // REG cnt
+    output  wire [63:0] cnt_o,
+
+    // REG gain
+    output  wire [15:0] cfg_gain_o,
+    output  wire cfg_gain_wr_o,
+
+    // REG offset
+    output  wire [15:0] cfg_offset_o,
+
+    // RAM port for buf
+    input   wire [5:0] buf_adr_i,
+    input   wire buf_data_rd_i,
+    output  wire [31:0] buf_data_dat_o,
+
+    // WB bus ext
+    output  wire ext_cyc_o,
+    output  wire ext_stb_o,
+    output  wire [7:2] ext_adr_o,
+    output  reg [3:0] ext_sel_o,
+    output  wire ext_we_o,
+    output  wire [31:0] ext_dat_o,
+    input   wire ext_ack_i,
+    input   wire ext_err_i,
+    input   wire ext_rty_i,
+    input   wire ext_stall_i,
+    input   wire [31:0] ext_dat_i
+  );
+  reg [31:0] wr_sel;
+  wire rd_req_int;
+  wire wr_req_int;
+  reg rd_ack_int;
+  reg wr_ack_int;
+  wire wb_en;
+  wire ack_int;
+  reg wb_rip;
+  reg wb_wip;
+  reg [31:0] ctrl_reg;
+  reg ctrl_wreq;
+  wire ctrl_wack;
+  reg [63:0] cnt_reg;
+  reg [1:0] cnt_wreq;
+  wire [1:0] cnt_wack;
+  reg [15:0] cfg_gain_reg;
+  reg cfg_gain_wreq;
+  wire cfg_gain_wack;
+  reg cfg_gain_wstrb;
+  reg [15:0] cfg_offset_reg;
+  reg cfg_offset_wreq;
+  wire cfg_offset_wack;
+  wire [31:0] buf_data_int_dato;
+  wire [31:0] buf_data_ext_dat;
+  reg buf_data_rreq;
+  reg buf_data_rack;
+  reg buf_data_int_wr;
+  reg ext_re;
+  reg ext_we;
+  reg ext_wt;
+  reg ext_rt;
+  wire ext_tr;
+  wire ext_wack;
+  wire ext_rack;
+  reg rd_ack_d0;
+  reg [31:0] rd_dat_d0;
+  reg wr_req_d0;
+  reg [9:2] wr_adr_d0;
+  reg [31:0] wr_dat_d0;
+  reg [31:0] wr_sel_d0;
+  wire buf_wr;
+  wire buf_wreq;
+  reg [5:0] buf_adr_int;
+  reg [3:0] buf_sel_int;
+  reg wr_req_dec_0;
+  reg wr_ack_dec_0;
+  reg wr_req_dec_1;
+  reg wr_ack_dec_1;
+  reg wr_req_dec_2;
+  reg wr_ack_dec_2;
+  reg wr_req_dec_others;
+  reg wr_ack_dec_others;
+  reg wr_req_dec_0_0;
+  reg wr_ack_dec_0_0;
+  reg wr_req_dec_0_1;
+  reg wr_ack_dec_0_1;
+  reg wr_req_dec_0_8;
+  reg wr_ack_dec_0_8;
+  reg wr_req_dec_0_others;
+  reg wr_ack_dec_0_others;
+  reg rd_req_dec_0;
+  reg rd_ack_dec_0;
+  reg rd_ack_dec_0_d;
+  reg [31:0] rd_dat_dec_0;
+  reg [31:0] rd_dat_dec_0_d;
+  reg rd_req_dec_1;
+  reg rd_ack_dec_1;
+  reg rd_ack_dec_1_d;
+  reg [31:0] rd_dat_dec_1;
+  reg [31:0] rd_dat_dec_1_d;
+  reg rd_req_dec_2;
+  reg rd_ack_dec_2;
+  reg rd_ack_dec_2_d;
+  reg [31:0] rd_dat_dec_2;
+  reg [31:0] rd_dat_dec_2_d;
+  reg rd_req_dec_others;
+  reg rd_ack_dec_others;
+  reg rd_ack_dec_others_d;
+  reg [31:0] rd_dat_dec_others;
+  reg [31:0] rd_dat_dec_others_d;
+  reg rd_req_dec_0_0;
+  reg rd_ack_dec_0_0;
+  reg rd_ack_dec_0_0_d;
+  reg [31:0] rd_dat_dec_0_0;
+  reg [31:0] rd_dat_dec_0_0_d;
+  reg rd_req_dec_0_1;
+  reg rd_ack_dec_0_1;
+  reg rd_ack_dec_0_1_d;
+  reg [31:0] rd_dat_dec_0_1;
+  reg [31:0] rd_dat_dec_0_1_d;
+  reg rd_req_dec_0_8;
+  reg rd_ack_dec_0_8;
+  reg rd_ack_dec_0_8_d;
+  reg [31:0] rd_dat_dec_0_8;
+  reg [31:0] rd_dat_dec_0_8_d;
+  reg rd_req_dec_0_others;
+  reg rd_ack_dec_0_others;
+  reg rd_ack_dec_0_others_d;
+  reg [31:0] rd_dat_dec_0_others;
+  reg [31:0] rd_dat_dec_0_others_d;
+
+  // WB decode signals
+  always_comb
+  begin
+    wr_sel[7:0] = {8{wb_sel_i[0]}};
+    wr_sel[15:8] = {8{wb_sel_i[1]}};
+    wr_sel[23:16] = {8{wb_sel_i[2]}};
+    wr_sel[31:24] = {8{wb_sel_i[3]}};
+  end
+  assign wb_en = wb_cyc_i & wb_stb_i;
+
+  always_ff @(posedge(clk_i))
+  begin
+    if (!rst_n_i)
+      wb_rip <= 1'b0;
+    else
+      wb_rip <= (wb_rip | (wb_en & ~wb_we_i)) & ~rd_ack_int;
+  end
+  assign rd_req_int = (wb_en & ~wb_we_i) & ~wb_rip;
+
+  always_ff @(posedge(clk_i))
+  begin
+    if (!rst_n_i)
+      wb_wip <= 1'b0;
+    else
+      wb_wip <= (wb_wip | (wb_en & wb_we_i)) & ~wr_ack_int;
+  end
+  assign wr_req_int = (wb_en & wb_we_i) & ~wb_wip;
+
+  assign ack_int = rd_ack_int | wr_ack_int;
+  assign wb_ack_o = ack_int;
+  assign wb_stall_o = ~ack_int & wb_en;
+  assign wb_rty_o = 1'b0;
+  assign wb_err_o = 1'b0;
+
+  // pipelining for wr-in+rd-out
+  always_ff @(posedge(clk_i))
+  begin
+    if (!rst_n_i)
+      begin
+        rd_ack_int <= 1'b0;
+        wb_dat_o <= 32'b00000000000000000000000000000000;
+        wr_req_d0 <= 1'b0;
+        wr_adr_d0 <= 8'b00000000;
+        wr_dat_d0 <= 32'b00000000000000000000000000000000;
+        wr_sel_d0 <= 32'b00000000000000000000000000000000;
+      end
+    else
+      begin
+        rd_ack_int <= rd_ack_d0;
+        wb_dat_o <= rd_dat_d0;
+        wr_req_d0 <= wr_req_int;
+        wr_adr_d0 <= wb_adr_i;
+        wr_dat_d0 <= wb_dat_i;
+        wr_sel_d0 <= wr_sel;
+      end
+  end
+
+  // Register ctrl
+  assign ctrl_o = ctrl_reg;
+  assign ctrl_wack = ctrl_wreq;
+  always_ff @(posedge(clk_i))
+  begin
+    if (!rst_n_i)
+      ctrl_reg <= 32'b00000000000000000000000000000000;
+    else
+      if (ctrl_wreq == 1'b1)
+        ctrl_reg <= wr_dat_d0;
+  end
+
+  // Register status
+
+  // Register cnt
+  assign cnt_o = cnt_reg;
+  assign cnt_wack = cnt_wreq;
+  always_ff @(posedge(clk_i))
+  begin
+    if (!rst_n_i)
+      cnt_reg <= 64'b0000000000000000000000000000000000000000000000000000000000000000;
+    else
+      begin
+        if (cnt_wreq[0] == 1'b1)
+          cnt_reg[31:0] <= wr_dat_d0;
+        if (cnt_wreq[1] == 1'b1)
+          cnt_reg[63:32] <= wr_dat_d0;
+      end
+  end
+
+  // Register cfg_gain
+  assign cfg_gain_o = cfg_gain_reg;
+  assign cfg_gain_wack = cfg_gain_wreq;
+  always_ff @(posedge(clk_i))
+  begin
+    if (!rst_n_i)
+      begin
+        cfg_gain_reg <= 16'b0000000000000000;
+        cfg_gain_wstrb <= 1'b0;
+      end
+    else
+      begin
+        if (cfg_gain_wreq == 1'b1)
+          cfg_gain_reg <= wr_dat_d0[15:0];
+        cfg_gain_wstrb <= cfg_gain_wreq;
+      end
+  end
+  assign cfg_gain_wr_o = cfg_gain_wstrb;
+
+  // Register cfg_offset
+  assign cfg_offset_o = cfg_offset_reg;
+  assign cfg_offset_wack = cfg_offset_wreq;
+  always_ff @(posedge(clk_i))
+  begin
+    if (!rst_n_i)
+      cfg_offset_reg <= 16'b0000000000000000;
+    else
+      if (cfg_offset_wreq == 1'b1)
+        cfg_offset_reg <= wr_dat_d0[15:0];
+  end
+
+  // Memory buf
+  always_comb
+  if (buf_wr == 1'b1)
+    buf_adr_int = wr_adr_d0[7:2];
+  else
+    buf_adr_int = wb_adr_i[7:2];
+  assign buf_wreq = buf_data_int_wr;
+  assign buf_wr = buf_wreq;
+  cheby_dpssram #(
+      .g_data_width(32),
+      .g_size(64),
+      .g_addr_width(6),
+      .g_dual_clock(1'b0),
+      .g_use_bwsel(1'b1)
+    )
+  buf_data_raminst (
+      .clk_a_i(clk_i),
+      .clk_b_i(clk_i),
+      .addr_a_i(buf_adr_int),
+      .bwsel_a_i(buf_sel_int),
+      .data_a_i(wr_dat_d0),
+      .data_a_o(buf_data_int_dato),
+      .rd_a_i(buf_data_rreq),
+      .wr_a_i(buf_data_int_wr),
+      .addr_b_i(buf_adr_i),
+      .bwsel_b_i({4{1'b1}}),
+      .data_b_i(buf_data_ext_dat),
+      .data_b_o(buf_data_dat_o),
+      .rd_b_i(buf_data_rd_i),
+      .wr_b_i(1'b0)
+    );
+  
+  always_comb
+  begin
+    buf_sel_int = 4'b0;
+    if (~(wr_sel_d0[7:0] == 8'b0))
+      buf_sel_int[0] = 1'b1;
+    if (~(wr_sel_d0[15:8] == 8'b0))
+      buf_sel_int[1] = 1'b1;
+    if (~(wr_sel_d0[23:16] == 8'b0))
+      buf_sel_int[2] = 1'b1;
+    if (~(wr_sel_d0[31:24] == 8'b0))
+      buf_sel_int[3] = 1'b1;
+  end
+  always_ff @(posedge(clk_i))
+  begin
+    if (!rst_n_i)
+      buf_data_rack <= 1'b0;
+    else
+      buf_data_rack <= buf_data_rreq;
+  end
+
+  // Interface ext
+  assign ext_tr = ext_wt | ext_rt;
+  always_ff @(posedge(clk_i))
+  begin
+    if (!rst_n_i)
+      begin
+        ext_rt <= 1'b0;
+        ext_wt <= 1'b0;
+      end
+    else
+      begin
+        ext_rt <= (ext_rt | ext_re) & ~ext_rack;
+        ext_wt <= (ext_wt | ext_we) & ~ext_wack;
+      end
+  end
+  assign ext_cyc_o = ext_tr;
+  assign ext_stb_o = ext_tr;
+  assign ext_wack = ext_ack_i & ext_wt;
+  assign ext_rack = ext_ack_i & ext_rt;
+  assign ext_adr_o = wb_adr_i[7:2];
+  always_comb
+  begin
+    ext_sel_o = 4'b0;
+    if (~(wr_sel_d0[7:0] == 8'b0))
+      ext_sel_o[0] = 1'b1;
+    if (~(wr_sel_d0[15:8] == 8'b0))
+      ext_sel_o[1] = 1'b1;
+    if (~(wr_sel_d0[23:16] == 8'b0))
+      ext_sel_o[2] = 1'b1;
+    if (~(wr_sel_d0[31:24] == 8'b0))
+      ext_sel_o[3] = 1'b1;
+  end
+  assign ext_we_o = ext_wt;
+  assign ext_dat_o = wr_dat_d0;
+
+  // Write decoder stage for address bits 9-8.
+  always_ff @(posedge(clk_i))
+  begin
+    if (!rst_n_i)
+      begin
+        wr_req_dec_0 <= 1'b0;
+        wr_req_dec_1 <= 1'b0;
+        wr_req_dec_2 <= 1'b0;
+        wr_req_dec_others <= 1'b0;
+      end
+    else
+      begin
+        wr_req_dec_0 <= 1'b0;
+        wr_req_dec_1 <= 1'b0;
+        wr_req_dec_2 <= 1'b0;
+        wr_req_dec_others <= 1'b0;
+        case (wr_adr_d0[9:8])
+        2'b00:
+          wr_req_dec_0 <= wr_req_d0;
+        2'b01:
+          wr_req_dec_1 <= wr_req_d0;
+        2'b10:
+          wr_req_dec_2 <= wr_req_d0;
+        default:
+          wr_req_dec_others <= wr_req_d0;
+        endcase
+      end
+  end
+  always_comb
+  case (wr_adr_d0[9:8])
+  2'b00:
+    wr_ack_int = wr_ack_dec_0;
+  2'b01:
+    wr_ack_int = wr_ack_dec_1;
+  2'b10:
+    wr_ack_int = wr_ack_dec_2;
+  default:
+    wr_ack_int = wr_ack_dec_others;
+  endcase
+
+  // Write decoder stage for address bits 7-3.
+  always_ff @(posedge(clk_i))
+  begin
+    if (!rst_n_i)
+      begin
+        wr_req_dec_0_0 <= 1'b0;
+        wr_req_dec_0_1 <= 1'b0;
+        wr_req_dec_0_8 <= 1'b0;
+        wr_req_dec_0_others <= 1'b0;
+      end
+    else
+      begin
+        wr_req_dec_0_0 <= 1'b0;
+        wr_req_dec_0_1 <= 1'b0;
+        wr_req_dec_0_8 <= 1'b0;
+        wr_req_dec_0_others <= 1'b0;
+        case (wr_adr_d0[7:3])
+        5'b00000:
+          wr_req_dec_0_0 <= wr_req_dec_0;
+        5'b00001:
+          wr_req_dec_0_1 <= wr_req_dec_0;
+        5'b01000:
+          wr_req_dec_0_8 <= wr_req_dec_0;
+        default:
+          wr_req_dec_0_others <= wr_req_dec_0;
+        endcase
+      end
+  end
+  always_comb
+  case (wr_adr_d0[7:3])
+  5'b00000:
+    wr_ack_dec_0 = wr_ack_dec_0_0;
+  5'b00001:
+    wr_ack_dec_0 = wr_ack_dec_0_1;
+  5'b01000:
+    wr_ack_dec_0 = wr_ack_dec_0_8;
+  default:
+    wr_ack_dec_0 = wr_ack_dec_0_others;
+  endcase
+
+  // Process for write requests.
+  always_comb
+  begin
+    ctrl_wreq = 1'b0;
+    case (wr_adr_d0[2:2])
+    1'b0:
+      begin
+        // Reg ctrl
+        ctrl_wreq = wr_req_dec_0_0;
+        wr_ack_dec_0_0 = ctrl_wack;
+      end
+    1'b1:
+      // Reg status
+      wr_ack_dec_0_0 = wr_req_dec_0_0;
+    default:
+      wr_ack_dec_0_0 = wr_req_dec_0_0;
+    endcase
+  end
+
+  // Process for write requests.
+  always_comb
+  begin
+    cnt_wreq = 2'b0;
+    case (wr_adr_d0[2:2])
+    1'b0:
+      begin
+        // Reg cnt
+        cnt_wreq[1] = wr_req_dec_0_1;
+        wr_ack_dec_0_1 = cnt_wack[1];
+      end
+    1'b1:
+      begin
+        // Reg cnt
+        cnt_wreq[0] = wr_req_dec_0_1;
+        wr_ack_dec_0_1 = cnt_wack[0];
+      end
+    default:
+      wr_ack_dec_0_1 = wr_req_dec_0_1;
+    endcase
+  end
+
+  // Process for write requests.
+  always_comb
+  begin
+    cfg_gain_wreq = 1'b0;
+    cfg_offset_wreq = 1'b0;
+    case (wr_adr_d0[2:2])
+    1'b0:
+      begin
+        // Reg cfg_gain
+        cfg_gain_wreq = wr_req_dec_0_8;
+        wr_ack_dec_0_8 = cfg_gain_wack;
+      end
+    1'b1:
+      begin
+        // Reg cfg_offset
+        cfg_offset_wreq = wr_req_dec_0_8;
+        wr_ack_dec_0_8 = cfg_offset_wack;
+      end
+    default:
+      wr_ack_dec_0_8 = wr_req_dec_0_8;
+    endcase
+  end
+
+  // Process for write requests.
+  always_comb
+  wr_ack_dec_0_others = wr_req_dec_0_others;
+
+  // Process for write requests.
+  always_comb
+  begin
+    buf_data_int_wr = 1'b0;
+    // Memory buf
+    buf_data_int_wr = wr_req_dec_1;
+    wr_ack_dec_1 = wr_req_dec_1;
+  end
+
+  // Process for write requests.
+  always_comb
+  begin
+    ext_we = 1'b0;
+    // Submap ext
+    ext_we = wr_req_dec_2;
+    wr_ack_dec_2 = ext_wack;
+  end
+
+  // Process for write requests.
+  always_comb
+  wr_ack_dec_others = wr_req_dec_others;
+
+  // Read decoder stage for address bits 9-8.
+  always_comb
+  begin
+    rd_req_dec_0 = 1'b0;
+    rd_req_dec_1 = 1'b0;
+    rd_req_dec_2 = 1'b0;
+    rd_req_dec_others = 1'b0;
+    case (wb_adr_i[9:8])
+    2'b00:
+      rd_req_dec_0 = rd_req_int;
+    2'b01:
+      rd_req_dec_1 = rd_req_int;
+    2'b10:
+      rd_req_dec_2 = rd_req_int;
+    default:
+      rd_req_dec_others = rd_req_int;
+    endcase
+  end
+  always_ff @(posedge(clk_i))
+  begin
+    if (!rst_n_i)
+      begin
+        rd_ack_dec_0_d <= 1'b0;
+        rd_dat_dec_0_d <= 32'b00000000000000000000000000000000;
+        rd_ack_dec_1_d <= 1'b0;
+        rd_dat_dec_1_d <= 32'b00000000000000000000000000000000;
+        rd_ack_dec_2_d <= 1'b0;
+        rd_dat_dec_2_d <= 32'b00000000000000000000000000000000;
+        rd_ack_dec_others_d <= 1'b0;
+        rd_dat_dec_others_d <= 32'b00000000000000000000000000000000;
+      end
+    else
+      begin
+        rd_ack_dec_0_d <= rd_ack_dec_0;
+        rd_dat_dec_0_d <= rd_dat_dec_0;
+        rd_ack_dec_1_d <= rd_ack_dec_1;
+        rd_dat_dec_1_d <= rd_dat_dec_1;
+        rd_ack_dec_2_d <= rd_ack_dec_2;
+        rd_dat_dec_2_d <= rd_dat_dec_2;
+        rd_ack_dec_others_d <= rd_ack_dec_others;
+        rd_dat_dec_others_d <= rd_dat_dec_others;
+      end
+  end
+  always_comb
+  case (wb_adr_i[9:8])
+  2'b00:
+    begin
+      rd_ack_d0 = rd_ack_dec_0_d;
+      rd_dat_d0 = rd_dat_dec_0_d;
+    end
+  2'b01:
+    begin
+      rd_ack_d0 = rd_ack_dec_1_d;
+      rd_dat_d0 = rd_dat_dec_1_d;
+    end
+  2'b10:
+    begin
+      rd_ack_d0 = rd_ack_dec_2_d;
+      rd_dat_d0 = rd_dat_dec_2_d;
+    end
+  default:
+    begin
+      rd_ack_d0 = rd_ack_dec_others_d;
+      rd_dat_d0 = rd_dat_dec_others_d;
+    end
+  endcase
+
+  // Read decoder stage for address bits 7-3.
+  always_comb
+  begin
+    rd_req_dec_0_0 = 1'b0;
+    rd_req_dec_0_1 = 1'b0;
+    rd_req_dec_0_8 = 1'b0;
+    rd_req_dec_0_others = 1'b0;
+    case (wb_adr_i[7:3])
+    5'b00000:
+      rd_req_dec_0_0 = rd_req_dec_0;
+    5'b00001:
+      rd_req_dec_0_1 = rd_req_dec_0;
+    5'b01000:
+      rd_req_dec_0_8 = rd_req_dec_0;
+    default:
+      rd_req_dec_0_others = rd_req_dec_0;
+    endcase
+  end
+  always_ff @(posedge(clk_i))
+  begin
+    if (!rst_n_i)
+      begin
+        rd_ack_dec_0_0_d <= 1'b0;
+        rd_dat_dec_0_0_d <= 32'b00000000000000000000000000000000;
+        rd_ack_dec_0_1_d <= 1'b0;
+        rd_dat_dec_0_1_d <= 32'b00000000000000000000000000000000;
+        rd_ack_dec_0_8_d <= 1'b0;
+        rd_dat_dec_0_8_d <= 32'b00000000000000000000000000000000;
+        rd_ack_dec_0_others_d <= 1'b0;
+        rd_dat_dec_0_others_d <= 32'b00000000000000000000000000000000;
+      end
+    else
+      begin
+        rd_ack_dec_0_0_d <= rd_ack_dec_0_0;
+        rd_dat_dec_0_0_d <= rd_dat_dec_0_0;
+        rd_ack_dec_0_1_d <= rd_ack_dec_0_1;
+        rd_dat_dec_0_1_d <= rd_dat_dec_0_1;
+        rd_ack_dec_0_8_d <= rd_ack_dec_0_8;
+        rd_dat_dec_0_8_d <= rd_dat_dec_0_8;
+        rd_ack_dec_0_others_d <= rd_ack_dec_0_others;
+        rd_dat_dec_0_others_d <= rd_dat_dec_0_others;
+      end
+  end
+  always_comb
+  case (wb_adr_i[7:3])
+  5'b00000:
+    begin
+      rd_ack_dec_0 = rd_ack_dec_0_0_d;
+      rd_dat_dec_0 = rd_dat_dec_0_0_d;
+    end
+  5'b00001:
+    begin
+      rd_ack_dec_0 = rd_ack_dec_0_1_d;
+      rd_dat_dec_0 = rd_dat_dec_0_1_d;
+    end
+  5'b01000:
+    begin
+      rd_ack_dec_0 = rd_ack_dec_0_8_d;
+      rd_dat_dec_0 = rd_dat_dec_0_8_d;
+    end
+  default:
+    begin
+      rd_ack_dec_0 = rd_ack_dec_0_others_d;
+      rd_dat_dec_0 = rd_dat_dec_0_others_d;
+    end
+  endcase
+
+  // Process for read requests.
+  always_comb
+  begin
+    // By default ack read requests
+    rd_dat_dec_0_0 = {32{1'bx}};
+    status_rd_o = 1'b0;
+    case (wb_adr_i[2:2])
+    1'b0:
+      begin
+        // Reg ctrl
+        rd_ack_dec_0_0 = rd_req_dec_0_0;
+        rd_dat_dec_0_0 = ctrl_reg;
+      end
+    1'b1:
+      begin
+        // Reg status
+        status_rd_o = rd_req_dec_0_0;
+        rd_ack_dec_0_0 = rd_req_dec_0_0;
+        rd_dat_dec_0_0 = status_i;
+      end
+    default:
+      rd_ack_dec_0_0 = rd_req_dec_0_0;
+    endcase
+  end
+
+  // Process for read requests.
+  always_comb
+  begin
+    // By default ack read requests
+    rd_dat_dec_0_1 = {32{1'bx}};
+    case (wb_adr_i[2:2])
+    1'b0:
+      begin
+        // Reg cnt
+        rd_ack_dec_0_1 = rd_req_dec_0_1;
+        rd_dat_dec_0_1 = cnt_reg[63:32];
+      end
+    1'b1:
+      begin
+        // Reg cnt
+        rd_ack_dec_0_1 = rd_req_dec_0_1;
+        rd_dat_dec_0_1 = cnt_reg[31:0];
+      end
+    default:
+      rd_ack_dec_0_1 = rd_req_dec_0_1;
+    endcase
+  end
+
+  // Process for read requests.
+  always_comb
+  begin
+    // By default ack read requests
+    rd_dat_dec_0_8 = {32{1'bx}};
+    case (wb_adr_i[2:2])
+    1'b0:
+      begin
+        // Reg cfg_gain
+        rd_ack_dec_0_8 = rd_req_dec_0_8;
+        rd_dat_dec_0_8[15:0] = cfg_gain_reg;
+        rd_dat_dec_0_8[31:16] = 16'b0;
+      end
+    1'b1:
+      begin
+        // Reg cfg_offset
+        rd_ack_dec_0_8 = rd_req_dec_0_8;
+        rd_dat_dec_0_8[15:0] = cfg_offset_reg;
+        rd_dat_dec_0_8[31:16] = 16'b0;
+      end
+    default:
+      rd_ack_dec_0_8 = rd_req_dec_0_8;
+    endcase
+  end
+
+  // Process for read requests.
+  always_comb
+  begin
+    // By default ack read requests
+    rd_dat_dec_0_others = {32{1'bx}};
+    rd_ack_dec_0_others = rd_req_dec_0_others;
+  end
+
+  // Process for read requests.
+  always_comb
+  begin
+    // By default ack read requests
+    rd_dat_dec_1 = {32{1'bx}};
+    buf_data_rreq = 1'b0;
+    // Memory buf
+    rd_dat_dec_1 = buf_data_int_dato;
+    buf_data_rreq = rd_req_dec_1;
+    rd_ack_dec_1 = buf_data_rack;
+  end
+
+  // Process for read requests.
+  always_comb
+  begin
+    // By default ack read requests
+    rd_dat_dec_2 = {32{1'bx}};
+    ext_re = 1'b0;
+    // Submap ext
+    ext_re = rd_req_dec_2;
+    rd_dat_dec_2 = ext_dat_i;
+    rd_ack_dec_2 = ext_rack;
+  end
+
+  // Process for read requests.
+  always_comb
+  begin
+    // By default ack read requests
+    rd_dat_dec_others = {32{1'bx}};
+    rd_ack_dec_others = rd_req_dec_others;
+  end
+endmodule
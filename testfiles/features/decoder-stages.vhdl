@@ -0,0 +1,751 @@
+library ieee;
+use ieee.std_logic_1164.all;
+use ieee.numeric_std.all;
+use work.cheby_pkg.all;
+
+entity decoder_stages is
+  port (
+    rst_n_i              : in    std_logic;
+    clk_i                : in    std_logic;
+    wb_cyc_i             : in    std_logic;
+    wb_stb_i             : in    std_logic;
+    wb_adr_i             : in    std_logic_vector(9 downto 2);
+    wb_sel_i             : in    std_logic_vector(3 downto 0);
+    wb_we_i              : in    std_logic;
+    wb_dat_i             : in    std_logic_vector(31 downto 0);
+    wb_ack_o             : out   std_logic;
+    wb_err_o             : out   std_logic;
+    wb_rty_o             : out   std_logic;
+    wb_stall_o           : out   std_logic;
+    wb_dat_o             : out   std_logic_vector(31 downto 0);
+
+    -- REG ctrl
+    ctrl_o               : out   std_logic_vector(31 downto 0);
+
+    -- REG status
+    status_i             : in    std_logic_vector(31 downto 0);
+    status_rd_o          : out   std_logic;
+
+    -- REG cnt
+    cnt_o                : out   std_logic_vector(63 downto 0);
+
+    -- REG gain
+    cfg_gain_o           : out   std_logic_vector(15 downto 0);
+    cfg_gain_wr_o        : out   std_logic;
+
+    -- REG offset
+    cfg_offset_o         : out   std_logic_vector(15 downto 0);
+
+    -- RAM port for buf
+    buf_adr_i            : in    std_logic_vector(5 downto 0);
+    buf_data_rd_i        : in    std_logic;
+    buf_data_dat_o       : out   std_logic_vector(31 downto 0);
+
+    -- WB bus ext
+    ext_cyc_o            : out   std_logic;
+    ext_stb_o            : out   std_logic;
+    ext_adr_o            : out   std_logic_vector(7 downto 2);
+    ext_sel_o            : out   std_logic_vector(3 downto 0);
+    ext_we_o             : out   std_logic;
+    ext_dat_o            : out   std_logic_vector(31 downto 0);
+    ext_ack_i            : in    std_logic;
+    ext_err_i            : in    std_logic;
+    ext_rty_i            : in    std_logic;
+    ext_stall_i          : in    std_logic;
+    ext_dat_i            : in    std_logic_vector(31 downto 0)
+  );
+end decoder_stages;
+
+architecture syn of decoder_stages is
+  signal wr_sel                         : std_logic_vector(31 downto 0);
+  signal rd_req_int                     : std_logic;
+  signal wr_req_int                     : std_logic;
+  signal rd_ack_int                     : std_logic;
+  signal wr_ack_int                     : std_logic;
+  signal wb_en                          : std_logic;
+  signal ack_int                        : std_logic;
+  signal wb_rip                         : std_logic;
+  signal wb_wip                         : std_logic;
+  signal ctrl_reg                       : std_logic_vector(31 downto 0);
+  signal ctrl_wreq                      : std_logic;
+  signal ctrl_wack                      : std_logic;
+  signal cnt_reg                        : std_logic_vector(63 downto 0);
+  signal cnt_wreq                       : std_logic_vector(1 downto 0);
+  signal cnt_wack                       : std_logic_vector(1 downto 0);
+  signal cfg_gain_reg                   : std_logic_vector(15 downto 0);
+  signal cfg_gain_wreq                  : std_logic;
+  signal cfg_gain_wack                  : std_logic;
+  signal cfg_gain_wstrb                 : std_logic;
+  signal cfg_offset_reg                 : std_logic_vector(15 downto 0);
+  signal cfg_offset_wreq                : std_logic;
+  signal cfg_offset_wack                : std_logic;
+  signal buf_data_int_dato              : std_logic_vector(31 downto 0);
+  signal buf_data_ext_dat               : std_logic_vector(31 downto 0);
+  signal buf_data_rreq                  : std_logic;
+  signal buf_data_rack                  : std_logic;
+  signal buf_data_int_wr                : std_logic;
+  signal ext_re                         : std_logic;
+  signal ext_we                         : std_logic;
+  signal ext_wt                         : std_logic;
+  signal ext_rt                         : std_logic;
+  signal ext_tr                         : std_logic;
+  signal ext_wack                       : std_logic;
+  signal ext_rack                       : std_logic;
+  signal rd_ack_d0                      : std_logic;
+  signal rd_dat_d0                      : std_logic_vector(31 downto 0);
+  signal wr_req_d0                      : std_logic;
+  signal wr_adr_d0                      : std_logic_vector(9 downto 2);
+  signal wr_dat_d0                      : std_logic_vector(31 downto 0);
+  signal wr_sel_d0                      : std_logic_vector(31 downto 0);
+  signal buf_wr                         : std_logic;
+  signal buf_wreq                       : std_logic;
+  signal buf_adr_int                    : std_logic_vector(5 downto 0);
+  signal buf_sel_int                    : std_logic_vector(3 downto 0);
+  signal wr_req_dec_0                   : std_logic;
+  signal wr_ack_dec_0                   : std_logic;
+  signal wr_req_dec_1                   : std_logic;
+  signal wr_ack_dec_1                   : std_logic;
+  signal wr_req_dec_2                   : std_logic;
+  signal wr_ack_dec_2                   : std_logic;
+  signal wr_req_dec_others              : std_logic;
+  signal wr_ack_dec_others              : std_logic;
+  signal wr_req_dec_0_0                 : std_logic;
+  signal wr_ack_dec_0_0                 : std_logic;
+  signal wr_req_dec_0_1                 : std_logic;
+  signal wr_ack_dec_0_1                 : std_logic;
+  signal wr_req_dec_0_8                 : std_logic;
+  signal wr_ack_dec_0_8                 : std_logic;
+  signal wr_req_dec_0_others            : std_logic;
+  signal wr_ack_dec_0_others            : std_logic;
+  signal rd_req_dec_0                   : std_logic;
+  signal rd_ack_dec_0                   : std_logic;
+  signal rd_ack_dec_0_d                 : std_logic;
+  signal rd_dat_dec_0                   : std_logic_vector(31 downto 0);
+  signal rd_dat_dec_0_d                 : std_logic_vector(31 downto 0);
+  signal rd_req_dec_1                   : std_logic;
+  signal rd_ack_dec_1                   : std_logic;
+  signal rd_ack_dec_1_d                 : std_logic;
+  signal rd_dat_dec_1                   : std_logic_vector(31 downto 0);
+  signal rd_dat_dec_1_d                 : std_logic_vector(31 downto 0);
+  signal rd_req_dec_2                   : std_logic;
+  signal rd_ack_dec_2                   : std_logic;
+  signal rd_ack_dec_2_d                 : std_logic;
+  signal rd_dat_dec_2                   : std_logic_vector(31 downto 0);
+  signal rd_dat_dec_2_d                 : std_logic_vector(31 downto 0);
+  signal rd_req_dec_others              : std_logic;
+  signal rd_ack_dec_others              : std_logic;
+  signal rd_ack_dec_others_d            : std_logic;
+  signal rd_dat_dec_others              : std_logic_vector(31 downto 0);
+  signal rd_dat_dec_others_d            : std_logic_vector(31 downto 0);
+  signal rd_req_dec_0_0                 : std_logic;
+  signal rd_ack_dec_0_0                 : std_logic;
+  signal rd_ack_dec_0_0_d               : std_logic;
+  signal rd_dat_dec_0_0                 : std_logic_vector(31 downto 0);
+  signal rd_dat_dec_0_0_d               : std_logic_vector(31 downto 0);
+  signal rd_req_dec_0_1                 : std_logic;
+  signal rd_ack_dec_0_1                 : std_logic;
+  signal rd_ack_dec_0_1_d               : std_logic;
+  signal rd_dat_dec_0_1                 : std_logic_vector(31 downto 0);
+  signal rd_dat_dec_0_1_d               : std_logic_vector(31 downto 0);
+  signal rd_req_dec_0_8                 : std_logic;
+  signal rd_ack_dec_0_8                 : std_logic;
+  signal rd_ack_dec_0_8_d               : std_logic;
+  signal rd_dat_dec_0_8                 : std_logic_vector(31 downto 0);
+  signal rd_dat_dec_0_8_d               : std_logic_vector(31 downto 0);
+  signal rd_req_dec_0_others            : std_logic;
+  signal rd_ack_dec_0_others            : std_logic;
+  signal rd_ack_dec_0_others_d          : std_logic;
+  signal rd_dat_dec_0_others            : std_logic_vector(31 downto 0);
+  signal rd_dat_dec_0_others_d          : std_logic_vector(31 downto 0);
+begin
+
+  -- WB decode signals
+  process (wb_sel_i) begin
+    wr_sel(7 downto 0) <= (others => wb_sel_i(0));
+    wr_sel(15 downto 8) <= (others => wb_sel_i(1));
+    wr_sel(23 downto 16) <= (others => wb_sel_i(2));
+    wr_sel(31 downto 24) <= (others => wb_sel_i(3));
+  end process;
+  wb_en <= wb_cyc_i and wb_stb_i;
+
+  process (clk_i) begin
+    if rising_edge(clk_i) then
+      if rst_n_i = '0' then
+        wb_rip <= '0';
+      else
+        wb_rip <= (wb_rip or (wb_en and not wb_we_i)) and not rd_ack_int;
+      end if;
+    end if;
+  end process;
+  rd_req_int <= (wb_en and not wb_we_i) and not wb_rip;
+
+  process (clk_i) begin
+    if rising_edge(clk_i) then
+      if rst_n_i = '0' then
+        wb_wip <= '0';
+      else
+        wb_wip <= (wb_wip or (wb_en and wb_we_i)) and not wr_ack_int;
+      end if;
+    end if;
+  end process;
+  wr_req_int <= (wb_en and wb_we_i) and not wb_wip;
+
+  ack_int <= rd_ack_int or wr_ack_int;
+  wb_ack_o <= ack_int;
+  wb_stall_o <= not ack_int and wb_en;
+  wb_rty_o <= '0';
+  wb_err_o <= '0';
+
+  -- pipelining for wr-in+rd-out
+  process (clk_i) begin
+    if rising_edge(clk_i) then
+      if rst_n_i = '0' then
+        rd_ack_int <= '0';
+        wb_dat_o <= "00000000000000000000000000000000";
+        wr_req_d0 <= '0';
+        wr_adr_d0 <= "00000000";
+        wr_dat_d0 <= "00000000000000000000000000000000";
+        wr_sel_d0 <= "00000000000000000000000000000000";
+      else
+        rd_ack_int <= rd_ack_d0;
+        wb_dat_o <= rd_dat_d0;
+        wr_req_d0 <= wr_req_int;
+        wr_adr_d0 <= wb_adr_i;
+        wr_dat_d0 <= wb_dat_i;
+        wr_sel_d0 <= wr_sel;
+      end if;
+    end if;
+  end process;
+
+  -- Register ctrl
+  ctrl_o <= ctrl_reg;
+  ctrl_wack <= ctrl_wreq;
+  process (clk_i) begin
+    if rising_edge(clk_i) then
+      if rst_n_i = '0' then
+        ctrl_reg <= "00000000000000000000000000000000";
+      else
+        if ctrl_wreq = '1' then
+          ctrl_reg <= wr_dat_d0;
+        end if;
+      end if;
+    end if;
+  end process;
+
+  -- Register status
+
+  -- Register cnt
+  cnt_o <= cnt_reg;
+  cnt_wack <= cnt_wreq;
+  process (clk_i) begin
+    if rising_edge(clk_i) then
+      if rst_n_i = '0' then
+        cnt_reg <= "0000000000000000000000000000000000000000000000000000000000000000";
+      else
+        if cnt_wreq(0) = '1' then
+          cnt_reg(31 downto 0) <= wr_dat_d0;
+        end if;
+        if cnt_wreq(1) = '1' then
+          cnt_reg(63 downto 32) <= wr_dat_d0;
+        end if;
+      end if;
+    end if;
+  end process;
+
+  -- Register cfg_gain
+  cfg_gain_o <= cfg_gain_reg;
+  cfg_gain_wack <= cfg_gain_wreq;
+  process (clk_i) begin
+    if rising_edge(clk_i) then
+      if rst_n_i = '0' then
+        cfg_gain_reg <= "0000000000000000";
+        cfg_gain_wstrb <= '0';
+      else
+        if cfg_gain_wreq = '1' then
+          cfg_gain_reg <= wr_dat_d0(15 downto 0);
+        end if;
+        cfg_gain_wstrb <= cfg_gain_wreq;
+      end if;
+    end if;
+  end process;
+  cfg_gain_wr_o <= cfg_gain_wstrb;
+
+  -- Register cfg_offset
+  cfg_offset_o <= cfg_offset_reg;
+  cfg_offset_wack <= cfg_offset_wreq;
+  process (clk_i) begin
+    if rising_edge(clk_i) then
+      if rst_n_i = '0' then
+        cfg_offset_reg <= "0000000000000000";
+      else
+        if cfg_offset_wreq = '1' then
+          cfg_offset_reg <= wr_dat_d0(15 downto 0);
+        end if;
+      end if;
+    end if;
+  end process;
+
+  -- Memory buf
+  process (wb_adr_i, wr_adr_d0, buf_wr) begin
+    if buf_wr = '1' then
+      buf_adr_int <= wr_adr_d0(7 downto 2);
+    else
+      buf_adr_int <= wb_adr_i(7 downto 2);
+    end if;
+  end process;
+  buf_wreq <= buf_data_int_wr;
+  buf_wr <= buf_wreq;
+  buf_data_raminst: cheby_dpssram
+    generic map (
+      g_data_width         => 32,
+      g_size               => 64,
+      g_addr_width         => 6,
+      g_dual_clock         => '0',
+      g_use_bwsel          => '1'
+    )
+    port map (
+      clk_a_i              => clk_i,
+      clk_b_i              => clk_i,
+      addr_a_i             => buf_adr_int,
+      bwsel_a_i            => buf_sel_int,
+      data_a_i             => wr_dat_d0,
+      data_a_o             => buf_data_int_dato,
+      rd_a_i               => buf_data_rreq,
+      wr_a_i               => buf_data_int_wr,
+      addr_b_i             => buf_adr_i,
+      bwsel_b_i            => (others => '1'),
+      data_b_i             => buf_data_ext_dat,
+      data_b_o             => buf_data_dat_o,
+      rd_b_i               => buf_data_rd_i,
+      wr_b_i               => '0'
+    );
+  
+  process (wr_sel_d0) begin
+    buf_sel_int <= (others => '0');
+    if not (wr_sel_d0(7 downto 0) = (7 downto 0 => '0')) then
+      buf_sel_int(0) <= '1';
+    end if;
+    if not (wr_sel_d0(15 downto 8) = (7 downto 0 => '0')) then
+      buf_sel_int(1) <= '1';
+    end if;
+    if not (wr_sel_d0(23 downto 16) = (7 downto 0 => '0')) then
+      buf_sel_int(2) <= '1';
+    end if;
+    if not (wr_sel_d0(31 downto 24) = (7 downto 0 => '0')) then
+      buf_sel_int(3) <= '1';
+    end if;
+  end process;
+  process (clk_i) begin
+    if rising_edge(clk_i) then
+      if rst_n_i = '0' then
+        buf_data_rack <= '0';
+      else
+        buf_data_rack <= buf_data_rreq;
+      end if;
+    end if;
+  end process;
+
+  -- Interface ext
+  ext_tr <= ext_wt or ext_rt;
+  process (clk_i) begin
+    if rising_edge(clk_i) then
+      if rst_n_i = '0' then
+        ext_rt <= '0';
+        ext_wt <= '0';
+      else
+        ext_rt <= (ext_rt or ext_re) and not ext_rack;
+        ext_wt <= (ext_wt or ext_we) and not ext_wack;
+      end if;
+    end if;
+  end process;
+  ext_cyc_o <= ext_tr;
+  ext_stb_o <= ext_tr;
+  ext_wack <= ext_ack_i and ext_wt;
+  ext_rack <= ext_ack_i and ext_rt;
+  ext_adr_o <= wb_adr_i(7 downto 2);
+  process (wr_sel_d0) begin
+    ext_sel_o <= (others => '0');
+    if not (wr_sel_d0(7 downto 0) = (7 downto 0 => '0')) then
+      ext_sel_o(0) <= '1';
+    end if;
+    if not (wr_sel_d0(15 downto 8) = (7 downto 0 => '0')) then
+      ext_sel_o(1) <= '1';
+    end if;
+    if not (wr_sel_d0(23 downto 16) = (7 downto 0 => '0')) then
+      ext_sel_o(2) <= '1';
+    end if;
+    if not (wr_sel_d0(31 downto 24) = (7 downto 0 => '0')) then
+      ext_sel_o(3) <= '1';
+    end if;
+  end process;
+  ext_we_o <= ext_wt;
+  ext_dat_o <= wr_dat_d0;
+
+  -- Write decoder stage for address bits 9-8.
+  process (clk_i) begin
+    if rising_edge(clk_i) then
+      if rst_n_i = '0' then
+        wr_req_dec_0 <= '0';
+        wr_req_dec_1 <= '0';
+        wr_req_dec_2 <= '0';
+        wr_req_dec_others <= '0';
+      else
+        wr_req_dec_0 <= '0';
+        wr_req_dec_1 <= '0';
+        wr_req_dec_2 <= '0';
+        wr_req_dec_others <= '0';
+        case wr_adr_d0(9 downto 8) is
+        when "00" =>
+          wr_req_dec_0 <= wr_req_d0;
+        when "01" =>
+          wr_req_dec_1 <= wr_req_d0;
+        when "10" =>
+          wr_req_dec_2 <= wr_req_d0;
+        when others =>
+          wr_req_dec_others <= wr_req_d0;
+        end case;
+      end if;
+    end if;
+  end process;
+  process (wr_adr_d0, wr_ack_dec_0, wr_ack_dec_1, wr_ack_dec_2, wr_ack_dec_others) begin
+    case wr_adr_d0(9 downto 8) is
+    when "00" =>
+      wr_ack_int <= wr_ack_dec_0;
+    when "01" =>
+      wr_ack_int <= wr_ack_dec_1;
+    when "10" =>
+      wr_ack_int <= wr_ack_dec_2;
+    when others =>
+      wr_ack_int <= wr_ack_dec_others;
+    end case;
+  end process;
+
+  -- Write decoder stage for address bits 7-3.
+  process (clk_i) begin
+    if rising_edge(clk_i) then
+      if rst_n_i = '0' then
+        wr_req_dec_0_0 <= '0';
+        wr_req_dec_0_1 <= '0';
+        wr_req_dec_0_8 <= '0';
+        wr_req_dec_0_others <= '0';
+      else
+        wr_req_dec_0_0 <= '0';
+        wr_req_dec_0_1 <= '0';
+        wr_req_dec_0_8 <= '0';
+        wr_req_dec_0_others <= '0';
+        case wr_adr_d0(7 downto 3) is
+        when "00000" =>
+          wr_req_dec_0_0 <= wr_req_dec_0;
+        when "00001" =>
+          wr_req_dec_0_1 <= wr_req_dec_0;
+        when "01000" =>
+          wr_req_dec_0_8 <= wr_req_dec_0;
+        when others =>
+          wr_req_dec_0_others <= wr_req_dec_0;
+        end case;
+      end if;
+    end if;
+  end process;
+  process (wr_adr_d0, wr_ack_dec_0_0, wr_ack_dec_0_1, wr_ack_dec_0_8,
+           wr_ack_dec_0_others) begin
+    case wr_adr_d0(7 downto 3) is
+    when "00000" =>
+      wr_ack_dec_0 <= wr_ack_dec_0_0;
+    when "00001" =>
+      wr_ack_dec_0 <= wr_ack_dec_0_1;
+    when "01000" =>
+      wr_ack_dec_0 <= wr_ack_dec_0_8;
+    when others =>
+      wr_ack_dec_0 <= wr_ack_dec_0_others;
+    end case;
+  end process;
+
+  -- Process for write requests.
+  process (wr_adr_d0, wr_req_dec_0_0, ctrl_wack) begin
+    ctrl_wreq <= '0';
+    case wr_adr_d0(2 downto 2) is
+    when "0" =>
+      -- Reg ctrl
+      ctrl_wreq <= wr_req_dec_0_0;
+      wr_ack_dec_0_0 <= ctrl_wack;
+    when "1" =>
+      -- Reg status
+      wr_ack_dec_0_0 <= wr_req_dec_0_0;
+    when others =>
+      wr_ack_dec_0_0 <= wr_req_dec_0_0;
+    end case;
+  end process;
+
+  -- Process for write requests.
+  process (wr_adr_d0, wr_req_dec_0_1, cnt_wack) begin
+    cnt_wreq <= (others => '0');
+    case wr_adr_d0(2 downto 2) is
+    when "0" =>
+      -- Reg cnt
+      cnt_wreq(1) <= wr_req_dec_0_1;
+      wr_ack_dec_0_1 <= cnt_wack(1);
+    when "1" =>
+      -- Reg cnt
+      cnt_wreq(0) <= wr_req_dec_0_1;
+      wr_ack_dec_0_1 <= cnt_wack(0);
+    when others =>
+      wr_ack_dec_0_1 <= wr_req_dec_0_1;
+    end case;
+  end process;
+
+  -- Process for write requests.
+  process (wr_adr_d0, wr_req_dec_0_8, cfg_gain_wack, cfg_offset_wack) begin
+    cfg_gain_wreq <= '0';
+    cfg_offset_wreq <= '0';
+    case wr_adr_d0(2 downto 2) is
+    when "0" =>
+      -- Reg cfg_gain
+      cfg_gain_wreq <= wr_req_dec_0_8;
+      wr_ack_dec_0_8 <= cfg_gain_wack;
+    when "1" =>
+      -- Reg cfg_offset
+      cfg_offset_wreq <= wr_req_dec_0_8;
+      wr_ack_dec_0_8 <= cfg_offset_wack;
+    when others =>
+      wr_ack_dec_0_8 <= wr_req_dec_0_8;
+    end case;
+  end process;
+
+  -- Process for write requests.
+  process (wr_req_dec_0_others) begin
+    wr_ack_dec_0_others <= wr_req_dec_0_others;
+  end process;
+
+  -- Process for write requests.
+  process (wr_req_dec_1) begin
+    buf_data_int_wr <= '0';
+    -- Memory buf
+    buf_data_int_wr <= wr_req_dec_1;
+    wr_ack_dec_1 <= wr_req_dec_1;
+  end process;
+
+  -- Process for write requests.
+  process (wr_req_dec_2, ext_wack) begin
+    ext_we <= '0';
+    -- Submap ext
+    ext_we <= wr_req_dec_2;
+    wr_ack_dec_2 <= ext_wack;
+  end process;
+
+  -- Process for write requests.
+  process (wr_req_dec_others) begin
+    wr_ack_dec_others <= wr_req_dec_others;
+  end process;
+
+  -- Read decoder stage for address bits 9-8.
+  process (wb_adr_i, rd_req_int) begin
+    rd_req_dec_0 <= '0';
+    rd_req_dec_1 <= '0';
+    rd_req_dec_2 <= '0';
+    rd_req_dec_others <= '0';
+    case wb_adr_i(9 downto 8) is
+    when "00" =>
+      rd_req_dec_0 <= rd_req_int;
+    when "01" =>
+      rd_req_dec_1 <= rd_req_int;
+    when "10" =>
+      rd_req_dec_2 <= rd_req_int;
+    when others =>
+      rd_req_dec_others <= rd_req_int;
+    end case;
+  end process;
+  process (clk_i) begin
+    if rising_edge(clk_i) then
+      if rst_n_i = '0' then
+        rd_ack_dec_0_d <= '0';
+        rd_dat_dec_0_d <= "00000000000000000000000000000000";
+        rd_ack_dec_1_d <= '0';
+        rd_dat_dec_1_d <= "00000000000000000000000000000000";
+        rd_ack_dec_2_d <= '0';
+        rd_dat_dec_2_d <= "00000000000000000000000000000000";
+        rd_ack_dec_others_d <= '0';
+        rd_dat_dec_others_d <= "00000000000000000000000000000000";
+      else
+        rd_ack_dec_0_d <= rd_ack_dec_0;
+        rd_dat_dec_0_d <= rd_dat_dec_0;
+        rd_ack_dec_1_d <= rd_ack_dec_1;
+        rd_dat_dec_1_d <= rd_dat_dec_1;
+        rd_ack_dec_2_d <= rd_ack_dec_2;
+        rd_dat_dec_2_d <= rd_dat_dec_2;
+        rd_ack_dec_others_d <= rd_ack_dec_others;
+        rd_dat_dec_others_d <= rd_dat_dec_others;
+      end if;
+    end if;
+  end process;
+  process (wb_adr_i, rd_ack_dec_0_d, rd_dat_dec_0_d, rd_ack_dec_1_d,
+           rd_dat_dec_1_d, rd_ack_dec_2_d, rd_dat_dec_2_d, rd_ack_dec_others_d,
+           rd_dat_dec_others_d) begin
+    case wb_adr_i(9 downto 8) is
+    when "00" =>
+      rd_ack_d0 <= rd_ack_dec_0_d;
+      rd_dat_d0 <= rd_dat_dec_0_d;
+    when "01" =>
+      rd_ack_d0 <= rd_ack_dec_1_d;
+      rd_dat_d0 <= rd_dat_dec_1_d;
+    when "10" =>
+      rd_ack_d0 <= rd_ack_dec_2_d;
+      rd_dat_d0 <= rd_dat_dec_2_d;
+    when others =>
+      rd_ack_d0 <= rd_ack_dec_others_d;
+      rd_dat_d0 <= rd_dat_dec_others_d;
+    end case;
+  end process;
+
+  -- Read decoder stage for address bits 7-3.
+  process (wb_adr_i, rd_req_dec_0) begin
+    rd_req_dec_0_0 <= '0';
+    rd_req_dec_0_1 <= '0';
+    rd_req_dec_0_8 <= '0';
+    rd_req_dec_0_others <= '0';
+    case wb_adr_i(7 downto 3) is
+    when "00000" =>
+      rd_req_dec_0_0 <= rd_req_dec_0;
+    when "00001" =>
+      rd_req_dec_0_1 <= rd_req_dec_0;
+    when "01000" =>
+      rd_req_dec_0_8 <= rd_req_dec_0;
+    when others =>
+      rd_req_dec_0_others <= rd_req_dec_0;
+    end case;
+  end process;
+  process (clk_i) begin
+    if rising_edge(clk_i) then
+      if rst_n_i = '0' then
+        rd_ack_dec_0_0_d <= '0';
+        rd_dat_dec_0_0_d <= "00000000000000000000000000000000";
+        rd_ack_dec_0_1_d <= '0';
+        rd_dat_dec_0_1_d <= "00000000000000000000000000000000";
+        rd_ack_dec_0_8_d <= '0';
+        rd_dat_dec_0_8_d <= "00000000000000000000000000000000";
+        rd_ack_dec_0_others_d <= '0';
+        rd_dat_dec_0_others_d <= "00000000000000000000000000000000";
+      else
+        rd_ack_dec_0_0_d <= rd_ack_dec_0_0;
+        rd_dat_dec_0_0_d <= rd_dat_dec_0_0;
+        rd_ack_dec_0_1_d <= rd_ack_dec_0_1;
+        rd_dat_dec_0_1_d <= rd_dat_dec_0_1;
+        rd_ack_dec_0_8_d <= rd_ack_dec_0_8;
+        rd_dat_dec_0_8_d <= rd_dat_dec_0_8;
+        rd_ack_dec_0_others_d <= rd_ack_dec_0_others;
+        rd_dat_dec_0_others_d <= rd_dat_dec_0_others;
+      end if;
+    end if;
+  end process;
+  process (wb_adr_i, rd_ack_dec_0_0_d, rd_dat_dec_0_0_d, rd_ack_dec_0_1_d,
+           rd_dat_dec_0_1_d, rd_ack_dec_0_8_d, rd_dat_dec_0_8_d,
+           rd_ack_dec_0_others_d, rd_dat_dec_0_others_d) begin
+    case wb_adr_i(7 downto 3) is
+    when "00000" =>
+      rd_ack_dec_0 <= rd_ack_dec_0_0_d;
+      rd_dat_dec_0 <= rd_dat_dec_0_0_d;
+    when "00001" =>
+      rd_ack_dec_0 <= rd_ack_dec_0_1_d;
+      rd_dat_dec_0 <= rd_dat_dec_0_1_d;
+    when "01000" =>
+      rd_ack_dec_0 <= rd_ack_dec_0_8_d;
+      rd_dat_dec_0 <= rd_dat_dec_0_8_d;
+    when others =>
+      rd_ack_dec_0 <= rd_ack_dec_0_others_d;
+      rd_dat_dec_0 <= rd_dat_dec_0_others_d;
+    end case;
+  end process;
+
+  -- Process for read requests.
+  process (wb_adr_i, rd_req_dec_0_0, ctrl_reg, status_i) begin
+    -- By default ack read requests
+    rd_dat_dec_0_0 <= (others => 'X');
+    status_rd_o <= '0';
+    case wb_adr_i(2 downto 2) is
+    when "0" =>
+      -- Reg ctrl
+      rd_ack_dec_0_0 <= rd_req_dec_0_0;
+      rd_dat_dec_0_0 <= ctrl_reg;
+    when "1" =>
+      -- Reg status
+      status_rd_o <= rd_req_dec_0_0;
+      rd_ack_dec_0_0 <= rd_req_dec_0_0;
+      rd_dat_dec_0_0 <= status_i;
+    when others =>
+      rd_ack_dec_0_0 <= rd_req_dec_0_0;
+    end case;
+  end process;
+
+  -- Process for read requests.
+  process (wb_adr_i, rd_req_dec_0_1, cnt_reg) begin
+    -- By default ack read requests
+    rd_dat_dec_0_1 <= (others => 'X');
+    case wb_adr_i(2 downto 2) is
+    when "0" =>
+      -- Reg cnt
+      rd_ack_dec_0_1 <= rd_req_dec_0_1;
+      rd_dat_dec_0_1 <= cnt_reg(63 downto 32);
+    when "1" =>
+      -- Reg cnt
+      rd_ack_dec_0_1 <= rd_req_dec_0_1;
+      rd_dat_dec_0_1 <= cnt_reg(31 downto 0);
+    when others =>
+      rd_ack_dec_0_1 <= rd_req_dec_0_1;
+    end case;
+  end process;
+
+  -- Process for read requests.
+  process (wb_adr_i, rd_req_dec_0_8, cfg_gain_reg, cfg_offset_reg) begin
+    -- By default ack read requests
+    rd_dat_dec_0_8 <= (others => 'X');
+    case wb_adr_i(2 downto 2) is
+    when "0" =>
+      -- Reg cfg_gain
+      rd_ack_dec_0_8 <= rd_req_dec_0_8;
+      rd_dat_dec_0_8(15 downto 0) <= cfg_gain_reg;
+      rd_dat_dec_0_8(31 downto 16) <= (others => '0');
+    when "1" =>
+      -- Reg cfg_offset
+      rd_ack_dec_0_8 <= rd_req_dec_0_8;
+      rd_dat_dec_0_8(15 downto 0) <= cfg_offset_reg;
+      rd_dat_dec_0_8(31 downto 16) <= (others => '0');
+    when others =>
+      rd_ack_dec_0_8 <= rd_req_dec_0_8;
+    end case;
+  end process;
+
+  -- Process for read requests.
+  process (rd_req_dec_0_others) begin
+    -- By default ack read requests
+    rd_dat_dec_0_others <= (others => 'X');
+    rd_ack_dec_0_others <= rd_req_dec_0_others;
+  end process;
+
+  -- Process for read requests.
+  process (buf_data_int_dato, rd_req_dec_1, buf_data_rack) begin
+    -- By default ack read requests
+    rd_dat_dec_1 <= (others => 'X');
+    buf_data_rreq <= '0';
+    -- Memory buf
+    rd_dat_dec_1 <= buf_data_int_dato;
+    buf_data_rreq <= rd_req_dec_1;
+    rd_ack_dec_1 <= buf_data_rack;
+  end process;
+
+  -- Process for read requests.
+  process (rd_req_dec_2, ext_dat_i, ext_rack) begin
+    -- By default ack read requests
+    rd_dat_dec_2 <= (others => 'X');
+    ext_re <= '0';
+    -- Submap ext
+    ext_re <= rd_req_dec_2;
+    rd_dat_dec_2 <= ext_dat_i;
+    rd_ack_dec_2 <= ext_rack;
+  end process;
+
+  -- Process for read requests.
+  process (rd_req_dec_others) begin
+    -- By default ack read requests
+    rd_dat_dec_others <= (others => 'X');
+    rd_ack_dec_others <= rd_req_dec_others;
+  end process;
+end syn;
@@ -0,0 +1,574 @@
+
+module read_mux_or
+  (
+    input   wire rst_n_i,
+    input   wire clk_i,
+    input   wire wb_cyc_i,
+    input   wire wb_stb_i,
+    input   wire [9:2] wb_adr_i,
+    input   wire [3:0] wb_sel_i,
+    input   wire wb_we_i,
+    input   wire [31:0] wb_dat_i,
+    output  wire wb_ack_o,
+    output  wire wb_err_o,
+    output  wire wb_rty_o,
+    output  wire wb_stall_o,
+    output  reg [31:0] wb_dat_o,
+
+    // REG r0
+    output  wire [31:0] r0_o,
+
+    // REG r1
+    input   wire [31:0] r1_i,
+
+    // REG r2
+    output  wire [31:0] r2_o,
+
+    // REG r3
+    input   wire [31:0] r3_i,
+
+    // REG r4
+    output  wire [31:0] r4_o,
+
+    // REG r5
+    input   wire [31:0] r5_i,
+
+    // REG r6
+    output  wire [31:0] r6_o,
+
+    // REG r7
+    input   wire [31:0] r7_i,
+
+    // REG cnt
+    input   wire [63:0] cnt_i,
+    output  reg [1:0] cnt_rd_o,
+
+    // RAM port for buf
+    input   wire [5:0] buf_adr_i,
+    input   wire buf_data_rd_i,
+    output  wire [31:0] buf_data_dat_o,
+
+    // WB bus ext
+    output  wire ext_cyc_o,
+    output  wire ext_stb_o,
+    output  wire [7:2] ext_adr_o,
+    output  reg [3:0] ext_sel_o,
+    output  wire ext_we_o,
+    output  wire [31:0] ext_dat_o,
+    input   wire ext_ack_i,
+    input   wire ext_err_i,
+    input   wire ext_rty_i,
+    input   wire ext_stall_i,
+    input   wire [31:0] ext_dat_i
+  );
+  reg [31:0] wr_sel;
+  wire rd_req_int;
+  wire wr_req_int;
+  reg rd_ack_int;
+  reg wr_ack_int;
+  wire wb_en;
+  wire ack_int;
+  reg wb_rip;
+  reg wb_wip;
+  reg [31:0] r0_reg;
+  reg r0_wreq;
+  wire r0_wack;
+  reg [31:0] r2_reg;
+  reg r2_wreq;
+  wire r2_wack;
+  reg [31:0] r4_reg;
+  reg r4_wreq;
+  wire r4_wack;
+  reg [31:0] r6_reg;
+  reg r6_wreq;
+  wire r6_wack;
+  wire [31:0] buf_data_int_dato;
+  wire [31:0] buf_data_ext_dat;
+  reg buf_data_rreq;
+  reg buf_data_rack;
+  reg buf_data_int_wr;
+  reg ext_re;
+  reg ext_we;
+  reg ext_wt;
+  reg ext_rt;
+  wire ext_tr;
+  wire ext_wack;
+  wire ext_rack;
+  wire rd_ack_d0;
+  wire [31:0] rd_dat_d0;
+  reg wr_req_d0;
+  reg [9:2] wr_adr_d0;
+  reg [31:0] wr_dat_d0;
+  reg [31:0] wr_sel_d0;
+  wire buf_wr;
+  wire buf_wreq;
+  reg [5:0] buf_adr_int;
+  reg [3:0] buf_sel_int;
+  reg rd_ack_or0;
+  reg [31:0] r0_rdat;
+  reg [31:0] r1_rdat;
+  reg [31:0] r2_rdat;
+  reg [31:0] r3_rdat;
+  reg [31:0] r4_rdat;
+  reg [31:0] r5_rdat;
+  reg [31:0] r6_rdat;
+  reg [31:0] r7_rdat;
+  reg [31:0] cnt_rdat;
+  reg [31:0] buf_rdat;
+  reg [31:0] ext_rdat;
+  reg [31:0] rd_dat_or1_0;
+  reg [31:0] rd_dat_or1_1;
+  reg [31:0] rd_dat_or1_2;
+  reg rd_ack_or1;
+
+  // WB decode signals
+  always_comb
+  begin
+    wr_sel[7:0] = {8{wb_sel_i[0]}};
+    wr_sel[15:8] = {8{wb_sel_i[1]}};
+    wr_sel[23:16] = {8{wb_sel_i[2]}};
+    wr_sel[31:24] = {8{wb_sel_i[3]}};
+  end
+  assign wb_en = wb_cyc_i & wb_stb_i;
+
+  always_ff @(posedge(clk_i))
+  begin
+    if (!rst_n_i)
+      wb_rip <= 1'b0;
+    else
+      wb_rip <= (wb_rip | (wb_en & ~wb_we_i)) & ~rd_ack_int;
+  end
+  assign rd_req_int = (wb_en & ~wb_we_i) & ~wb_rip;
+
+  always_ff @(posedge(clk_i))
+  begin
+    if (!rst_n_i)
+      wb_wip <= 1'b0;
+    else
+      wb_wip <= (wb_wip | (wb_en & wb_we_i)) & ~wr_ack_int;
+  end
+  assign wr_req_int = (wb_en & wb_we_i) & ~wb_wip;
+
+  assign ack_int = rd_ack_int | wr_ack_int;
+  assign wb_ack_o = ack_int;
+  assign wb_stall_o = ~ack_int & wb_en;
+  assign wb_rty_o = 1'b0;
+  assign wb_err_o = 1'b0;
+
+  // pipelining for wr-in+rd-out
+  always_ff @(posedge(clk_i))
+  begin
+    if (!rst_n_i)
+      begin
+        rd_ack_int <= 1'b0;
+        wb_dat_o <= 32'b00000000000000000000000000000000;
+        wr_req_d0 <= 1'b0;
+        wr_adr_d0 <= 8'b00000000;
+        wr_dat_d0 <= 32'b00000000000000000000000000000000;
+        wr_sel_d0 <= 32'b00000000000000000000000000000000;
+      end
+    else
+      begin
+        rd_ack_int <= rd_ack_d0;
+        wb_dat_o <= rd_dat_d0;
+        wr_req_d0 <= wr_req_int;
+        wr_adr_d0 <= wb_adr_i;
+        wr_dat_d0 <= wb_dat_i;
+        wr_sel_d0 <= wr_sel;
+      end
+  end
+
+  // Register r0
+  assign r0_o = r0_reg;
+  assign r0_wack = r0_wreq;
+  always_ff @(posedge(clk_i))
+  begin
+    if (!rst_n_i)
+      r0_reg <= 32'b00000000000000000000000000000000;
+    else
+      if (r0_wreq == 1'b1)
+        r0_reg <= wr_dat_d0;
+  end
+
+  // Register r1
+
+  // Register r2
+  assign r2_o = r2_reg;
+  assign r2_wack = r2_wreq;
+  always_ff @(posedge(clk_i))
+  begin
+    if (!rst_n_i)
+      r2_reg <= 32'b00000000000000000000000000000000;
+    else
+      if (r2_wreq == 1'b1)
+        r2_reg <= wr_dat_d0;
+  end
+
+  // Register r3
+
+  // Register r4
+  assign r4_o = r4_reg;
+  assign r4_wack = r4_wreq;
+  always_ff @(posedge(clk_i))
+  begin
+    if (!rst_n_i)
+      r4_reg <= 32'b00000000000000000000000000000000;
+    else
+      if (r4_wreq == 1'b1)
+        r4_reg <= wr_dat_d0;
+  end
+
+  // Register r5
+
+  // Register r6
+  assign r6_o = r6_reg;
+  assign r6_wack = r6_wreq;
+  always_ff @(posedge(clk_i))
+  begin
+    if (!rst_n_i)
+      r6_reg <= 32'b00000000000000000000000000000000;
+    else
+      if (r6_wreq == 1'b1)
+        r6_reg <= wr_dat_d0;
+  end
+
+  // Register r7
+
+  // Register cnt
+
+  // Memory buf
+  always_comb
+  if (buf_wr == 1'b1)
+    buf_adr_int = wr_adr_d0[7:2];
+  else
+    buf_adr_int = wb_adr_i[7:2];
+  assign buf_wreq = buf_data_int_wr;
+  assign buf_wr = buf_wreq;
+  cheby_dpssram #(
+      .g_data_width(32),
+      .g_size(64),
+      .g_addr_width(6),
+      .g_dual_clock(1'b0),
+      .g_use_bwsel(1'b1)
+    )
+  buf_data_raminst (
+      .clk_a_i(clk_i),
+      .clk_b_i(clk_i),
+      .addr_a_i(buf_adr_int),
+      .bwsel_a_i(buf_sel_int),
+      .data_a_i(wr_dat_d0),
+      .data_a_o(buf_data_int_dato),
+      .rd_a_i(buf_data_rreq),
+      .wr_a_i(buf_data_int_wr),
+      .addr_b_i(buf_adr_i),
+      .bwsel_b_i({4{1'b1}}),
+      .data_b_i(buf_data_ext_dat),
+      .data_b_o(buf_data_dat_o),
+      .rd_b_i(buf_data_rd_i),
+      .wr_b_i(1'b0)
+    );
+  
+  always_comb
+  begin
+    buf_sel_int = 4'b0;
+    if (~(wr_sel_d0[7:0] == 8'b0))
+      buf_sel_int[0] = 1'b1;
+    if (~(wr_sel_d0[15:8] == 8'b0))
+      buf_sel_int[1] = 1'b1;
+    if (~(wr_sel_d0[23:16] == 8'b0))
+      buf_sel_int[2] = 1'b1;
+    if (~(wr_sel_d0[31:24] == 8'b0))
+      buf_sel_int[3] = 1'b1;
+  end
+  always_ff @(posedge(clk_i))
+  begin
+    if (!rst_n_i)
+      buf_data_rack <= 1'b0;
+    else
+      buf_data_rack <= buf_data_rreq;
+  end
+
+  // Interface ext
+  assign ext_tr = ext_wt | ext_rt;
+  always_ff @(posedge(clk_i))
+  begin
+    if (!rst_n_i)
+      begin
+        ext_rt <= 1'b0;
+        ext_wt <= 1'b0;
+      end
+    else
+      begin
+        ext_rt <= (ext_rt | ext_re) & ~ext_rack;
+        ext_wt <= (ext_wt | ext_we) & ~ext_wack;
+      end
+  end
+  assign ext_cyc_o = ext_tr;
+  assign ext_stb_o = ext_tr;
+  assign ext_wack = ext_ack_i & ext_wt;
+  assign ext_rack = ext_ack_i & ext_rt;
+  assign ext_adr_o = wb_adr_i[7:2];
+  always_comb
+  begin
+    ext_sel_o = 4'b0;
+    if (~(wr_sel_d0[7:0] == 8'b0))
+      ext_sel_o[0] = 1'b1;
+    if (~(wr_sel_d0[15:8] == 8'b0))
+      ext_sel_o[1] = 1'b1;
+    if (~(wr_sel_d0[23:16] == 8'b0))
+      ext_sel_o[2] = 1'b1;
+    if (~(wr_sel_d0[31:24] == 8'b0))
+      ext_sel_o[3] = 1'b1;
+  end
+  assign ext_we_o = ext_wt;
+  assign ext_dat_o = wr_dat_d0;
+
+  // Process for write requests.
+  always_comb
+  begin
+    r0_wreq = 1'b0;
+    r2_wreq = 1'b0;
+    r4_wreq = 1'b0;
+    r6_wreq = 1'b0;
+    buf_data_int_wr = 1'b0;
+    ext_we = 1'b0;
+    case (wr_adr_d0[9:8])
+    2'b00:
+      case (wr_adr_d0[7:3])
+      5'b00000:
+        case (wr_adr_d0[2:2])
+        1'b0:
+          begin
+            // Reg r0
+            r0_wreq = wr_req_d0;
+            wr_ack_int = r0_wack;
+          end
+        1'b1:
+          // Reg r1
+          wr_ack_int = wr_req_d0;
+        default:
+          wr_ack_int = wr_req_d0;
+        endcase
+      5'b00001:
+        case (wr_adr_d0[2:2])
+        1'b0:
+          begin
+            // Reg r2
+            r2_wreq = wr_req_d0;
+            wr_ack_int = r2_wack;
+          end
+        1'b1:
+          // Reg r3
+          wr_ack_int = wr_req_d0;
+        default:
+          wr_ack_int = wr_req_d0;
+        endcase
+      5'b00010:
+        case (wr_adr_d0[2:2])
+        1'b0:
+          begin
+            // Reg r4
+            r4_wreq = wr_req_d0;
+            wr_ack_int = r4_wack;
+          end
+        1'b1:
+          // Reg r5
+          wr_ack_int = wr_req_d0;
+        default:
+          wr_ack_int = wr_req_d0;
+        endcase
+      5'b00011:
+        case (wr_adr_d0[2:2])
+        1'b0:
+          begin
+            // Reg r6
+            r6_wreq = wr_req_d0;
+            wr_ack_int = r6_wack;
+          end
+        1'b1:
+          // Reg r7
+          wr_ack_int = wr_req_d0;
+        default:
+          wr_ack_int = wr_req_d0;
+        endcase
+      5'b00100:
+        case (wr_adr_d0[2:2])
+        1'b0:
+          // Reg cnt
+          wr_ack_int = wr_req_d0;
+        1'b1:
+          // Reg cnt
+          wr_ack_int = wr_req_d0;
+        default:
+          wr_ack_int = wr_req_d0;
+        endcase
+      default:
+        wr_ack_int = wr_req_d0;
+      endcase
+    2'b01:
+      begin
+        // Memory buf
+        buf_data_int_wr = wr_req_d0;
+        wr_ack_int = wr_req_d0;
+      end
+    2'b10:
+      begin
+        // Submap ext
+        ext_we = wr_req_d0;
+        wr_ack_int = ext_wack;
+      end
+    default:
+      wr_ack_int = wr_req_d0;
+    endcase
+  end
+
+  // Process for read requests.
+  always_comb
+  begin
+    r0_rdat = 32'b0;
+    r1_rdat = 32'b0;
+    r2_rdat = 32'b0;
+    r3_rdat = 32'b0;
+    r4_rdat = 32'b0;
+    r5_rdat = 32'b0;
+    r6_rdat = 32'b0;
+    r7_rdat = 32'b0;
+    cnt_rdat = 32'b0;
+    cnt_rd_o = 2'b0;
+    buf_rdat = 32'b0;
+    buf_data_rreq = 1'b0;
+    ext_rdat = 32'b0;
+    ext_re = 1'b0;
+    case (wb_adr_i[9:8])
+    2'b00:
+      case (wb_adr_i[7:3])
+      5'b00000:
+        case (wb_adr_i[2:2])
+        1'b0:
+          begin
+            // Reg r0
+            rd_ack_or0 = rd_req_int;
+            r0_rdat = r0_reg;
+          end
+        1'b1:
+          begin
+            // Reg r1
+            rd_ack_or0 = rd_req_int;
+            r1_rdat = r1_i;
+          end
+        default:
+          rd_ack_or0 = rd_req_int;
+        endcase
+      5'b00001:
+        case (wb_adr_i[2:2])
+        1'b0:
+          begin
+            // Reg r2
+            rd_ack_or0 = rd_req_int;
+            r2_rdat = r2_reg;
+          end
+        1'b1:
+          begin
+            // Reg r3
+            rd_ack_or0 = rd_req_int;
+            r3_rdat = r3_i;
+          end
+        default:
+          rd_ack_or0 = rd_req_int;
+        endcase
+      5'b00010:
+        case (wb_adr_i[2:2])
+        1'b0:
+          begin
+            // Reg r4
+            rd_ack_or0 = rd_req_int;
+            r4_rdat = r4_reg;
+          end
+        1'b1:
+          begin
+            // Reg r5
+            rd_ack_or0 = rd_req_int;
+            r5_rdat = r5_i;
+          end
+        default:
+          rd_ack_or0 = rd_req_int;
+        endcase
+      5'b00011:
+        case (wb_adr_i[2:2])
+        1'b0:
+          begin
+            // Reg r6
+            rd_ack_or0 = rd_req_int;
+            r6_rdat = r6_reg;
+          end
+        1'b1:
+          begin
+            // Reg r7
+            rd_ack_or0 = rd_req_int;
+            r7_rdat = r7_i;
+          end
+        default:
+          rd_ack_or0 = rd_req_int;
+        endcase
+      5'b00100:
+        case (wb_adr_i[2:2])
+        1'b0:
+          begin
+            // Reg cnt
+            cnt_rd_o[1] = rd_req_int;
+            rd_ack_or0 = rd_req_int;
+            cnt_rdat = cnt_i[63:32];
+          end
+        1'b1:
+          begin
+            // Reg cnt
+            cnt_rd_o[0] = rd_req_int;
+            rd_ack_or0 = rd_req_int;
+            cnt_rdat = cnt_i[31:0];
+          end
+        default:
+          rd_ack_or0 = rd_req_int;
+        endcase
+      default:
+        rd_ack_or0 = rd_req_int;
+      endcase
+    2'b01:
+      begin
+        // Memory buf
+        buf_rdat = buf_data_int_dato;
+        buf_data_rreq = rd_req_int;
+        rd_ack_or0 = buf_data_rack;
+      end
+    2'b10:
+      begin
+        // Submap ext
+        ext_re = rd_req_int;
+        ext_rdat = ext_dat_i;
+        rd_ack_or0 = ext_rack;
+      end
+    default:
+      rd_ack_or0 = rd_req_int;
+    endcase
+  end
+
+  // Read data OR tree.
+  assign rd_dat_d0 = (rd_dat_or1_0 | rd_dat_or1_1) | rd_dat_or1_2;
+  always_ff @(posedge(clk_i))
+  begin
+    if (!rst_n_i)
+      begin
+        rd_dat_or1_0 <= 32'b00000000000000000000000000000000;
+        rd_dat_or1_1 <= 32'b00000000000000000000000000000000;
+        rd_dat_or1_2 <= 32'b00000000000000000000000000000000;
+        rd_ack_or1 <= 1'b0;
+      end
+    else
+      begin
+        rd_dat_or1_0 <= ((r0_rdat | r1_rdat) | r2_rdat) | r3_rdat;
+        rd_dat_or1_1 <= ((r4_rdat | r5_rdat) | r6_rdat) | r7_rdat;
+        rd_dat_or1_2 <= (cnt_rdat | buf_rdat) | ext_rdat;
+        rd_ack_or1 <= rd_ack_or0;
+      end
+  end
+  assign rd_ack_d0 = rd_ack_or1;
+endmodule
@@ -0,0 +1,565 @@
+library ieee;
+use ieee.std_logic_1164.all;
+use ieee.numeric_std.all;
+use work.cheby_pkg.all;
+
+entity read_mux_or is
+  port (
+    rst_n_i              : in    std_logic;
+    clk_i                : in    std_logic;
+    wb_cyc_i             : in    std_logic;
+    wb_stb_i             : in    std_logic;
+    wb_adr_i             : in    std_logic_vector(9 downto 2);
+    wb_sel_i             : in    std_logic_vector(3 downto 0);
+    wb_we_i              : in    std_logic;
+    wb_dat_i             : in    std_logic_vector(31 downto 0);
+    wb_ack_o             : out   std_logic;
+    wb_err_o             : out   std_logic;
+    wb_rty_o             : out   std_logic;
+    wb_stall_o           : out   std_logic;
+    wb_dat_o             : out   std_logic_vector(31 downto 0);
+
+    -- REG r0
+    r0_o                 : out   std_logic_vector(31 downto 0);
+
+    -- REG r1
+    r1_i                 : in    std_logic_vector(31 downto 0);
+
+    -- REG r2
+    r2_o                 : out   std_logic_vector(31 downto 0);
+
+    -- REG r3
+    r3_i                 : in    std_logic_vector(31 downto 0);
+
+    -- REG r4
+    r4_o                 : out   std_logic_vector(31 downto 0);
+
+    -- REG r5
+    r5_i                 : in    std_logic_vector(31 downto 0);
+
+    -- REG r6
+    r6_o                 : out   std_logic_vector(31 downto 0);
+
+    -- REG r7
+    r7_i                 : in    std_logic_vector(31 downto 0);
+
+    -- REG cnt
+    cnt_i                : in    std_logic_vector(63 downto 0);
+    cnt_rd_o             : out   std_logic_vector(1 downto 0);
+
+    -- RAM port for buf
+    buf_adr_i            : in    std_logic_vector(5 downto 0);
+    buf_data_rd_i        : in    std_logic;
+    buf_data_dat_o       : out   std_logic_vector(31 downto 0);
+
+    -- WB bus ext
+    ext_cyc_o            : out   std_logic;
+    ext_stb_o            : out   std_logic;
+    ext_adr_o            : out   std_logic_vector(7 downto 2);
+    ext_sel_o            : out   std_logic_vector(3 downto 0);
+    ext_we_o             : out   std_logic;
+    ext_dat_o            : out   std_logic_vector(31 downto 0);
+    ext_ack_i            : in    std_logic;
+    ext_err_i            : in    std_logic;
+    ext_rty_i            : in    std_logic;
+    ext_stall_i          : in    std_logic;
+    ext_dat_i            : in    std_logic_vector(31 downto 0)
+  );
+end read_mux_or;
+
+architecture syn of read_mux_or is
+  signal wr_sel                         : std_logic_vector(31 downto 0);
+  signal rd_req_int                     : std_logic;
+  signal wr_req_int                     : std_logic;
+  signal rd_ack_int                     : std_logic;
+  signal wr_ack_int                     : std_logic;
+  signal wb_en                          : std_logic;
+  signal ack_int                        : std_logic;
+  signal wb_rip                         : std_logic;
+  signal wb_wip                         : std_logic;
+  signal r0_reg                         : std_logic_vector(31 downto 0);
+  signal r0_wreq                        : std_logic;
+  signal r0_wack                        : std_logic;
+  signal r2_reg                         : std_logic_vector(31 downto 0);
+  signal r2_wreq                        : std_logic;
+  signal r2_wack                        : std_logic;
+  signal r4_reg                         : std_logic_vector(31 downto 0);
+  signal r4_wreq                        : std_logic;
+  signal r4_wack                        : std_logic;
+  signal r6_reg                         : std_logic_vector(31 downto 0);
+  signal r6_wreq                        : std_logic;
+  signal r6_wack                        : std_logic;
+  signal buf_data_int_dato              : std_logic_vector(31 downto 0);
+  signal buf_data_ext_dat               : std_logic_vector(31 downto 0);
+  signal buf_data_rreq                  : std_logic;
+  signal buf_data_rack                  : std_logic;
+  signal buf_data_int_wr                : std_logic;
+  signal ext_re                         : std_logic;
+  signal ext_we                         : std_logic;
+  signal ext_wt                         : std_logic;
+  signal ext_rt                         : std_logic;
+  signal ext_tr                         : std_logic;
+  signal ext_wack                       : std_logic;
+  signal ext_rack                       : std_logic;
+  signal rd_ack_d0                      : std_logic;
+  signal rd_dat_d0                      : std_logic_vector(31 downto 0);
+  signal wr_req_d0                      : std_logic;
+  signal wr_adr_d0                      : std_logic_vector(9 downto 2);
+  signal wr_dat_d0                      : std_logic_vector(31 downto 0);
+  signal wr_sel_d0                      : std_logic_vector(31 downto 0);
+  signal buf_wr                         : std_logic;
+  signal buf_wreq                       : std_logic;
+  signal buf_adr_int                    : std_logic_vector(5 downto 0);
+  signal buf_sel_int                    : std_logic_vector(3 downto 0);
+  signal rd_ack_or0                     : std_logic;
+  signal r0_rdat                        : std_logic_vector(31 downto 0);
+  signal r1_rdat                        : std_logic_vector(31 downto 0);
+  signal r2_rdat                        : std_logic_vector(31 downto 0);
+  signal r3_rdat                        : std_logic_vector(31 downto 0);
+  signal r4_rdat                        : std_logic_vector(31 downto 0);
+  signal r5_rdat                        : std_logic_vector(31 downto 0);
+  signal r6_rdat                        : std_logic_vector(31 downto 0);
+  signal r7_rdat                        : std_logic_vector(31 downto 0);
+  signal cnt_rdat                       : std_logic_vector(31 downto 0);
+  signal buf_rdat                       : std_logic_vector(31 downto 0);
+  signal ext_rdat                       : std_logic_vector(31 downto 0);
+  signal rd_dat_or1_0                   : std_logic_vector(31 downto 0);
+  signal rd_dat_or1_1                   : std_logic_vector(31 downto 0);
+  signal rd_dat_or1_2                   : std_logic_vector(31 downto 0);
+  signal rd_ack_or1                     : std_logic;
+begin
+
+  -- WB decode signals
+  process (wb_sel_i) begin
+    wr_sel(7 downto 0) <= (others => wb_sel_i(0));
+    wr_sel(15 downto 8) <= (others => wb_sel_i(1));
+    wr_sel(23 downto 16) <= (others => wb_sel_i(2));
+    wr_sel(31 downto 24) <= (others => wb_sel_i(3));
+  end process;
+  wb_en <= wb_cyc_i and wb_stb_i;
+
+  process (clk_i) begin
+    if rising_edge(clk_i) then
+      if rst_n_i = '0' then
+        wb_rip <= '0';
+      else
+        wb_rip <= (wb_rip or (wb_en and not wb_we_i)) and not rd_ack_int;
+      end if;
+    end if;
+  end process;
+  rd_req_int <= (wb_en and not wb_we_i) and not wb_rip;
+
+  process (clk_i) begin
+    if rising_edge(clk_i) then
+      if rst_n_i = '0' then
+        wb_wip <= '0';
+      else
+        wb_wip <= (wb_wip or (wb_en and wb_we_i)) and not wr_ack_int;
+      end if;
+    end if;
+  end process;
+  wr_req_int <= (wb_en and wb_we_i) and not wb_wip;
+
+  ack_int <= rd_ack_int or wr_ack_int;
+  wb_ack_o <= ack_int;
+  wb_stall_o <= not ack_int and wb_en;
+  wb_rty_o <= '0';
+  wb_err_o <= '0';
+
+  -- pipelining for wr-in+rd-out
+  process (clk_i) begin
+    if rising_edge(clk_i) then
+      if rst_n_i = '0' then
+        rd_ack_int <= '0';
+        wb_dat_o <= "00000000000000000000000000000000";
+        wr_req_d0 <= '0';
+        wr_adr_d0 <= "00000000";
+        wr_dat_d0 <= "00000000000000000000000000000000";
+        wr_sel_d0 <= "00000000000000000000000000000000";
+      else
+        rd_ack_int <= rd_ack_d0;
+        wb_dat_o <= rd_dat_d0;
+        wr_req_d0 <= wr_req_int;
+        wr_adr_d0 <= wb_adr_i;
+        wr_dat_d0 <= wb_dat_i;
+        wr_sel_d0 <= wr_sel;
+      end if;
+    end if;
+  end process;
+
+  -- Register r0
+  r0_o <= r0_reg;
+  r0_wack <= r0_wreq;
+  process (clk_i) begin
+    if rising_edge(clk_i) then
+      if rst_n_i = '0' then
+        r0_reg <= "00000000000000000000000000000000";
+      else
+        if r0_wreq = '1' then
+          r0_reg <= wr_dat_d0;
+        end if;
+      end if;
+    end if;
+  end process;
+
+  -- Register r1
+
+  -- Register r2
+  r2_o <= r2_reg;
+  r2_wack <= r2_wreq;
+  process (clk_i) begin
+    if rising_edge(clk_i) then
+      if rst_n_i = '0' then
+        r2_reg <= "00000000000000000000000000000000";
+      else
+        if r2_wreq = '1' then
+          r2_reg <= wr_dat_d0;
+        end if;
+      end if;
+    end if;
+  end process;
+
+  -- Register r3
+
+  -- Register r4
+  r4_o <= r4_reg;
+  r4_wack <= r4_wreq;
+  process (clk_i) begin
+    if rising_edge(clk_i) then
+      if rst_n_i = '0' then
+        r4_reg <= "00000000000000000000000000000000";
+      else
+        if r4_wreq = '1' then
+          r4_reg <= wr_dat_d0;
+        end if;
+      end if;
+    end if;
+  end process;
+
+  -- Register r5
+
+  -- Register r6
+  r6_o <= r6_reg;
+  r6_wack <= r6_wreq;
+  process (clk_i) begin
+    if rising_edge(clk_i) then
+      if rst_n_i = '0' then
+        r6_reg <= "00000000000000000000000000000000";
+      else
+        if r6_wreq = '1' then
+          r6_reg <= wr_dat_d0;
+        end if;
+      end if;
+    end if;
+  end process;
+
+  -- Register r7
+
+  -- Register cnt
+
+  -- Memory buf
+  process (wb_adr_i, wr_adr_d0, buf_wr) begin
+    if buf_wr = '1' then
+      buf_adr_int <= wr_adr_d0(7 downto 2);
+    else
+      buf_adr_int <= wb_adr_i(7 downto 2);
+    end if;
+  end process;
+  buf_wreq <= buf_data_int_wr;
+  buf_wr <= buf_wreq;
+  buf_data_raminst: cheby_dpssram
+    generic map (
+      g_data_width         => 32,
+      g_size               => 64,
+      g_addr_width         => 6,
+      g_dual_clock         => '0',
+      g_use_bwsel          => '1'
+    )
+    port map (
+      clk_a_i              => clk_i,
+      clk_b_i              => clk_i,
+      addr_a_i             => buf_adr_int,
+      bwsel_a_i            => buf_sel_int,
+      data_a_i             => wr_dat_d0,
+      data_a_o             => buf_data_int_dato,
+      rd_a_i               => buf_data_rreq,
+      wr_a_i               => buf_data_int_wr,
+      addr_b_i             => buf_adr_i,
+      bwsel_b_i            => (others => '1'),
+      data_b_i             => buf_data_ext_dat,
+      data_b_o             => buf_data_dat_o,
+      rd_b_i               => buf_data_rd_i,
+      wr_b_i               => '0'
+    );
+  
+  process (wr_sel_d0) begin
+    buf_sel_int <= (others => '0');
+    if not (wr_sel_d0(7 downto 0) = (7 downto 0 => '0')) then
+      buf_sel_int(0) <= '1';
+    end if;
+    if not (wr_sel_d0(15 downto 8) = (7 downto 0 => '0')) then
+      buf_sel_int(1) <= '1';
+    end if;
+    if not (wr_sel_d0(23 downto 16) = (7 downto 0 => '0')) then
+      buf_sel_int(2) <= '1';
+    end if;
+    if not (wr_sel_d0(31 downto 24) = (7 downto 0 => '0')) then
+      buf_sel_int(3) <= '1';
+    end if;
+  end process;
+  process (clk_i) begin
+    if rising_edge(clk_i) then
+      if rst_n_i = '0' then
+        buf_data_rack <= '0';
+      else
+        buf_data_rack <= buf_data_rreq;
+      end if;
+    end if;
+  end process;
+
+  -- Interface ext
+  ext_tr <= ext_wt or ext_rt;
+  process (clk_i) begin
+    if rising_edge(clk_i) then
+      if rst_n_i = '0' then
+        ext_rt <= '0';
+        ext_wt <= '0';
+      else
+        ext_rt <= (ext_rt or ext_re) and not ext_rack;
+        ext_wt <= (ext_wt or ext_we) and not ext_wack;
+      end if;
+    end if;
+  end process;
+  ext_cyc_o <= ext_tr;
+  ext_stb_o <= ext_tr;
+  ext_wack <= ext_ack_i and ext_wt;
+  ext_rack <= ext_ack_i and ext_rt;
+  ext_adr_o <= wb_adr_i(7 downto 2);
+  process (wr_sel_d0) begin
+    ext_sel_o <= (others => '0');
+    if not (wr_sel_d0(7 downto 0) = (7 downto 0 => '0')) then
+      ext_sel_o(0) <= '1';
+    end if;
+    if not (wr_sel_d0(15 downto 8) = (7 downto 0 => '0')) then
+      ext_sel_o(1) <= '1';
+    end if;
+    if not (wr_sel_d0(23 downto 16) = (7 downto 0 => '0')) then
+      ext_sel_o(2) <= '1';
+    end if;
+    if not (wr_sel_d0(31 downto 24) = (7 downto 0 => '0')) then
+      ext_sel_o(3) <= '1';
+    end if;
+  end process;
+  ext_we_o <= ext_wt;
+  ext_dat_o <= wr_dat_d0;
+
+  -- Process for write requests.
+  process (wr_adr_d0, wr_req_d0, r0_wack, r2_wack, r4_wack, r6_wack, ext_wack) begin
+    r0_wreq <= '0';
+    r2_wreq <= '0';
+    r4_wreq <= '0';
+    r6_wreq <= '0';
+    buf_data_int_wr <= '0';
+    ext_we <= '0';
+    case wr_adr_d0(9 downto 8) is
+    when "00" =>
+      case wr_adr_d0(7 downto 3) is
+      when "00000" =>
+        case wr_adr_d0(2 downto 2) is
+        when "0" =>
+          -- Reg r0
+          r0_wreq <= wr_req_d0;
+          wr_ack_int <= r0_wack;
+        when "1" =>
+          -- Reg r1
+          wr_ack_int <= wr_req_d0;
+        when others =>
+          wr_ack_int <= wr_req_d0;
+        end case;
+      when "00001" =>
+        case wr_adr_d0(2 downto 2) is
+        when "0" =>
+          -- Reg r2
+          r2_wreq <= wr_req_d0;
+          wr_ack_int <= r2_wack;
+        when "1" =>
+          -- Reg r3
+          wr_ack_int <= wr_req_d0;
+        when others =>
+          wr_ack_int <= wr_req_d0;
+        end case;
+      when "00010" =>
+        case wr_adr_d0(2 downto 2) is
+        when "0" =>
+          -- Reg r4
+          r4_wreq <= wr_req_d0;
+          wr_ack_int <= r4_wack;
+        when "1" =>
+          -- Reg r5
+          wr_ack_int <= wr_req_d0;
+        when others =>
+          wr_ack_int <= wr_req_d0;
+        end case;
+      when "00011" =>
+        case wr_adr_d0(2 downto 2) is
+        when "0" =>
+          -- Reg r6
+          r6_wreq <= wr_req_d0;
+          wr_ack_int <= r6_wack;
+        when "1" =>
+          -- Reg r7
+          wr_ack_int <= wr_req_d0;
+        when others =>
+          wr_ack_int <= wr_req_d0;
+        end case;
+      when "00100" =>
+        case wr_adr_d0(2 downto 2) is
+        when "0" =>
+          -- Reg cnt
+          wr_ack_int <= wr_req_d0;
+        when "1" =>
+          -- Reg cnt
+          wr_ack_int <= wr_req_d0;
+        when others =>
+          wr_ack_int <= wr_req_d0;
+        end case;
+      when others =>
+        wr_ack_int <= wr_req_d0;
+      end case;
+    when "01" =>
+      -- Memory buf
+      buf_data_int_wr <= wr_req_d0;
+      wr_ack_int <= wr_req_d0;
+    when "10" =>
+      -- Submap ext
+      ext_we <= wr_req_d0;
+      wr_ack_int <= ext_wack;
+    when others =>
+      wr_ack_int <= wr_req_d0;
+    end case;
+  end process;
+
+  -- Process for read requests.
+  process (wb_adr_i, rd_req_int, r0_reg, r1_i, r2_reg, r3_i, r4_reg, r5_i, r6_reg, r7_i, cnt_i,
+           buf_data_int_dato, buf_data_rack, ext_dat_i, ext_rack) begin
+    r0_rdat <= (others => '0');
+    r1_rdat <= (others => '0');
+    r2_rdat <= (others => '0');
+    r3_rdat <= (others => '0');
+    r4_rdat <= (others => '0');
+    r5_rdat <= (others => '0');
+    r6_rdat <= (others => '0');
+    r7_rdat <= (others => '0');
+    cnt_rdat <= (others => '0');
+    cnt_rd_o <= (others => '0');
+    buf_rdat <= (others => '0');
+    buf_data_rreq <= '0';
+    ext_rdat <= (others => '0');
+    ext_re <= '0';
+    case wb_adr_i(9 downto 8) is
+    when "00" =>
+      case wb_adr_i(7 downto 3) is
+      when "00000" =>
+        case wb_adr_i(2 downto 2) is
+        when "0" =>
+          -- Reg r0
+          rd_ack_or0 <= rd_req_int;
+          r0_rdat <= r0_reg;
+        when "1" =>
+          -- Reg r1
+          rd_ack_or0 <= rd_req_int;
+          r1_rdat <= r1_i;
+        when others =>
+          rd_ack_or0 <= rd_req_int;
+        end case;
+      when "00001" =>
+        case wb_adr_i(2 downto 2) is
+        when "0" =>
+          -- Reg r2
+          rd_ack_or0 <= rd_req_int;
+          r2_rdat <= r2_reg;
+        when "1" =>
+          -- Reg r3
+          rd_ack_or0 <= rd_req_int;
+          r3_rdat <= r3_i;
+        when others =>
+          rd_ack_or0 <= rd_req_int;
+        end case;
+      when "00010" =>
+        case wb_adr_i(2 downto 2) is
+        when "0" =>
+          -- Reg r4
+          rd_ack_or0 <= rd_req_int;
+          r4_rdat <= r4_reg;
+        when "1" =>
+          -- Reg r5
+          rd_ack_or0 <= rd_req_int;
+          r5_rdat <= r5_i;
+        when others =>
+          rd_ack_or0 <= rd_req_int;
+        end case;
+      when "00011" =>
+        case wb_adr_i(2 downto 2) is
+        when "0" =>
+          -- Reg r6
+          rd_ack_or0 <= rd_req_int;
+          r6_rdat <= r6_reg;
+        when "1" =>
+          -- Reg r7
+          rd_ack_or0 <= rd_req_int;
+          r7_rdat <= r7_i;
+        when others =>
+          rd_ack_or0 <= rd_req_int;
+        end case;
+      when "00100" =>
+        case wb_adr_i(2 downto 2) is
+        when "0" =>
+          -- Reg cnt
+          cnt_rd_o(1) <= rd_req_int;
+          rd_ack_or0 <= rd_req_int;
+          cnt_rdat <= cnt_i(63 downto 32);
+        when "1" =>
+          -- Reg cnt
+          cnt_rd_o(0) <= rd_req_int;
+          rd_ack_or0 <= rd_req_int;
+          cnt_rdat <= cnt_i(31 downto 0);
+        when others =>
+          rd_ack_or0 <= rd_req_int;
+        end case;
+      when others =>
+        rd_ack_or0 <= rd_req_int;
+      end case;
+    when "01" =>
+      -- Memory buf
+      buf_rdat <= buf_data_int_dato;
+      buf_data_rreq <= rd_req_int;
+      rd_ack_or0 <= buf_data_rack;
+    when "10" =>
+      -- Submap ext
+      ext_re <= rd_req_int;
+      ext_rdat <= ext_dat_i;
+      rd_ack_or0 <= ext_rack;
+    when others =>
+      rd_ack_or0 <= rd_req_int;
+    end case;
+  end process;
+
+  -- Read data OR tree.
+  rd_dat_d0 <= (rd_dat_or1_0 or rd_dat_or1_1) or rd_dat_or1_2;
+  process (clk_i) begin
+    if rising_edge(clk_i) then
+      if rst_n_i = '0' then
+        rd_dat_or1_0 <= "00000000000000000000000000000000";
+        rd_dat_or1_1 <= "00000000000000000000000000000000";
+        rd_dat_or1_2 <= "00000000000000000000000000000000";
+        rd_ack_or1 <= '0';
+      else
+        rd_dat_or1_0 <= ((r0_rdat or r1_rdat) or r2_rdat) or r3_rdat;
+        rd_dat_or1_1 <= ((r4_rdat or r5_rdat) or r6_rdat) or r7_rdat;
+        rd_dat_or1_2 <= (cnt_rdat or buf_rdat) or ext_rdat;
+        rd_ack_or1 <= rd_ack_or0;
+      end if;
+    end if;
+  end process;
+  rd_ack_d0 <= rd_ack_or1;
+end syn;
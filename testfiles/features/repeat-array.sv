@@ -0,0 +1,327 @@
+
+module repeat_array
+  (
+    input   wire rst_n_i,
+    input   wire clk_i,
+    input   wire wb_cyc_i,
+    input   wire wb_stb_i,
+    input   wire [7:2] wb_adr_i,
+    input   wire [3:0] wb_sel_i,
+    input   wire wb_we_i,
+    input   wire [31:0] wb_dat_i,
+    output  wire wb_ack_o,
+    output  wire wb_err_o,
+    output  wire wb_rty_o,
+    output  wire wb_stall_o,
+    output  reg [31:0] wb_dat_o,
+
+    // REG ctrl
+    output  wire [31:0] ctrl_o,
+
+    // REG cfg
+    output  wire [63:0] ch_cfg_gain_o,
+    output  wire [3:0] ch_cfg_en_o,
+    output  wire [3:0] ch_cfg_wr_o,
+
+    // REG status
+    input   wire [63:0] ch_status_i,
+
+    // REG cnt
+    output  wire [255:0] ch_cnt_o,
+    output  reg [7:0] ch_cnt_rd_o,
+
+    // REG time
+    input   wire [95:0] ev_time_i,
+    input   wire [2:0] ev_time_rack_i
+  );
+  wire rd_req_int;
+  wire wr_req_int;
+  reg rd_ack_int;
+  reg wr_ack_int;
+  wire wb_en;
+  wire ack_int;
+  reg wb_rip;
+  reg wb_wip;
+  reg [31:0] ctrl_reg;
+  reg ctrl_wreq;
+  wire ctrl_wack;
+  reg [3:0] ch_cfg_wreq;
+  reg [7:0] ch_cnt_wreq;
+  reg rd_ack_d0;
+  reg [31:0] rd_dat_d0;
+  reg wr_req_d0;
+  reg [7:2] wr_adr_d0;
+  reg [31:0] wr_dat_d0;
+  wire [3:0] ch_cfg_wack_arr;
+  wire [7:0] ch_cnt_wack_arr;
+  wire [63:0] ch_cfg_gain_reg_arr;
+  wire [3:0] ch_cfg_en_reg_arr;
+  wire [255:0] ch_cnt_reg_arr;
+
+  // WB decode signals
+  always_comb
+  ;
+  assign wb_en = wb_cyc_i & wb_stb_i;
+
+  always_ff @(posedge(clk_i))
+  begin
+    if (!rst_n_i)
+      wb_rip <= 1'b0;
+    else
+      wb_rip <= (wb_rip | (wb_en & ~wb_we_i)) & ~rd_ack_int;
+  end
+  assign rd_req_int = (wb_en & ~wb_we_i) & ~wb_rip;
+
+  always_ff @(posedge(clk_i))
+  begin
+    if (!rst_n_i)
+      wb_wip <= 1'b0;
+    else
+      wb_wip <= (wb_wip | (wb_en & wb_we_i)) & ~wr_ack_int;
+  end
+  assign wr_req_int = (wb_en & wb_we_i) & ~wb_wip;
+
+  assign ack_int = rd_ack_int | wr_ack_int;
+  assign wb_ack_o = ack_int;
+  assign wb_stall_o = ~ack_int & wb_en;
+  assign wb_rty_o = 1'b0;
+  assign wb_err_o = 1'b0;
+
+  // pipelining for wr-in+rd-out
+  always_ff @(posedge(clk_i))
+  begin
+    if (!rst_n_i)
+      begin
+        rd_ack_int <= 1'b0;
+        wb_dat_o <= 32'b00000000000000000000000000000000;
+        wr_req_d0 <= 1'b0;
+        wr_adr_d0 <= 6'b000000;
+        wr_dat_d0 <= 32'b00000000000000000000000000000000;
+      end
+    else
+      begin
+        rd_ack_int <= rd_ack_d0;
+        wb_dat_o <= rd_dat_d0;
+        wr_req_d0 <= wr_req_int;
+        wr_adr_d0 <= wb_adr_i;
+        wr_dat_d0 <= wb_dat_i;
+      end
+  end
+
+  // Register ctrl
+  assign ctrl_o = ctrl_reg;
+  assign ctrl_wack = ctrl_wreq;
+  always_ff @(posedge(clk_i))
+  begin
+    if (!rst_n_i)
+      ctrl_reg <= 32'b00000000000000000000000000000000;
+    else
+      if (ctrl_wreq == 1'b1)
+        ctrl_reg <= wr_dat_d0;
+  end
+
+  // Repeat ch
+  genvar i_ch;
+  generate
+  for (i_ch = 0; i_ch < 4; i_ch = i_ch + 1) begin : g_ch
+    reg [15:0] ch_cfg_gain_reg;
+    reg ch_cfg_en_reg;
+    wire ch_cfg_wack;
+    reg ch_cfg_wstrb;
+    reg [63:0] ch_cnt_reg;
+    wire [1:0] ch_cnt_wack;
+
+    // Register ch_cfg
+    assign ch_cfg_gain_o[i_ch*16 +: 16] = ch_cfg_gain_reg;
+    assign ch_cfg_en_o[i_ch] = ch_cfg_en_reg;
+    assign ch_cfg_wack = ch_cfg_wreq[i_ch];
+    always_ff @(posedge(clk_i))
+    begin
+      if (!rst_n_i)
+        begin
+          ch_cfg_gain_reg <= 16'b0000000100000000;
+          ch_cfg_en_reg <= 1'b0;
+          ch_cfg_wstrb <= 1'b0;
+        end
+      else
+        begin
+          if (ch_cfg_wreq[i_ch] == 1'b1)
+            begin
+              ch_cfg_gain_reg <= wr_dat_d0[15:0];
+              ch_cfg_en_reg <= wr_dat_d0[31];
+            end
+          ch_cfg_wstrb <= ch_cfg_wreq[i_ch];
+        end
+    end
+    assign ch_cfg_wr_o[i_ch] = ch_cfg_wstrb;
+
+    // Register ch_status
+
+    // Register ch_cnt
+    assign ch_cnt_o[i_ch*64 +: 64] = ch_cnt_reg;
+    assign ch_cnt_wack = ch_cnt_wreq[i_ch*2 +: 2];
+    always_ff @(posedge(clk_i))
+    begin
+      if (!rst_n_i)
+        ch_cnt_reg <= 64'b0000000000000000000000000000000000000000000000000000000000000000;
+      else
+        begin
+          if (ch_cnt_wreq[i_ch*2] == 1'b1)
+            ch_cnt_reg[31:0] <= wr_dat_d0;
+          if (ch_cnt_wreq[i_ch*2+1] == 1'b1)
+            ch_cnt_reg[63:32] <= wr_dat_d0;
+        end
+    end
+    assign ch_cfg_wack_arr[i_ch] = ch_cfg_wack;
+    assign ch_cnt_wack_arr[i_ch*2 +: 2] = ch_cnt_wack;
+    assign ch_cfg_gain_reg_arr[i_ch*16 +: 16] = ch_cfg_gain_reg;
+    assign ch_cfg_en_reg_arr[i_ch] = ch_cfg_en_reg;
+    assign ch_cnt_reg_arr[i_ch*64 +: 64] = ch_cnt_reg;
+  end
+  endgenerate
+
+  // Process for write requests.
+  always_comb
+  begin
+    ctrl_wreq = 1'b0;
+    ch_cfg_wreq = 4'b0;
+    ch_cnt_wreq = 8'b0;
+    case (wr_adr_d0[7:6])
+    2'b00:
+      case (wr_adr_d0[5:2])
+      4'b0000:
+        begin
+          // Reg ctrl
+          ctrl_wreq = wr_req_d0;
+          wr_ack_int = ctrl_wack;
+        end
+      default:
+        wr_ack_int = wr_req_d0;
+      endcase
+    2'b01:
+      // Repeat ch
+      case (wr_adr_d0[3:3])
+      1'b0:
+        case (wr_adr_d0[2:2])
+        1'b0:
+          begin
+            // Reg ch_cfg
+            ch_cfg_wreq[wr_adr_d0[5:4]] = wr_req_d0;
+            wr_ack_int = ch_cfg_wack_arr[wr_adr_d0[5:4]];
+          end
+        1'b1:
+          // Reg ch_status
+          wr_ack_int = wr_req_d0;
+        default:
+          wr_ack_int = wr_req_d0;
+        endcase
+      1'b1:
+        case (wr_adr_d0[2:2])
+        1'b0:
+          begin
+            // Reg ch_cnt
+            ch_cnt_wreq[wr_adr_d0[5:4]*2+1] = wr_req_d0;
+            wr_ack_int = ch_cnt_wack_arr[wr_adr_d0[5:4]*2+1];
+          end
+        1'b1:
+          begin
+            // Reg ch_cnt
+            ch_cnt_wreq[wr_adr_d0[5:4]*2] = wr_req_d0;
+            wr_ack_int = ch_cnt_wack_arr[wr_adr_d0[5:4]*2];
+          end
+        default:
+          wr_ack_int = wr_req_d0;
+        endcase
+      default:
+        wr_ack_int = wr_req_d0;
+      endcase
+    2'b10:
+      // Repeat ev
+      if (wr_adr_d0[3:2] <= 2)
+        // Reg ev_time
+        wr_ack_int = wr_req_d0;
+      else
+        wr_ack_int = wr_req_d0;
+    default:
+      wr_ack_int = wr_req_d0;
+    endcase
+  end
+
+  // Process for read requests.
+  always_comb
+  begin
+    // By default ack read requests
+    rd_dat_d0 = {32{1'bx}};
+    ch_cnt_rd_o = 8'b0;
+    case (wb_adr_i[7:6])
+    2'b00:
+      case (wb_adr_i[5:2])
+      4'b0000:
+        begin
+          // Reg ctrl
+          rd_ack_d0 = rd_req_int;
+          rd_dat_d0 = ctrl_reg;
+        end
+      default:
+        rd_ack_d0 = rd_req_int;
+      endcase
+    2'b01:
+      // Repeat ch
+      case (wb_adr_i[3:3])
+      1'b0:
+        case (wb_adr_i[2:2])
+        1'b0:
+          begin
+            // Reg ch_cfg
+            rd_ack_d0 = rd_req_int;
+            rd_dat_d0[15:0] = ch_cfg_gain_reg_arr[wb_adr_i[5:4]*16 +: 16];
+            rd_dat_d0[30:16] = 15'b0;
+            rd_dat_d0[31] = ch_cfg_en_reg_arr[wb_adr_i[5:4]];
+          end
+        1'b1:
+          begin
+            // Reg ch_status
+            rd_ack_d0 = rd_req_int;
+            rd_dat_d0[15:0] = ch_status_i[wb_adr_i[5:4]*16 +: 16];
+            rd_dat_d0[31:16] = 16'b0;
+          end
+        default:
+          rd_ack_d0 = rd_req_int;
+        endcase
+      1'b1:
+        case (wb_adr_i[2:2])
+        1'b0:
+          begin
+            // Reg ch_cnt
+            ch_cnt_rd_o[wb_adr_i[5:4]*2+1] = rd_req_int;
+            rd_ack_d0 = rd_req_int;
+            rd_dat_d0 = ch_cnt_reg_arr[wb_adr_i[5:4]*64+32 +: 32];
+          end
+        1'b1:
+          begin
+            // Reg ch_cnt
+            ch_cnt_rd_o[wb_adr_i[5:4]*2] = rd_req_int;
+            rd_ack_d0 = rd_req_int;
+            rd_dat_d0 = ch_cnt_reg_arr[wb_adr_i[5:4]*64 +: 32];
+          end
+        default:
+          rd_ack_d0 = rd_req_int;
+        endcase
+      default:
+        rd_ack_d0 = rd_req_int;
+      endcase
+    2'b10:
+      // Repeat ev
+      if (wb_adr_i[3:2] <= 2)
+        begin
+          // Reg ev_time
+          rd_ack_d0 = ev_time_rack_i[wb_adr_i[3:2]];
+          rd_dat_d0 = ev_time_i[wb_adr_i[3:2]*32 +: 32];
+        end
+      else
+        rd_ack_d0 = rd_req_int;
+    default:
+      rd_ack_d0 = rd_req_int;
+    endcase
+  end
+endmodule
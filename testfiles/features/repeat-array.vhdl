@@ -0,0 +1,315 @@
+library ieee;
+use ieee.std_logic_1164.all;
+use ieee.numeric_std.all;
+
+entity repeat_array is
+  port (
+    rst_n_i              : in    std_logic;
+    clk_i                : in    std_logic;
+    wb_cyc_i             : in    std_logic;
+    wb_stb_i             : in    std_logic;
+    wb_adr_i             : in    std_logic_vector(7 downto 2);
+    wb_sel_i             : in    std_logic_vector(3 downto 0);
+    wb_we_i              : in    std_logic;
+    wb_dat_i             : in    std_logic_vector(31 downto 0);
+    wb_ack_o             : out   std_logic;
+    wb_err_o             : out   std_logic;
+    wb_rty_o             : out   std_logic;
+    wb_stall_o           : out   std_logic;
+    wb_dat_o             : out   std_logic_vector(31 downto 0);
+
+    -- REG ctrl
+    ctrl_o               : out   std_logic_vector(31 downto 0);
+
+    -- REG cfg
+    ch_cfg_gain_o        : out   std_logic_vector(63 downto 0);
+    ch_cfg_en_o          : out   std_logic_vector(3 downto 0);
+    ch_cfg_wr_o          : out   std_logic_vector(3 downto 0);
+
+    -- REG status
+    ch_status_i          : in    std_logic_vector(63 downto 0);
+
+    -- REG cnt
+    ch_cnt_o             : out   std_logic_vector(255 downto 0);
+    ch_cnt_rd_o          : out   std_logic_vector(7 downto 0);
+
+    -- REG time
+    ev_time_i            : in    std_logic_vector(95 downto 0);
+    ev_time_rack_i       : in    std_logic_vector(2 downto 0)
+  );
+end repeat_array;
+
+architecture syn of repeat_array is
+  signal rd_req_int                     : std_logic;
+  signal wr_req_int                     : std_logic;
+  signal rd_ack_int                     : std_logic;
+  signal wr_ack_int                     : std_logic;
+  signal wb_en                          : std_logic;
+  signal ack_int                        : std_logic;
+  signal wb_rip                         : std_logic;
+  signal wb_wip                         : std_logic;
+  signal ctrl_reg                       : std_logic_vector(31 downto 0);
+  signal ctrl_wreq                      : std_logic;
+  signal ctrl_wack                      : std_logic;
+  signal ch_cfg_wreq                    : std_logic_vector(3 downto 0);
+  signal ch_cnt_wreq                    : std_logic_vector(7 downto 0);
+  signal rd_ack_d0                      : std_logic;
+  signal rd_dat_d0                      : std_logic_vector(31 downto 0);
+  signal wr_req_d0                      : std_logic;
+  signal wr_adr_d0                      : std_logic_vector(7 downto 2);
+  signal wr_dat_d0                      : std_logic_vector(31 downto 0);
+  signal ch_cfg_wack_arr                : std_logic_vector(3 downto 0);
+  signal ch_cnt_wack_arr                : std_logic_vector(7 downto 0);
+  signal ch_cfg_gain_reg_arr            : std_logic_vector(63 downto 0);
+  signal ch_cfg_en_reg_arr              : std_logic_vector(3 downto 0);
+  signal ch_cnt_reg_arr                 : std_logic_vector(255 downto 0);
+begin
+
+  -- WB decode signals
+  wb_en <= wb_cyc_i and wb_stb_i;
+
+  process (clk_i) begin
+    if rising_edge(clk_i) then
+      if rst_n_i = '0' then
+        wb_rip <= '0';
+      else
+        wb_rip <= (wb_rip or (wb_en and not wb_we_i)) and not rd_ack_int;
+      end if;
+    end if;
+  end process;
+  rd_req_int <= (wb_en and not wb_we_i) and not wb_rip;
+
+  process (clk_i) begin
+    if rising_edge(clk_i) then
+      if rst_n_i = '0' then
+        wb_wip <= '0';
+      else
+        wb_wip <= (wb_wip or (wb_en and wb_we_i)) and not wr_ack_int;
+      end if;
+    end if;
+  end process;
+  wr_req_int <= (wb_en and wb_we_i) and not wb_wip;
+
+  ack_int <= rd_ack_int or wr_ack_int;
+  wb_ack_o <= ack_int;
+  wb_stall_o <= not ack_int and wb_en;
+  wb_rty_o <= '0';
+  wb_err_o <= '0';
+
+  -- pipelining for wr-in+rd-out
+  process (clk_i) begin
+    if rising_edge(clk_i) then
+      if rst_n_i = '0' then
+        rd_ack_int <= '0';
+        wb_dat_o <= "00000000000000000000000000000000";
+        wr_req_d0 <= '0';
+        wr_adr_d0 <= "000000";
+        wr_dat_d0 <= "00000000000000000000000000000000";
+      else
+        rd_ack_int <= rd_ack_d0;
+        wb_dat_o <= rd_dat_d0;
+        wr_req_d0 <= wr_req_int;
+        wr_adr_d0 <= wb_adr_i;
+        wr_dat_d0 <= wb_dat_i;
+      end if;
+    end if;
+  end process;
+
+  -- Register ctrl
+  ctrl_o <= ctrl_reg;
+  ctrl_wack <= ctrl_wreq;
+  process (clk_i) begin
+    if rising_edge(clk_i) then
+      if rst_n_i = '0' then
+        ctrl_reg <= "00000000000000000000000000000000";
+      else
+        if ctrl_wreq = '1' then
+          ctrl_reg <= wr_dat_d0;
+        end if;
+      end if;
+    end if;
+  end process;
+
+  -- Repeat ch
+  g_ch: for i_ch in 0 to 3 generate
+    signal ch_cfg_gain_reg                : std_logic_vector(15 downto 0);
+    signal ch_cfg_en_reg                  : std_logic;
+    signal ch_cfg_wack                    : std_logic;
+    signal ch_cfg_wstrb                   : std_logic;
+    signal ch_cnt_reg                     : std_logic_vector(63 downto 0);
+    signal ch_cnt_wack                    : std_logic_vector(1 downto 0);
+  begin
+
+    -- Register ch_cfg
+    ch_cfg_gain_o(i_ch*16+15 downto i_ch*16) <= ch_cfg_gain_reg;
+    ch_cfg_en_o(i_ch) <= ch_cfg_en_reg;
+    ch_cfg_wack <= ch_cfg_wreq(i_ch);
+    process (clk_i) begin
+      if rising_edge(clk_i) then
+        if rst_n_i = '0' then
+          ch_cfg_gain_reg <= "0000000100000000";
+          ch_cfg_en_reg <= '0';
+          ch_cfg_wstrb <= '0';
+        else
+          if ch_cfg_wreq(i_ch) = '1' then
+            ch_cfg_gain_reg <= wr_dat_d0(15 downto 0);
+            ch_cfg_en_reg <= wr_dat_d0(31);
+          end if;
+          ch_cfg_wstrb <= ch_cfg_wreq(i_ch);
+        end if;
+      end if;
+    end process;
+    ch_cfg_wr_o(i_ch) <= ch_cfg_wstrb;
+
+    -- Register ch_status
+
+    -- Register ch_cnt
+    ch_cnt_o(i_ch*64+63 downto i_ch*64) <= ch_cnt_reg;
+    ch_cnt_wack <= ch_cnt_wreq(i_ch*2+1 downto i_ch*2);
+    process (clk_i) begin
+      if rising_edge(clk_i) then
+        if rst_n_i = '0' then
+          ch_cnt_reg <= "0000000000000000000000000000000000000000000000000000000000000000";
+        else
+          if ch_cnt_wreq(i_ch*2) = '1' then
+            ch_cnt_reg(31 downto 0) <= wr_dat_d0;
+          end if;
+          if ch_cnt_wreq(i_ch*2+1) = '1' then
+            ch_cnt_reg(63 downto 32) <= wr_dat_d0;
+          end if;
+        end if;
+      end if;
+    end process;
+    ch_cfg_wack_arr(i_ch) <= ch_cfg_wack;
+    ch_cnt_wack_arr(i_ch*2+1 downto i_ch*2) <= ch_cnt_wack;
+    ch_cfg_gain_reg_arr(i_ch*16+15 downto i_ch*16) <= ch_cfg_gain_reg;
+    ch_cfg_en_reg_arr(i_ch) <= ch_cfg_en_reg;
+    ch_cnt_reg_arr(i_ch*64+63 downto i_ch*64) <= ch_cnt_reg;
+  end generate g_ch;
+
+  -- Process for write requests.
+  process (wr_adr_d0, wr_req_d0, ctrl_wack, ch_cfg_wack_arr, ch_cnt_wack_arr) begin
+    ctrl_wreq <= '0';
+    ch_cfg_wreq <= (others => '0');
+    ch_cnt_wreq <= (others => '0');
+    case wr_adr_d0(7 downto 6) is
+    when "00" =>
+      case wr_adr_d0(5 downto 2) is
+      when "0000" =>
+        -- Reg ctrl
+        ctrl_wreq <= wr_req_d0;
+        wr_ack_int <= ctrl_wack;
+      when others =>
+        wr_ack_int <= wr_req_d0;
+      end case;
+    when "01" =>
+      -- Repeat ch
+      case wr_adr_d0(3 downto 3) is
+      when "0" =>
+        case wr_adr_d0(2 downto 2) is
+        when "0" =>
+          -- Reg ch_cfg
+          ch_cfg_wreq(to_integer(unsigned(wr_adr_d0(5 downto 4)))) <= wr_req_d0;
+          wr_ack_int <= ch_cfg_wack_arr(to_integer(unsigned(wr_adr_d0(5 downto 4))));
+        when "1" =>
+          -- Reg ch_status
+          wr_ack_int <= wr_req_d0;
+        when others =>
+          wr_ack_int <= wr_req_d0;
+        end case;
+      when "1" =>
+        case wr_adr_d0(2 downto 2) is
+        when "0" =>
+          -- Reg ch_cnt
+          ch_cnt_wreq(to_integer(unsigned(wr_adr_d0(5 downto 4)))*2+1) <= wr_req_d0;
+          wr_ack_int <= ch_cnt_wack_arr(to_integer(unsigned(wr_adr_d0(5 downto 4)))*2+1);
+        when "1" =>
+          -- Reg ch_cnt
+          ch_cnt_wreq(to_integer(unsigned(wr_adr_d0(5 downto 4)))*2) <= wr_req_d0;
+          wr_ack_int <= ch_cnt_wack_arr(to_integer(unsigned(wr_adr_d0(5 downto 4)))*2);
+        when others =>
+          wr_ack_int <= wr_req_d0;
+        end case;
+      when others =>
+        wr_ack_int <= wr_req_d0;
+      end case;
+    when "10" =>
+      -- Repeat ev
+      if to_integer(unsigned(wr_adr_d0(3 downto 2))) <= 2 then
+        -- Reg ev_time
+        wr_ack_int <= wr_req_d0;
+      else
+        wr_ack_int <= wr_req_d0;
+      end if;
+    when others =>
+      wr_ack_int <= wr_req_d0;
+    end case;
+  end process;
+
+  -- Process for read requests.
+  process (wb_adr_i, rd_req_int, ctrl_reg, ch_cfg_gain_reg_arr, ch_cfg_en_reg_arr,
+           ch_status_i, ch_cnt_reg_arr, ev_time_rack_i, ev_time_i) begin
+    -- By default ack read requests
+    rd_dat_d0 <= (others => 'X');
+    ch_cnt_rd_o <= (others => '0');
+    case wb_adr_i(7 downto 6) is
+    when "00" =>
+      case wb_adr_i(5 downto 2) is
+      when "0000" =>
+        -- Reg ctrl
+        rd_ack_d0 <= rd_req_int;
+        rd_dat_d0 <= ctrl_reg;
+      when others =>
+        rd_ack_d0 <= rd_req_int;
+      end case;
+    when "01" =>
+      -- Repeat ch
+      case wb_adr_i(3 downto 3) is
+      when "0" =>
+        case wb_adr_i(2 downto 2) is
+        when "0" =>
+          -- Reg ch_cfg
+          rd_ack_d0 <= rd_req_int;
+          rd_dat_d0(15 downto 0) <= ch_cfg_gain_reg_arr(to_integer(unsigned(wb_adr_i(5 downto 4)))*16+15 downto to_integer(unsigned(wb_adr_i(5 downto 4)))*16);
+          rd_dat_d0(30 downto 16) <= (others => '0');
+          rd_dat_d0(31) <= ch_cfg_en_reg_arr(to_integer(unsigned(wb_adr_i(5 downto 4))));
+        when "1" =>
+          -- Reg ch_status
+          rd_ack_d0 <= rd_req_int;
+          rd_dat_d0(15 downto 0) <= ch_status_i(to_integer(unsigned(wb_adr_i(5 downto 4)))*16+15 downto to_integer(unsigned(wb_adr_i(5 downto 4)))*16);
+          rd_dat_d0(31 downto 16) <= (others => '0');
+        when others =>
+          rd_ack_d0 <= rd_req_int;
+        end case;
+      when "1" =>
+        case wb_adr_i(2 downto 2) is
+        when "0" =>
+          -- Reg ch_cnt
+          ch_cnt_rd_o(to_integer(unsigned(wb_adr_i(5 downto 4)))*2+1) <= rd_req_int;
+          rd_ack_d0 <= rd_req_int;
+          rd_dat_d0 <= ch_cnt_reg_arr(to_integer(unsigned(wb_adr_i(5 downto 4)))*64+63 downto to_integer(unsigned(wb_adr_i(5 downto 4)))*64+32);
+        when "1" =>
+          -- Reg ch_cnt
+          ch_cnt_rd_o(to_integer(unsigned(wb_adr_i(5 downto 4)))*2) <= rd_req_int;
+          rd_ack_d0 <= rd_req_int;
+          rd_dat_d0 <= ch_cnt_reg_arr(to_integer(unsigned(wb_adr_i(5 downto 4)))*64+31 downto to_integer(unsigned(wb_adr_i(5 downto 4)))*64);
+        when others =>
+          rd_ack_d0 <= rd_req_int;
+        end case;
+      when others =>
+        rd_ack_d0 <= rd_req_int;
+      end case;
+    when "10" =>
+      -- Repeat ev
+      if to_integer(unsigned(wb_adr_i(3 downto 2))) <= 2 then
+        -- Reg ev_time
+        rd_ack_d0 <= ev_time_rack_i(to_integer(unsigned(wb_adr_i(3 downto 2))));
+        rd_dat_d0 <= ev_time_i(to_integer(unsigned(wb_adr_i(3 downto 2)))*32+31 downto to_integer(unsigned(wb_adr_i(3 downto 2)))*32);
+      else
+        rd_ack_d0 <= rd_req_int;
+      end if;
+    when others =>
+      rd_ack_d0 <= rd_req_int;
+    end case;
+  end process;
+end syn;
@@ -0,0 +1,356 @@
+
+module wb_pipelined
+  (
+    input   wire rst_n_i,
+    input   wire clk_i,
+    input   wire wb_cyc_i,
+    input   wire wb_stb_i,
+    input   wire [8:2] wb_adr_i,
+    input   wire [3:0] wb_sel_i,
+    input   wire wb_we_i,
+    input   wire [31:0] wb_dat_i,
+    output  reg wb_ack_o,
+    output  reg wb_err_o,
+    output  wire wb_rty_o,
+    output  wire wb_stall_o,
+    output  reg [31:0] wb_dat_o,
+
+    // REG ctrl
+    output  wire [31:0] ctrl_o,
+
+    // REG status
+    input   wire [31:0] status_i,
+
+    // REG cnt
+    output  wire [63:0] cnt_o,
+
+    // RAM port for buf
+    input   wire [5:0] buf_adr_i,
+    input   wire buf_data_rd_i,
+    output  wire [31:0] buf_data_dat_o
+  );
+  reg [31:0] rd_dat_int;
+  reg [31:0] wr_dat_int;
+  reg [31:0] wr_sel;
+  reg [8:2] adr_int;
+  reg rd_req_int;
+  reg wr_req_int;
+  reg rd_ack_int;
+  reg rd_err_int;
+  reg wr_ack_int;
+  reg wr_err_int;
+  wire wb_en;
+  wire ack_int;
+  wire err_int;
+  reg wb_skid;
+  reg [8:2] wb_skid_adr;
+  reg wb_skid_we;
+  reg [31:0] wb_skid_dat;
+  reg [3:0] wb_skid_sel;
+  reg wb_ip;
+  wire wb_start;
+  reg [31:0] ctrl_reg;
+  reg ctrl_wreq;
+  wire ctrl_wack;
+  reg [63:0] cnt_reg;
+  reg [1:0] cnt_wreq;
+  wire [1:0] cnt_wack;
+  wire [31:0] buf_data_int_dato;
+  wire [31:0] buf_data_ext_dat;
+  reg buf_data_rreq;
+  reg buf_data_rack;
+  reg buf_data_int_wr;
+  reg [3:0] buf_sel_int;
+
+  // WB decode signals
+  assign wb_en = wb_cyc_i & wb_stb_i;
+  assign ack_int = rd_ack_int | wr_ack_int;
+  assign err_int = rd_err_int | wr_err_int;
+  assign wb_start = (~wb_ip | ack_int) & (wb_skid | wb_en);
+
+  always @(posedge(clk_i))
+  begin
+    if (!rst_n_i)
+      begin
+        rd_req_int <= 1'b0;
+        wr_req_int <= 1'b0;
+        wb_skid <= 1'b0;
+        wb_ip <= 1'b0;
+        wb_ack_o <= 1'b0;
+        wb_err_o <= 1'b0;
+        wb_dat_o <= 32'b0;
+      end
+    else
+      begin
+        rd_req_int <= 1'b0;
+        wr_req_int <= 1'b0;
+        wb_ack_o <= ack_int & ~err_int;
+        wb_err_o <= ack_int & err_int;
+        if (rd_ack_int == 1'b1)
+          wb_dat_o <= rd_dat_int;
+        if (ack_int == 1'b1)
+          wb_ip <= 1'b0;
+        if (wb_start == 1'b1)
+          begin
+            wb_ip <= 1'b1;
+            if (wb_skid == 1'b1)
+              begin
+                rd_req_int <= ~wb_skid_we;
+                wr_req_int <= wb_skid_we;
+                adr_int <= wb_skid_adr;
+                wr_dat_int <= wb_skid_dat;
+                wr_sel[7:0] <= {8{wb_skid_sel[0]}};
+                wr_sel[15:8] <= {8{wb_skid_sel[1]}};
+                wr_sel[23:16] <= {8{wb_skid_sel[2]}};
+                wr_sel[31:24] <= {8{wb_skid_sel[3]}};
+                wb_skid <= 1'b0;
+              end
+            else
+              begin
+                rd_req_int <= ~wb_we_i;
+                wr_req_int <= wb_we_i;
+                adr_int <= wb_adr_i;
+                wr_dat_int <= wb_dat_i;
+                wr_sel[7:0] <= {8{wb_sel_i[0]}};
+                wr_sel[15:8] <= {8{wb_sel_i[1]}};
+                wr_sel[23:16] <= {8{wb_sel_i[2]}};
+                wr_sel[31:24] <= {8{wb_sel_i[3]}};
+              end
+          end
+        else if (wb_en == 1'b1 & wb_skid == 1'b0)
+          begin
+            wb_skid_adr <= wb_adr_i;
+            wb_skid_we <= wb_we_i;
+            wb_skid_dat <= wb_dat_i;
+            wb_skid_sel <= wb_sel_i;
+            wb_skid <= 1'b1;
+          end
+      end
+  end
+
+  assign wb_stall_o = wb_skid;
+  assign wb_rty_o = 1'b0;
+
+  // Register ctrl
+  assign ctrl_o = ctrl_reg;
+  assign ctrl_wack = ctrl_wreq;
+  always @(posedge(clk_i))
+  begin
+    if (!rst_n_i)
+      ctrl_reg <= 32'b00000000000000000000000000000000;
+    else
+      if (ctrl_wreq == 1'b1)
+        ctrl_reg <= wr_dat_int;
+  end
+
+  // Register status
+
+  // Register cnt
+  assign cnt_o = cnt_reg;
+  assign cnt_wack = cnt_wreq;
+  always @(posedge(clk_i))
+  begin
+    if (!rst_n_i)
+      cnt_reg <= 64'b0000000000000000000000000000000000000000000000000000000000000000;
+    else
+      begin
+        if (cnt_wreq[0] == 1'b1)
+          cnt_reg[31:0] <= wr_dat_int;
+        if (cnt_wreq[1] == 1'b1)
+          cnt_reg[63:32] <= wr_dat_int;
+      end
+  end
+
+  // Memory buf
+  cheby_dpssram #(
+      .g_data_width(32),
+      .g_size(64),
+      .g_addr_width(6),
+      .g_dual_clock(1'b0),
+      .g_use_bwsel(1'b1)
+    )
+  buf_data_raminst (
+      .clk_a_i(clk_i),
+      .clk_b_i(clk_i),
+      .addr_a_i(adr_int[7:2]),
+      .bwsel_a_i(buf_sel_int),
+      .data_a_i(wr_dat_int),
+      .data_a_o(buf_data_int_dato),
+      .rd_a_i(buf_data_rreq),
+      .wr_a_i(buf_data_int_wr),
+      .addr_b_i(buf_adr_i),
+      .bwsel_b_i({4{1'b1}}),
+      .data_b_i(buf_data_ext_dat),
+      .data_b_o(buf_data_dat_o),
+      .rd_b_i(buf_data_rd_i),
+      .wr_b_i(1'b0)
+    );
+  
+  always @(wr_sel)
+  begin
+    buf_sel_int = 4'b0;
+    if (~(wr_sel[7:0] == 8'b0))
+      buf_sel_int[0] = 1'b1;
+    if (~(wr_sel[15:8] == 8'b0))
+      buf_sel_int[1] = 1'b1;
+    if (~(wr_sel[23:16] == 8'b0))
+      buf_sel_int[2] = 1'b1;
+    if (~(wr_sel[31:24] == 8'b0))
+      buf_sel_int[3] = 1'b1;
+  end
+  always @(posedge(clk_i))
+  begin
+    if (!rst_n_i)
+      buf_data_rack <= 1'b0;
+    else
+      buf_data_rack <= buf_data_rreq;
+  end
+
+  // Process for write requests.
+  always @(adr_int, wr_req_int, ctrl_wack, cnt_wack)
+  begin
+    ctrl_wreq = 1'b0;
+    cnt_wreq = 2'b0;
+    buf_data_int_wr = 1'b0;
+    case (adr_int[8:8])
+    1'b0:
+      case (adr_int[7:3])
+      5'b00000:
+        case (adr_int[2:2])
+        1'b0:
+          begin
+            // Reg ctrl
+            ctrl_wreq = wr_req_int;
+            wr_ack_int = ctrl_wack;
+            wr_err_int = 1'b0;
+          end
+        1'b1:
+          begin
+            // Reg status
+            wr_ack_int = wr_req_int;
+            wr_err_int = wr_req_int;
+          end
+        default:
+          begin
+            wr_ack_int = wr_req_int;
+            wr_err_int = wr_req_int;
+          end
+        endcase
+      5'b00001:
+        case (adr_int[2:2])
+        1'b0:
+          begin
+            // Reg cnt
+            cnt_wreq[1] = wr_req_int;
+            wr_ack_int = cnt_wack[1];
+            wr_err_int = 1'b0;
+          end
+        1'b1:
+          begin
+            // Reg cnt
+            cnt_wreq[0] = wr_req_int;
+            wr_ack_int = cnt_wack[0];
+            wr_err_int = 1'b0;
+          end
+        default:
+          begin
+            wr_ack_int = wr_req_int;
+            wr_err_int = wr_req_int;
+          end
+        endcase
+      default:
+        begin
+          wr_ack_int = wr_req_int;
+          wr_err_int = wr_req_int;
+        end
+      endcase
+    1'b1:
+      begin
+        // Memory buf
+        buf_data_int_wr = wr_req_int;
+        wr_ack_int = wr_req_int;
+        wr_err_int = 1'b0;
+      end
+    default:
+      begin
+        wr_ack_int = wr_req_int;
+        wr_err_int = wr_req_int;
+      end
+    endcase
+  end
+
+  // Process for read requests.
+  always @(adr_int, rd_req_int, ctrl_reg, status_i, cnt_reg, buf_data_int_dato, buf_data_rack)
+  begin
+    // By default ack read requests
+    rd_dat_int = {32{1'bx}};
+    buf_data_rreq = 1'b0;
+    case (adr_int[8:8])
+    1'b0:
+      case (adr_int[7:3])
+      5'b00000:
+        case (adr_int[2:2])
+        1'b0:
+          begin
+            // Reg ctrl
+            rd_ack_int = rd_req_int;
+            rd_err_int = 1'b0;
+            rd_dat_int = ctrl_reg;
+          end
+        1'b1:
+          begin
+            // Reg status
+            rd_ack_int = rd_req_int;
+            rd_err_int = 1'b0;
+            rd_dat_int = status_i;
+          end
+        default:
+          begin
+            rd_ack_int = rd_req_int;
+            rd_err_int = rd_req_int;
+          end
+        endcase
+      5'b00001:
+        case (adr_int[2:2])
+        1'b0:
+          begin
+            // Reg cnt
+            rd_ack_int = rd_req_int;
+            rd_err_int = 1'b0;
+            rd_dat_int = cnt_reg[63:32];
+          end
+        1'b1:
+          begin
+            // Reg cnt
+            rd_ack_int = rd_req_int;
+            rd_err_int = 1'b0;
+            rd_dat_int = cnt_reg[31:0];
+          end
+        default:
+          begin
+            rd_ack_int = rd_req_int;
+            rd_err_int = rd_req_int;
+          end
+        endcase
+      default:
+        begin
+          rd_ack_int = rd_req_int;
+          rd_err_int = rd_req_int;
+        end
+      endcase
+    1'b1:
+      begin
+        // Memory buf
+        rd_dat_int = buf_data_int_dato;
+        buf_data_rreq = rd_req_int;
+        rd_ack_int = buf_data_rack;
+        rd_err_int = 1'b0;
+      end
+    default:
+      begin
+        rd_ack_int = rd_req_int;
+        rd_err_int = rd_req_int;
+      end
+    endcase
+  end
+endmodule
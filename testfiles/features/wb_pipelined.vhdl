@@ -0,0 +1,332 @@
+library ieee;
+use ieee.std_logic_1164.all;
+use ieee.numeric_std.all;
+use work.cheby_pkg.all;
+
+entity wb_pipelined is
+  port (
+    rst_n_i              : in    std_logic;
+    clk_i                : in    std_logic;
+    wb_cyc_i             : in    std_logic;
+    wb_stb_i             : in    std_logic;
+    wb_adr_i             : in    std_logic_vector(8 downto 2);
+    wb_sel_i             : in    std_logic_vector(3 downto 0);
+    wb_we_i              : in    std_logic;
+    wb_dat_i             : in    std_logic_vector(31 downto 0);
+    wb_ack_o             : out   std_logic;
+    wb_err_o             : out   std_logic;
+    wb_rty_o             : out   std_logic;
+    wb_stall_o           : out   std_logic;
+    wb_dat_o             : out   std_logic_vector(31 downto 0);
+
+    -- REG ctrl
+    ctrl_o               : out   std_logic_vector(31 downto 0);
+
+    -- REG status
+    status_i             : in    std_logic_vector(31 downto 0);
+
+    -- REG cnt
+    cnt_o                : out   std_logic_vector(63 downto 0);
+
+    -- RAM port for buf
+    buf_adr_i            : in    std_logic_vector(5 downto 0);
+    buf_data_rd_i        : in    std_logic;
+    buf_data_dat_o       : out   std_logic_vector(31 downto 0)
+  );
+end wb_pipelined;
+
+architecture syn of wb_pipelined is
+  signal rd_dat_int                     : std_logic_vector(31 downto 0);
+  signal wr_dat_int                     : std_logic_vector(31 downto 0);
+  signal wr_sel                         : std_logic_vector(31 downto 0);
+  signal adr_int                        : std_logic_vector(8 downto 2);
+  signal rd_req_int                     : std_logic;
+  signal wr_req_int                     : std_logic;
+  signal rd_ack_int                     : std_logic;
+  signal rd_err_int                     : std_logic;
+  signal wr_ack_int                     : std_logic;
+  signal wr_err_int                     : std_logic;
+  signal wb_en                          : std_logic;
+  signal ack_int                        : std_logic;
+  signal err_int                        : std_logic;
+  signal wb_skid                        : std_logic;
+  signal wb_skid_adr                    : std_logic_vector(8 downto 2);
+  signal wb_skid_we                     : std_logic;
+  signal wb_skid_dat                    : std_logic_vector(31 downto 0);
+  signal wb_skid_sel                    : std_logic_vector(3 downto 0);
+  signal wb_ip                          : std_logic;
+  signal wb_start                       : std_logic;
+  signal ctrl_reg                       : std_logic_vector(31 downto 0);
+  signal ctrl_wreq                      : std_logic;
+  signal ctrl_wack                      : std_logic;
+  signal cnt_reg                        : std_logic_vector(63 downto 0);
+  signal cnt_wreq                       : std_logic_vector(1 downto 0);
+  signal cnt_wack                       : std_logic_vector(1 downto 0);
+  signal buf_data_int_dato              : std_logic_vector(31 downto 0);
+  signal buf_data_ext_dat               : std_logic_vector(31 downto 0);
+  signal buf_data_rreq                  : std_logic;
+  signal buf_data_rack                  : std_logic;
+  signal buf_data_int_wr                : std_logic;
+  signal buf_sel_int                    : std_logic_vector(3 downto 0);
+begin
+
+  -- WB decode signals
+  wb_en <= wb_cyc_i and wb_stb_i;
+  ack_int <= rd_ack_int or wr_ack_int;
+  err_int <= rd_err_int or wr_err_int;
+  wb_start <= (not wb_ip or ack_int) and (wb_skid or wb_en);
+
+  process (clk_i) begin
+    if rising_edge(clk_i) then
+      if rst_n_i = '0' then
+        rd_req_int <= '0';
+        wr_req_int <= '0';
+        wb_skid <= '0';
+        wb_ip <= '0';
+        wb_ack_o <= '0';
+        wb_err_o <= '0';
+        wb_dat_o <= (others => '0');
+      else
+        rd_req_int <= '0';
+        wr_req_int <= '0';
+        wb_ack_o <= ack_int and not err_int;
+        wb_err_o <= ack_int and err_int;
+        if rd_ack_int = '1' then
+          wb_dat_o <= rd_dat_int;
+        end if;
+        if ack_int = '1' then
+          wb_ip <= '0';
+        end if;
+        if wb_start = '1' then
+          wb_ip <= '1';
+          if wb_skid = '1' then
+            rd_req_int <= not wb_skid_we;
+            wr_req_int <= wb_skid_we;
+            adr_int <= wb_skid_adr;
+            wr_dat_int <= wb_skid_dat;
+            wr_sel(7 downto 0) <= (others => wb_skid_sel(0));
+            wr_sel(15 downto 8) <= (others => wb_skid_sel(1));
+            wr_sel(23 downto 16) <= (others => wb_skid_sel(2));
+            wr_sel(31 downto 24) <= (others => wb_skid_sel(3));
+            wb_skid <= '0';
+          else
+            rd_req_int <= not wb_we_i;
+            wr_req_int <= wb_we_i;
+            adr_int <= wb_adr_i;
+            wr_dat_int <= wb_dat_i;
+            wr_sel(7 downto 0) <= (others => wb_sel_i(0));
+            wr_sel(15 downto 8) <= (others => wb_sel_i(1));
+            wr_sel(23 downto 16) <= (others => wb_sel_i(2));
+            wr_sel(31 downto 24) <= (others => wb_sel_i(3));
+          end if;
+        elsif wb_en = '1' and wb_skid = '0' then
+          wb_skid_adr <= wb_adr_i;
+          wb_skid_we <= wb_we_i;
+          wb_skid_dat <= wb_dat_i;
+          wb_skid_sel <= wb_sel_i;
+          wb_skid <= '1';
+        end if;
+      end if;
+    end if;
+  end process;
+
+  wb_stall_o <= wb_skid;
+  wb_rty_o <= '0';
+
+  -- Register ctrl
+  ctrl_o <= ctrl_reg;
+  ctrl_wack <= ctrl_wreq;
+  process (clk_i) begin
+    if rising_edge(clk_i) then
+      if rst_n_i = '0' then
+        ctrl_reg <= "00000000000000000000000000000000";
+      else
+        if ctrl_wreq = '1' then
+          ctrl_reg <= wr_dat_int;
+        end if;
+      end if;
+    end if;
+  end process;
+
+  -- Register status
+
+  -- Register cnt
+  cnt_o <= cnt_reg;
+  cnt_wack <= cnt_wreq;
+  process (clk_i) begin
+    if rising_edge(clk_i) then
+      if rst_n_i = '0' then
+        cnt_reg <= "0000000000000000000000000000000000000000000000000000000000000000";
+      else
+        if cnt_wreq(0) = '1' then
+          cnt_reg(31 downto 0) <= wr_dat_int;
+        end if;
+        if cnt_wreq(1) = '1' then
+          cnt_reg(63 downto 32) <= wr_dat_int;
+        end if;
+      end if;
+    end if;
+  end process;
+
+  -- Memory buf
+  buf_data_raminst: cheby_dpssram
+    generic map (
+      g_data_width         => 32,
+      g_size               => 64,
+      g_addr_width         => 6,
+      g_dual_clock         => '0',
+      g_use_bwsel          => '1'
+    )
+    port map (
+      clk_a_i              => clk_i,
+      clk_b_i              => clk_i,
+      addr_a_i             => adr_int(7 downto 2),
+      bwsel_a_i            => buf_sel_int,
+      data_a_i             => wr_dat_int,
+      data_a_o             => buf_data_int_dato,
+      rd_a_i               => buf_data_rreq,
+      wr_a_i               => buf_data_int_wr,
+      addr_b_i             => buf_adr_i,
+      bwsel_b_i            => (others => '1'),
+      data_b_i             => buf_data_ext_dat,
+      data_b_o             => buf_data_dat_o,
+      rd_b_i               => buf_data_rd_i,
+      wr_b_i               => '0'
+    );
+  
+  process (wr_sel) begin
+    buf_sel_int <= (others => '0');
+    if not (wr_sel(7 downto 0) = (7 downto 0 => '0')) then
+      buf_sel_int(0) <= '1';
+    end if;
+    if not (wr_sel(15 downto 8) = (7 downto 0 => '0')) then
+      buf_sel_int(1) <= '1';
+    end if;
+    if not (wr_sel(23 downto 16) = (7 downto 0 => '0')) then
+      buf_sel_int(2) <= '1';
+    end if;
+    if not (wr_sel(31 downto 24) = (7 downto 0 => '0')) then
+      buf_sel_int(3) <= '1';
+    end if;
+  end process;
+  process (clk_i) begin
+    if rising_edge(clk_i) then
+      if rst_n_i = '0' then
+        buf_data_rack <= '0';
+      else
+        buf_data_rack <= buf_data_rreq;
+      end if;
+    end if;
+  end process;
+
+  -- Process for write requests.
+  process (adr_int, wr_req_int, ctrl_wack, cnt_wack) begin
+    ctrl_wreq <= '0';
+    cnt_wreq <= (others => '0');
+    buf_data_int_wr <= '0';
+    case adr_int(8 downto 8) is
+    when "0" =>
+      case adr_int(7 downto 3) is
+      when "00000" =>
+        case adr_int(2 downto 2) is
+        when "0" =>
+          -- Reg ctrl
+          ctrl_wreq <= wr_req_int;
+          wr_ack_int <= ctrl_wack;
+          wr_err_int <= '0';
+        when "1" =>
+          -- Reg status
+          wr_ack_int <= wr_req_int;
+          wr_err_int <= wr_req_int;
+        when others =>
+          wr_ack_int <= wr_req_int;
+          wr_err_int <= wr_req_int;
+        end case;
+      when "00001" =>
+        case adr_int(2 downto 2) is
+        when "0" =>
+          -- Reg cnt
+          cnt_wreq(1) <= wr_req_int;
+          wr_ack_int <= cnt_wack(1);
+          wr_err_int <= '0';
+        when "1" =>
+          -- Reg cnt
+          cnt_wreq(0) <= wr_req_int;
+          wr_ack_int <= cnt_wack(0);
+          wr_err_int <= '0';
+        when others =>
+          wr_ack_int <= wr_req_int;
+          wr_err_int <= wr_req_int;
+        end case;
+      when others =>
+        wr_ack_int <= wr_req_int;
+        wr_err_int <= wr_req_int;
+      end case;
+    when "1" =>
+      -- Memory buf
+      buf_data_int_wr <= wr_req_int;
+      wr_ack_int <= wr_req_int;
+      wr_err_int <= '0';
+    when others =>
+      wr_ack_int <= wr_req_int;
+      wr_err_int <= wr_req_int;
+    end case;
+  end process;
+
+  -- Process for read requests.
+  process (adr_int, rd_req_int, ctrl_reg, status_i, cnt_reg, buf_data_int_dato,
+           buf_data_rack) begin
+    -- By default ack read requests
+    rd_dat_int <= (others => 'X');
+    buf_data_rreq <= '0';
+    case adr_int(8 downto 8) is
+    when "0" =>
+      case adr_int(7 downto 3) is
+      when "00000" =>
+        case adr_int(2 downto 2) is
+        when "0" =>
+          -- Reg ctrl
+          rd_ack_int <= rd_req_int;
+          rd_err_int <= '0';
+          rd_dat_int <= ctrl_reg;
+        when "1" =>
+          -- Reg status
+          rd_ack_int <= rd_req_int;
+          rd_err_int <= '0';
+          rd_dat_int <= status_i;
+        when others =>
+          rd_ack_int <= rd_req_int;
+          rd_err_int <= rd_req_int;
+        end case;
+      when "00001" =>
+        case adr_int(2 downto 2) is
+        when "0" =>
+          -- Reg cnt
+          rd_ack_int <= rd_req_int;
+          rd_err_int <= '0';
+          rd_dat_int <= cnt_reg(63 downto 32);
+        when "1" =>
+          -- Reg cnt
+          rd_ack_int <= rd_req_int;
+          rd_err_int <= '0';
+          rd_dat_int <= cnt_reg(31 downto 0);
+        when others =>
+          rd_ack_int <= rd_req_int;
+          rd_err_int <= rd_req_int;
+        end case;
+      when others =>
+        rd_ack_int <= rd_req_int;
+        rd_err_int <= rd_req_int;
+      end case;
+    when "1" =>
+      -- Memory buf
+      rd_dat_int <= buf_data_int_dato;
+      buf_data_rreq <= rd_req_int;
+      rd_ack_int <= buf_data_rack;
+      rd_err_int <= '0';
+    when others =>
+      rd_ack_int <= rd_req_int;
+      rd_err_int <= rd_req_int;
+    end case;
+  end process;
+end syn;
@@ -47,6 +47,7 @@ module bugDPSSRAMbwSel
   reg mem_r1_rreq;
   reg mem_r1_rack;
   reg mem_r1_int_wr;
+  reg mem_r1_rp;
   reg rd_ack_d0;
   reg [31:0] rd_dat_d0;
   reg wr_req_d0;
@@ -207,9 +208,15 @@ module bugDPSSRAMbwSel
   always @(posedge(aclk))
   begin
     if (!areset_n)
-      mem_r1_rack <= 1'b0;
+      begin
+        mem_r1_rack <= 1'b0;
+        mem_r1_rp <= 1'b0;
+      end
     else
-      mem_r1_rack <= (mem_r1_rreq & ~mem_wreq) & ~mem_r1_rack;
+      begin
+        mem_r1_rack <= (mem_r1_rreq & ~mem_wreq) & ~mem_r1_rack;
+        mem_r1_rp <= mem_r1_rreq & mem_wreq;
+      end
   end
 
   // Process for write requests.
@@ -222,14 +229,14 @@ module bugDPSSRAMbwSel
   end
 
   // Process for read requests.
-  always @(mem_r1_int_dato, rd_req, mem_wreq, mem_r1_rack)
+  always @(mem_r1_int_dato, rd_req, mem_r1_rp, mem_r1_rack)
   begin
     // By default ack read requests
     rd_dat_d0 = {32{1'bx}};
     mem_r1_rreq = 1'b0;
     // Memory mem
     rd_dat_d0 = {24'b000000000000000000000000, mem_r1_int_dato};
-    mem_r1_rreq = rd_req & ~mem_wreq;
+    mem_r1_rreq = rd_req | mem_r1_rp;
     rd_ack_d0 = mem_r1_rack;
   end
 endmodule
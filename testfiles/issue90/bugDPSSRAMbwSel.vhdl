@@ -54,6 +54,7 @@ architecture syn of bugDPSSRAMbwSel is
   signal mem_r1_rreq                    : std_logic;
   signal mem_r1_rack                    : std_logic;
   signal mem_r1_int_wr                  : std_logic;
+  signal mem_r1_rp                      : std_logic;
   signal rd_ack_d0                      : std_logic;
   signal rd_dat_d0                      : std_logic_vector(31 downto 0);
   signal wr_req_d0                      : std_logic;
@@ -211,8 +212,10 @@ begin
     if rising_edge(aclk) then
       if areset_n = '0' then
         mem_r1_rack <= '0';
+        mem_r1_rp <= '0';
       else
         mem_r1_rack <= (mem_r1_rreq and not mem_wreq) and not mem_r1_rack;
+        mem_r1_rp <= mem_r1_rreq and mem_wreq;
       end if;
     end if;
   end process;
@@ -226,13 +229,13 @@ begin
   end process;
 
   -- Process for read requests.
-  process (mem_r1_int_dato, rd_req, mem_wreq, mem_r1_rack) begin
+  process (mem_r1_int_dato, rd_req, mem_r1_rp, mem_r1_rack) begin
     -- By default ack read requests
     rd_dat_d0 <= (others => 'X');
     mem_r1_rreq <= '0';
     -- Memory mem
     rd_dat_d0 <= "000000000000000000000000" & mem_r1_int_dato;
-    mem_r1_rreq <= rd_req and not mem_wreq;
+    mem_r1_rreq <= rd_req or mem_r1_rp;
     rd_ack_d0 <= mem_r1_rack;
   end process;
 end syn;
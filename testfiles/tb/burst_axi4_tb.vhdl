@@ -0,0 +1,331 @@
+entity burst_axi4_tb is
+end burst_axi4_tb;
+
+library ieee;
+use ieee.std_logic_1164.all;
+use ieee.numeric_std.all;
+
+use work.axi4_tb_pkg.all;
+
+architecture behav of burst_axi4_tb is
+  signal rst_n   : std_logic;
+  signal clk     : std_logic;
+
+  signal awvalid : std_logic;
+  signal awready : std_logic;
+  signal awaddr  : std_logic_vector(31 downto 0);
+  signal awlen   : std_logic_vector(7 downto 0);
+  signal awsize  : std_logic_vector(2 downto 0);
+  signal awburst : std_logic_vector(1 downto 0);
+  signal wvalid  : std_logic;
+  signal wready  : std_logic;
+  signal wdata   : std_logic_vector(31 downto 0);
+  signal wlast   : std_logic;
+  signal bvalid  : std_logic;
+  signal bready  : std_logic;
+  signal bresp   : std_logic_vector(1 downto 0);
+  signal arvalid : std_logic;
+  signal arready : std_logic;
+  signal araddr  : std_logic_vector(31 downto 0);
+  signal arlen   : std_logic_vector(7 downto 0);
+  signal arsize  : std_logic_vector(2 downto 0);
+  signal arburst : std_logic_vector(1 downto 0);
+  signal rvalid  : std_logic;
+  signal rready  : std_logic;
+  signal rdata   : std_logic_vector(31 downto 0);
+  signal rresp   : std_logic_vector(1 downto 0);
+  signal rlast   : std_logic;
+
+  signal reg_rw0 : std_logic_vector(31 downto 0);
+  signal reg_rw1 : std_logic_vector(31 downto 0);
+  signal reg_rw2 : std_logic_vector(31 downto 0);
+  signal reg_rw3 : std_logic_vector(31 downto 0);
+  signal reg_ro0 : std_logic_vector(31 downto 0);
+
+  type t_word_array is array (natural range <>) of std_logic_vector(31 downto 0);
+  type t_resp_array is array (natural range <>) of std_logic_vector(1 downto 0);
+
+  constant C_BURST_FIXED : std_logic_vector(1 downto 0) := "00";
+  constant C_BURST_INCR  : std_logic_vector(1 downto 0) := "01";
+  constant C_BURST_WRAP  : std_logic_vector(1 downto 0) := "10";
+  constant C_SIZE_WORD   : std_logic_vector(2 downto 0) := "010";
+
+  signal end_of_test : boolean := False;
+begin
+  --  Clock and reset
+  process
+  begin
+    clk <= '0';
+    wait for 5 ns;
+    clk <= '1';
+    wait for 5 ns;
+
+    if end_of_test then
+      wait;
+    end if;
+  end process;
+
+  rst_n <= '0' after 0 ns, '1' after 20 ns;
+
+  dut : entity work.burst_axi4
+    port map (
+      aclk     => clk,
+      areset_n => rst_n,
+      awvalid  => awvalid,
+      awready  => awready,
+      awaddr   => awaddr(6 downto 2),
+      awprot   => "010",
+      awlen    => awlen,
+      awsize   => awsize,
+      awburst  => awburst,
+      wvalid   => wvalid,
+      wready   => wready,
+      wdata    => wdata,
+      wstrb    => "1111",
+      wlast    => wlast,
+      bvalid   => bvalid,
+      bready   => bready,
+      bresp    => bresp,
+      arvalid  => arvalid,
+      arready  => arready,
+      araddr   => araddr(6 downto 2),
+      arprot   => "010",
+      arlen    => arlen,
+      arsize   => arsize,
+      arburst  => arburst,
+      rvalid   => rvalid,
+      rready   => rready,
+      rdata    => rdata,
+      rresp    => rresp,
+      rlast    => rlast,
+
+      rw0_o    => reg_rw0,
+      rw1_o    => reg_rw1,
+      rw2_o    => reg_rw2,
+      rw3_o    => reg_rw3,
+      ro0_i    => reg_ro0,
+
+      mem_adr_i     => (others => '0'),
+      mem_val_rd_i  => '0',
+      mem_val_dat_o => open
+    );
+
+  reg_ro0 <= x"5678_9abc";
+
+  main : process is
+    variable d      : t_word_array(0 to 15);
+    variable rs     : t_resp_array(0 to 15);
+    variable cycles : natural;
+
+    --  Write burst of data (one beat per word) at addr, and check the
+    --  response.  Return in cycles the number of cycles until bvalid.
+    procedure write_burst (addr : std_logic_vector(31 downto 0);
+                           burst : std_logic_vector(1 downto 0);
+                           size : std_logic_vector(2 downto 0);
+                           data : t_word_array;
+                           resp : std_logic_vector(1 downto 0);
+                           cycles : out natural) is
+      variable i, n : natural := 0;
+    begin
+      awvalid <= '1';
+      awaddr <= addr;
+      awlen <= std_logic_vector(to_unsigned(data'length - 1, 8));
+      awsize <= size;
+      awburst <= burst;
+      bready <= '1';
+      loop
+        wait until rising_edge(clk);
+        exit when awready = '1';
+      end loop;
+      awvalid <= '0';
+
+      loop
+        if i < data'length then
+          wvalid <= '1';
+          wdata <= data(data'low + i);
+        else
+          wvalid <= '0';
+        end if;
+        if i = data'length - 1 then
+          wlast <= '1';
+        else
+          wlast <= '0';
+        end if;
+        wait until rising_edge(clk);
+        if wvalid = '1' and wready = '1' then
+          i := i + 1;
+        end if;
+        n := n + 1;
+        if bvalid = '1' then
+          assert i = data'length report "early bvalid" severity error;
+          assert bresp = resp report "bad write response" severity error;
+          exit;
+        end if;
+        assert n < 100 report "no write response" severity failure;
+      end loop;
+      cycles := n;
+      wvalid <= '0';
+      wlast <= '0';
+
+      for j in 1 to 3 loop
+        wait until rising_edge(clk);
+        assert bvalid = '0' report "duplicated write response" severity error;
+      end loop;
+    end write_burst;
+
+    --  Read burst of len beats at addr, and check the data and the
+    --  responses of each beat.  With stall, rready is sometimes deasserted.
+    --  Return in cycles the number of cycles until the last beat.
+    procedure read_burst (addr : std_logic_vector(31 downto 0);
+                          burst : std_logic_vector(1 downto 0);
+                          size : std_logic_vector(2 downto 0);
+                          data : t_word_array;
+                          resp : t_resp_array;
+                          stall : boolean;
+                          cycles : out natural) is
+      variable i, n : natural := 0;
+    begin
+      arvalid <= '1';
+      araddr <= addr;
+      arlen <= std_logic_vector(to_unsigned(resp'length - 1, 8));
+      arsize <= size;
+      arburst <= burst;
+      rready <= '0';
+      loop
+        wait until rising_edge(clk);
+        exit when arready = '1';
+      end loop;
+      arvalid <= '0';
+
+      loop
+        if stall and n mod 3 = 1 then
+          rready <= '0';
+        else
+          rready <= '1';
+        end if;
+        wait until rising_edge(clk);
+        if rvalid = '1' and rready = '1' then
+          if i >= resp'length then
+            report "unexpected beat" severity error;
+          else
+            assert rresp = resp(resp'low + i)
+              report "bad read response " & natural'image(i) severity error;
+            assert rresp /= C_AXI4_RESP_OK or rdata = data(data'low + i)
+              report "bad read data " & natural'image(i) severity error;
+            assert (rlast = '1') = (i = resp'length - 1)
+              report "bad rlast " & natural'image(i) severity error;
+          end if;
+          i := i + 1;
+        end if;
+        n := n + 1;
+        exit when i = resp'length;
+        assert n < 100 report "missing beats" severity failure;
+      end loop;
+      cycles := n;
+
+      rready <= '1';
+      for j in 1 to 3 loop
+        wait until rising_edge(clk);
+        assert rvalid = '0' report "extra beat" severity error;
+      end loop;
+    end read_burst;
+  begin
+    awvalid <= '0';
+    wvalid <= '0';
+    wlast <= '0';
+    bready <= '0';
+    arvalid <= '0';
+    rready <= '0';
+
+    --  Wait after reset.
+    wait until rising_edge(clk) and rst_n = '1';
+
+    --  INCR bursts on the registers: one beat per cycle.
+    report "Testing INCR bursts" severity note;
+    d(0 to 3) := (x"1000_0000", x"1000_0001", x"1000_0002", x"1000_0003");
+    write_burst(x"0000_0000", C_BURST_INCR, C_SIZE_WORD, d(0 to 3),
+                C_AXI4_RESP_OK, cycles);
+    assert cycles <= 4 + 2 report "write: not one beat per cycle" severity error;
+    assert reg_rw0 = x"1000_0000" severity error;
+    assert reg_rw3 = x"1000_0003" severity error;
+    rs(0 to 3) := (others => C_AXI4_RESP_OK);
+    read_burst(x"0000_0000", C_BURST_INCR, C_SIZE_WORD, d(0 to 3), rs(0 to 3),
+               False, cycles);
+    assert cycles <= 4 + 2 report "read: not one beat per cycle" severity error;
+
+    --  FIXED bursts.
+    report "Testing FIXED bursts" severity note;
+    d(0 to 2) := (x"2000_0000", x"2000_0001", x"2000_0002");
+    write_burst(x"0000_0004", C_BURST_FIXED, C_SIZE_WORD, d(0 to 2),
+                C_AXI4_RESP_OK, cycles);
+    assert reg_rw1 = x"2000_0002" severity error;
+    assert reg_rw2 = x"1000_0002" severity error;
+    d(0 to 1) := (x"2000_0002", x"2000_0002");
+    read_burst(x"0000_0004", C_BURST_FIXED, C_SIZE_WORD, d(0 to 1), rs(0 to 1),
+               False, cycles);
+
+    --  Bus errors are reported per beat for reads.
+    report "Testing bursts with errors" severity note;
+    d(0 to 1) := (x"3000_0000", x"3000_0001");
+    write_burst(x"0000_000c", C_BURST_INCR, C_SIZE_WORD, d(0 to 1),
+                C_AXI4_RESP_SLVERR, cycles);
+    assert reg_rw3 = x"3000_0000" severity error;
+    d(0 to 2) := (x"3000_0000", x"5678_9abc", x"0000_0000");
+    rs(0 to 2) := (C_AXI4_RESP_OK, C_AXI4_RESP_OK, C_AXI4_RESP_SLVERR);
+    read_burst(x"0000_000c", C_BURST_INCR, C_SIZE_WORD, d(0 to 2), rs(0 to 2),
+               False, cycles);
+
+    --  Memory bursts, with back-pressure on the reads.
+    report "Testing memory bursts" severity note;
+    for i in 0 to 15 loop
+      d(i) := std_logic_vector(unsigned'(x"cafe_0000") + i * 3);
+    end loop;
+    write_burst(x"0000_0040", C_BURST_INCR, C_SIZE_WORD, d,
+                C_AXI4_RESP_OK, cycles);
+    rs := (others => C_AXI4_RESP_OK);
+    read_burst(x"0000_0040", C_BURST_INCR, C_SIZE_WORD, d, rs, True, cycles);
+
+    --  WRAP bursts are not supported: SLVERR for all the beats, and no
+    --  access.
+    report "Testing WRAP bursts" severity note;
+    d(0 to 3) := (x"4000_0000", x"4000_0001", x"4000_0002", x"4000_0003");
+    write_burst(x"0000_0008", C_BURST_WRAP, C_SIZE_WORD, d(0 to 3),
+                C_AXI4_RESP_SLVERR, cycles);
+    assert reg_rw0 = x"1000_0000" severity error;
+    assert reg_rw1 = x"2000_0002" severity error;
+    assert reg_rw2 = x"1000_0002" severity error;
+    assert reg_rw3 = x"3000_0000" severity error;
+    rs(0 to 3) := (others => C_AXI4_RESP_SLVERR);
+    read_burst(x"0000_0008", C_BURST_WRAP, C_SIZE_WORD, d(0 to 3), rs(0 to 3),
+               True, cycles);
+
+    --  Nor are narrow beats.
+    report "Testing narrow bursts" severity note;
+    d(0 to 1) := (x"5000_0000", x"5000_0001");
+    write_burst(x"0000_0000", C_BURST_INCR, "001", d(0 to 1),
+                C_AXI4_RESP_SLVERR, cycles);
+    assert reg_rw0 = x"1000_0000" severity error;
+    assert reg_rw1 = x"2000_0002" severity error;
+    rs(0 to 1) := (others => C_AXI4_RESP_SLVERR);
+    read_burst(x"0000_0000", C_BURST_INCR, "000", d(0 to 1), rs(0 to 1),
+               False, cycles);
+
+    --  And the next burst is handled normally.
+    d(0 to 1) := (x"1000_0000", x"2000_0002");
+    rs(0 to 1) := (others => C_AXI4_RESP_OK);
+    read_burst(x"0000_0000", C_BURST_INCR, C_SIZE_WORD, d(0 to 1), rs(0 to 1),
+               False, cycles);
+
+    wait until rising_edge(clk);
+    report "End of test" severity note;
+    end_of_test <= true;
+    wait;
+  end process main;
+
+  watchdog : process is
+  begin
+    wait until end_of_test for 10 us;
+    assert end_of_test report "timeout" severity failure;
+    wait;
+  end process watchdog;
+end behav;
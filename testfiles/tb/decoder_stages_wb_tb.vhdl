@@ -0,0 +1,170 @@
+entity decoder_stages_wb_tb is
+end decoder_stages_wb_tb;
+
+library ieee;
+use ieee.std_logic_1164.all;
+use ieee.numeric_std.all;
+
+use work.wishbone_pkg.all;
+use work.wb_tb_pkg.all;
+
+architecture behav of decoder_stages_wb_tb is
+  signal rst_n   : std_logic;
+  signal clk     : std_logic;
+  signal wb_in   : t_wishbone_slave_in;
+  signal wb_out  : t_wishbone_slave_out;
+
+  signal reg_ctrl  : std_logic_vector(31 downto 0);
+  signal reg_cnt   : std_logic_vector(31 downto 0);
+  signal status_rd : std_logic;
+
+  --  For ext.
+  signal ext_wb_in  : t_wishbone_slave_in;
+  signal ext_wb_out : t_wishbone_slave_out;
+  signal ext_adr    : std_logic_vector(7 downto 2);
+
+  --  Number of read strobes of status and of cycles on ext.
+  signal nbr_status_rd : natural := 0;
+  signal nbr_ext_cyc   : natural := 0;
+
+  signal end_of_test : boolean := false;
+begin
+  --  Clock and reset
+  process
+  begin
+    clk <= '0';
+    wait for 5 ns;
+    clk <= '1';
+    wait for 5 ns;
+
+    if end_of_test then
+      wait;
+    end if;
+  end process;
+
+  --  Watchdog
+  process
+  begin
+    wait until end_of_test for 10 us;
+    assert end_of_test report "TIMEOUT" severity failure;
+    wait;
+  end process;
+
+  rst_n <= '0' after 0 ns, '1' after 20 ns;
+
+  dut : entity work.decoder_stages_wb
+    port map (
+      rst_n_i    => rst_n,
+      clk_i      => clk,
+      wb_cyc_i   => wb_in.cyc,
+      wb_stb_i   => wb_in.stb,
+      wb_adr_i   => wb_in.adr(8 downto 2),
+      wb_sel_i   => wb_in.sel,
+      wb_we_i    => wb_in.we,
+      wb_dat_i   => wb_in.dat,
+      wb_ack_o   => wb_out.ack,
+      wb_err_o   => wb_out.err,
+      wb_rty_o   => wb_out.rty,
+      wb_stall_o => wb_out.stall,
+      wb_dat_o   => wb_out.dat,
+
+      ctrl_o      => reg_ctrl,
+      status_i    => x"5a5a_0001",
+      status_rd_o => status_rd,
+      cnt_o       => reg_cnt,
+
+      ext_cyc_o   => ext_wb_in.cyc,
+      ext_stb_o   => ext_wb_in.stb,
+      ext_adr_o   => ext_adr,
+      ext_sel_o   => ext_wb_in.sel,
+      ext_we_o    => ext_wb_in.we,
+      ext_dat_o   => ext_wb_in.dat,
+      ext_ack_i   => ext_wb_out.ack,
+      ext_err_i   => ext_wb_out.err,
+      ext_rty_i   => ext_wb_out.rty,
+      ext_stall_i => ext_wb_out.stall,
+      ext_dat_i   => ext_wb_out.dat);
+
+  ext_wb_in.adr <= (31 downto 8 => '0') & ext_adr & "00";
+
+  --  WB target
+  b1: entity work.block1_wb
+    port map (clk => clk,
+              rst_n => rst_n,
+              sub1_wb_in => ext_wb_in,
+              sub1_wb_out => ext_wb_out);
+
+  --  Count the read strobes and the bus cycles on ext.
+  process (clk)
+    variable ext_cyc : std_logic := '0';
+  begin
+    if rising_edge(clk) then
+      if status_rd = '1' then
+        nbr_status_rd <= nbr_status_rd + 1;
+      end if;
+      if ext_wb_in.cyc = '1' and ext_cyc = '0' then
+        nbr_ext_cyc <= nbr_ext_cyc + 1;
+      end if;
+      ext_cyc := ext_wb_in.cyc;
+    end if;
+  end process;
+
+  process
+    variable v : std_logic_vector(31 downto 0);
+  begin
+    wb_init(clk, wb_out, wb_in);
+
+    --  Wait after reset.
+    wait until rising_edge(clk) and rst_n = '1';
+
+    --  Registers.
+    report "Testing registers" severity note;
+    wb_writel(clk, wb_out, wb_in, x"0000_0000", x"1234_0000");
+    wb_writel(clk, wb_out, wb_in, x"0000_0008", x"1234_0008");
+    assert reg_ctrl = x"1234_0000" severity error;
+    assert reg_cnt = x"1234_0008" severity error;
+
+    wb_readl(clk, wb_out, wb_in, x"0000_0000", v);
+    assert v = x"1234_0000" report "bad ctrl value" severity error;
+    wb_readl(clk, wb_out, wb_in, x"0000_0008", v);
+    assert v = x"1234_0008" report "bad cnt value" severity error;
+    wb_readl(clk, wb_out, wb_in, x"0000_000c", v);
+    assert nbr_status_rd = 0 report "status read strobe pulsed" severity error;
+
+    wb_readl(clk, wb_out, wb_in, x"0000_0004", v);
+    assert v = x"5a5a_0001" report "bad status value" severity error;
+    wait until rising_edge(clk);
+    assert nbr_status_rd = 1 report "bad status read strobes" severity error;
+
+    --  The accesses to the registers are not sent to ext.
+    assert nbr_ext_cyc = 0 report "register access sent to ext" severity error;
+
+    --  ext, at an address whose lower bits are the address of status.
+    report "Testing submap" severity note;
+    wb_readl(clk, wb_out, wb_in, x"0000_0104", v);
+    assert v = x"01fe_fe01" report "bad ext value at 0x104" severity error;
+    wb_readl(clk, wb_out, wb_in, x"0000_0100", v);
+    assert v = x"0000_1000" report "bad ext value at 0x100" severity error;
+    wait until rising_edge(clk);
+    assert nbr_status_rd = 1 report "status read strobe pulsed by ext" severity error;
+    assert nbr_ext_cyc = 2 report "bad number of ext cycles" severity error;
+
+    --  Interleaved accesses.
+    wb_readl(clk, wb_out, wb_in, x"0000_0000", v);
+    assert v = x"1234_0000" report "bad ctrl value" severity error;
+    wb_readl(clk, wb_out, wb_in, x"0000_0108", v);
+    assert v = x"02fd_fd02" report "bad ext value at 0x108" severity error;
+    wb_writel(clk, wb_out, wb_in, x"0000_0100", x"0000_2000");
+    wb_readl(clk, wb_out, wb_in, x"0000_0008", v);
+    assert v = x"1234_0008" report "bad cnt value" severity error;
+    wb_readl(clk, wb_out, wb_in, x"0000_0100", v);
+    assert v = x"0000_2000" report "bad ext value at 0x100" severity error;
+    wait until rising_edge(clk);
+    assert nbr_status_rd = 1 report "status read strobe pulsed" severity error;
+    assert nbr_ext_cyc = 5 report "bad number of ext cycles" severity error;
+
+    end_of_test <= true;
+    report "end of test" severity note;
+    wait;
+  end process;
+end behav;
@@ -133,6 +133,7 @@ architecture syn of all1_apb is
   signal ram1_val_rreq                  : std_logic;
   signal ram1_val_rack                  : std_logic;
   signal ram1_val_int_wr                : std_logic;
+  signal ram1_val_rp                    : std_logic;
   signal ram_ro_val_int_dato            : std_logic_vector(31 downto 0);
   signal ram_ro_val_ext_dat             : std_logic_vector(31 downto 0);
   signal ram_ro_val_rreq                : std_logic;
@@ -331,8 +332,10 @@ begin
     if rising_edge(pclk) then
       if presetn = '0' then
         ram1_val_rack <= '0';
+        ram1_val_rp <= '0';
       else
         ram1_val_rack <= (ram1_val_rreq and not ram1_wreq) and not ram1_val_rack;
+        ram1_val_rp <= ram1_val_rreq and ram1_wreq;
       end if;
     end if;
   end process;
@@ -732,7 +735,7 @@ begin
   end process;
 
   -- Process for read requests.
-  process (rd_adr_d0, rd_req_d0, reg1_reg, reg2_reg, ram1_val_int_dato, ram1_wreq,
+  process (rd_adr_d0, rd_req_d0, reg1_reg, reg2_reg, ram1_val_int_dato, ram1_val_rp,
            ram1_val_rack, ram_ro_val_int_dato, ram_ro_val_rack, ram2_data_i,
            ram2_rack, sub1_wb_dat_i, sub1_wb_rack, sub2_axi4_rdata_i,
            sub2_axi4_rvalid_i, sub3_cernbe_rs, sub3_cernbe_VMERdData_i,
@@ -773,7 +776,7 @@ begin
       when "0000001" =>
         -- Memory ram1
         rd_dat_d0 <= ram1_val_int_dato;
-        ram1_val_rreq <= rd_req_d0 and not ram1_wreq;
+        ram1_val_rreq <= rd_req_d0 or ram1_val_rp;
         rd_ack_d0 <= ram1_val_rack;
       when "0000010" =>
         -- Memory ram_ro
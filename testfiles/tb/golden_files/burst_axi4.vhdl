@@ -0,0 +1,509 @@
+library ieee;
+use ieee.std_logic_1164.all;
+use ieee.numeric_std.all;
+use work.cheby_pkg.all;
+
+entity burst_axi4 is
+  port (
+    aclk                 : in    std_logic;
+    areset_n             : in    std_logic;
+    awvalid              : in    std_logic;
+    awready              : out   std_logic;
+    awaddr               : in    std_logic_vector(6 downto 2);
+    awprot               : in    std_logic_vector(2 downto 0);
+    awlen                : in    std_logic_vector(7 downto 0);
+    awsize               : in    std_logic_vector(2 downto 0);
+    awburst              : in    std_logic_vector(1 downto 0);
+    wvalid               : in    std_logic;
+    wready               : out   std_logic;
+    wdata                : in    std_logic_vector(31 downto 0);
+    wstrb                : in    std_logic_vector(3 downto 0);
+    wlast                : in    std_logic;
+    bvalid               : out   std_logic;
+    bready               : in    std_logic;
+    bresp                : out   std_logic_vector(1 downto 0);
+    arvalid              : in    std_logic;
+    arready              : out   std_logic;
+    araddr               : in    std_logic_vector(6 downto 2);
+    arprot               : in    std_logic_vector(2 downto 0);
+    arlen                : in    std_logic_vector(7 downto 0);
+    arsize               : in    std_logic_vector(2 downto 0);
+    arburst              : in    std_logic_vector(1 downto 0);
+    rvalid               : out   std_logic;
+    rready               : in    std_logic;
+    rdata                : out   std_logic_vector(31 downto 0);
+    rresp                : out   std_logic_vector(1 downto 0);
+    rlast                : out   std_logic;
+
+    -- REG rw0
+    rw0_o                : out   std_logic_vector(31 downto 0);
+
+    -- REG rw1
+    rw1_o                : out   std_logic_vector(31 downto 0);
+
+    -- REG rw2
+    rw2_o                : out   std_logic_vector(31 downto 0);
+
+    -- REG rw3
+    rw3_o                : out   std_logic_vector(31 downto 0);
+
+    -- REG ro0
+    ro0_i                : in    std_logic_vector(31 downto 0);
+
+    -- RAM port for mem
+    mem_adr_i            : in    std_logic_vector(3 downto 0);
+    mem_val_rd_i         : in    std_logic;
+    mem_val_dat_o        : out   std_logic_vector(31 downto 0)
+  );
+end burst_axi4;
+
+architecture syn of burst_axi4 is
+  signal wr_req                         : std_logic;
+  signal wr_ack                         : std_logic;
+  signal wr_err                         : std_logic;
+  signal wr_addr                        : std_logic_vector(6 downto 2);
+  signal wr_data                        : std_logic_vector(31 downto 0);
+  signal wr_sel                         : std_logic_vector(31 downto 0);
+  signal axi_wbusy                      : std_logic;
+  signal axi_awaddr                     : std_logic_vector(6 downto 2);
+  signal axi_awburst                    : std_logic_vector(1 downto 0);
+  signal axi_wbad                       : std_logic;
+  signal axi_wlast                      : std_logic;
+  signal axi_wip                        : std_logic;
+  signal axi_wready                     : std_logic;
+  signal axi_wdone                      : std_logic;
+  signal axi_werr                       : std_logic_vector(1 downto 0);
+  signal rd_req                         : std_logic;
+  signal rd_ack                         : std_logic;
+  signal rd_err                         : std_logic;
+  signal rd_addr                        : std_logic_vector(6 downto 2);
+  signal rd_data                        : std_logic_vector(31 downto 0);
+  signal axi_rbusy                      : std_logic;
+  signal axi_araddr                     : std_logic_vector(6 downto 2);
+  signal axi_arburst                    : std_logic_vector(1 downto 0);
+  signal axi_rbad                       : std_logic;
+  signal axi_rfake                      : std_logic;
+  signal axi_rack                       : std_logic;
+  signal axi_arlen                      : std_logic_vector(7 downto 0);
+  signal axi_rissue                     : std_logic_vector(7 downto 0);
+  signal axi_rpend                      : std_logic;
+  signal axi_rbeat                      : std_logic_vector(7 downto 0);
+  signal axi_rip                        : std_logic;
+  signal axi_rstart                     : std_logic;
+  signal axi_rdone                      : std_logic;
+  signal axi_rlast                      : std_logic;
+  signal axi_rskid                      : std_logic;
+  signal axi_rskid_data                 : std_logic_vector(31 downto 0);
+  signal axi_rerr                       : std_logic_vector(1 downto 0);
+  signal axi_rskid_err                  : std_logic_vector(1 downto 0);
+  signal rw0_reg                        : std_logic_vector(31 downto 0);
+  signal rw0_wreq                       : std_logic;
+  signal rw0_wack                       : std_logic;
+  signal rw1_reg                        : std_logic_vector(31 downto 0);
+  signal rw1_wreq                       : std_logic;
+  signal rw1_wack                       : std_logic;
+  signal rw2_reg                        : std_logic_vector(31 downto 0);
+  signal rw2_wreq                       : std_logic;
+  signal rw2_wack                       : std_logic;
+  signal rw3_reg                        : std_logic_vector(31 downto 0);
+  signal rw3_wreq                       : std_logic;
+  signal rw3_wack                       : std_logic;
+  signal mem_val_int_dato               : std_logic_vector(31 downto 0);
+  signal mem_val_ext_dat                : std_logic_vector(31 downto 0);
+  signal mem_val_rreq                   : std_logic;
+  signal mem_val_rack                   : std_logic;
+  signal mem_val_int_wr                 : std_logic;
+  signal mem_val_rp                     : std_logic;
+  signal mem_wr                         : std_logic;
+  signal mem_wreq                       : std_logic;
+  signal mem_adr_int                    : std_logic_vector(3 downto 0);
+  signal mem_sel_int                    : std_logic_vector(3 downto 0);
+begin
+
+  -- AW, W and B channels
+  awready <= not axi_wbusy;
+  axi_wready <= (axi_wbusy and not axi_wlast) and (not axi_wip or wr_ack);
+  wready <= axi_wready;
+  bvalid <= axi_wdone;
+  process (aclk) begin
+    if rising_edge(aclk) then
+      if areset_n = '0' then
+        wr_req <= '0';
+        axi_wbusy <= '0';
+        axi_wlast <= '0';
+        axi_wip <= '0';
+        axi_wdone <= '0';
+        axi_werr <= "00";
+      else
+        wr_req <= '0';
+        if awvalid = '1' and axi_wbusy = '0' then
+          axi_awaddr <= awaddr;
+          axi_awburst <= awburst;
+          if awburst(1) = '1' or not (awsize = "010") then
+            axi_wbad <= '1';
+          else
+            axi_wbad <= '0';
+          end if;
+          axi_wbusy <= '1';
+        end if;
+        if wr_ack = '1' then
+          axi_wip <= '0';
+          if wr_err = '1' then
+            axi_werr <= "10";
+          end if;
+          if axi_wlast = '1' then
+            axi_wdone <= '1';
+          end if;
+        end if;
+        if axi_wready = '1' and wvalid = '1' then
+          axi_wlast <= wlast;
+          if axi_wbad = '1' then
+            axi_werr <= "10";
+            if wlast = '1' then
+              axi_wdone <= '1';
+            end if;
+          else
+            wr_req <= '1';
+            axi_wip <= '1';
+            wr_addr <= axi_awaddr;
+            if not (axi_awburst = "00") then
+              axi_awaddr <= std_logic_vector(unsigned(axi_awaddr) + 1);
+            end if;
+            wr_data <= wdata;
+            wr_sel(7 downto 0) <= (others => wstrb(0));
+            wr_sel(15 downto 8) <= (others => wstrb(1));
+            wr_sel(23 downto 16) <= (others => wstrb(2));
+            wr_sel(31 downto 24) <= (others => wstrb(3));
+          end if;
+        end if;
+        if (axi_wdone and bready) = '1' then
+          axi_wdone <= '0';
+          axi_wbusy <= '0';
+          axi_wlast <= '0';
+          axi_werr <= "00";
+        end if;
+      end if;
+    end if;
+  end process;
+  bresp <= axi_werr;
+
+  -- AR and R channels
+  arready <= not axi_rbusy;
+  rvalid <= axi_rdone;
+  axi_rack <= rd_ack or axi_rfake;
+  axi_rstart <= (axi_rpend and (not axi_rip or axi_rack)) and (not axi_rskid and (not (axi_rdone and axi_rack) or rready));
+  process (axi_rbeat, axi_arlen) begin
+    if axi_rbeat = axi_arlen then
+      axi_rlast <= '1';
+    else
+      axi_rlast <= '0';
+    end if;
+  end process;
+  rlast <= axi_rlast;
+  process (aclk) begin
+    if rising_edge(aclk) then
+      if areset_n = '0' then
+        rd_req <= '0';
+        axi_rfake <= '0';
+        axi_rbusy <= '0';
+        axi_rpend <= '0';
+        axi_rip <= '0';
+        rdata <= (others => '0');
+        axi_rdone <= '0';
+        axi_rerr <= "00";
+        axi_rskid <= '0';
+      else
+        rd_req <= '0';
+        axi_rfake <= '0';
+        if (axi_rdone and rready) = '1' then
+          axi_rdone <= axi_rskid;
+          axi_rerr <= axi_rskid_err;
+          rdata <= axi_rskid_data;
+          axi_rskid <= '0';
+        end if;
+        if axi_rack = '1' then
+          if axi_rdone = '0' or (rready and not axi_rskid) = '1' then
+            axi_rdone <= '1';
+            if (rd_err or axi_rbad) = '0' then
+              axi_rerr <= "00";
+            else
+              axi_rerr <= "10";
+            end if;
+            rdata <= rd_data;
+          else
+            axi_rskid <= '1';
+            if (rd_err or axi_rbad) = '0' then
+              axi_rskid_err <= "00";
+            else
+              axi_rskid_err <= "10";
+            end if;
+            axi_rskid_data <= rd_data;
+          end if;
+        end if;
+        if axi_rack = '1' then
+          axi_rip <= '0';
+        end if;
+        if arvalid = '1' and axi_rbusy = '0' then
+          axi_araddr <= araddr;
+          axi_arburst <= arburst;
+          if arburst(1) = '1' or not (arsize = "010") then
+            axi_rbad <= '1';
+          else
+            axi_rbad <= '0';
+          end if;
+          axi_arlen <= arlen;
+          axi_rissue <= (others => '0');
+          axi_rbeat <= (others => '0');
+          axi_rbusy <= '1';
+          axi_rpend <= '1';
+        end if;
+        if axi_rstart = '1' then
+          axi_rip <= '1';
+          if axi_rbad = '1' then
+            axi_rfake <= '1';
+          else
+            rd_req <= '1';
+            rd_addr <= axi_araddr;
+            if not (axi_arburst = "00") then
+              axi_araddr <= std_logic_vector(unsigned(axi_araddr) + 1);
+            end if;
+          end if;
+          if axi_rissue = axi_arlen then
+            axi_rpend <= '0';
+          end if;
+          axi_rissue <= std_logic_vector(unsigned(axi_rissue) + 1);
+        end if;
+        if (axi_rdone and rready) = '1' then
+          axi_rbeat <= std_logic_vector(unsigned(axi_rbeat) + 1);
+          if axi_rlast = '1' then
+            axi_rbusy <= '0';
+          end if;
+        end if;
+      end if;
+    end if;
+  end process;
+  rresp <= axi_rerr;
+
+  -- Register rw0
+  rw0_o <= rw0_reg;
+  rw0_wack <= rw0_wreq;
+  process (aclk) begin
+    if rising_edge(aclk) then
+      if areset_n = '0' then
+        rw0_reg <= "00010010001101000101011001111000";
+      else
+        if rw0_wreq = '1' then
+          rw0_reg <= wr_data;
+        end if;
+      end if;
+    end if;
+  end process;
+
+  -- Register rw1
+  rw1_o <= rw1_reg;
+  rw1_wack <= rw1_wreq;
+  process (aclk) begin
+    if rising_edge(aclk) then
+      if areset_n = '0' then
+        rw1_reg <= "00100011010001010110011110001001";
+      else
+        if rw1_wreq = '1' then
+          rw1_reg <= wr_data;
+        end if;
+      end if;
+    end if;
+  end process;
+
+  -- Register rw2
+  rw2_o <= rw2_reg;
+  rw2_wack <= rw2_wreq;
+  process (aclk) begin
+    if rising_edge(aclk) then
+      if areset_n = '0' then
+        rw2_reg <= "00110100010101100111100010011010";
+      else
+        if rw2_wreq = '1' then
+          rw2_reg <= wr_data;
+        end if;
+      end if;
+    end if;
+  end process;
+
+  -- Register rw3
+  rw3_o <= rw3_reg;
+  rw3_wack <= rw3_wreq;
+  process (aclk) begin
+    if rising_edge(aclk) then
+      if areset_n = '0' then
+        rw3_reg <= "01000101011001111000100110101011";
+      else
+        if rw3_wreq = '1' then
+          rw3_reg <= wr_data;
+        end if;
+      end if;
+    end if;
+  end process;
+
+  -- Register ro0
+
+  -- Memory mem
+  process (rd_addr, wr_addr, mem_wr) begin
+    if mem_wr = '1' then
+      mem_adr_int <= wr_addr(5 downto 2);
+    else
+      mem_adr_int <= rd_addr(5 downto 2);
+    end if;
+  end process;
+  mem_wreq <= mem_val_int_wr;
+  mem_wr <= mem_wreq;
+  mem_val_raminst: cheby_dpssram
+    generic map (
+      g_data_width         => 32,
+      g_size               => 16,
+      g_addr_width         => 4,
+      g_dual_clock         => '0',
+      g_use_bwsel          => '1'
+    )
+    port map (
+      clk_a_i              => aclk,
+      clk_b_i              => aclk,
+      addr_a_i             => mem_adr_int,
+      bwsel_a_i            => mem_sel_int,
+      data_a_i             => wr_data,
+      data_a_o             => mem_val_int_dato,
+      rd_a_i               => mem_val_rreq,
+      wr_a_i               => mem_val_int_wr,
+      addr_b_i             => mem_adr_i,
+      bwsel_b_i            => (others => '1'),
+      data_b_i             => mem_val_ext_dat,
+      data_b_o             => mem_val_dat_o,
+      rd_b_i               => mem_val_rd_i,
+      wr_b_i               => '0'
+    );
+  
+  process (wr_sel) begin
+    mem_sel_int <= (others => '0');
+    if not (wr_sel(7 downto 0) = (7 downto 0 => '0')) then
+      mem_sel_int(0) <= '1';
+    end if;
+    if not (wr_sel(15 downto 8) = (7 downto 0 => '0')) then
+      mem_sel_int(1) <= '1';
+    end if;
+    if not (wr_sel(23 downto 16) = (7 downto 0 => '0')) then
+      mem_sel_int(2) <= '1';
+    end if;
+    if not (wr_sel(31 downto 24) = (7 downto 0 => '0')) then
+      mem_sel_int(3) <= '1';
+    end if;
+  end process;
+  process (aclk) begin
+    if rising_edge(aclk) then
+      if areset_n = '0' then
+        mem_val_rack <= '0';
+        mem_val_rp <= '0';
+      else
+        mem_val_rack <= (mem_val_rreq and not mem_wreq) and not mem_val_rack;
+        mem_val_rp <= mem_val_rreq and mem_wreq;
+      end if;
+    end if;
+  end process;
+
+  -- Process for write requests.
+  process (wr_addr, wr_req, rw0_wack, rw1_wack, rw2_wack, rw3_wack) begin
+    rw0_wreq <= '0';
+    rw1_wreq <= '0';
+    rw2_wreq <= '0';
+    rw3_wreq <= '0';
+    mem_val_int_wr <= '0';
+    case wr_addr(6 downto 6) is
+    when "0" =>
+      case wr_addr(5 downto 2) is
+      when "0000" =>
+        -- Reg rw0
+        rw0_wreq <= wr_req;
+        wr_ack <= rw0_wack;
+        wr_err <= '0';
+      when "0001" =>
+        -- Reg rw1
+        rw1_wreq <= wr_req;
+        wr_ack <= rw1_wack;
+        wr_err <= '0';
+      when "0010" =>
+        -- Reg rw2
+        rw2_wreq <= wr_req;
+        wr_ack <= rw2_wack;
+        wr_err <= '0';
+      when "0011" =>
+        -- Reg rw3
+        rw3_wreq <= wr_req;
+        wr_ack <= rw3_wack;
+        wr_err <= '0';
+      when "0100" =>
+        -- Reg ro0
+        wr_ack <= wr_req;
+        wr_err <= wr_req;
+      when others =>
+        wr_ack <= wr_req;
+        wr_err <= wr_req;
+      end case;
+    when "1" =>
+      -- Memory mem
+      mem_val_int_wr <= wr_req;
+      wr_ack <= wr_req;
+      wr_err <= '0';
+    when others =>
+      wr_ack <= wr_req;
+      wr_err <= wr_req;
+    end case;
+  end process;
+
+  -- Process for read requests.
+  process (rd_addr, rd_req, rw0_reg, rw1_reg, rw2_reg, rw3_reg, ro0_i, mem_val_int_dato,
+           mem_val_rp, mem_val_rack) begin
+    -- By default ack read requests
+    rd_data <= (others => 'X');
+    mem_val_rreq <= '0';
+    case rd_addr(6 downto 6) is
+    when "0" =>
+      case rd_addr(5 downto 2) is
+      when "0000" =>
+        -- Reg rw0
+        rd_ack <= rd_req;
+        rd_err <= '0';
+        rd_data <= rw0_reg;
+      when "0001" =>
+        -- Reg rw1
+        rd_ack <= rd_req;
+        rd_err <= '0';
+        rd_data <= rw1_reg;
+      when "0010" =>
+        -- Reg rw2
+        rd_ack <= rd_req;
+        rd_err <= '0';
+        rd_data <= rw2_reg;
+      when "0011" =>
+        -- Reg rw3
+        rd_ack <= rd_req;
+        rd_err <= '0';
+        rd_data <= rw3_reg;
+      when "0100" =>
+        -- Reg ro0
+        rd_ack <= rd_req;
+        rd_err <= '0';
+        rd_data <= ro0_i;
+      when others =>
+        rd_ack <= rd_req;
+        rd_err <= rd_req;
+      end case;
+    when "1" =>
+      -- Memory mem
+      rd_data <= mem_val_int_dato;
+      mem_val_rreq <= rd_req or mem_val_rp;
+      rd_ack <= mem_val_rack;
+      rd_err <= '0';
+    when others =>
+      rd_ack <= rd_req;
+      rd_err <= rd_req;
+    end case;
+  end process;
+end syn;
@@ -0,0 +1,352 @@
+library ieee;
+use ieee.std_logic_1164.all;
+use ieee.numeric_std.all;
+
+entity decoder_stages_wb is
+  port (
+    rst_n_i              : in    std_logic;
+    clk_i                : in    std_logic;
+    wb_cyc_i             : in    std_logic;
+    wb_stb_i             : in    std_logic;
+    wb_adr_i             : in    std_logic_vector(8 downto 2);
+    wb_sel_i             : in    std_logic_vector(3 downto 0);
+    wb_we_i              : in    std_logic;
+    wb_dat_i             : in    std_logic_vector(31 downto 0);
+    wb_ack_o             : out   std_logic;
+    wb_err_o             : out   std_logic;
+    wb_rty_o             : out   std_logic;
+    wb_stall_o           : out   std_logic;
+    wb_dat_o             : out   std_logic_vector(31 downto 0);
+
+    -- REG ctrl
+    ctrl_o               : out   std_logic_vector(31 downto 0);
+
+    -- REG status
+    status_i             : in    std_logic_vector(31 downto 0);
+    status_rd_o          : out   std_logic;
+
+    -- REG cnt
+    cnt_o                : out   std_logic_vector(31 downto 0);
+
+    -- WB bus ext
+    ext_cyc_o            : out   std_logic;
+    ext_stb_o            : out   std_logic;
+    ext_adr_o            : out   std_logic_vector(7 downto 2);
+    ext_sel_o            : out   std_logic_vector(3 downto 0);
+    ext_we_o             : out   std_logic;
+    ext_dat_o            : out   std_logic_vector(31 downto 0);
+    ext_ack_i            : in    std_logic;
+    ext_err_i            : in    std_logic;
+    ext_rty_i            : in    std_logic;
+    ext_stall_i          : in    std_logic;
+    ext_dat_i            : in    std_logic_vector(31 downto 0)
+  );
+end decoder_stages_wb;
+
+architecture syn of decoder_stages_wb is
+  signal wr_sel                         : std_logic_vector(31 downto 0);
+  signal rd_req_int                     : std_logic;
+  signal wr_req_int                     : std_logic;
+  signal rd_ack_int                     : std_logic;
+  signal wr_ack_int                     : std_logic;
+  signal wb_en                          : std_logic;
+  signal ack_int                        : std_logic;
+  signal wb_rip                         : std_logic;
+  signal wb_wip                         : std_logic;
+  signal ctrl_reg                       : std_logic_vector(31 downto 0);
+  signal ctrl_wreq                      : std_logic;
+  signal ctrl_wack                      : std_logic;
+  signal cnt_reg                        : std_logic_vector(31 downto 0);
+  signal cnt_wreq                       : std_logic;
+  signal cnt_wack                       : std_logic;
+  signal ext_re                         : std_logic;
+  signal ext_we                         : std_logic;
+  signal ext_wt                         : std_logic;
+  signal ext_rt                         : std_logic;
+  signal ext_tr                         : std_logic;
+  signal ext_wack                       : std_logic;
+  signal ext_rack                       : std_logic;
+  signal rd_ack_d0                      : std_logic;
+  signal rd_dat_d0                      : std_logic_vector(31 downto 0);
+  signal wr_req_d0                      : std_logic;
+  signal wr_adr_d0                      : std_logic_vector(8 downto 2);
+  signal wr_dat_d0                      : std_logic_vector(31 downto 0);
+  signal wr_sel_d0                      : std_logic_vector(31 downto 0);
+  signal wr_req_dec_0                   : std_logic;
+  signal wr_ack_dec_0                   : std_logic;
+  signal wr_req_dec_1                   : std_logic;
+  signal wr_ack_dec_1                   : std_logic;
+  signal rd_req_dec_0                   : std_logic;
+  signal rd_ack_dec_0                   : std_logic;
+  signal rd_ack_dec_0_d                 : std_logic;
+  signal rd_dat_dec_0                   : std_logic_vector(31 downto 0);
+  signal rd_dat_dec_0_d                 : std_logic_vector(31 downto 0);
+  signal rd_req_dec_1                   : std_logic;
+  signal rd_ack_dec_1                   : std_logic;
+  signal rd_ack_dec_1_d                 : std_logic;
+  signal rd_dat_dec_1                   : std_logic_vector(31 downto 0);
+  signal rd_dat_dec_1_d                 : std_logic_vector(31 downto 0);
+begin
+
+  -- WB decode signals
+  process (wb_sel_i) begin
+    wr_sel(7 downto 0) <= (others => wb_sel_i(0));
+    wr_sel(15 downto 8) <= (others => wb_sel_i(1));
+    wr_sel(23 downto 16) <= (others => wb_sel_i(2));
+    wr_sel(31 downto 24) <= (others => wb_sel_i(3));
+  end process;
+  wb_en <= wb_cyc_i and wb_stb_i;
+
+  process (clk_i) begin
+    if rising_edge(clk_i) then
+      if rst_n_i = '0' then
+        wb_rip <= '0';
+      else
+        wb_rip <= (wb_rip or (wb_en and not wb_we_i)) and not rd_ack_int;
+      end if;
+    end if;
+  end process;
+  rd_req_int <= (wb_en and not wb_we_i) and not wb_rip;
+
+  process (clk_i) begin
+    if rising_edge(clk_i) then
+      if rst_n_i = '0' then
+        wb_wip <= '0';
+      else
+        wb_wip <= (wb_wip or (wb_en and wb_we_i)) and not wr_ack_int;
+      end if;
+    end if;
+  end process;
+  wr_req_int <= (wb_en and wb_we_i) and not wb_wip;
+
+  ack_int <= rd_ack_int or wr_ack_int;
+  wb_ack_o <= ack_int;
+  wb_stall_o <= not ack_int and wb_en;
+  wb_rty_o <= '0';
+  wb_err_o <= '0';
+
+  -- pipelining for wr-in+rd-out
+  process (clk_i) begin
+    if rising_edge(clk_i) then
+      if rst_n_i = '0' then
+        rd_ack_int <= '0';
+        wb_dat_o <= "00000000000000000000000000000000";
+        wr_req_d0 <= '0';
+        wr_adr_d0 <= "0000000";
+        wr_dat_d0 <= "00000000000000000000000000000000";
+        wr_sel_d0 <= "00000000000000000000000000000000";
+      else
+        rd_ack_int <= rd_ack_d0;
+        wb_dat_o <= rd_dat_d0;
+        wr_req_d0 <= wr_req_int;
+        wr_adr_d0 <= wb_adr_i;
+        wr_dat_d0 <= wb_dat_i;
+        wr_sel_d0 <= wr_sel;
+      end if;
+    end if;
+  end process;
+
+  -- Register ctrl
+  ctrl_o <= ctrl_reg;
+  ctrl_wack <= ctrl_wreq;
+  process (clk_i) begin
+    if rising_edge(clk_i) then
+      if rst_n_i = '0' then
+        ctrl_reg <= "00000000000000000000000000000000";
+      else
+        if ctrl_wreq = '1' then
+          ctrl_reg <= wr_dat_d0;
+        end if;
+      end if;
+    end if;
+  end process;
+
+  -- Register status
+
+  -- Register cnt
+  cnt_o <= cnt_reg;
+  cnt_wack <= cnt_wreq;
+  process (clk_i) begin
+    if rising_edge(clk_i) then
+      if rst_n_i = '0' then
+        cnt_reg <= "00000000000000000000000000000000";
+      else
+        if cnt_wreq = '1' then
+          cnt_reg <= wr_dat_d0;
+        end if;
+      end if;
+    end if;
+  end process;
+
+  -- Interface ext
+  ext_tr <= ext_wt or ext_rt;
+  process (clk_i) begin
+    if rising_edge(clk_i) then
+      if rst_n_i = '0' then
+        ext_rt <= '0';
+        ext_wt <= '0';
+      else
+        ext_rt <= (ext_rt or ext_re) and not ext_rack;
+        ext_wt <= (ext_wt or ext_we) and not ext_wack;
+      end if;
+    end if;
+  end process;
+  ext_cyc_o <= ext_tr;
+  ext_stb_o <= ext_tr;
+  ext_wack <= ext_ack_i and ext_wt;
+  ext_rack <= ext_ack_i and ext_rt;
+  ext_adr_o <= wb_adr_i(7 downto 2);
+  process (wr_sel_d0) begin
+    ext_sel_o <= (others => '0');
+    if not (wr_sel_d0(7 downto 0) = (7 downto 0 => '0')) then
+      ext_sel_o(0) <= '1';
+    end if;
+    if not (wr_sel_d0(15 downto 8) = (7 downto 0 => '0')) then
+      ext_sel_o(1) <= '1';
+    end if;
+    if not (wr_sel_d0(23 downto 16) = (7 downto 0 => '0')) then
+      ext_sel_o(2) <= '1';
+    end if;
+    if not (wr_sel_d0(31 downto 24) = (7 downto 0 => '0')) then
+      ext_sel_o(3) <= '1';
+    end if;
+  end process;
+  ext_we_o <= ext_wt;
+  ext_dat_o <= wr_dat_d0;
+
+  -- Write decoder stage for address bits 8-8.
+  process (clk_i) begin
+    if rising_edge(clk_i) then
+      if rst_n_i = '0' then
+        wr_req_dec_0 <= '0';
+        wr_req_dec_1 <= '0';
+      else
+        wr_req_dec_0 <= '0';
+        wr_req_dec_1 <= '0';
+        case wr_adr_d0(8 downto 8) is
+        when "0" =>
+          wr_req_dec_0 <= wr_req_d0;
+        when "1" =>
+          wr_req_dec_1 <= wr_req_d0;
+        when others =>
+        end case;
+      end if;
+    end if;
+  end process;
+  process (wr_adr_d0, wr_ack_dec_0, wr_ack_dec_1) begin
+    case wr_adr_d0(8 downto 8) is
+    when "0" =>
+      wr_ack_int <= wr_ack_dec_0;
+    when "1" =>
+      wr_ack_int <= wr_ack_dec_1;
+    when others =>
+      wr_ack_int <= '0';
+    end case;
+  end process;
+
+  -- Process for write requests.
+  process (wr_adr_d0, wr_req_dec_0, ctrl_wack, cnt_wack) begin
+    ctrl_wreq <= '0';
+    cnt_wreq <= '0';
+    case wr_adr_d0(7 downto 2) is
+    when "000000" =>
+      -- Reg ctrl
+      ctrl_wreq <= wr_req_dec_0;
+      wr_ack_dec_0 <= ctrl_wack;
+    when "000001" =>
+      -- Reg status
+      wr_ack_dec_0 <= wr_req_dec_0;
+    when "000010" =>
+      -- Reg cnt
+      cnt_wreq <= wr_req_dec_0;
+      wr_ack_dec_0 <= cnt_wack;
+    when others =>
+      wr_ack_dec_0 <= wr_req_dec_0;
+    end case;
+  end process;
+
+  -- Process for write requests.
+  process (wr_req_dec_1, ext_wack) begin
+    ext_we <= '0';
+    -- Submap ext
+    ext_we <= wr_req_dec_1;
+    wr_ack_dec_1 <= ext_wack;
+  end process;
+
+  -- Read decoder stage for address bits 8-8.
+  process (wb_adr_i, rd_req_int) begin
+    rd_req_dec_0 <= '0';
+    rd_req_dec_1 <= '0';
+    case wb_adr_i(8 downto 8) is
+    when "0" =>
+      rd_req_dec_0 <= rd_req_int;
+    when "1" =>
+      rd_req_dec_1 <= rd_req_int;
+    when others =>
+    end case;
+  end process;
+  process (clk_i) begin
+    if rising_edge(clk_i) then
+      if rst_n_i = '0' then
+        rd_ack_dec_0_d <= '0';
+        rd_dat_dec_0_d <= "00000000000000000000000000000000";
+        rd_ack_dec_1_d <= '0';
+        rd_dat_dec_1_d <= "00000000000000000000000000000000";
+      else
+        rd_ack_dec_0_d <= rd_ack_dec_0;
+        rd_dat_dec_0_d <= rd_dat_dec_0;
+        rd_ack_dec_1_d <= rd_ack_dec_1;
+        rd_dat_dec_1_d <= rd_dat_dec_1;
+      end if;
+    end if;
+  end process;
+  process (wb_adr_i, rd_ack_dec_0_d, rd_dat_dec_0_d, rd_ack_dec_1_d,
+           rd_dat_dec_1_d) begin
+    case wb_adr_i(8 downto 8) is
+    when "0" =>
+      rd_ack_d0 <= rd_ack_dec_0_d;
+      rd_dat_d0 <= rd_dat_dec_0_d;
+    when "1" =>
+      rd_ack_d0 <= rd_ack_dec_1_d;
+      rd_dat_d0 <= rd_dat_dec_1_d;
+    when others =>
+      rd_ack_d0 <= '0';
+      rd_dat_d0 <= (others => 'X');
+    end case;
+  end process;
+
+  -- Process for read requests.
+  process (wb_adr_i, rd_req_dec_0, ctrl_reg, status_i, cnt_reg) begin
+    -- By default ack read requests
+    rd_dat_dec_0 <= (others => 'X');
+    status_rd_o <= '0';
+    case wb_adr_i(7 downto 2) is
+    when "000000" =>
+      -- Reg ctrl
+      rd_ack_dec_0 <= rd_req_dec_0;
+      rd_dat_dec_0 <= ctrl_reg;
+    when "000001" =>
+      -- Reg status
+      status_rd_o <= rd_req_dec_0;
+      rd_ack_dec_0 <= rd_req_dec_0;
+      rd_dat_dec_0 <= status_i;
+    when "000010" =>
+      -- Reg cnt
+      rd_ack_dec_0 <= rd_req_dec_0;
+      rd_dat_dec_0 <= cnt_reg;
+    when others =>
+      rd_ack_dec_0 <= rd_req_dec_0;
+    end case;
+  end process;
+
+  -- Process for read requests.
+  process (rd_req_dec_1, ext_dat_i, ext_rack) begin
+    -- By default ack read requests
+    rd_dat_dec_1 <= (others => 'X');
+    ext_re <= '0';
+    -- Submap ext
+    ext_re <= rd_req_dec_1;
+    rd_dat_dec_1 <= ext_dat_i;
+    rd_ack_dec_1 <= ext_rack;
+  end process;
+end syn;
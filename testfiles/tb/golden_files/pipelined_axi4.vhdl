@@ -0,0 +1,409 @@
+library ieee;
+use ieee.std_logic_1164.all;
+use ieee.numeric_std.all;
+use work.cheby_pkg.all;
+
+entity pipelined_axi4 is
+  port (
+    aclk                 : in    std_logic;
+    areset_n             : in    std_logic;
+    awvalid              : in    std_logic;
+    awready              : out   std_logic;
+    awaddr               : in    std_logic_vector(6 downto 2);
+    awprot               : in    std_logic_vector(2 downto 0);
+    wvalid               : in    std_logic;
+    wready               : out   std_logic;
+    wdata                : in    std_logic_vector(31 downto 0);
+    wstrb                : in    std_logic_vector(3 downto 0);
+    bvalid               : out   std_logic;
+    bready               : in    std_logic;
+    bresp                : out   std_logic_vector(1 downto 0);
+    arvalid              : in    std_logic;
+    arready              : out   std_logic;
+    araddr               : in    std_logic_vector(6 downto 2);
+    arprot               : in    std_logic_vector(2 downto 0);
+    rvalid               : out   std_logic;
+    rready               : in    std_logic;
+    rdata                : out   std_logic_vector(31 downto 0);
+    rresp                : out   std_logic_vector(1 downto 0);
+
+    -- REG rw0
+    rw0_o                : out   std_logic_vector(31 downto 0);
+
+    -- REG rw1
+    rw1_o                : out   std_logic_vector(31 downto 0);
+
+    -- REG ro0
+    ro0_i                : in    std_logic_vector(31 downto 0);
+
+    -- RAM port for mem
+    mem_adr_i            : in    std_logic_vector(3 downto 0);
+    mem_val_rd_i         : in    std_logic;
+    mem_val_dat_o        : out   std_logic_vector(31 downto 0)
+  );
+end pipelined_axi4;
+
+architecture syn of pipelined_axi4 is
+  signal wr_req                         : std_logic;
+  signal wr_ack                         : std_logic;
+  signal wr_err                         : std_logic;
+  signal wr_addr                        : std_logic_vector(6 downto 2);
+  signal wr_data                        : std_logic_vector(31 downto 0);
+  signal wr_sel                         : std_logic_vector(31 downto 0);
+  signal axi_awskid                     : std_logic;
+  signal axi_awaddr                     : std_logic_vector(6 downto 2);
+  signal axi_wskid                      : std_logic;
+  signal axi_wdata                      : std_logic_vector(31 downto 0);
+  signal axi_wstrb                      : std_logic_vector(3 downto 0);
+  signal axi_wip                        : std_logic;
+  signal axi_wstart                     : std_logic;
+  signal axi_wdone                      : std_logic;
+  signal axi_bskid                      : std_logic;
+  signal axi_werr                       : std_logic_vector(1 downto 0);
+  signal axi_bskid_err                  : std_logic_vector(1 downto 0);
+  signal rd_req                         : std_logic;
+  signal rd_ack                         : std_logic;
+  signal rd_err                         : std_logic;
+  signal rd_addr                        : std_logic_vector(6 downto 2);
+  signal rd_data                        : std_logic_vector(31 downto 0);
+  signal axi_arskid                     : std_logic;
+  signal axi_araddr                     : std_logic_vector(6 downto 2);
+  signal axi_rip                        : std_logic;
+  signal axi_rstart                     : std_logic;
+  signal axi_rdone                      : std_logic;
+  signal axi_rskid                      : std_logic;
+  signal axi_rskid_data                 : std_logic_vector(31 downto 0);
+  signal axi_rerr                       : std_logic_vector(1 downto 0);
+  signal axi_rskid_err                  : std_logic_vector(1 downto 0);
+  signal rw0_reg                        : std_logic_vector(31 downto 0);
+  signal rw0_wreq                       : std_logic;
+  signal rw0_wack                       : std_logic;
+  signal rw1_reg                        : std_logic_vector(31 downto 0);
+  signal rw1_wreq                       : std_logic;
+  signal rw1_wack                       : std_logic;
+  signal mem_val_int_dato               : std_logic_vector(31 downto 0);
+  signal mem_val_ext_dat                : std_logic_vector(31 downto 0);
+  signal mem_val_rreq                   : std_logic;
+  signal mem_val_rack                   : std_logic;
+  signal mem_val_int_wr                 : std_logic;
+  signal mem_val_rp                     : std_logic;
+  signal mem_wr                         : std_logic;
+  signal mem_wreq                       : std_logic;
+  signal mem_adr_int                    : std_logic_vector(3 downto 0);
+  signal mem_sel_int                    : std_logic_vector(3 downto 0);
+begin
+
+  -- AW, W and B channels (pipelined)
+  awready <= not axi_awskid;
+  wready <= not axi_wskid;
+  bvalid <= axi_wdone;
+  axi_wstart <= (((not axi_wip or wr_ack) and (axi_awskid or awvalid)) and (axi_wskid or wvalid)) and (not axi_bskid and (not (axi_wdone and wr_ack) or bready));
+  process (aclk) begin
+    if rising_edge(aclk) then
+      if areset_n = '0' then
+        wr_req <= '0';
+        axi_awskid <= '0';
+        axi_wskid <= '0';
+        axi_wip <= '0';
+        axi_wdone <= '0';
+        axi_werr <= "00";
+        axi_bskid <= '0';
+      else
+        wr_req <= '0';
+        if (axi_wdone and bready) = '1' then
+          axi_wdone <= axi_bskid;
+          axi_werr <= axi_bskid_err;
+          axi_bskid <= '0';
+        end if;
+        if wr_ack = '1' then
+          if axi_wdone = '0' or (bready and not axi_bskid) = '1' then
+            axi_wdone <= '1';
+            if wr_err = '0' then
+              axi_werr <= "00";
+            else
+              axi_werr <= "10";
+            end if;
+          else
+            axi_bskid <= '1';
+            if wr_err = '0' then
+              axi_bskid_err <= "00";
+            else
+              axi_bskid_err <= "10";
+            end if;
+          end if;
+        end if;
+        if wr_ack = '1' then
+          axi_wip <= '0';
+        end if;
+        if axi_wstart = '1' then
+          wr_req <= '1';
+          axi_wip <= '1';
+          if axi_awskid = '1' then
+            wr_addr <= axi_awaddr;
+            axi_awskid <= '0';
+          else
+            wr_addr <= awaddr;
+          end if;
+          if axi_wskid = '1' then
+            wr_data <= axi_wdata;
+            wr_sel(7 downto 0) <= (others => axi_wstrb(0));
+            wr_sel(15 downto 8) <= (others => axi_wstrb(1));
+            wr_sel(23 downto 16) <= (others => axi_wstrb(2));
+            wr_sel(31 downto 24) <= (others => axi_wstrb(3));
+            axi_wskid <= '0';
+          else
+            wr_data <= wdata;
+            wr_sel(7 downto 0) <= (others => wstrb(0));
+            wr_sel(15 downto 8) <= (others => wstrb(1));
+            wr_sel(23 downto 16) <= (others => wstrb(2));
+            wr_sel(31 downto 24) <= (others => wstrb(3));
+          end if;
+        else
+          if awvalid = '1' and axi_awskid = '0' then
+            axi_awaddr <= awaddr;
+            axi_awskid <= '1';
+          end if;
+          if wvalid = '1' and axi_wskid = '0' then
+            axi_wdata <= wdata;
+            axi_wstrb <= wstrb;
+            axi_wskid <= '1';
+          end if;
+        end if;
+      end if;
+    end if;
+  end process;
+  bresp <= axi_werr;
+
+  -- AR and R channels (pipelined)
+  arready <= not axi_arskid;
+  rvalid <= axi_rdone;
+  axi_rstart <= ((not axi_rip or rd_ack) and (axi_arskid or arvalid)) and (not axi_rskid and (not (axi_rdone and rd_ack) or rready));
+  process (aclk) begin
+    if rising_edge(aclk) then
+      if areset_n = '0' then
+        rd_req <= '0';
+        axi_arskid <= '0';
+        axi_rip <= '0';
+        rdata <= (others => '0');
+        axi_rdone <= '0';
+        axi_rerr <= "00";
+        axi_rskid <= '0';
+      else
+        rd_req <= '0';
+        if (axi_rdone and rready) = '1' then
+          axi_rdone <= axi_rskid;
+          axi_rerr <= axi_rskid_err;
+          rdata <= axi_rskid_data;
+          axi_rskid <= '0';
+        end if;
+        if rd_ack = '1' then
+          if axi_rdone = '0' or (rready and not axi_rskid) = '1' then
+            axi_rdone <= '1';
+            if rd_err = '0' then
+              axi_rerr <= "00";
+            else
+              axi_rerr <= "10";
+            end if;
+            rdata <= rd_data;
+          else
+            axi_rskid <= '1';
+            if rd_err = '0' then
+              axi_rskid_err <= "00";
+            else
+              axi_rskid_err <= "10";
+            end if;
+            axi_rskid_data <= rd_data;
+          end if;
+        end if;
+        if rd_ack = '1' then
+          axi_rip <= '0';
+        end if;
+        if axi_rstart = '1' then
+          rd_req <= '1';
+          axi_rip <= '1';
+          if axi_arskid = '1' then
+            rd_addr <= axi_araddr;
+            axi_arskid <= '0';
+          else
+            rd_addr <= araddr;
+          end if;
+        elsif arvalid = '1' and axi_arskid = '0' then
+          axi_araddr <= araddr;
+          axi_arskid <= '1';
+        end if;
+      end if;
+    end if;
+  end process;
+  rresp <= axi_rerr;
+
+  -- Register rw0
+  rw0_o <= rw0_reg;
+  rw0_wack <= rw0_wreq;
+  process (aclk) begin
+    if rising_edge(aclk) then
+      if areset_n = '0' then
+        rw0_reg <= "00010010001101000101011001111000";
+      else
+        if rw0_wreq = '1' then
+          rw0_reg <= wr_data;
+        end if;
+      end if;
+    end if;
+  end process;
+
+  -- Register rw1
+  rw1_o <= rw1_reg;
+  rw1_wack <= rw1_wreq;
+  process (aclk) begin
+    if rising_edge(aclk) then
+      if areset_n = '0' then
+        rw1_reg <= "00100011010001010110011110001001";
+      else
+        if rw1_wreq = '1' then
+          rw1_reg <= wr_data;
+        end if;
+      end if;
+    end if;
+  end process;
+
+  -- Register ro0
+
+  -- Memory mem
+  process (rd_addr, wr_addr, mem_wr) begin
+    if mem_wr = '1' then
+      mem_adr_int <= wr_addr(5 downto 2);
+    else
+      mem_adr_int <= rd_addr(5 downto 2);
+    end if;
+  end process;
+  mem_wreq <= mem_val_int_wr;
+  mem_wr <= mem_wreq;
+  mem_val_raminst: cheby_dpssram
+    generic map (
+      g_data_width         => 32,
+      g_size               => 16,
+      g_addr_width         => 4,
+      g_dual_clock         => '0',
+      g_use_bwsel          => '1'
+    )
+    port map (
+      clk_a_i              => aclk,
+      clk_b_i              => aclk,
+      addr_a_i             => mem_adr_int,
+      bwsel_a_i            => mem_sel_int,
+      data_a_i             => wr_data,
+      data_a_o             => mem_val_int_dato,
+      rd_a_i               => mem_val_rreq,
+      wr_a_i               => mem_val_int_wr,
+      addr_b_i             => mem_adr_i,
+      bwsel_b_i            => (others => '1'),
+      data_b_i             => mem_val_ext_dat,
+      data_b_o             => mem_val_dat_o,
+      rd_b_i               => mem_val_rd_i,
+      wr_b_i               => '0'
+    );
+  
+  process (wr_sel) begin
+    mem_sel_int <= (others => '0');
+    if not (wr_sel(7 downto 0) = (7 downto 0 => '0')) then
+      mem_sel_int(0) <= '1';
+    end if;
+    if not (wr_sel(15 downto 8) = (7 downto 0 => '0')) then
+      mem_sel_int(1) <= '1';
+    end if;
+    if not (wr_sel(23 downto 16) = (7 downto 0 => '0')) then
+      mem_sel_int(2) <= '1';
+    end if;
+    if not (wr_sel(31 downto 24) = (7 downto 0 => '0')) then
+      mem_sel_int(3) <= '1';
+    end if;
+  end process;
+  process (aclk) begin
+    if rising_edge(aclk) then
+      if areset_n = '0' then
+        mem_val_rack <= '0';
+        mem_val_rp <= '0';
+      else
+        mem_val_rack <= (mem_val_rreq and not mem_wreq) and not mem_val_rack;
+        mem_val_rp <= mem_val_rreq and mem_wreq;
+      end if;
+    end if;
+  end process;
+
+  -- Process for write requests.
+  process (wr_addr, wr_req, rw0_wack, rw1_wack) begin
+    rw0_wreq <= '0';
+    rw1_wreq <= '0';
+    mem_val_int_wr <= '0';
+    case wr_addr(6 downto 6) is
+    when "0" =>
+      case wr_addr(5 downto 2) is
+      when "0000" =>
+        -- Reg rw0
+        rw0_wreq <= wr_req;
+        wr_ack <= rw0_wack;
+        wr_err <= '0';
+      when "0001" =>
+        -- Reg rw1
+        rw1_wreq <= wr_req;
+        wr_ack <= rw1_wack;
+        wr_err <= '0';
+      when "0010" =>
+        -- Reg ro0
+        wr_ack <= wr_req;
+        wr_err <= wr_req;
+      when others =>
+        wr_ack <= wr_req;
+        wr_err <= wr_req;
+      end case;
+    when "1" =>
+      -- Memory mem
+      mem_val_int_wr <= wr_req;
+      wr_ack <= wr_req;
+      wr_err <= '0';
+    when others =>
+      wr_ack <= wr_req;
+      wr_err <= wr_req;
+    end case;
+  end process;
+
+  -- Process for read requests.
+  process (rd_addr, rd_req, rw0_reg, rw1_reg, ro0_i, mem_val_int_dato, mem_val_rp,
+           mem_val_rack) begin
+    -- By default ack read requests
+    rd_data <= (others => 'X');
+    mem_val_rreq <= '0';
+    case rd_addr(6 downto 6) is
+    when "0" =>
+      case rd_addr(5 downto 2) is
+      when "0000" =>
+        -- Reg rw0
+        rd_ack <= rd_req;
+        rd_err <= '0';
+        rd_data <= rw0_reg;
+      when "0001" =>
+        -- Reg rw1
+        rd_ack <= rd_req;
+        rd_err <= '0';
+        rd_data <= rw1_reg;
+      when "0010" =>
+        -- Reg ro0
+        rd_ack <= rd_req;
+        rd_err <= '0';
+        rd_data <= ro0_i;
+      when others =>
+        rd_ack <= rd_req;
+        rd_err <= rd_req;
+      end case;
+    when "1" =>
+      -- Memory mem
+      rd_data <= mem_val_int_dato;
+      mem_val_rreq <= rd_req or mem_val_rp;
+      rd_ack <= mem_val_rack;
+      rd_err <= '0';
+    when others =>
+      rd_ack <= rd_req;
+      rd_err <= rd_req;
+    end case;
+  end process;
+end syn;
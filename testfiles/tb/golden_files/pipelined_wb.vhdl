@@ -0,0 +1,295 @@
+library ieee;
+use ieee.std_logic_1164.all;
+use ieee.numeric_std.all;
+use work.cheby_pkg.all;
+
+entity pipelined_wb is
+  port (
+    rst_n_i              : in    std_logic;
+    clk_i                : in    std_logic;
+    wb_cyc_i             : in    std_logic;
+    wb_stb_i             : in    std_logic;
+    wb_adr_i             : in    std_logic_vector(6 downto 2);
+    wb_sel_i             : in    std_logic_vector(3 downto 0);
+    wb_we_i              : in    std_logic;
+    wb_dat_i             : in    std_logic_vector(31 downto 0);
+    wb_ack_o             : out   std_logic;
+    wb_err_o             : out   std_logic;
+    wb_rty_o             : out   std_logic;
+    wb_stall_o           : out   std_logic;
+    wb_dat_o             : out   std_logic_vector(31 downto 0);
+
+    -- REG rw0
+    rw0_o                : out   std_logic_vector(31 downto 0);
+
+    -- REG rw1
+    rw1_o                : out   std_logic_vector(31 downto 0);
+
+    -- REG ro0
+    ro0_i                : in    std_logic_vector(31 downto 0);
+
+    -- RAM port for mem
+    mem_adr_i            : in    std_logic_vector(3 downto 0);
+    mem_val_rd_i         : in    std_logic;
+    mem_val_dat_o        : out   std_logic_vector(31 downto 0)
+  );
+end pipelined_wb;
+
+architecture syn of pipelined_wb is
+  signal rd_dat_int                     : std_logic_vector(31 downto 0);
+  signal wr_dat_int                     : std_logic_vector(31 downto 0);
+  signal wr_sel                         : std_logic_vector(31 downto 0);
+  signal adr_int                        : std_logic_vector(6 downto 2);
+  signal rd_req_int                     : std_logic;
+  signal wr_req_int                     : std_logic;
+  signal rd_ack_int                     : std_logic;
+  signal rd_err_int                     : std_logic;
+  signal wr_ack_int                     : std_logic;
+  signal wr_err_int                     : std_logic;
+  signal wb_en                          : std_logic;
+  signal ack_int                        : std_logic;
+  signal err_int                        : std_logic;
+  signal wb_skid                        : std_logic;
+  signal wb_skid_adr                    : std_logic_vector(6 downto 2);
+  signal wb_skid_we                     : std_logic;
+  signal wb_skid_dat                    : std_logic_vector(31 downto 0);
+  signal wb_skid_sel                    : std_logic_vector(3 downto 0);
+  signal wb_ip                          : std_logic;
+  signal wb_start                       : std_logic;
+  signal rw0_reg                        : std_logic_vector(31 downto 0);
+  signal rw0_wreq                       : std_logic;
+  signal rw0_wack                       : std_logic;
+  signal rw1_reg                        : std_logic_vector(31 downto 0);
+  signal rw1_wreq                       : std_logic;
+  signal rw1_wack                       : std_logic;
+  signal mem_val_int_dato               : std_logic_vector(31 downto 0);
+  signal mem_val_ext_dat                : std_logic_vector(31 downto 0);
+  signal mem_val_rreq                   : std_logic;
+  signal mem_val_rack                   : std_logic;
+  signal mem_val_int_wr                 : std_logic;
+  signal mem_sel_int                    : std_logic_vector(3 downto 0);
+begin
+
+  -- WB decode signals
+  wb_en <= wb_cyc_i and wb_stb_i;
+  ack_int <= rd_ack_int or wr_ack_int;
+  err_int <= rd_err_int or wr_err_int;
+  wb_start <= (not wb_ip or ack_int) and (wb_skid or wb_en);
+
+  process (clk_i) begin
+    if rising_edge(clk_i) then
+      if rst_n_i = '0' then
+        rd_req_int <= '0';
+        wr_req_int <= '0';
+        wb_skid <= '0';
+        wb_ip <= '0';
+        wb_ack_o <= '0';
+        wb_err_o <= '0';
+        wb_dat_o <= (others => '0');
+      else
+        rd_req_int <= '0';
+        wr_req_int <= '0';
+        wb_ack_o <= ack_int and not err_int;
+        wb_err_o <= ack_int and err_int;
+        if rd_ack_int = '1' then
+          wb_dat_o <= rd_dat_int;
+        end if;
+        if ack_int = '1' then
+          wb_ip <= '0';
+        end if;
+        if wb_start = '1' then
+          wb_ip <= '1';
+          if wb_skid = '1' then
+            rd_req_int <= not wb_skid_we;
+            wr_req_int <= wb_skid_we;
+            adr_int <= wb_skid_adr;
+            wr_dat_int <= wb_skid_dat;
+            wr_sel(7 downto 0) <= (others => wb_skid_sel(0));
+            wr_sel(15 downto 8) <= (others => wb_skid_sel(1));
+            wr_sel(23 downto 16) <= (others => wb_skid_sel(2));
+            wr_sel(31 downto 24) <= (others => wb_skid_sel(3));
+            wb_skid <= '0';
+          else
+            rd_req_int <= not wb_we_i;
+            wr_req_int <= wb_we_i;
+            adr_int <= wb_adr_i;
+            wr_dat_int <= wb_dat_i;
+            wr_sel(7 downto 0) <= (others => wb_sel_i(0));
+            wr_sel(15 downto 8) <= (others => wb_sel_i(1));
+            wr_sel(23 downto 16) <= (others => wb_sel_i(2));
+            wr_sel(31 downto 24) <= (others => wb_sel_i(3));
+          end if;
+        elsif wb_en = '1' and wb_skid = '0' then
+          wb_skid_adr <= wb_adr_i;
+          wb_skid_we <= wb_we_i;
+          wb_skid_dat <= wb_dat_i;
+          wb_skid_sel <= wb_sel_i;
+          wb_skid <= '1';
+        end if;
+      end if;
+    end if;
+  end process;
+
+  wb_stall_o <= wb_skid;
+  wb_rty_o <= '0';
+
+  -- Register rw0
+  rw0_o <= rw0_reg;
+  rw0_wack <= rw0_wreq;
+  process (clk_i) begin
+    if rising_edge(clk_i) then
+      if rst_n_i = '0' then
+        rw0_reg <= "00010010001101000101011001111000";
+      else
+        if rw0_wreq = '1' then
+          rw0_reg <= wr_dat_int;
+        end if;
+      end if;
+    end if;
+  end process;
+
+  -- Register rw1
+  rw1_o <= rw1_reg;
+  rw1_wack <= rw1_wreq;
+  process (clk_i) begin
+    if rising_edge(clk_i) then
+      if rst_n_i = '0' then
+        rw1_reg <= "00100011010001010110011110001001";
+      else
+        if rw1_wreq = '1' then
+          rw1_reg <= wr_dat_int;
+        end if;
+      end if;
+    end if;
+  end process;
+
+  -- Register ro0
+
+  -- Memory mem
+  mem_val_raminst: cheby_dpssram
+    generic map (
+      g_data_width         => 32,
+      g_size               => 16,
+      g_addr_width         => 4,
+      g_dual_clock         => '0',
+      g_use_bwsel          => '1'
+    )
+    port map (
+      clk_a_i              => clk_i,
+      clk_b_i              => clk_i,
+      addr_a_i             => adr_int(5 downto 2),
+      bwsel_a_i            => mem_sel_int,
+      data_a_i             => wr_dat_int,
+      data_a_o             => mem_val_int_dato,
+      rd_a_i               => mem_val_rreq,
+      wr_a_i               => mem_val_int_wr,
+      addr_b_i             => mem_adr_i,
+      bwsel_b_i            => (others => '1'),
+      data_b_i             => mem_val_ext_dat,
+      data_b_o             => mem_val_dat_o,
+      rd_b_i               => mem_val_rd_i,
+      wr_b_i               => '0'
+    );
+  
+  process (wr_sel) begin
+    mem_sel_int <= (others => '0');
+    if not (wr_sel(7 downto 0) = (7 downto 0 => '0')) then
+      mem_sel_int(0) <= '1';
+    end if;
+    if not (wr_sel(15 downto 8) = (7 downto 0 => '0')) then
+      mem_sel_int(1) <= '1';
+    end if;
+    if not (wr_sel(23 downto 16) = (7 downto 0 => '0')) then
+      mem_sel_int(2) <= '1';
+    end if;
+    if not (wr_sel(31 downto 24) = (7 downto 0 => '0')) then
+      mem_sel_int(3) <= '1';
+    end if;
+  end process;
+  process (clk_i) begin
+    if rising_edge(clk_i) then
+      if rst_n_i = '0' then
+        mem_val_rack <= '0';
+      else
+        mem_val_rack <= mem_val_rreq;
+      end if;
+    end if;
+  end process;
+
+  -- Process for write requests.
+  process (adr_int, wr_req_int, rw0_wack, rw1_wack) begin
+    rw0_wreq <= '0';
+    rw1_wreq <= '0';
+    mem_val_int_wr <= '0';
+    case adr_int(6 downto 6) is
+    when "0" =>
+      case adr_int(5 downto 2) is
+      when "0000" =>
+        -- Reg rw0
+        rw0_wreq <= wr_req_int;
+        wr_ack_int <= rw0_wack;
+        wr_err_int <= '0';
+      when "0001" =>
+        -- Reg rw1
+        rw1_wreq <= wr_req_int;
+        wr_ack_int <= rw1_wack;
+        wr_err_int <= '0';
+      when "0010" =>
+        -- Reg ro0
+        wr_ack_int <= wr_req_int;
+        wr_err_int <= wr_req_int;
+      when others =>
+        wr_ack_int <= wr_req_int;
+        wr_err_int <= wr_req_int;
+      end case;
+    when "1" =>
+      -- Memory mem
+      mem_val_int_wr <= wr_req_int;
+      wr_ack_int <= wr_req_int;
+      wr_err_int <= '0';
+    when others =>
+      wr_ack_int <= wr_req_int;
+      wr_err_int <= wr_req_int;
+    end case;
+  end process;
+
+  -- Process for read requests.
+  process (adr_int, rd_req_int, rw0_reg, rw1_reg, ro0_i, mem_val_int_dato,
+           mem_val_rack) begin
+    -- By default ack read requests
+    rd_dat_int <= (others => 'X');
+    mem_val_rreq <= '0';
+    case adr_int(6 downto 6) is
+    when "0" =>
+      case adr_int(5 downto 2) is
+      when "0000" =>
+        -- Reg rw0
+        rd_ack_int <= rd_req_int;
+        rd_err_int <= '0';
+        rd_dat_int <= rw0_reg;
+      when "0001" =>
+        -- Reg rw1
+        rd_ack_int <= rd_req_int;
+        rd_err_int <= '0';
+        rd_dat_int <= rw1_reg;
+      when "0010" =>
+        -- Reg ro0
+        rd_ack_int <= rd_req_int;
+        rd_err_int <= '0';
+        rd_dat_int <= ro0_i;
+      when others =>
+        rd_ack_int <= rd_req_int;
+        rd_err_int <= rd_req_int;
+      end case;
+    when "1" =>
+      -- Memory mem
+      rd_dat_int <= mem_val_int_dato;
+      mem_val_rreq <= rd_req_int;
+      rd_ack_int <= mem_val_rack;
+      rd_err_int <= '0';
+    when others =>
+      rd_ack_int <= rd_req_int;
+      rd_err_int <= rd_req_int;
+    end case;
+  end process;
+end syn;
@@ -0,0 +1,262 @@
+entity pipelined_axi4_tb is
+end pipelined_axi4_tb;
+
+library ieee;
+use ieee.std_logic_1164.all;
+use ieee.numeric_std.all;
+
+use work.axi4_tb_pkg.all;
+
+architecture behav of pipelined_axi4_tb is
+  signal rst_n   : std_logic;
+  signal clk     : std_logic;
+  signal wr_in   : t_axi4lite_write_master_in;
+  signal wr_out  : t_axi4lite_write_master_out;
+  signal rd_in   : t_axi4lite_read_master_in;
+  signal rd_out  : t_axi4lite_read_master_out;
+
+  signal reg_rw0 : std_logic_vector(31 downto 0);
+  signal reg_rw1 : std_logic_vector(31 downto 0);
+  signal reg_ro0 : std_logic_vector(31 downto 0);
+
+  type t_word_array is array (natural range <>) of std_logic_vector(31 downto 0);
+  type t_resp_array is array (natural range <>) of std_logic_vector(1 downto 0);
+
+  signal end_of_test : boolean := False;
+begin
+  --  Clock and reset
+  process
+  begin
+    clk <= '0';
+    wait for 5 ns;
+    clk <= '1';
+    wait for 5 ns;
+
+    if end_of_test then
+      wait;
+    end if;
+  end process;
+
+  rst_n <= '0' after 0 ns, '1' after 20 ns;
+
+  dut : entity work.pipelined_axi4
+    port map (
+      aclk     => clk,
+      areset_n => rst_n,
+      awvalid  => wr_out.awvalid,
+      awready  => wr_in.awready,
+      awaddr   => wr_out.awaddr(6 downto 2),
+      awprot   => "010",
+      wvalid   => wr_out.wvalid,
+      wready   => wr_in.wready,
+      wdata    => wr_out.wdata,
+      wstrb    => "1111",
+      bvalid   => wr_in.bvalid,
+      bready   => wr_out.bready,
+      bresp    => wr_in.bresp,
+      arvalid  => rd_out.arvalid,
+      arready  => rd_in.arready,
+      araddr   => rd_out.araddr(6 downto 2),
+      arprot   => "010",
+      rvalid   => rd_in.rvalid,
+      rready   => rd_out.rready,
+      rdata    => rd_in.rdata,
+      rresp    => rd_in.rresp,
+
+      rw0_o    => reg_rw0,
+      rw1_o    => reg_rw1,
+      ro0_i    => reg_ro0,
+
+      mem_adr_i     => (others => '0'),
+      mem_val_rd_i  => '0',
+      mem_val_dat_o => open
+    );
+
+  reg_ro0 <= x"4567_89ab";
+
+  main : process is
+    variable wa, wd, ra, rd : t_word_array(0 to 15);
+    variable wr, rr         : t_resp_array(0 to 15);
+    variable cycles         : natural;
+
+    --  Issue the writes (waddr, wdata) and the reads (raddr) back-to-back:
+    --  a new request is presented on each channel at every cycle.  The
+    --  responses are checked in order against wresp, rresp and rdata.
+    --  With stall, bready and rready are sometimes deasserted.  The AW
+    --  channel starts skew cycles after the W channel.  Return in cycles
+    --  the number of cycles until the last response.
+    procedure run (waddr, wdata : t_word_array; wresp : t_resp_array;
+                   raddr, rdata : t_word_array; rresp : t_resp_array;
+                   stall : boolean; skew : natural; cycles : out natural) is
+      variable aw, w, b, ar, r, n : natural := 0;
+    begin
+      loop
+        --  Requests.
+        if aw < waddr'length and n >= skew then
+          wr_out.awvalid <= '1';
+          wr_out.awaddr <= waddr(waddr'low + aw);
+        else
+          wr_out.awvalid <= '0';
+        end if;
+        if w < wdata'length then
+          wr_out.wvalid <= '1';
+          wr_out.wdata <= wdata(wdata'low + w);
+        else
+          wr_out.wvalid <= '0';
+        end if;
+        if ar < raddr'length then
+          rd_out.arvalid <= '1';
+          rd_out.araddr <= raddr(raddr'low + ar);
+        else
+          rd_out.arvalid <= '0';
+        end if;
+
+        --  Back-pressure on the responses.
+        if stall and n mod 3 = 2 then
+          wr_out.bready <= '0';
+        else
+          wr_out.bready <= '1';
+        end if;
+        if stall and n mod 4 = 1 then
+          rd_out.rready <= '0';
+        else
+          rd_out.rready <= '1';
+        end if;
+
+        wait until rising_edge(clk);
+
+        --  Handshakes.
+        if wr_out.awvalid = '1' and wr_in.awready = '1' then
+          aw := aw + 1;
+        end if;
+        if wr_out.wvalid = '1' and wr_in.wready = '1' then
+          w := w + 1;
+        end if;
+        if rd_out.arvalid = '1' and rd_in.arready = '1' then
+          ar := ar + 1;
+        end if;
+        if wr_in.bvalid = '1' and wr_out.bready = '1' then
+          if b >= wresp'length then
+            report "unexpected write response" severity error;
+          else
+            assert wr_in.bresp = wresp(wresp'low + b)
+              report "bad write response " & natural'image(b) severity error;
+          end if;
+          b := b + 1;
+        end if;
+        if rd_in.rvalid = '1' and rd_out.rready = '1' then
+          if r >= rresp'length then
+            report "unexpected read response" severity error;
+          else
+            assert rd_in.rresp = rresp(rresp'low + r)
+              report "bad read response " & natural'image(r) severity error;
+            assert rd_in.rresp /= C_AXI4_RESP_OK or rd_in.rdata = rdata(rdata'low + r)
+              report "bad read data " & natural'image(r) severity error;
+          end if;
+          r := r + 1;
+        end if;
+
+        n := n + 1;
+        exit when b = wresp'length and r = rresp'length;
+        assert n < 200 report "responses missing" severity failure;
+      end loop;
+      cycles := n;
+
+      --  No more responses.
+      wr_out.awvalid <= '0';
+      wr_out.wvalid <= '0';
+      rd_out.arvalid <= '0';
+      wr_out.bready <= '1';
+      rd_out.rready <= '1';
+      for i in 1 to 4 loop
+        wait until rising_edge(clk);
+        assert wr_in.bvalid = '0' and rd_in.rvalid = '0'
+          report "duplicated response" severity error;
+      end loop;
+    end run;
+  begin
+    axi4lite_wr_init(wr_out);
+    axi4lite_rd_init(rd_out);
+
+    --  Wait after reset.
+    wait until rising_edge(clk) and rst_n = '1';
+
+    --  Registers, without back-pressure: one access per cycle (after
+    --  two cycles of latency).  ro0 and the hole at 0xc are errors.
+    report "Testing back-to-back register writes" severity note;
+    for i in 0 to 7 loop
+      wa(i) := std_logic_vector(to_unsigned((i mod 4) * 4, 32));
+      wd(i) := std_logic_vector(to_unsigned(16#1000_0000# + i, 32));
+      if i mod 4 >= 2 then
+        wr(i) := C_AXI4_RESP_SLVERR;
+      else
+        wr(i) := C_AXI4_RESP_OK;
+      end if;
+    end loop;
+    run(wa(0 to 7), wd(0 to 7), wr(0 to 7),
+        ra(0 to -1), rd(0 to -1), rr(0 to -1), False, 0, cycles);
+    assert cycles <= 8 + 2 report "writes: not one access per cycle" severity error;
+    assert reg_rw0 = x"1000_0004" severity error;
+    assert reg_rw1 = x"1000_0005" severity error;
+
+    report "Testing back-to-back register reads" severity note;
+    for i in 0 to 7 loop
+      ra(i) := std_logic_vector(to_unsigned((i mod 4) * 4, 32));
+      rr(i) := C_AXI4_RESP_OK;
+      case i mod 4 is
+        when 0 => rd(i) := x"1000_0004";
+        when 1 => rd(i) := x"1000_0005";
+        when 2 => rd(i) := x"4567_89ab";
+        when others => rr(i) := C_AXI4_RESP_SLVERR;
+      end case;
+    end loop;
+    run(wa(0 to -1), wd(0 to -1), wr(0 to -1),
+        ra(0 to 7), rd(0 to 7), rr(0 to 7), False, 0, cycles);
+    assert cycles <= 8 + 2 report "reads: not one access per cycle" severity error;
+
+    --  Memory writes with back-pressure, W before AW (the skid buffers
+    --  are used).
+    report "Testing memory writes with back-pressure" severity note;
+    for i in 0 to 15 loop
+      wa(i) := std_logic_vector(to_unsigned(16#40# + i * 4, 32));
+      wd(i) := std_logic_vector(unsigned'(x"cafe_0000") + i * 3);
+      wr(i) := C_AXI4_RESP_OK;
+    end loop;
+    run(wa, wd, wr, ra(0 to -1), rd(0 to -1), rr(0 to -1), True, 3, cycles);
+
+    --  Memory reads with back-pressure and register writes at the same
+    --  time.
+    report "Testing memory reads and register writes" severity note;
+    for i in 0 to 15 loop
+      ra(i) := std_logic_vector(to_unsigned(16#40# + i * 4, 32));
+      rd(i) := std_logic_vector(unsigned'(x"cafe_0000") + i * 3);
+      rr(i) := C_AXI4_RESP_OK;
+      wa(i) := std_logic_vector(to_unsigned((i mod 2) * 4, 32));
+      wd(i) := std_logic_vector(to_unsigned(16#2000_0000# + i, 32));
+    end loop;
+    run(wa, wd, wr, ra, rd, rr, True, 0, cycles);
+    assert reg_rw0 = x"2000_000e" severity error;
+    assert reg_rw1 = x"2000_000f" severity error;
+
+    --  Memory reads and memory writes at the same time (the reads wait
+    --  for the writes).
+    report "Testing memory reads and memory writes" severity note;
+    for i in 0 to 15 loop
+      wa(i) := std_logic_vector(to_unsigned(16#40# + ((i + 8) mod 16) * 4, 32));
+      wd(i) := std_logic_vector(unsigned'(x"cafe_0000") + ((i + 8) mod 16) * 3);
+    end loop;
+    run(wa, wd, wr, ra, rd, rr, False, 0, cycles);
+
+    wait until rising_edge(clk);
+    report "End of test" severity note;
+    end_of_test <= true;
+    wait;
+  end process main;
+
+  watchdog : process is
+  begin
+    wait until end_of_test for 10 us;
+    assert end_of_test report "timeout" severity failure;
+    wait;
+  end process watchdog;
+end behav;
@@ -0,0 +1,228 @@
+entity pipelined_wb_tb is
+end pipelined_wb_tb;
+
+library ieee;
+use ieee.std_logic_1164.all;
+use ieee.numeric_std.all;
+
+use work.wishbone_pkg.all;
+use work.wb_tb_pkg.all;
+
+architecture behav of pipelined_wb_tb is
+  signal rst_n   : std_logic;
+  signal clk     : std_logic;
+  signal wb_in   : t_wishbone_slave_in;
+  signal wb_out  : t_wishbone_slave_out;
+
+  signal reg_rw0 : std_logic_vector(31 downto 0);
+  signal reg_rw1 : std_logic_vector(31 downto 0);
+  signal reg_ro0 : std_logic_vector(31 downto 0);
+
+  --  A request: address, write (or read), data (written or expected)
+  --  and expected error.
+  type t_request is record
+    adr : std_logic_vector(31 downto 0);
+    we  : std_logic;
+    dat : std_logic_vector(31 downto 0);
+    err : std_logic;
+  end record;
+  type t_request_array is array (natural range <>) of t_request;
+
+  signal end_of_test : boolean := false;
+begin
+  --  Clock and reset
+  process
+  begin
+    clk <= '0';
+    wait for 5 ns;
+    clk <= '1';
+    wait for 5 ns;
+
+    if end_of_test then
+      wait;
+    end if;
+  end process;
+
+  --  Watchdog
+  process
+  begin
+    wait until end_of_test for 10 us;
+    assert end_of_test report "TIMEOUT" severity failure;
+    wait;
+  end process;
+
+  rst_n <= '0' after 0 ns, '1' after 20 ns;
+
+  dut : entity work.pipelined_wb
+    port map (
+      rst_n_i    => rst_n,
+      clk_i      => clk,
+      wb_cyc_i   => wb_in.cyc,
+      wb_stb_i   => wb_in.stb,
+      wb_adr_i   => wb_in.adr(6 downto 2),
+      wb_sel_i   => wb_in.sel,
+      wb_we_i    => wb_in.we,
+      wb_dat_i   => wb_in.dat,
+      wb_ack_o   => wb_out.ack,
+      wb_err_o   => wb_out.err,
+      wb_rty_o   => wb_out.rty,
+      wb_stall_o => wb_out.stall,
+      wb_dat_o   => wb_out.dat,
+
+      rw0_o      => reg_rw0,
+      rw1_o      => reg_rw1,
+      ro0_i      => reg_ro0,
+
+      mem_adr_i     => (others => '0'),
+      mem_val_rd_i  => '0',
+      mem_val_dat_o => open);
+
+  reg_ro0 <= x"4567_89ab";
+
+  process
+    variable reqs   : t_request_array(0 to 47);
+    variable cycles : natural;
+    variable stalls : natural;
+
+    --  Issue the requests back-to-back within a single bus cycle: a new
+    --  request is presented as soon as the previous one is accepted (stall
+    --  is not asserted).  Check that there is exactly one ack (or err) per
+    --  request and in order.  Return the number of cycles until the last
+    --  ack and the number of cycles the requests were stalled.
+    procedure run (reqs : t_request_array; cycles, stalls : out natural) is
+      variable rq, ak, n, s : natural := 0;
+      variable r : t_request;
+    begin
+      loop
+        wb_in.cyc <= '1';
+        if rq < reqs'length then
+          r := reqs(reqs'low + rq);
+          wb_in.stb <= '1';
+          wb_in.adr <= r.adr;
+          wb_in.we <= r.we;
+          wb_in.dat <= r.dat;
+        else
+          wb_in.stb <= '0';
+        end if;
+
+        wait until rising_edge(clk);
+
+        if wb_in.stb = '1' then
+          if wb_out.stall = '1' then
+            s := s + 1;
+          else
+            rq := rq + 1;
+          end if;
+        end if;
+        assert not (wb_out.ack = '1' and wb_out.err = '1')
+          report "both ack and err" severity error;
+        if wb_out.ack = '1' or wb_out.err = '1' then
+          if ak >= reqs'length then
+            report "unexpected ack" severity error;
+          else
+            r := reqs(reqs'low + ak);
+            assert wb_out.err = r.err
+              report "bad error for request " & natural'image(ak) severity error;
+            assert r.we = '1' or r.err = '1' or wb_out.dat = r.dat
+              report "bad data for request " & natural'image(ak) severity error;
+          end if;
+          ak := ak + 1;
+        end if;
+
+        n := n + 1;
+        exit when ak = reqs'length;
+        assert n < 200 report "acks missing" severity failure;
+      end loop;
+      cycles := n;
+      stalls := s;
+
+      --  No more acks.
+      wb_in.cyc <= '0';
+      wb_in.stb <= '0';
+      for i in 1 to 4 loop
+        wait until rising_edge(clk);
+        assert wb_out.ack = '0' and wb_out.err = '0'
+          report "duplicated ack" severity error;
+      end loop;
+    end run;
+
+    function word (v : natural) return std_logic_vector is
+    begin
+      return std_logic_vector(to_unsigned(v, 32));
+    end word;
+
+    function mem_data (i : natural) return std_logic_vector is
+    begin
+      return std_logic_vector(unsigned'(x"cafe_0000") + i * 3);
+    end mem_data;
+  begin
+    wb_init(clk, wb_out, wb_in);
+    wb_in.sel <= "1111";
+
+    --  Wait after reset.
+    wait until rising_edge(clk) and rst_n = '1';
+
+    --  Registers: one access per cycle (after two cycles of latency).
+    --  ro0 and the hole at 0xc are errors.
+    report "Testing back-to-back register writes" severity note;
+    for i in 0 to 7 loop
+      reqs(i) := (adr => word((i mod 4) * 4), we => '1',
+                  dat => word(16#1000_0000# + i), err => '0');
+      if i mod 4 >= 2 then
+        reqs(i).err := '1';
+      end if;
+    end loop;
+    run(reqs(0 to 7), cycles, stalls);
+    assert cycles <= 8 + 2 report "writes: not one access per cycle" severity error;
+    assert reg_rw0 = x"1000_0004" severity error;
+    assert reg_rw1 = x"1000_0005" severity error;
+
+    report "Testing back-to-back register reads" severity note;
+    for i in 0 to 7 loop
+      reqs(i) := (adr => word((i mod 4) * 4), we => '0',
+                  dat => x"4567_89ab", err => '0');
+      case i mod 4 is
+        when 0 => reqs(i).dat := x"1000_0004";
+        when 1 => reqs(i).dat := x"1000_0005";
+        when 3 => reqs(i).err := '1';
+        when others => null;
+      end case;
+    end loop;
+    run(reqs(0 to 7), cycles, stalls);
+    assert cycles <= 8 + 2 report "reads: not one access per cycle" severity error;
+
+    report "Testing back-to-back memory writes" severity note;
+    for i in 0 to 15 loop
+      reqs(i) := (adr => word(16#40# + i * 4), we => '1',
+                  dat => mem_data(i), err => '0');
+    end loop;
+    run(reqs(0 to 15), cycles, stalls);
+    assert cycles <= 16 + 2 report "memory: not one write per cycle" severity error;
+
+    --  Memory reads (which stall the bus), mixed with writes and with
+    --  errors just before the memory accesses.
+    report "Testing mixed accesses" severity note;
+    for i in 0 to 7 loop
+      reqs(i * 6 + 0) := (adr => x"0000_000c", we => '0',
+                          dat => (others => '0'), err => '1');
+      reqs(i * 6 + 1) := (adr => word(16#40# + i * 4), we => '0',
+                          dat => mem_data(i), err => '0');
+      reqs(i * 6 + 2) := (adr => x"0000_0008", we => '1',
+                          dat => word(16#2000_0000# + i), err => '1');
+      reqs(i * 6 + 3) := (adr => word(16#40# + (i + 8) * 4), we => '1',
+                          dat => mem_data(i + 8), err => '0');
+      reqs(i * 6 + 4) := (adr => word(16#40# + (i + 8) * 4), we => '0',
+                          dat => mem_data(i + 8), err => '0');
+      reqs(i * 6 + 5) := (adr => word((i mod 2) * 4), we => '1',
+                          dat => word(16#2000_0000# + i), err => '0');
+    end loop;
+    run(reqs, cycles, stalls);
+    assert stalls > 0 report "mixed: stall never asserted" severity error;
+    assert reg_rw0 = x"2000_0006" severity error;
+    assert reg_rw1 = x"2000_0007" severity error;
+
+    end_of_test <= true;
+    report "end of test" severity note;
+    wait;
+  end process;
+end behav;
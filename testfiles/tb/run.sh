@@ -162,6 +162,20 @@ build_all2()
     build_any "sub2_axi4" "sub2_axi4" "all2_axi4" "all2_axi4" "all2_axi4_tb"
 }
 
+build_burst()
+{
+    echo "## Testing AXI4 bursts"
+
+    build_any "burst_axi4"
+}
+
+build_decoder_stages()
+{
+    echo "## Testing decoder stages"
+
+    build_any "decoder_stages_wb"
+}
+
 build_buserr_any()
 {
     name="$1"
@@ -195,6 +209,17 @@ build_lock_any()
     build_any "lock_${name_short}"
 }
 
+build_pipelined_any()
+{
+    name="$1"
+    name_short="$2"
+
+    echo "## Testing pipelined interface '${name}'"
+    sed -e '/bus:/s/BUS/'"${name}"'/' -e '/name:/s/NAME/'"${name_short}"'/' < pipelined.cheby > pipelined_${name_short}.cheby
+
+    build_any "pipelined_${name_short}"
+}
+
 # Build packages
 build_infra
 
@@ -228,6 +253,12 @@ done
 #
 build_all2
 
+# Test AXI4 bursts
+build_burst
+
+# Test registered decoder stages
+build_decoder_stages
+
 # Test buses with bus error
 build_buserr_any "apb-32" "apb"
 build_buserr_any "axi4-lite-32" "axi4"
@@ -242,4 +273,8 @@ build_wmask_any "wb-32-be" "wb"
 # Test locking
 build_lock_any "apb-32" "apb"
 
+# Test pipelined buses
+build_pipelined_any "axi4-lite-32" "axi4"
+build_pipelined_any "wb-32-be" "wb"
+
 echo "SUCCESS"